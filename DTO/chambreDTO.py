@@ -6,7 +6,7 @@
 # et l’API FastAPI, pour contrôler et valider les données.
 # ==============================================================
 
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, Field
 from uuid import UUID
 from modele.chambre import Chambre
@@ -19,7 +19,7 @@ from modele.type_chambre import TypeChambre
 # --------------------------------------------------------------
 class TypeChambreDTO(BaseModel):
     nom_type: str
-    prix_plafond: Optional[str] = None
+    prix_plafond: Optional[float] = None
     prix_plancher: float
     description_chambre: Optional[str] = None
 
@@ -28,7 +28,7 @@ class TypeChambreDTO(BaseModel):
     def __init__(self, typeChambre: TypeChambre):
         super().__init__(
             nom_type=typeChambre.nom_type,
-            prix_plafond=typeChambre.prix_plafond,
+            prix_plafond=None if typeChambre.prix_plafond is None else float(typeChambre.prix_plafond),
             prix_plancher=float(typeChambre.prix_plancher),
             description_chambre=typeChambre.description_chambre,
         )
@@ -62,17 +62,31 @@ class TypeChambreCreateDTO(BaseModel):
     # Champs nécessaires pour créer un type de chambre
     nom_type: str = Field(min_length=1, max_length=50)
     prix_plancher: float
-    prix_plafond: Optional[str] = Field(default=None, max_length=10)
+    prix_plafond: Optional[float] = Field(default=None, ge=0)
     description_chambre: Optional[str] = Field(default=None, max_length=200)
 
+    def model_post_init(self, __context) -> None:
+        # Le plafond est la borne haute de la fourchette de prix
+        if self.prix_plafond is not None and self.prix_plafond < self.prix_plancher:
+            raise ValueError("Le prix plafond doit être supérieur ou égal au prix plancher.")
+
 
 class TypeChambreUpdateDTO(BaseModel):
     # Champs optionnels pour la mise à jour d’un type de chambre
     nom_type: Optional[str] = Field(default=None, min_length=1, max_length=50)
     prix_plancher: Optional[float] = None
-    prix_plafond: Optional[str] = Field(default=None, max_length=10)
+    prix_plafond: Optional[float] = Field(default=None, ge=0)
     description_chambre: Optional[str] = Field(default=None, max_length=200)
 
+    def model_post_init(self, __context) -> None:
+        # Les deux bornes envoyées : vérifiées ici ; une seule : contre la BD (modifierTypeChambre)
+        if (
+            self.prix_plafond is not None
+            and self.prix_plancher is not None
+            and self.prix_plafond < self.prix_plancher
+        ):
+            raise ValueError("Le prix plafond doit être supérieur ou égal au prix plancher.")
+
 
 class ChambreCreateDTO(BaseModel):
     # Champs utilisés lors de la création d’une nouvelle chambre
@@ -90,3 +104,41 @@ class ChambreUpdateDTO(BaseModel):
     autre_informations: Optional[str] = None
     # Permet de changer le type en fournissant un nouveau nom
     nom_type: Optional[str] = Field(default=None, min_length=1, max_length=50)
+
+# --------------------------------------------------------------
+# ---------- Modification en masse (PATCH /chambres) ----------
+# Un filtre (plage de numéros, type, liste d’ids) et les changements
+# à appliquer à toutes les chambres qui y correspondent.
+# --------------------------------------------------------------
+class FiltreChambresDTO(BaseModel):
+    numero_min: Optional[int] = None
+    numero_max: Optional[int] = None
+    nom_type: Optional[str] = Field(default=None, min_length=1, max_length=50)
+    ids: Optional[List[UUID]] = Field(default=None, min_length=1, max_length=10_000)
+
+    def model_post_init(self, __context) -> None:
+        # Pas de filtre vide : on ne modifie jamais tout l’hôtel par accident
+        if not self.model_dump(exclude_none=True):
+            raise ValueError("Au moins un critère de filtre est requis.")
+        if self.numero_min is not None and self.numero_max is not None and self.numero_max < self.numero_min:
+            raise ValueError("numero_max doit être supérieur ou égal à numero_min.")
+
+
+class ChangementsChambresDTO(BaseModel):
+    # Le numéro n’en fait pas partie : il est propre à chaque chambre
+    disponible_reservation: Optional[bool] = None
+    autre_informations: Optional[str] = None
+    nom_type: Optional[str] = Field(default=None, min_length=1, max_length=50)
+
+    def model_post_init(self, __context) -> None:
+        if not self.model_dump(exclude_none=True):
+            raise ValueError("Au moins un changement est requis.")
+
+
+class ModificationChambresDTO(BaseModel):
+    filtre: FiltreChambresDTO
+    changements: ChangementsChambresDTO
+
+
+class ResultatModificationChambresDTO(BaseModel):
+    nombre: int
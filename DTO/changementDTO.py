@@ -0,0 +1,47 @@
+# ==============================================================
+# DTO/changementDTO.py
+# Objets de transfert du flux des changements (GET /changements) :
+# les intégrations (gestionnaire de canaux, tablettes du ménage)
+# ne relisent que les entités modifiées depuis leur dernier curseur.
+# ==============================================================
+
+from __future__ import annotations
+
+import datetime
+from typing import List
+from uuid import UUID
+from pydantic import BaseModel
+
+from modele.changement import Changement
+
+# --------------------------------------------------------------
+# ---------- Un changement du journal ----------
+# --------------------------------------------------------------
+class ChangementDTO(BaseModel):
+    curseur: int
+    entite: str
+    id: UUID
+    operation: str
+    version: int
+    moment: datetime.datetime
+
+    # Constructeur : convertit une ligne du journal (ORM) en DTO
+    def __init__(self, c: Changement):
+        super().__init__(
+            curseur=c.sequence,
+            entite=c.entite,
+            id=c.id_entite,
+            operation=c.operation,
+            version=c.version,
+            moment=c.moment,
+        )
+
+# --------------------------------------------------------------
+# ---------- Une page du flux ----------
+# curseur : à renvoyer comme "depuis" à l’appel suivant.
+# suite : d’autres changements sont déjà disponibles.
+# --------------------------------------------------------------
+class PageChangementsDTO(BaseModel):
+    changements: List[ChangementDTO]
+    curseur: int
+    suite: bool
@@ -0,0 +1,76 @@
+# ==============================================================
+# DTO/importationDTO.py
+# Objets de transfert des imports en masse (metier/importation.py) :
+# la ligne d’une réservation importée (références à plat, telles
+# qu’exportées par l’ancien système) et le bilan d’un import.
+# Les usagers importés sont validés par UsagerCreateDTO.
+# ==============================================================
+
+from __future__ import annotations
+
+import datetime
+from typing import Optional
+from uuid import UUID
+from pydantic import BaseModel, Field
+
+from modele.importation import Importation
+
+# --------------------------------------------------------------
+# ---------- Une réservation importée ----------
+# L’usager est désigné par son id ou par sa clé naturelle (nom,
+# prénom, mobile), la chambre par son id ou par son numéro.
+# --------------------------------------------------------------
+class ReservationImportDTO(BaseModel):
+    dateDebut: datetime.datetime
+    dateFin: datetime.datetime
+    prixParJour: float
+    infoReservation: Optional[str] = None
+
+    idUsager: Optional[UUID] = None
+    nom: Optional[str] = Field(default=None, min_length=1, max_length=50)
+    prenom: Optional[str] = Field(default=None, min_length=1, max_length=50)
+    mobile: Optional[str] = Field(default=None, min_length=1, max_length=15)
+
+    idChambre: Optional[UUID] = None
+    numeroChambre: Optional[int] = None
+
+    def model_post_init(self, __context) -> None:
+        # Mêmes règles que creerReservation
+        if self.dateFin <= self.dateDebut:
+            raise ValueError("La date de fin doit être après la date de début.")
+        if self.idUsager is None and not (self.nom and self.prenom and self.mobile):
+            raise ValueError("idUsager, ou nom, prénom et mobile, requis.")
+        if self.idChambre is None and self.numeroChambre is None:
+            raise ValueError("idChambre ou numeroChambre requis.")
+
+    @property
+    def cle_usager(self) -> tuple:
+        return (self.nom, self.prenom, self.mobile)
+
+# --------------------------------------------------------------
+# ---------- Bilan d’un import ----------
+# traites : enregistrements lus (point de reprise) ;
+# inseres + existants + rejetes = traites.
+# --------------------------------------------------------------
+class ResultatImportDTO(BaseModel):
+    idImport: UUID
+    entite: str
+    format: str
+    etat: str
+    traites: int
+    inseres: int
+    existants: int
+    rejetes: int
+
+    # Constructeur : convertit la ligne de suivi (ORM) en DTO
+    def __init__(self, i: Importation):
+        super().__init__(
+            idImport=i.id_import,
+            entite=i.entite,
+            format=i.format,
+            etat=i.etat,
+            traites=i.traites,
+            inseres=i.inseres,
+            existants=i.existants,
+            rejetes=i.rejetes,
+        )
@@ -0,0 +1,179 @@
+# ==============================================================
+# DTO/projection.py
+# Projection des DTO de sortie (paramètres ?fields= et ?inclure=) :
+# un client qui n’a besoin que des ids et des dates ne reçoit pas
+# la chambre, son type et l’usager imbriqués.
+#
+#     ?fields=dateDebut,dateFin,chambre.numero_chambre
+#     ?inclure=usager
+#
+#   - fields : champs retenus, en chemins pointés pour les objets
+#     imbriqués ("chambre" seul : la chambre complète) ;
+#   - inclure : objets imbriqués ajoutés en entier ("chambre.type_chambre").
+#     Sans fields, seuls les champs simples sont gardés en plus.
+# Sans fields ni inclure, la forme complète est servie (inchangée).
+# L’identifiant de chaque objet (idReservation, idChambre, idUsager)
+# est toujours retourné.
+#
+# La même projection choisit les colonnes lues par le métier (colonnes
+# différées, jointures évitées) et la forme sérialisée (include de pydantic).
+# ==============================================================
+
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Type, Union, get_args
+
+from pydantic import BaseModel
+
+# Arbre des champs retenus : True (champ ou objet complet) ou sous-arbre
+Arbre = Dict[str, Union[bool, dict]]
+
+
+def _relations(modele: Type[BaseModel]) -> Dict[str, Type[BaseModel]]:
+    # Champs qui sont eux-mêmes des DTO (Optional[X] compris)
+    relations = {}
+    for nom, champ in modele.model_fields.items():
+        types = [t for t in (get_args(champ.annotation) or (champ.annotation,)) if t is not type(None)]
+        if len(types) == 1 and isinstance(types[0], type) and issubclass(types[0], BaseModel):
+            relations[nom] = types[0]
+    return relations
+
+
+def _liste(valeur: Optional[str]) -> List[str]:
+    return [p.strip() for p in (valeur or "").split(",") if p.strip()]
+
+
+class Projection:
+    """Champs demandés d’un DTO de sortie (None : forme complète)."""
+
+    def __init__(self, modele: Type[BaseModel], arbre: Optional[Arbre] = None) -> None:
+        self.modele = modele
+        self.arbre = arbre
+
+    @classmethod
+    def depuis_parametres(
+        cls, modele: Type[BaseModel], fields: Optional[str] = None, inclure: Optional[str] = None
+    ) -> "Projection":
+        """Lève ValueError pour un champ inconnu (400 dans l’API)."""
+        if not _liste(fields) and not _liste(inclure):
+            return cls(modele)
+
+        arbre: Arbre = {}
+        if _liste(fields):
+            for chemin in _liste(fields):
+                cls._ajouter(modele, arbre, chemin, relation=False)
+        else:
+            arbre = {nom: True for nom in modele.model_fields if nom not in _relations(modele)}
+        for chemin in _liste(inclure):
+            cls._ajouter(modele, arbre, chemin, relation=True)
+        cls._identifiants(modele, arbre)
+        return cls(modele, arbre)
+
+    @staticmethod
+    def _ajouter(modele: Type[BaseModel], arbre: Arbre, chemin: str, relation: bool) -> None:
+        parties = chemin.split(".")
+        for i, nom in enumerate(parties):
+            relations = _relations(modele)
+            if nom not in modele.model_fields:
+                prefixe = ".".join(parties[:i] + [""])
+                possibles = ", ".join(prefixe + n for n in modele.model_fields)
+                raise ValueError(f"Champ inconnu : {chemin}. Champs possibles : {possibles}.")
+            dernier = i == len(parties) - 1
+            if dernier:
+                if relation and nom not in relations:
+                    raise ValueError(f"inclure n’accepte que des objets imbriqués : {chemin}.")
+                arbre[nom] = True
+                return
+            if nom not in relations:
+                raise ValueError(f"{'.'.join(parties[:i + 1])} n’est pas un objet imbriqué.")
+            sous = arbre.get(nom)
+            if sous is True:
+                return  # objet déjà complet
+            arbre = arbre.setdefault(nom, {})
+            modele = relations[nom]
+
+    @classmethod
+    def _identifiants(cls, modele: Type[BaseModel], arbre: Arbre) -> None:
+        relations = _relations(modele)
+        for nom in modele.model_fields:
+            if nom.startswith("id") and nom not in relations:
+                arbre[nom] = True
+        for nom, sous in arbre.items():
+            if isinstance(sous, dict):
+                cls._identifiants(relations[nom], sous)
+
+    # ---------- Lecture ----------
+    @property
+    def complete(self) -> bool:
+        return self.arbre is None
+
+    def contient(self, chemin: str) -> bool:
+        """Vrai si le champ (chemin pointé) fait partie de la réponse."""
+        noeud: Any = self.arbre
+        for nom in chemin.split("."):
+            if noeud is None or noeud is True:
+                return True
+            noeud = noeud.get(nom)
+            if noeud is None:
+                return False
+        return True
+
+    @property
+    def inclusion(self) -> Optional[Arbre]:
+        """Paramètre include de pydantic (model_dump / dump_json)."""
+        return self.arbre
+
+    def cle(self) -> Any:
+        """Clé hachable (regroupement des lectures simultanées)."""
+        def geler(noeud):
+            if isinstance(noeud, dict):
+                return tuple(sorted((nom, geler(sous)) for nom, sous in noeud.items()))
+            return noeud
+        return geler(self.arbre)
+
+# --------------------------------------------------------------
+# ---------- CONSTRUCTION PARTIELLE ----------
+# Les DTO projetés sont construits sans validation (model_construct)
+# avec seulement les champs demandés : les colonnes non lues ne sont
+# jamais touchées (aucun chargement paresseux).
+#
+# correspondance : {champ: colonne} pour les champs simples et
+# {relation: (attribut de la source ou None, sous-correspondance)}
+# pour les objets imbriqués (None : même ligne, cas de la vue).
+# --------------------------------------------------------------
+
+def colonnes(arbre: Optional[Arbre], correspondance: dict) -> List[str]:
+    """Colonnes de la source à lire (hors objets imbriqués portés par un autre attribut)."""
+    resultat: List[str] = []
+    for nom, cible in correspondance.items():
+        sous = True if arbre is None else arbre.get(nom)
+        if sous is None:
+            continue
+        if isinstance(cible, tuple):
+            attribut, sous_correspondance = cible
+            if attribut is None:
+                resultat += colonnes(None if sous is True else sous, sous_correspondance)
+        else:
+            resultat.append(cible)
+    return resultat
+
+
+def construire(modele: Type[BaseModel], arbre: Optional[Arbre], source: Any, correspondance: dict) -> BaseModel:
+    valeurs = {}
+    relations = _relations(modele)
+    for nom, cible in correspondance.items():
+        sous = True if arbre is None else arbre.get(nom)
+        if sous is None:
+            continue
+        if isinstance(cible, tuple):
+            attribut, sous_correspondance = cible
+            sous_source = source if attribut is None else getattr(source, attribut)
+            valeurs[nom] = construire(
+                relations[nom], None if sous is True else sous, sous_source, sous_correspondance
+            )
+        else:
+            valeur = getattr(source, cible)
+            # Numeric lu en Decimal : les DTO exposent des float
+            valeurs[nom] = float(valeur) if isinstance(valeur, Decimal) else valeur
+    return modele.model_construct(**valeurs)
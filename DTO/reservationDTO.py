@@ -8,7 +8,7 @@
 from __future__ import annotations
 
 import datetime
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 from pydantic import BaseModel, Field, field_validator
 
@@ -16,10 +16,22 @@ from pydantic import BaseModel, Field, field_validator
 from DTO.chambreDTO import ChambreDTO
 from DTO.usagerDTO import UsagerDTO
 
+# --------------------------------------------------------------
+# ---------- Plage de dates (bornes incluses) ----------
+# --------------------------------------------------------------
+class PlageDatesDTO(BaseModel):
+    debut: datetime.datetime
+    fin: datetime.datetime
+
+    def model_post_init(self, __context) -> None:
+        if self.fin < self.debut:
+            raise ValueError("La fin de la plage doit être après son début.")
+
 # --------------------------------------------------------------
 # ---------- DTO pour la recherche de réservations ----------
 # Sert à filtrer les réservations selon différents critères
-# (par ex. nom, prénom, id, id chambre, etc.)
+# (par ex. nom, prénom, id, id chambre, dates, prix, etc.)
+# Tous les filtres sont appliqués par la BD, dans une seule requête.
 # --------------------------------------------------------------
 class CriteresRechercheDTO(BaseModel):
     idReservation: Optional[str] = None
@@ -28,6 +40,23 @@ class CriteresRechercheDTO(BaseModel):
     nom: Optional[str] = None
     prenom: Optional[str] = None
 
+    # Filtres sur les dates : arrivée (début) ou départ (fin) dans une plage,
+    # ou séjour en cours à un instant donné (début <= presentLe < fin)
+    arrivantEntre: Optional[PlageDatesDTO] = None
+    partantEntre: Optional[PlageDatesDTO] = None
+    presentLe: Optional[datetime.datetime] = None
+
+    # Filtres sur la chambre et le prix par jour (bornes incluses)
+    numeroChambre: Optional[int] = Field(default=None, ge=0)
+    nomType: Optional[str] = Field(default=None, min_length=1, max_length=50)
+    prixMin: Optional[float] = Field(default=None, ge=0)
+    prixMax: Optional[float] = Field(default=None, ge=0)
+
+    # Pagination et nombre total de réservations correspondantes
+    limite: Optional[int] = Field(default=None, ge=1, le=1000)
+    decalage: int = Field(default=0, ge=0)
+    total: bool = False
+
     # Validation automatique : les UUID doivent avoir 36 caractères
     @field_validator("idReservation", "idUsager", "idChambre")
     @classmethod
@@ -52,6 +81,21 @@ class CriteresRechercheDTO(BaseModel):
         # Petite logique : le nom et le prénom doivent venir ensemble
         if (self.nom and not self.prenom) or (self.prenom and not self.nom):
             raise ValueError("Le nom et le prénom doivent être tous les deux présents ou absents.")
+        if self.prixMin is not None and self.prixMax is not None and self.prixMax < self.prixMin:
+            raise ValueError("Le prix maximum doit être supérieur au prix minimum.")
+
+    def cle_canonique(self) -> tuple:
+        # Forme normalisée et hachable des critères : deux recherches
+        # équivalentes (ordre des champs, casse des UUID) ont la même clé
+        return tuple(sorted(
+            (
+                champ,
+                valeur.lower() if champ.startswith("id")
+                else tuple(sorted(valeur.items())) if isinstance(valeur, dict)
+                else valeur,
+            )
+            for champ, valeur in self.model_dump(exclude_none=True).items()
+        ))
 
 # --------------------------------------------------------------
 # ---------- DTO principal de réservation ----------
@@ -70,8 +114,12 @@ class ReservationDTO(BaseModel):
 
     # Méthode utilitaire pour créer un DTO à partir d’un objet ORM
     # (version demandée par le professeur dans les consignes)
+    # chambre / usager : DTO déjà connus (catalogue, cache, chargeur par lot)
+    # qui évitent de résoudre r.chambre et r.usager par la session
     @classmethod
-    def from_entity(cls, r) -> "ReservationDTO":
+    def from_entity(
+        cls, r, chambre: Optional[ChambreDTO] = None, usager: Optional[UsagerDTO] = None
+    ) -> "ReservationDTO":
         # Import local pour éviter les références circulaires entre modules
         from modele.reservation import Reservation as ReservationEntity  # noqa: F401
         return cls(
@@ -80,10 +128,33 @@ class ReservationDTO(BaseModel):
             dateFin=r.date_fin_reservation,
             prixParJour=float(r.prix_jour),
             infoReservation=r.info_reservation,
-            chambre=ChambreDTO(r.chambre),
-            usager=UsagerDTO(r.usager),
+            chambre=chambre or ChambreDTO(r.chambre),
+            usager=usager or UsagerDTO(r.usager),
         )
 
+# --------------------------------------------------------------
+# ---------- Annulation en masse ----------
+# Mêmes genres de critères que la recherche : un groupe (liste d’ids),
+# un usager, une chambre, une plage d’arrivée, les séjours à venir.
+# --------------------------------------------------------------
+class CriteresAnnulationDTO(BaseModel):
+    idReservations: Optional[List[UUID]] = Field(default=None, min_length=1, max_length=10_000)
+    idUsager: Optional[UUID] = None
+    idChambre: Optional[UUID] = None
+    arrivantEntre: Optional[PlageDatesDTO] = None
+    # Seulement les séjours qui n’ont pas encore commencé
+    aVenir: bool = False
+
+    def model_post_init(self, __context) -> None:
+        # Pas de critère vide : on n’annule jamais tout par accident
+        if not self.model_dump(exclude_none=True, exclude_defaults=True):
+            raise ValueError("Au moins un critère d’annulation est requis.")
+
+
+class ResultatAnnulationDTO(BaseModel):
+    nombre: int
+    idReservations: List[UUID]
+
 # --------------------------------------------------------------
 # ---------- DTO de mise à jour partielle ----------
 # Sert quand on veut modifier seulement certains champs d’une réservation
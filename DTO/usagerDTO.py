@@ -52,8 +52,13 @@ class UsagerDTO(BaseModel):
     mobile: str
     type_usager: str
 
-    # Constructeur : convertit un objet Usager (ORM) en DTO pour l’API
-    def __init__(self, u: Usager):
+    # Constructeur : convertit un objet Usager (ORM) en DTO pour l’API.
+    # Sans objet ORM, les champs nommés sont validés (model_validate_json,
+    # relecture du cache partagé)
+    def __init__(self, u: Optional[Usager] = None, **champs):
+        if u is None:
+            super().__init__(**champs)
+            return
         super().__init__(
             idUsager=u.id_usager,
             prenom=u.prenom,
@@ -0,0 +1,181 @@
+# ==============================================================
+# bench/bench_archive.py
+# Recherches courantes avant et après l’archivage des réservations
+# terminées (metier/archivage.py), sur un historique de plusieurs
+# années : séjours en cours d’une chambre, arrivées de la semaine,
+# départs récents d’un usager, garde de suppression d’une chambre.
+# Utilise la BD configurée (core/db.py) ; les données du banc sont
+# créées puis supprimées (tables sources, vue et archive).
+#
+# Utilisation :
+#     python -m bench.bench_archive [nb_reservations] [horizon_jours]
+# ==============================================================
+
+from __future__ import annotations
+
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, exists, func, insert, select
+
+from core.cache import cache_metier
+from core.db import SessionLocal, engine, init_db
+from DTO.reservationDTO import CriteresRechercheDTO, PlageDatesDTO
+from metier.archivage import archiverReservations
+from metier.reservationMetier import rechercherReservationPage
+from metier.reservationVue import reconstruire
+from modele.chambre import Chambre
+from modele.reservation import Reservation
+from modele.reservation_archive import ReservationArchive
+from modele.reservation_vue import ReservationVue
+from modele.type_chambre import TypeChambre
+from modele.usager import Usager
+
+NB_CHAMBRES = 500
+NB_USAGERS = 20_000
+ANNEES_HISTORIQUE = 6
+TAILLE_INSERTION = 10_000
+REPETITIONS = 20
+
+
+def _creer_donnees(nb: int, maintenant: datetime):
+    id_type = uuid.uuid4()
+    chambres = [uuid.uuid4() for _ in range(NB_CHAMBRES)]
+    usagers = [uuid.uuid4() for _ in range(NB_USAGERS)]
+    with SessionLocal() as s:
+        s.execute(insert(TypeChambre), [{
+            "id_type_chambre": id_type, "nom_type": f"bench-{id_type.hex[:8]}", "prix_plancher": 80,
+        }])
+        s.execute(insert(Chambre), [
+            {"id_chambre": c, "numero_chambre": 20_000 + i, "disponible_reservation": True, "fk_type_chambre": id_type}
+            for i, c in enumerate(chambres)
+        ])
+        s.execute(insert(Usager), [
+            {
+                "id_usager": u, "prenom": "Bench", "nom": f"Bench-{u}", "adresse": "1 Rue Bench",
+                "mobile": "5550000000", "mot_de_passe": "x" * 60, "type_usager": "client",
+            }
+            for u in usagers
+        ])
+        s.commit()
+
+    # Séjours de 1 à 7 nuits répartis sur l’historique et l’année à venir
+    rnd = random.Random(42)
+    debut_historique = maintenant - timedelta(days=365 * ANNEES_HISTORIQUE)
+    etendue = (365 * (ANNEES_HISTORIQUE + 1)) * 86400
+    with SessionLocal() as s:
+        for debut_lot in range(0, nb, TAILLE_INSERTION):
+            lignes = []
+            for _ in range(min(TAILLE_INSERTION, nb - debut_lot)):
+                debut = debut_historique + timedelta(seconds=rnd.randrange(etendue))
+                lignes.append({
+                    "id_reservation": uuid.uuid4(),
+                    "date_debut_reservation": debut,
+                    "date_fin_reservation": debut + timedelta(days=rnd.randint(1, 7)),
+                    "prix_jour": 90,
+                    "fk_id_usager": rnd.choice(usagers),
+                    "fk_id_chambre": rnd.choice(chambres),
+                })
+            s.execute(insert(Reservation), lignes)
+            s.commit()
+    with engine.begin() as conn:
+        reconstruire(conn)
+    return id_type, chambres, usagers
+
+
+def _supprimer_donnees(id_type, chambres, usagers) -> None:
+    with SessionLocal() as s:
+        for table, colonne in (
+            (Reservation, Reservation.fk_id_chambre),
+            (ReservationVue, ReservationVue.id_chambre),
+            (ReservationArchive, ReservationArchive.id_chambre),
+        ):
+            for debut in range(0, len(chambres), 100):
+                s.execute(delete(table).where(colonne.in_(chambres[debut:debut + 100])))
+                s.commit()
+        s.execute(delete(Chambre).where(Chambre.fk_type_chambre == id_type))
+        for debut in range(0, len(usagers), 1000):
+            s.execute(delete(Usager).where(Usager.id_usager.in_(usagers[debut:debut + 1000])))
+        s.execute(delete(TypeChambre).where(TypeChambre.id_type_chambre == id_type))
+        s.commit()
+    cache_metier.invalider("archive", ["borne"])
+
+
+def _garde_suppression(id_chambre):
+    # Même test que supprimerChambre : la chambre a-t-elle des réservations ?
+    with SessionLocal() as s:
+        return s.scalar(select(exists().where(Reservation.fk_id_chambre == id_chambre)))
+
+
+def _scenarios(chambres, usagers, maintenant: datetime):
+    rnd = random.Random(7)
+    semaine = PlageDatesDTO(debut=maintenant, fin=maintenant + timedelta(days=7))
+    mois_passe = PlageDatesDTO(debut=maintenant - timedelta(days=30), fin=maintenant)
+    return {
+        "séjours en cours d’une chambre": lambda: rechercherReservationPage(
+            CriteresRechercheDTO(idChambre=str(rnd.choice(chambres)), presentLe=maintenant)
+        ),
+        "arrivées de la semaine (+ total)": lambda: rechercherReservationPage(
+            CriteresRechercheDTO(arrivantEntre=semaine, limite=50, total=True)
+        ),
+        "départs du mois d’un usager": lambda: rechercherReservationPage(
+            CriteresRechercheDTO(idUsager=str(rnd.choice(usagers)), partantEntre=mois_passe)
+        ),
+        "garde de suppression de chambre": lambda: _garde_suppression(rnd.choice(chambres)),
+    }
+
+
+def _mesurer(scenarios) -> dict:
+    resultats = {}
+    for nom, appel in scenarios.items():
+        appel()  # plan et cache de requêtes
+        durees = []
+        for _ in range(REPETITIONS):
+            debut = time.perf_counter()
+            appel()
+            durees.append((time.perf_counter() - debut) * 1000)
+        resultats[nom] = statistics.median(durees)
+    return resultats
+
+
+def _tailles() -> str:
+    with SessionLocal() as s:
+        return ", ".join(
+            f"{t.__tablename__} {s.scalar(select(func.count()).select_from(t)):,}"
+            for t in (Reservation, ReservationVue, ReservationArchive)
+        )
+
+
+def main(nb: int = 5_000_000, horizon_jours: int = 365) -> None:
+    init_db()
+    maintenant = datetime.now().replace(microsecond=0)
+
+    debut = time.perf_counter()
+    donnees = _creer_donnees(nb, maintenant)
+    print(f"{nb:,} réservations créées en {time.perf_counter() - debut:.0f} s")
+    try:
+        scenarios = _scenarios(donnees[1], donnees[2], maintenant)
+        print(f"  avant : {_tailles()}")
+        avant = _mesurer(scenarios)
+
+        debut = time.perf_counter()
+        archivees = archiverReservations(horizon_jours, maintenant=maintenant)
+        duree = time.perf_counter() - debut
+        print(f"  archivage (horizon {horizon_jours} j) : {archivees:,} réservations "
+              f"en {duree:.1f} s ({archivees / duree:,.0f}/s)")
+        print(f"  après : {_tailles()}")
+        apres = _mesurer(scenarios)
+
+        print(f"  {'médiane (ms)':34s} {'avant':>9s} {'après':>9s}")
+        for nom in scenarios:
+            print(f"  {nom:34s} {avant[nom]:9.2f} {apres[nom]:9.2f}   ×{avant[nom] / apres[nom]:.1f}")
+    finally:
+        _supprimer_donnees(*donnees)
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:3]))
@@ -0,0 +1,86 @@
+# ==============================================================
+# bench/bench_catalogue.py
+# Empreinte mémoire et latence du catalogue des chambres en
+# mémoire, pour un hôtel fictif de 10 000 chambres (sans BD).
+#
+# Utilisation :
+#     python -m bench.bench_catalogue [nb_chambres]
+# ==============================================================
+
+from __future__ import annotations
+
+import random
+import sys
+import time
+import tracemalloc
+import uuid
+from collections import namedtuple
+from decimal import Decimal
+
+from metier.catalogueChambre import CatalogueChambres
+
+LigneType = namedtuple(
+    "LigneType", "id_type_chambre nom_type prix_plancher prix_plafond description_chambre"
+)
+LigneChambre = namedtuple(
+    "LigneChambre", "id_chambre numero_chambre disponible_reservation autre_informations fk_type_chambre"
+)
+
+
+def _donnees(nb_chambres: int, nb_types: int = 20):
+    types = [
+        LigneType(uuid.uuid4(), f"type-{i}", Decimal("100.00") + i, "250", f"Description {i}")
+        for i in range(nb_types)
+    ]
+    chambres = [
+        LigneChambre(
+            uuid.uuid4(),
+            n,
+            n % 3 != 0,
+            f"Étage {n // 100}, vue {('mer', 'ville', 'cour')[n % 3]}",
+            types[n % nb_types].id_type_chambre,
+        )
+        for n in range(1, nb_chambres + 1)
+    ]
+    return types, chambres
+
+
+def _par_appel(fonction, nb: int) -> float:
+    debut = time.perf_counter()
+    for _ in range(nb):
+        fonction()
+    return (time.perf_counter() - debut) / nb
+
+
+def main(nb_chambres: int = 10_000) -> None:
+    types, chambres = _donnees(nb_chambres)
+    catalogue = CatalogueChambres()
+
+    tracemalloc.start()
+    base = tracemalloc.take_snapshot()
+    catalogue.charger(types, chambres)
+    apres = tracemalloc.take_snapshot()
+    memoire = sum(s.size_diff for s in apres.compare_to(base, "filename"))
+    catalogue.lister_chambres()  # construit la liste de DTO mise en cache
+    avec_liste = tracemalloc.take_snapshot()
+    memoire_liste = sum(s.size_diff for s in avec_liste.compare_to(apres, "filename"))
+    tracemalloc.stop()
+
+    numeros = [random.randint(1, nb_chambres) for _ in range(1000)]
+    it = iter(numeros * 100)
+    ids = [c.id_chambre for c in random.sample(chambres, 1000)]
+    it_ids = iter(ids * 100)
+
+    print(f"Catalogue de {nb_chambres} chambres / {len(types)} types")
+    print(f"  mémoire des index            {memoire / 1024:10.1f} Kio ({memoire / nb_chambres:.0f} o/chambre)")
+    print(f"  mémoire liste DTO en cache   {memoire_liste / 1024:10.1f} Kio")
+    print(f"  chambre_par_numero           {_par_appel(lambda: catalogue.chambre_par_numero(next(it)), 50_000) * 1e6:10.2f} µs")
+    print(f"  chambre_par_id               {_par_appel(lambda: catalogue.chambre_par_id(next(it_ids)), 50_000) * 1e6:10.2f} µs")
+    print(f"  lister_chambres (en cache)   {_par_appel(catalogue.lister_chambres, 200) * 1e6:10.2f} µs")
+    debut = time.perf_counter()
+    catalogue.charger(types, chambres)
+    print(f"  rechargement complet         {(time.perf_counter() - debut) * 1e3:10.2f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
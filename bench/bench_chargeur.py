@@ -0,0 +1,95 @@
+# ==============================================================
+# bench/bench_chargeur.py
+# Débit des lectures d’usagers par id, avec et sans chargement
+# par lots (core/lot.py), sous N threads simultanés.
+# Utilise la BD configurée (core/db.py) ; les usagers de test
+# sont créés au besoin puis supprimés.
+#
+# Utilisation :
+#     python -m bench.bench_chargeur [nb_threads] [lectures_par_thread]
+# ==============================================================
+
+from __future__ import annotations
+
+import random
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import delete, insert
+
+from core.db import SessionLocal, init_db
+from core.lot import ChargeurParLot
+from DTO.usagerDTO import UsagerDTO
+from metier.chargeurs import FENETRE_LOT, TAILLE_MAX_LOT, _usagers
+from modele.usager import Usager
+from tests.compteur_sql import compter_requetes
+
+NB_USAGERS = 2_000
+
+
+def _creer_usagers(nb: int) -> list:
+    ids = [uuid.uuid4() for _ in range(nb)]
+    with SessionLocal() as s:
+        s.execute(
+            insert(Usager),
+            [
+                {
+                    "id_usager": i,
+                    "prenom": "Bench",
+                    "nom": f"Bench-{i}",
+                    "adresse": "1 Rue Bench",
+                    "mobile": "5550000000",
+                    "mot_de_passe": "x" * 60,
+                    "type_usager": "client",
+                }
+                for i in ids
+            ],
+        )
+        s.commit()
+    return ids
+
+
+def _lecture_directe(id_usager):
+    with SessionLocal() as s:
+        u = s.get(Usager, id_usager)
+        return UsagerDTO(u) if u else None
+
+
+def _mesurer(lire, ids, nb_threads: int, par_thread: int):
+    depart = threading.Barrier(nb_threads)
+
+    def travailleur(graine):
+        rnd = random.Random(graine)
+        depart.wait()
+        for _ in range(par_thread):
+            lire(rnd.choice(ids))
+
+    with compter_requetes() as requetes, ThreadPoolExecutor(max_workers=nb_threads) as pool:
+        debut = time.perf_counter()
+        list(pool.map(travailleur, range(nb_threads)))
+        duree = time.perf_counter() - debut
+    return nb_threads * par_thread / duree, len(requetes)
+
+
+def main(nb_threads: int = 32, par_thread: int = 200) -> None:
+    init_db()
+    ids = _creer_usagers(NB_USAGERS)
+    try:
+        lot = ChargeurParLot(_usagers, FENETRE_LOT or 0.002, TAILLE_MAX_LOT)
+        print(f"{nb_threads} threads × {par_thread} lectures d’usagers par id")
+        for nom, lire in (("sans lots (get par id)", _lecture_directe), ("avec lots (IN groupé)", lot.charger)):
+            debit, nb_requetes = _mesurer(lire, ids, nb_threads, par_thread)
+            print(f"  {nom:26s} {debit:10.0f} lectures/s   {nb_requetes:6d} requêtes SQL")
+        s = lot.statistiques()
+        print(f"  taille moyenne des lots    {s['taille_moyenne_lot']:10.1f}")
+    finally:
+        with SessionLocal() as s:
+            s.execute(delete(Usager).where(Usager.id_usager.in_(ids)))
+            s.commit()
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:3]))
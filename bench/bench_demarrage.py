@@ -0,0 +1,58 @@
+# ==============================================================
+# bench/bench_demarrage.py
+# Mesure du démarrage à froid d’un worker :
+#   import de main -> lifespan (réchauffement) -> première réponse 200.
+# Chaque mesure tourne dans un nouveau processus Python (vrai froid).
+#
+# Utilisation :
+#     python -m bench.bench_demarrage [nb_essais]
+# ==============================================================
+
+from __future__ import annotations
+
+import json
+import statistics
+import subprocess
+import sys
+
+# Code exécuté dans le processus enfant
+_ENFANT = r"""
+import json, time
+t0 = time.perf_counter()
+import main
+t_import = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(main.app) as client:          # déclenche le lifespan
+    t_lifespan = time.perf_counter()
+    r = client.get("/chambres")
+    t_premiere = time.perf_counter()
+    assert r.status_code == 200, r.status_code
+    r = client.get("/chambres")
+    t_seconde = time.perf_counter()
+print(json.dumps({
+    "import": t_import - t0,
+    "lifespan": t_lifespan - t_import,
+    "premiere_requete": t_premiere - t_lifespan,
+    "seconde_requete": t_seconde - t_premiere,
+    "total_jusqua_200": t_premiere - t0,
+}))
+"""
+
+
+def mesurer() -> dict:
+    sortie = subprocess.run(
+        [sys.executable, "-c", _ENFANT], capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(sortie.strip().splitlines()[-1])
+
+
+def main(nb_essais: int = 5) -> None:
+    mesures = [mesurer() for _ in range(nb_essais)]
+    print(f"Démarrage à froid ({nb_essais} essais), médiane en ms :")
+    for cle in mesures[0]:
+        valeurs = [m[cle] * 1000 for m in mesures]
+        print(f"  {cle:<20} {statistics.median(valeurs):8.1f}  (min {min(valeurs):.1f}, max {max(valeurs):.1f})")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,108 @@
+# ==============================================================
+# bench/bench_formats.py
+# Taille (brute et gzip) et temps d’encodage / de décodage de
+# chaque format de liste (core/formats.py), pour des réservations
+# et des chambres fictives (sans BD).
+#
+# Utilisation :
+#     python -m bench.bench_formats [nb_lignes]
+# ==============================================================
+
+from __future__ import annotations
+
+import gzip
+import json
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from pydantic import TypeAdapter
+
+from core import formats
+from DTO.chambreDTO import ChambreDTO, TypeChambreDTO
+from DTO.reservationDTO import ReservationDTO
+from DTO.usagerDTO import UsagerDTO
+
+NOMS_TYPES = ["Simple", "Double", "Suite", "Familiale", "Deluxe"]
+
+
+def _donnees(nb: int):
+    types = [
+        TypeChambreDTO.model_construct(
+            nom_type=nom, prix_plancher=80.0 + 20 * i, prix_plafond=300.0,
+            description_chambre=f"Chambre {nom.lower()}",
+        )
+        for i, nom in enumerate(NOMS_TYPES)
+    ]
+    chambres = [
+        ChambreDTO.model_construct(
+            idChambre=uuid.uuid4(), numero_chambre=n, disponible_reservation=n % 3 != 0,
+            autre_informations=f"Étage {n // 100}", type_chambre=types[n % len(types)],
+        )
+        for n in range(1, nb + 1)
+    ]
+    usagers = [
+        UsagerDTO.model_construct(
+            idUsager=uuid.uuid4(), prenom=f"Prénom{i}", nom=f"Nom{i}",
+            adresse=f"{i} rue Principale", mobile=f"555{i:07d}", type_usager=("client", "employe")[i % 10 == 0],
+        )
+        for i in range(max(nb // 5, 1))
+    ]
+    debut = datetime(2030, 1, 1)
+    reservations = [
+        ReservationDTO.model_construct(
+            idReservation=uuid.uuid4(), dateDebut=debut + timedelta(days=i % 365),
+            dateFin=debut + timedelta(days=i % 365 + 3), prixParJour=100.0 + i % 50,
+            infoReservation=None, chambre=chambres[i % nb], usager=usagers[i % len(usagers)],
+        )
+        for i in range(nb)
+    ]
+    return chambres, reservations
+
+
+def _decodeur(format_: str):
+    if format_ in (formats.JSON, formats.COLONNES):
+        return json.loads
+    if format_ == formats.MSGPACK:
+        return formats._msgpack.unpackb
+    pa = formats._pyarrow
+    return lambda contenu: pa.ipc.open_stream(contenu).read_all()
+
+
+def _duree(fonction, nb: int = 5) -> float:
+    # Meilleur de nb essais, en ms
+    meilleur = float("inf")
+    for _ in range(nb):
+        debut = time.perf_counter()
+        fonction()
+        meilleur = min(meilleur, time.perf_counter() - debut)
+    return meilleur * 1e3
+
+
+def mesurer(nom: str, adaptateur, objets: list) -> None:
+    print(f"{nom} ({len(objets)} lignes)")
+    print(f"  {'format':38} {'Kio':>9} {'gzip Kio':>9} {'encodage ms':>12} {'décodage ms':>12}")
+    for format_ in formats.formats_disponibles():
+        contenu = formats.encoder(format_, adaptateur, objets)
+        decoder = _decodeur(format_)
+        encodage = _duree(lambda: formats.encoder(format_, adaptateur, objets))
+        decodage = _duree(lambda: decoder(contenu))
+        print(
+            f"  {format_:38} {len(contenu) / 1024:9.1f} {len(gzip.compress(contenu)) / 1024:9.1f}"
+            f" {encodage:12.2f} {decodage:12.2f}"
+        )
+    absents = {formats.MSGPACK: "msgpack", formats.ARROW: "pyarrow"}
+    for format_, paquet in absents.items():
+        if format_ not in formats.formats_disponibles():
+            print(f"  {format_:38} (paquet {paquet} non installé)")
+
+
+def main(nb: int = 5000) -> None:
+    chambres, reservations = _donnees(nb)
+    mesurer("Chambres", TypeAdapter(list[ChambreDTO]), chambres)
+    mesurer("Réservations", TypeAdapter(list[ReservationDTO]), reservations)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,189 @@
+# ==============================================================
+# bench/rejeu.py
+# Rejoue une capture de trafic (core/capture.py) contre une
+# instance locale, puis compare les distributions de latence
+# de deux versions de l’API.
+#
+# Utilisation :
+#     # 1) rejouer la capture contre la version A, puis la version B
+#     python -m bench.rejeu rejouer captures/trafic-*.jsonl \
+#         --cible http://127.0.0.1:8000 --vitesse 1 --sortie resultats-A.jsonl
+#     # 2) comparer les deux rejeux, route par route
+#     python -m bench.rejeu comparer resultats-A.jsonl resultats-B.jsonl
+#
+# --vitesse 1 respecte le rythme d’origine, 10 le rejoue dix fois
+# plus vite, 0 envoie tout sans attendre (débit maximal).
+# ==============================================================
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List
+from urllib.parse import urlsplit
+
+_UUID = re.compile(r"^[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{12}$")
+
+
+def route(methode: str, chemin: str) -> str:
+    """Gabarit de route : les ids et numéros du chemin sont remplacés."""
+    segments = [
+        "{id}" if _UUID.match(s) else "{no}" if s.isdigit() else s
+        for s in chemin.split("/")
+    ]
+    return f"{methode} {'/'.join(segments)}"
+
+
+def lire_jsonl(chemins: Iterable[str]) -> List[dict]:
+    lignes = []
+    for chemin in chemins:
+        with open(chemin, encoding="utf-8") as f:
+            lignes.extend(json.loads(l) for l in f if l.strip())
+    return lignes
+
+# --------------------------------------------------------------
+# ---------- REJEU ----------
+# --------------------------------------------------------------
+
+class _Client:
+    """Une connexion HTTP persistante par thread."""
+
+    def __init__(self, cible: str) -> None:
+        u = urlsplit(cible)
+        self.hote, self.port = u.hostname, u.port or 80
+        self._local = threading.local()
+
+    def _connexion(self) -> http.client.HTTPConnection:
+        c = getattr(self._local, "connexion", None)
+        if c is None:
+            c = self._local.connexion = http.client.HTTPConnection(self.hote, self.port, timeout=30)
+        return c
+
+    def envoyer(self, entree: dict) -> dict:
+        chemin = entree["chemin"] + (f"?{entree['requete']}" if entree.get("requete") else "")
+        corps = entree.get("corps")
+        donnees = None if corps is None else json.dumps(corps).encode()
+        entetes = {"Content-Type": "application/json"} if donnees is not None else {}
+        debut = time.perf_counter()
+        try:
+            c = self._connexion()
+            c.request(entree["methode"], chemin, body=donnees, headers=entetes)
+            r = c.getresponse()
+            taille = len(r.read())
+            statut = r.status
+        except (OSError, http.client.HTTPException):
+            self._local.connexion = None
+            statut, taille = 0, 0
+        return {
+            "route": route(entree["methode"], entree["chemin"]),
+            "statut": statut,
+            "statut_capture": entree.get("statut"),
+            "duree_ms": round((time.perf_counter() - debut) * 1000, 3),
+            "taille": taille,
+        }
+
+
+def rejouer(entrees: List[dict], cible: str, vitesse: float, clients: int) -> List[dict]:
+    # Les corps tronqués ou non JSON ne peuvent pas être renvoyés
+    entrees = sorted(
+        (e for e in entrees if not (isinstance(e.get("corps"), dict) and set(e["corps"]) & {"__tronque__", "__non_json__"})),
+        key=lambda e: e["t"],
+    )
+    if not entrees:
+        return []
+    client = _Client(cible)
+    t0 = entrees[0]["t"]
+    depart = time.perf_counter()
+    futurs = []
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        for e in entrees:
+            if vitesse > 0:
+                attente = (e["t"] - t0) / vitesse - (time.perf_counter() - depart)
+                if attente > 0:
+                    time.sleep(attente)
+            futurs.append(pool.submit(client.envoyer, e))
+    return [f.result() for f in futurs]
+
+# --------------------------------------------------------------
+# ---------- COMPARAISON ----------
+# --------------------------------------------------------------
+
+def centile(valeurs: List[float], p: float) -> float:
+    if not valeurs:
+        return float("nan")
+    v = sorted(valeurs)
+    return v[min(len(v) - 1, int(round(p / 100 * (len(v) - 1))))]
+
+
+def distributions(resultats: List[dict]) -> Dict[str, List[float]]:
+    par_route: Dict[str, List[float]] = defaultdict(list)
+    for r in resultats:
+        if r["statut"]:
+            par_route[r["route"]].append(r["duree_ms"])
+            par_route["(toutes)"].append(r["duree_ms"])
+    return par_route
+
+
+def comparer(a: List[dict], b: List[dict]) -> List[dict]:
+    """Centiles de latence par route pour A et B, et variation relative de B."""
+    da, db = distributions(a), distributions(b)
+    lignes = []
+    for r in sorted(set(da) | set(db), key=lambda r: (r != "(toutes)", r)):
+        ligne = {"route": r, "n_a": len(da.get(r, [])), "n_b": len(db.get(r, []))}
+        for p in (50, 90, 99):
+            va, vb = centile(da.get(r, []), p), centile(db.get(r, []), p)
+            ligne[f"p{p}_a"], ligne[f"p{p}_b"] = va, vb
+            ligne[f"p{p}_delta"] = (vb - va) / va * 100 if va and va == va and vb == vb else float("nan")
+        lignes.append(ligne)
+    return lignes
+
+
+def _afficher(lignes: List[dict], a: List[dict], b: List[dict]) -> None:
+    print(f"{'route':42s} {'n A/B':>11s} {'p50 A→B (ms)':>20s} {'p90 A→B (ms)':>20s} {'p99 A→B (ms)':>20s}")
+    for l in lignes:
+        cols = [
+            f"{l[f'p{p}_a']:7.2f}→{l[f'p{p}_b']:7.2f} {l[f'p{p}_delta']:+5.0f}%" for p in (50, 90, 99)
+        ]
+        print(f"{l['route'][:42]:42s} {l['n_a']:>5d}/{l['n_b']:<5d} " + " ".join(f"{c:>20s}" for c in cols))
+    for nom, res in (("A", a), ("B", b)):
+        echecs = sum(1 for r in res if r["statut"] == 0)
+        ecarts = sum(1 for r in res if r["statut"] and r.get("statut_capture") and r["statut"] != r["statut_capture"])
+        print(f"{nom} : {len(res)} requêtes, {echecs} échecs réseau, {ecarts} statuts différents de la capture")
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Rejeu de trafic capturé et comparaison de latences.")
+    sous = parser.add_subparsers(dest="commande", required=True)
+
+    p_rejouer = sous.add_parser("rejouer", help="rejoue une capture contre une instance")
+    p_rejouer.add_argument("captures", nargs="+")
+    p_rejouer.add_argument("--cible", default="http://127.0.0.1:8000")
+    p_rejouer.add_argument("--vitesse", type=float, default=1.0)
+    p_rejouer.add_argument("--clients", type=int, default=32)
+    p_rejouer.add_argument("--sortie", required=True)
+
+    p_comparer = sous.add_parser("comparer", help="compare deux rejeux (A puis B)")
+    p_comparer.add_argument("a")
+    p_comparer.add_argument("b")
+
+    args = parser.parse_args(argv)
+    if args.commande == "rejouer":
+        resultats = rejouer(lire_jsonl(args.captures), args.cible, args.vitesse, args.clients)
+        with open(args.sortie, "w", encoding="utf-8") as f:
+            for r in resultats:
+                f.write(json.dumps(r) + "\n")
+        print(f"{len(resultats)} requêtes rejouées -> {args.sortie}")
+    else:
+        a, b = lire_jsonl([args.a]), lire_jsonl([args.b])
+        _afficher(comparer(a, b), a, b)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,334 @@
+# ==============================================================
+# core/admission.py
+# Contrôle d’admission devant la couche métier (middleware ASGI).
+# Quand SQL Server ralentit, les requêtes s’empilent dans le pool
+# de threads de Starlette puis dans le pool SQLAlchemy, et finissent
+# toutes en timeout en même temps. Ici, au plus `limite` requêtes
+# sont en cours ; les suivantes attendent dans une file à priorités
+# (les écritures de réservation passent devant les listes et les
+# rapports) pendant un temps borné, puis sont refusées tout de suite
+# par un 503 avec Retry-After. Les requêtes admises gardent ainsi
+# une latence bornée pendant une baisse de régime de la BD.
+#
+# L’attente de sortie d’une connexion du pool SQL (core/db.py) est
+# mesurée : au-delà du seuil, la BD est saturée et seules les
+# écritures de réservation peuvent encore attendre une place.
+#
+# Réglages :
+#     HOTEL_ADMISSION_MAX=32                      requêtes en cours (0 : désactivé)
+#     HOTEL_ADMISSION_RESERVE=8                   places réservées aux réservations
+#     HOTEL_ADMISSION_FILE=64                     requêtes en attente au maximum
+#     HOTEL_ADMISSION_ATTENTE_RESERVATION_MS=2000 attente maximale d’une écriture
+#     HOTEL_ADMISSION_ATTENTE_LECTURE_MS=250      attente maximale d’une lecture
+#     HOTEL_ADMISSION_SEUIL_POOL_MS=50            attente du pool jugée saturée
+# ==============================================================
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import json
+import math
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from core.echeance import echeance_restante
+
+LIMITE = int(os.environ.get("HOTEL_ADMISSION_MAX", "32"))
+RESERVE = int(os.environ.get("HOTEL_ADMISSION_RESERVE", "8"))
+TAILLE_FILE = int(os.environ.get("HOTEL_ADMISSION_FILE", "64"))
+ATTENTE_RESERVATION = int(os.environ.get("HOTEL_ADMISSION_ATTENTE_RESERVATION_MS", "2000")) / 1000
+ATTENTE_LECTURE = int(os.environ.get("HOTEL_ADMISSION_ATTENTE_LECTURE_MS", "250")) / 1000
+SEUIL_POOL = int(os.environ.get("HOTEL_ADMISSION_SEUIL_POOL_MS", "50")) / 1000
+
+# Classes de requêtes, de la plus prioritaire à la moins prioritaire
+RESERVATION = "reservation"   # écritures de réservation (et des usagers)
+LECTURE = "lecture"           # listes, recherches, rapports, administration des chambres
+MASSE = "masse"               # imports, annulation et modification en masse
+PRIORITES = {RESERVATION: 0, LECTURE: 1, MASSE: 2}
+
+# Retry-After proposé aux clients refusés (secondes)
+RETRY_AFTER_MAX = 30
+
+
+class Refus(Exception):
+    """Requête refusée (file pleine, attente dépassée ou BD saturée)."""
+
+    def __init__(self, motif: str, retry_after: int) -> None:
+        super().__init__(motif)
+        self.motif = motif
+        self.retry_after = retry_after
+
+# --------------------------------------------------------------
+# ---------- MOYENNE GLISSANTE ----------
+# Moyenne exponentielle des mesures, qui décroît aussi avec le
+# temps : sans nouvelle mesure (plus aucune requête n’atteint la
+# BD), une saturation passée est oubliée en quelques secondes.
+# --------------------------------------------------------------
+class MoyenneGlissante:
+    def __init__(self, poids: float = 0.2, demi_vie: float = 1.0) -> None:
+        self.poids = poids
+        self.demi_vie = demi_vie
+        self._valeur = 0.0
+        self._instant = time.monotonic()
+        self._verrou = threading.Lock()
+        self.mesures = 0
+
+    def _actuelle(self, maintenant: float) -> float:
+        return self._valeur * 0.5 ** ((maintenant - self._instant) / self.demi_vie)
+
+    def ajouter(self, mesure: float) -> None:
+        # Appelée depuis les threads du pool de Starlette (sortie d’une connexion)
+        with self._verrou:
+            maintenant = time.monotonic()
+            valeur = self._actuelle(maintenant)
+            self._valeur = valeur + self.poids * (mesure - valeur)
+            self._instant = maintenant
+            self.mesures += 1
+
+    @property
+    def valeur(self) -> float:
+        with self._verrou:
+            return self._actuelle(time.monotonic())
+
+
+# Attente de sortie d’une connexion du pool SQL (alimentée par core/db.py)
+attente_pool = MoyenneGlissante()
+
+# --------------------------------------------------------------
+# ---------- LIMITEUR À PRIORITÉS ----------
+# Tout se passe dans la boucle d’événements (un seul thread) : pas
+# de verrou. Une place libérée va à la requête en attente la plus
+# prioritaire, puis la plus ancienne.
+# --------------------------------------------------------------
+class ControleAdmission:
+    def __init__(
+        self,
+        limite: int = LIMITE,
+        reserve: int = RESERVE,
+        taille_file: int = TAILLE_FILE,
+        attentes: Optional[Dict[str, float]] = None,
+        seuil_pool: float = SEUIL_POOL,
+        mesure_pool: MoyenneGlissante = attente_pool,
+    ) -> None:
+        self.limite = limite
+        self.reserve = min(reserve, max(limite - 1, 0))
+        self.taille_file = taille_file
+        self.attentes = attentes or {
+            RESERVATION: ATTENTE_RESERVATION,
+            LECTURE: ATTENTE_LECTURE,
+            MASSE: ATTENTE_LECTURE,
+        }
+        self.seuil_pool = seuil_pool
+        self.mesure_pool = mesure_pool
+
+        self.en_cours = 0
+        # (priorité, ordre d’arrivée, classe, futur)
+        self._file: List[tuple] = []
+        self._ordre = itertools.count()
+        self._en_attente = {classe: 0 for classe in PRIORITES}
+        self._en_cours = {classe: 0 for classe in PRIORITES}
+        self._admises = {classe: 0 for classe in PRIORITES}
+        self._refusees: Dict[str, Dict[str, int]] = {classe: {} for classe in PRIORITES}
+        self._file_max = 0
+        self._attente_file = MoyenneGlissante(demi_vie=float("inf"))
+        self._duree = MoyenneGlissante(demi_vie=float("inf"))
+
+    # ---------- État ----------
+    @property
+    def profondeur_file(self) -> int:
+        return sum(self._en_attente.values())
+
+    def bd_saturee(self) -> bool:
+        return self.mesure_pool.valeur > self.seuil_pool
+
+    def _limite_classe(self, classe: str) -> int:
+        # Les dernières places restent aux écritures de réservation
+        return self.limite if PRIORITES[classe] == 0 else self.limite - self.reserve
+
+    def _place_libre(self, classe: str) -> bool:
+        return self.en_cours < self._limite_classe(classe)
+
+    def _retry_after(self) -> int:
+        # Temps pour écouler la file devant une nouvelle requête, au moins 1 s
+        duree = self._duree.valeur or 0.1
+        estime = (self.profondeur_file + 1) * duree / max(self.limite, 1)
+        if self.bd_saturee():
+            estime += self.mesure_pool.valeur * (self.profondeur_file + 1)
+        return max(1, min(RETRY_AFTER_MAX, math.ceil(estime)))
+
+    def _refuser(self, classe: str, motif: str) -> Refus:
+        compteurs = self._refusees[classe]
+        compteurs[motif] = compteurs.get(motif, 0) + 1
+        return Refus(motif, self._retry_after())
+
+    def _admettre(self, classe: str) -> None:
+        self.en_cours += 1
+        self._en_cours[classe] += 1
+        self._admises[classe] += 1
+
+    # ---------- Entrée / sortie ----------
+    async def entrer(self, classe: str) -> None:
+        """Attend une place pour une requête de `classe`, ou lève Refus."""
+        priorite = PRIORITES[classe]
+        # Pas de dépassement : une requête au moins aussi prioritaire qui attend passe d’abord
+        devant = any(self._en_attente[c] for c, p in PRIORITES.items() if p <= priorite)
+        if not devant and self._place_libre(classe):
+            self._admettre(classe)
+            return
+
+        attente = self.attentes.get(classe, 0.0)
+        restant = echeance_restante()
+        if restant is not None:
+            # Inutile d’attendre une place au-delà de l’échéance de la requête
+            attente = min(attente, restant)
+        if priorite > 0 and self.bd_saturee():
+            # BD saturée : seules les réservations attendent, le reste est refusé tout de suite
+            raise self._refuser(classe, "bd_saturee")
+        if attente <= 0:
+            raise self._refuser(classe, "complet")
+        if self.profondeur_file >= self.taille_file:
+            raise self._refuser(classe, "file_pleine")
+
+        futur = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._file, (priorite, next(self._ordre), classe, futur))
+        self._en_attente[classe] += 1
+        self._file_max = max(self._file_max, self.profondeur_file)
+        debut = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(futur), attente)
+        except asyncio.TimeoutError:
+            if not futur.done():
+                futur.cancel()
+                self._en_attente[classe] -= 1
+                raise self._refuser(classe, "attente_depassee")
+        except BaseException:
+            # Client parti pendant l’attente : rendre la place si elle venait d’être donnée
+            if futur.done() and not futur.cancelled():
+                self.sortir(classe)
+            else:
+                futur.cancel()
+                self._en_attente[classe] -= 1
+            raise
+        self._attente_file.ajouter(time.perf_counter() - debut)
+
+    def sortir(self, classe: str, duree: Optional[float] = None) -> None:
+        self.en_cours -= 1
+        self._en_cours[classe] -= 1
+        if duree is not None:
+            self._duree.ajouter(duree)
+        self._reveiller()
+
+    def _reveiller(self) -> None:
+        while self._file:
+            _, _, classe, futur = self._file[0]
+            if futur.done():
+                # Attente abandonnée (délai dépassé, client parti)
+                heapq.heappop(self._file)
+                continue
+            if not self._place_libre(classe):
+                return
+            heapq.heappop(self._file)
+            self._en_attente[classe] -= 1
+            self._admettre(classe)
+            futur.set_result(None)
+
+    def statistiques(self) -> dict:
+        pool = self._statistiques_pool()
+        return {
+            "limite": self.limite,
+            "reserve_reservations": self.reserve,
+            "en_cours": self.en_cours,
+            "en_cours_par_classe": dict(self._en_cours),
+            "file": self.profondeur_file,
+            "file_par_classe": dict(self._en_attente),
+            "file_max": self._file_max,
+            "taille_file": self.taille_file,
+            "admises": dict(self._admises),
+            "refusees": {classe: dict(motifs) for classe, motifs in self._refusees.items()},
+            "attente_file_moyenne_ms": round(self._attente_file.valeur * 1000, 3),
+            "duree_moyenne_ms": round(self._duree.valeur * 1000, 3),
+            "attente_pool_ms": round(self.mesure_pool.valeur * 1000, 3),
+            "seuil_pool_ms": round(self.seuil_pool * 1000, 3),
+            "bd_saturee": self.bd_saturee(),
+            "pool": pool,
+        }
+
+    @staticmethod
+    def _statistiques_pool() -> Optional[dict]:
+        from core.db import engine  # import local : core.db importe ce module
+
+        pool = engine.pool
+        if not hasattr(pool, "checkedout"):
+            return None
+        return {
+            "connexions_sorties": pool.checkedout(),
+            "taille": pool.size(),
+            "debordement": pool.overflow(),
+        }
+
+
+controle_admission = ControleAdmission()
+
+# --------------------------------------------------------------
+# ---------- MIDDLEWARE ASGI ----------
+# `classer(methode, chemin)` donne la classe d’une requête, ou None
+# pour la laisser passer sans contrôle (santé, administration, flux
+# longs qui n’occupent pas la BD).
+# --------------------------------------------------------------
+class Admission:
+    def __init__(
+        self,
+        app,
+        classer: Callable[[str, str], Optional[str]],
+        controle: ControleAdmission = controle_admission,
+    ) -> None:
+        self.app = app
+        self.classer = classer
+        self.controle = controle
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        classe = self.classer(scope["method"], scope["path"])
+        if classe is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.controle.entrer(classe)
+        except Refus as refus:
+            await self._refuser(send, refus)
+            return
+
+        debut = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controle.sortir(classe, time.perf_counter() - debut)
+
+    async def _refuser(self, send, refus: Refus) -> None:
+        corps = json.dumps(
+            {
+                "detail": "Service surchargé, réessayer plus tard.",
+                "motif": refus.motif,
+                "file": self.controle.profondeur_file,
+            },
+            ensure_ascii=False,
+        ).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(corps)).encode()),
+                    (b"retry-after", str(refus.retry_after).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": corps})
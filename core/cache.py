@@ -0,0 +1,395 @@
+# ==============================================================
+# core/cache.py
+# Cache à deux niveaux pour la couche métier :
+#   1. un LRU local au processus (le plus rapide),
+#   2. un niveau partagé entre workers / serveurs (protocole Redis).
+# Chaque écriture du métier publie un message d’invalidation
+# (entité + id) : les autres processus retirent l’entrée de leur
+# LRU local. On mesure le taux de succès et le délai (lag) entre
+# l’écriture et la réception de l’invalidation.
+#
+# Les valeurs du niveau partagé sont en JSON, validées par pydantic
+# selon le type annoncé par l’appelant : jamais de pickle, qui
+# exécuterait du code venant de quiconque peut écrire dans Redis.
+#
+# Par défaut, le niveau partagé est un remplaçant en mémoire
+# (BackendMemoire, utile en test et en mono-processus). Avec la
+# variable HOTEL_REDIS_URL, on utilise un vrai serveur Redis
+# (paquet "redis" requis ; "fakeredis" fonctionne aussi en test).
+# ==============================================================
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from pydantic import TypeAdapter
+
+log = logging.getLogger(__name__)
+
+CANAL_INVALIDATION = "hotel:invalidation"
+
+# --------------------------------------------------------------
+# ---------- NIVEAU LOCAL ----------
+# --------------------------------------------------------------
+class CacheLocalLRU:
+    """LRU borné, sûr entre threads."""
+
+    def __init__(self, taille_max: int = 10_000) -> None:
+        self.taille_max = taille_max
+        self._donnees: "OrderedDict[str, Any]" = OrderedDict()
+        self._verrou = threading.Lock()
+
+    def obtenir(self, cle: str, defaut: Any = None) -> Any:
+        with self._verrou:
+            try:
+                self._donnees.move_to_end(cle)
+                return self._donnees[cle]
+            except KeyError:
+                return defaut
+
+    def placer(self, cle: str, valeur: Any) -> None:
+        with self._verrou:
+            self._donnees[cle] = valeur
+            self._donnees.move_to_end(cle)
+            while len(self._donnees) > self.taille_max:
+                self._donnees.popitem(last=False)
+
+    def retirer(self, cle: str) -> None:
+        with self._verrou:
+            self._donnees.pop(cle, None)
+
+    def vider(self) -> None:
+        with self._verrou:
+            self._donnees.clear()
+
+    def __len__(self) -> int:
+        return len(self._donnees)
+
+# --------------------------------------------------------------
+# ---------- NIVEAU PARTAGÉ ----------
+# Les deux backends offrent le même petit sous-ensemble de Redis.
+# --------------------------------------------------------------
+class BackendMemoire:
+    """Remplaçant en mémoire du serveur Redis (un seul processus)."""
+
+    def __init__(self) -> None:
+        self._donnees: Dict[str, tuple] = {}
+        self._abonnes: Dict[str, List[Callable[[bytes], None]]] = {}
+        self._verrou = threading.Lock()
+
+    def get(self, cle: str) -> Optional[bytes]:
+        with self._verrou:
+            entree = self._donnees.get(cle)
+            if entree is None:
+                return None
+            valeur, expire = entree
+            if expire < time.monotonic():
+                del self._donnees[cle]
+                return None
+            return valeur
+
+    def set(self, cle: str, valeur: bytes, ttl: int) -> None:
+        with self._verrou:
+            self._donnees[cle] = (valeur, time.monotonic() + ttl)
+
+    def delete(self, *cles: str) -> None:
+        with self._verrou:
+            for cle in cles:
+                self._donnees.pop(cle, None)
+
+    def publier(self, canal: str, message: bytes) -> None:
+        for rappel in list(self._abonnes.get(canal, ())):
+            rappel(message)
+
+    def abonner(self, canal: str, rappel: Callable[[bytes], None]) -> None:
+        self._abonnes.setdefault(canal, []).append(rappel)
+
+
+class BackendRedis:
+    """Adaptateur pour un client compatible redis-py (redis.Redis, fakeredis.FakeRedis)."""
+
+    def __init__(self, client) -> None:
+        self.client = client
+        self._pubsub = None
+        self._fil = None
+        self._pid: Optional[int] = None
+
+    def get(self, cle: str) -> Optional[bytes]:
+        return self.client.get(cle)
+
+    def set(self, cle: str, valeur: bytes, ttl: int) -> None:
+        self.client.set(cle, valeur, ex=ttl)
+
+    def delete(self, *cles: str) -> None:
+        if cles:
+            self.client.delete(*cles)
+
+    def publier(self, canal: str, message: bytes) -> None:
+        self.client.publish(canal, message)
+
+    def abonner(self, canal: str, rappel: Callable[[bytes], None]) -> None:
+        # Une connexion pub/sub par processus pour tous les canaux
+        # (invalidations, flux) ; après un fork, le fil du parent n’existe pas
+        if self._pid != os.getpid():
+            self._pubsub, self._fil, self._pid = None, None, os.getpid()
+        if self._pubsub is None:
+            self._pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(**{canal: lambda m: rappel(m["data"])})
+        if self._fil is None:
+            # Fil d’écoute en arrière-plan (démon : ne bloque pas l’arrêt)
+            self._fil = self._pubsub.run_in_thread(sleep_time=0.01, daemon=True)
+
+    def fermer(self) -> None:
+        if self._fil is not None:
+            self._fil.stop()
+
+# --------------------------------------------------------------
+# ---------- CACHE MÉTIER ----------
+# --------------------------------------------------------------
+@lru_cache(maxsize=None)
+def _adaptateur(type_valeur: Any) -> TypeAdapter:
+    # Un validateur par type (sa construction est coûteuse)
+    return TypeAdapter(type_valeur)
+
+
+class CacheMetier:
+    def __init__(self, backend=None, taille_locale: int = 10_000, ttl_partage: int = 300) -> None:
+        self.local = CacheLocalLRU(taille_locale)
+        self.backend = backend if backend is not None else BackendMemoire()
+        self.ttl_partage = ttl_partage
+        self._pid_abonne: Optional[int] = None
+        self._pid_origine: Optional[int] = None
+        self._origine = ""
+        self._verrou = threading.Lock()
+        # Abonnés locaux supplémentaires (ex. catalogue des chambres)
+        self._ecouteurs: List[Callable[[str, List[str], Optional[str]], None]] = []
+        self._stats = dict(
+            succes_local=0,
+            succes_partage=0,
+            echecs=0,
+            invalidations_publiees=0,
+            invalidations_recues=0,
+        )
+        self._lag_total = 0.0
+        self._lag_max = 0.0
+        # Clés en cours de chargement : [génération, chargements en cours].
+        # invalider() incrémente la génération : un chargement commencé avant
+        # l’invalidation ne remet pas en cache sa valeur (peut-être périmée).
+        self._generations: Dict[str, List[int]] = {}
+
+    @staticmethod
+    def _cle(entite: str, id_) -> str:
+        # Les UUID arrivent en str ou en UUID, parfois en majuscules
+        return f"{entite}:{str(id_).lower()}"
+
+    def _assurer_abonnement(self) -> None:
+        # Un abonnement par processus : après un fork, l’enfant se réabonne
+        # avec sa propre origine (le fil d’écoute du parent n’existe pas chez lui).
+        pid = os.getpid()
+        if self._pid_abonne == pid:
+            return
+        self._assurer_origine()
+        with self._verrou:
+            if self._pid_abonne == pid:
+                return
+            self.local.vider()
+            self.backend.abonner(CANAL_INVALIDATION, self._recevoir)
+            self._pid_abonne = pid
+
+    # ---------- Lecture ----------
+    def obtenir(self, entite: str, id_, charger: Callable[[], Any], type_valeur: Any) -> Any:
+        """
+        Retourne la valeur en cache (local, puis partagé), sinon appelle `charger()`.
+        `type_valeur` (ex. UsagerDTO) sert à relire la valeur JSON du niveau partagé :
+        un DTO construit depuis le modèle doit aussi accepter ses champs nommés.
+        Une valeur None n’est jamais mise en cache.
+        """
+        self._assurer_abonnement()
+        cle = self._cle(entite, id_)
+        valeur = self.local.obtenir(cle)
+        if valeur is not None:
+            self._compter("succes_local")
+            return valeur
+
+        adaptateur = _adaptateur(type_valeur)
+        generation = self._debut_chargement(cle)
+        try:
+            valeur = self._decoder(cle, self._backend_get(cle), adaptateur)
+            if valeur is not None:
+                self._compter("succes_partage")
+            else:
+                self._compter("echecs")
+                valeur = charger()
+                if valeur is not None:
+                    self._backend_set(cle, adaptateur.dump_json(valeur))
+            if valeur is not None and not self._placer_si_a_jour(cle, generation, valeur):
+                # Invalidée pendant le chargement : la copie partagée est peut-être périmée
+                self._backend_delete(cle)
+        finally:
+            self._fin_chargement(cle)
+        return valeur
+
+    @staticmethod
+    def _decoder(cle: str, brut: Optional[bytes], adaptateur: TypeAdapter) -> Any:
+        # Valeur partagée illisible (autre version du code, écriture étrangère) : rechargée
+        if brut is None:
+            return None
+        try:
+            return adaptateur.validate_json(brut)
+        except ValueError:
+            log.warning("Valeur illisible dans le cache partagé (%s) : rechargée", cle)
+            return None
+
+    def _compter(self, nom: str) -> None:
+        with self._verrou:
+            self._stats[nom] += 1
+
+    def _debut_chargement(self, cle: str) -> int:
+        with self._verrou:
+            entree = self._generations.setdefault(cle, [0, 0])
+            entree[1] += 1
+            return entree[0]
+
+    def _fin_chargement(self, cle: str) -> None:
+        with self._verrou:
+            entree = self._generations[cle]
+            entree[1] -= 1
+            if not entree[1]:
+                del self._generations[cle]
+
+    def _placer_si_a_jour(self, cle: str, generation: int, valeur: Any) -> bool:
+        with self._verrou:
+            if self._generations[cle][0] != generation:
+                return False
+            self.local.placer(cle, valeur)
+            return True
+
+    def _nouvelle_generation(self, cles: Iterable[str]) -> None:
+        # Seules les clés en cours de chargement sont suivies (dictionnaire borné)
+        with self._verrou:
+            for cle in cles:
+                entree = self._generations.get(cle)
+                if entree is not None:
+                    entree[0] += 1
+
+    # ---------- Invalidation ----------
+    def invalider(self, entite: str, ids: Iterable = (), tolerant: bool = True) -> None:
+        """
+        À appeler après chaque écriture validée (commit) sur l’entité.
+        tolerant=False : une panne du niveau partagé lève l’exception (tâche
+        d’arrière-plan rejouée par core/taches.py) au lieu d’être journalisée.
+        """
+        self._assurer_abonnement()
+        ids = [str(i).lower() for i in ids]
+        cles = [self._cle(entite, i) for i in ids]
+        self._nouvelle_generation(cles)
+        for cle in cles:
+            self.local.retirer(cle)
+        try:
+            self.backend.delete(*cles)
+            message = json.dumps(
+                {"entite": entite, "ids": ids, "origine": self._origine, "ts": time.time()}
+            ).encode()
+            self.backend.publier(CANAL_INVALIDATION, message)
+            self._compter("invalidations_publiees")
+        except Exception:
+            if not tolerant:
+                raise
+            # Le niveau partagé est optionnel : une panne Redis ne bloque pas l’écriture
+            log.exception("Publication d’invalidation échouée (%s %s)", entite, ids)
+
+    def _recevoir(self, brut: bytes) -> None:
+        message = json.loads(brut)
+        if message.get("origine") == self._origine:
+            return  # notre propre écriture : déjà appliquée
+        lag = max(0.0, time.time() - message.get("ts", time.time()))
+        with self._verrou:
+            self._stats["invalidations_recues"] += 1
+            self._lag_total += lag
+            self._lag_max = max(self._lag_max, lag)
+        cles = [self._cle(message["entite"], id_) for id_ in message.get("ids", [])]
+        self._nouvelle_generation(cles)
+        for cle in cles:
+            self.local.retirer(cle)
+        for ecouteur in list(self._ecouteurs):
+            try:
+                ecouteur(message["entite"], message.get("ids", []), message.get("origine"))
+            except Exception:
+                log.exception("Écouteur d’invalidation en erreur")
+
+    def ecouter(self, rappel: Callable[[str, List[str], Optional[str]], None]) -> None:
+        """
+        Ajoute un rappel appelé pour chaque invalidation venant d’un autre
+        processus : rappel(entite, ids, origine du message).
+        """
+        self._ecouteurs.append(rappel)
+
+    @property
+    def origine(self) -> str:
+        """Origine des invalidations publiées par ce processus (une par pid, sans s’abonner)."""
+        return self._assurer_origine()
+
+    def _assurer_origine(self) -> str:
+        # Nouvelle origine après un fork, comme l’abonnement
+        pid = os.getpid()
+        if self._pid_origine != pid:
+            with self._verrou:
+                if self._pid_origine != pid:
+                    self._origine = f"{pid}-{uuid.uuid4().hex[:8]}"
+                    self._pid_origine = pid
+        return self._origine
+
+    # ---------- Accès tolérant aux pannes du niveau partagé ----------
+    def _backend_get(self, cle: str) -> Optional[bytes]:
+        try:
+            return self.backend.get(cle)
+        except Exception:
+            log.exception("Lecture du cache partagé échouée")
+            return None
+
+    def _backend_set(self, cle: str, valeur: bytes) -> None:
+        try:
+            self.backend.set(cle, valeur, self.ttl_partage)
+        except Exception:
+            log.exception("Écriture du cache partagé échouée")
+
+    def _backend_delete(self, cle: str) -> None:
+        try:
+            self.backend.delete(cle)
+        except Exception:
+            log.exception("Suppression dans le cache partagé échouée")
+
+    # ---------- Mesures ----------
+    def statistiques(self) -> Dict[str, Any]:
+        with self._verrou:
+            s = dict(self._stats)
+        lectures = s["succes_local"] + s["succes_partage"] + s["echecs"]
+        s["taux_succes_local"] = s["succes_local"] / lectures if lectures else 0.0
+        s["taux_succes_total"] = (s["succes_local"] + s["succes_partage"]) / lectures if lectures else 0.0
+        recues = s["invalidations_recues"]
+        s["lag_invalidation_moyen_ms"] = self._lag_total / recues * 1000 if recues else 0.0
+        s["lag_invalidation_max_ms"] = self._lag_max * 1000
+        s["entrees_locales"] = len(self.local)
+        s["backend"] = type(self.backend).__name__
+        return s
+
+
+def _backend_par_defaut():
+    url = os.environ.get("HOTEL_REDIS_URL")
+    if not url:
+        return BackendMemoire()
+    import redis  # dépendance optionnelle
+
+    return BackendRedis(redis.Redis.from_url(url))
+
+
+# Instance partagée par la couche métier
+cache_metier = CacheMetier(_backend_par_defaut())
@@ -0,0 +1,184 @@
+# ==============================================================
+# core/capture.py
+# Capture d’un échantillon du trafic réel (middleware ASGI) dans
+# un fichier JSONL, rejouable ensuite par bench/rejeu.py.
+# Une ligne par requête : méthode, chemin, corps, statut, durée
+# et taille de la réponse. Les champs personnels des usagers
+# (nom, prénom, adresse, mobile, mot de passe) sont remplacés par
+# des pseudonymes stables : deux requêtes sur le même usager
+# gardent les mêmes valeurs, mais aucune donnée réelle n’est écrite.
+#
+# Activation (désactivée par défaut) :
+#     HOTEL_CAPTURE_TAUX=0.05                       (5 % des requêtes)
+#     HOTEL_CAPTURE_FICHIER=captures/trafic-{pid}.jsonl
+# ==============================================================
+
+from __future__ import annotations
+
+import atexit
+import hashlib
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from typing import Any, Optional
+
+log = logging.getLogger(__name__)
+
+TAUX_CAPTURE = float(os.environ.get("HOTEL_CAPTURE_TAUX", "0"))
+# {pid} : un fichier par worker (pas d’écritures entrelacées entre processus)
+FICHIER_CAPTURE = os.environ.get("HOTEL_CAPTURE_FICHIER", "captures/trafic-{pid}.jsonl")
+
+# Au-delà, le corps n’est pas gardé (la requête est quand même mesurée)
+TAILLE_MAX_CORPS = 64 * 1024
+# Lignes en attente d’écriture ; au-delà, les captures sont abandonnées
+TAILLE_FILE = 10_000
+
+# --------------------------------------------------------------
+# ---------- PSEUDONYMISATION ----------
+# --------------------------------------------------------------
+_SEL = os.environ.get("HOTEL_CAPTURE_SEL", "hotel")
+
+
+def _empreinte(valeur: str) -> str:
+    return hashlib.sha256(f"{_SEL}:{valeur}".encode()).hexdigest()
+
+
+def _pseudonyme(champ: str, valeur: Any) -> Any:
+    if not isinstance(valeur, str):
+        return valeur
+    if champ == "mot_de_passe":
+        return "********"
+    h = _empreinte(valeur)
+    if champ == "mobile":
+        # Chiffres seulement, même longueur (contrainte de 15 caractères)
+        return "".join(str(int(c, 16) % 10) for c in h)[: max(len(valeur), 1)]
+    if champ == "adresse":
+        return f"{int(h[:6], 16) % 9999 + 1} Rue {h[6:14]}"
+    return f"{champ[:1].upper()}{h[:11]}"
+
+
+CHAMPS_PERSONNELS = frozenset({"prenom", "nom", "adresse", "mobile", "mot_de_passe"})
+
+
+def nettoyer(donnees: Any) -> Any:
+    """Remplace récursivement les champs personnels par des pseudonymes stables."""
+    if isinstance(donnees, dict):
+        return {
+            k: _pseudonyme(k, v) if k in CHAMPS_PERSONNELS else nettoyer(v)
+            for k, v in donnees.items()
+        }
+    if isinstance(donnees, list):
+        return [nettoyer(v) for v in donnees]
+    return donnees
+
+# --------------------------------------------------------------
+# ---------- ÉCRITURE (thread dédié) ----------
+# Le fichier est écrit hors de la boucle d’événements : une requête
+# capturée ne paie qu’un put_nowait dans une file bornée.
+# --------------------------------------------------------------
+class _Ecrivain:
+    def __init__(self, chemin: str) -> None:
+        self.chemin = chemin
+        self.file: "queue.Queue[Optional[dict]]" = queue.Queue(TAILLE_FILE)
+        self.abandonnees = 0
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+
+    def ajouter(self, ligne: dict) -> None:
+        if self._pid != os.getpid():
+            # Premier appel (ou premier appel après un fork) : thread neuf
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._boucle, name="capture-trafic", daemon=True)
+            self._thread.start()
+            atexit.register(self.fermer)
+        try:
+            self.file.put_nowait(ligne)
+        except queue.Full:
+            self.abandonnees += 1
+
+    def _boucle(self) -> None:
+        chemin = self.chemin.format(pid=os.getpid())
+        os.makedirs(os.path.dirname(chemin) or ".", exist_ok=True)
+        with open(chemin, "a", encoding="utf-8") as f:
+            while True:
+                ligne = self.file.get()
+                if ligne is None:
+                    return
+                f.write(json.dumps(ligne, ensure_ascii=False, separators=(",", ":")) + "\n")
+                if self.file.empty():
+                    f.flush()
+
+    def fermer(self, delai: float = 5.0) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            self.file.put(None)
+            self._thread.join(delai)
+
+# --------------------------------------------------------------
+# ---------- MIDDLEWARE ASGI ----------
+# --------------------------------------------------------------
+class CaptureTrafic:
+    def __init__(self, app, taux: float = TAUX_CAPTURE, chemin: str = FICHIER_CAPTURE) -> None:
+        self.app = app
+        self.taux = taux
+        self.ecrivain = _Ecrivain(chemin)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.taux <= 0 or random.random() >= self.taux:
+            await self.app(scope, receive, send)
+            return
+
+        morceaux: list = []
+        taille_corps = 0
+        reponse = {"statut": 0, "taille": 0}
+
+        async def recevoir():
+            nonlocal taille_corps
+            message = await receive()
+            if message["type"] == "http.request":
+                corps = message.get("body", b"")
+                taille_corps += len(corps)
+                if taille_corps <= TAILLE_MAX_CORPS:
+                    morceaux.append(corps)
+            return message
+
+        async def envoyer(message):
+            if message["type"] == "http.response.start":
+                reponse["statut"] = message["status"]
+            elif message["type"] == "http.response.body":
+                reponse["taille"] += len(message.get("body", b""))
+            await send(message)
+
+        debut_horloge = time.time()
+        debut = time.perf_counter()
+        try:
+            await self.app(scope, recevoir, envoyer)
+        finally:
+            duree = time.perf_counter() - debut
+            self.ecrivain.ajouter(
+                {
+                    "t": round(debut_horloge, 6),
+                    "methode": scope["method"],
+                    "chemin": scope["path"],
+                    "requete": scope.get("query_string", b"").decode("latin-1"),
+                    "corps": self._corps(morceaux, taille_corps),
+                    "statut": reponse["statut"],
+                    "duree_ms": round(duree * 1000, 3),
+                    "taille": reponse["taille"],
+                }
+            )
+
+    @staticmethod
+    def _corps(morceaux: list, taille: int) -> Any:
+        if not taille:
+            return None
+        if taille > TAILLE_MAX_CORPS:
+            return {"__tronque__": taille}
+        try:
+            return nettoyer(json.loads(b"".join(morceaux)))
+        except ValueError:
+            # Corps non JSON : jamais écrit tel quel (il pourrait contenir des données personnelles)
+            return {"__non_json__": taille}
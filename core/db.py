@@ -1,12 +1,13 @@
 # core/db.py
-import logging
+import os
+import time
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from modele.base import Base
+from sqlalchemy.pool import QueuePool
 
-# Enable SQLAlchemy logging (INFO level)
-logging.basicConfig(level=logging.INFO)
-logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO)
+from core.admission import attente_pool
+from core.echeance import installer as installer_echeances
+from core.requetes_lentes import journal_requetes_lentes
 
 SQLALCHEMY_DATABASE_URL = (
     "mssql+pyodbc://localhost\\SQLEXPRESS/Hotel"
@@ -14,15 +15,56 @@ SQLALCHEMY_DATABASE_URL = (
     "&Trusted_Connection=yes"
 )
 
+# Pool qui mesure l’attente de sortie d’une connexion : quand elle
+# grandit, la BD est saturée et le contrôle d’admission (core/admission.py)
+# refuse les lectures avant qu’elles ne s’empilent ici.
+class PoolChronometre(QueuePool):
+    def connect(self):
+        debut = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            attente_pool.ajouter(time.perf_counter() - debut)
+
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
-    echo=True,                 # ✅ print all SQL querie
+    # Plus de echo=True (chaque instruction journalisée de façon synchrone) :
+    # seules les requêtes lentes sont gardées, voir core/requetes_lentes.py.
+    # HOTEL_SQL_ECHO=1 rétablit l’affichage de tout le SQL (débogage local).
+    echo=os.environ.get("HOTEL_SQL_ECHO", "0") == "1",
     use_setinputsizes=False,
+    poolclass=PoolChronometre,
     future=True
 )
 
+# Échéance de la requête propagée aux instructions SQL (core/echeance.py)
+installer_echeances(engine)
+# Requêtes lentes : SQL normalisé, durée, origine (GET /admin/requetesLentes)
+journal_requetes_lentes.installer(engine)
+
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 
+# Sécurité après fork (app préchargée puis workers forkés, voir core/serveur.py) :
+# les connexions héritées du parent ne doivent jamais être réutilisées par l’enfant.
+# dispose(close=False) repart d’un pool vide sans fermer les sockets du parent.
+def _nouveau_pool_apres_fork():
+    engine.dispose(close=False)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_nouveau_pool_apres_fork)
+
+# Évite de relancer la vérification des migrations à chaque classe de test
+_schema_a_jour = False
+
 def init_db():
-    """Create all tables (only if they don’t exist yet)."""
-    Base.metadata.create_all(bind=engine)
+    """
+    Applique les migrations versionnées en attente (voir core/migrations.py).
+    N’est plus appelé au démarrage de l’API : seulement par les tests
+    et par la commande explicite `python -m core.migrations`.
+    """
+    global _schema_a_jour
+    if _schema_a_jour:
+        return
+    from core.migrations import migrer  # import local : évite la boucle core.db <-> migrations
+    migrer(engine)
+    _schema_a_jour = True
@@ -0,0 +1,101 @@
+# ==============================================================
+# core/demarrage.py
+# Réchauffement de l’API au démarrage d’un worker (hook "lifespan").
+# Sans ça, les premières requêtes après un redémarrage paient :
+#   - l’ouverture des connexions du pool,
+#   - la compilation des requêtes SQLAlchemy (cache de compilation),
+#   - la construction des validateurs pydantic des DTO,
+#   - la génération paresseuse du schéma OpenAPI (/docs).
+# ==============================================================
+
+from __future__ import annotations
+
+import logging
+import os
+import time
+import uuid
+from typing import Dict
+
+from fastapi import FastAPI
+
+from core.db import engine
+
+log = logging.getLogger(__name__)
+
+# Nombre de connexions ouvertes d’avance (borné par la taille du pool)
+NB_CONNEXIONS_PRECHAUFFEES = int(os.environ.get("HOTEL_CONNEXIONS_PRECHAUFFEES", "5"))
+
+# Identifiant qui ne correspond à aucune ligne : les requêtes de
+# réchauffement sont compilées et exécutées sans rien retourner.
+_ID_NUL = str(uuid.UUID(int=0))
+
+
+def ouvrir_connexions(nb: int = NB_CONNEXIONS_PRECHAUFFEES) -> int:
+    """Ouvre `nb` connexions en même temps puis les rend au pool."""
+    taille = getattr(engine.pool, "size", lambda: nb)()
+    nb = max(0, min(nb, taille))
+    connexions = []
+    try:
+        for _ in range(nb):
+            connexions.append(engine.connect())
+    finally:
+        for c in connexions:
+            c.close()  # retourne au pool, la connexion reste ouverte
+    return len(connexions)
+
+
+def verifier_schema() -> None:
+    """Avertit si des migrations n’ont pas été appliquées (sans rien créer)."""
+    from core.migrations import DERNIERE_VERSION, version_courante
+
+    with engine.connect() as conn:
+        version = version_courante(conn)
+    if version < DERNIERE_VERSION:
+        log.warning(
+            "Schéma à la version %s (attendu %s) : exécuter `python -m core.migrations`.",
+            version,
+            DERNIERE_VERSION,
+        )
+
+
+def rechauffer_requetes() -> None:
+    """Exécute une fois les lectures fréquentes du métier (cache de compilation + DTO)."""
+    from DTO.reservationDTO import CriteresRechercheDTO
+    from metier.chambreMetier import (
+        getChambreParNumero,
+        listerChambres,
+        listerTypesChambre,
+        rechercherChambres,
+    )
+    from metier.reservationMetier import rechercherReservation
+    from metier.usagerMetier import getUsagerParId
+
+    listerChambres()
+    listerTypesChambre()
+    getChambreParNumero(-1)
+    rechercherChambres(prix_min=0, prix_max=0, nom_type="", disponible=True)
+    getUsagerParId(_ID_NUL)
+    rechercherReservation(CriteresRechercheDTO(idReservation=_ID_NUL))
+    rechercherReservation(CriteresRechercheDTO(idUsager=_ID_NUL, total=True))
+
+
+def rechauffer(app: FastAPI) -> Dict[str, float]:
+    """
+    Réchauffe le worker. Retourne la durée (secondes) de chaque étape.
+    Une étape qui échoue est journalisée mais ne bloque pas le démarrage.
+    """
+    durees: Dict[str, float] = {}
+    for nom, etape in (
+        ("connexions", ouvrir_connexions),
+        ("schema", verifier_schema),
+        ("requetes", rechauffer_requetes),
+        ("openapi", app.openapi),  # met le schéma en cache dans app.openapi_schema
+    ):
+        debut = time.perf_counter()
+        try:
+            etape()
+        except Exception:
+            log.exception("Réchauffement '%s' échoué", nom)
+        durees[nom] = time.perf_counter() - debut
+    log.info("Réchauffement terminé : %s", {k: round(v, 4) for k, v in durees.items()})
+    return durees
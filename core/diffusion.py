@@ -0,0 +1,250 @@
+# ==============================================================
+# core/diffusion.py
+# Diffusion d’événements en continu (Server-Sent Events) vers de
+# nombreux abonnés : chaque événement est mis en forme une seule fois
+# (trame SSE en octets), puis distribué dans le processus à tous les
+# abonnés, quelques milliers par worker.
+#
+#   - un tampon borné par abonné : un client qui ne lit pas assez vite
+#     (tampon plein) est évincé ; il reçoit "event: resynchroniser",
+#     le flux se ferme et le navigateur se reconnecte ;
+#   - les dernières trames sont gardées : un client qui se reconnecte
+#     avec Last-Event-ID reçoit ce qu’il a manqué, sinon resynchroniser ;
+#   - les événements des autres workers arrivent par le pub/sub du
+#     cache partagé (core/cache.py), publiés en arrière-plan.
+#
+# Réglages :
+#     HOTEL_FLUX_TAMPON=256          trames en attente par abonné
+#     HOTEL_FLUX_HISTORIQUE=1000     trames gardées pour les reprises
+#     HOTEL_FLUX_DUREE_MAX=600       secondes avant de fermer un flux (le
+#                                    client se reconnecte : les abonnés se
+#                                    répartissent entre workers et un arrêt
+#                                    du serveur n’attend pas indéfiniment)
+# ==============================================================
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import uuid
+from collections import deque
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+
+from core.taches import file_taches
+
+log = logging.getLogger(__name__)
+
+TAILLE_TAMPON = int(os.environ.get("HOTEL_FLUX_TAMPON", "256"))
+TAILLE_HISTORIQUE = int(os.environ.get("HOTEL_FLUX_HISTORIQUE", "1000"))
+DUREE_MAX = float(os.environ.get("HOTEL_FLUX_DUREE_MAX", "600"))
+INTERVALLE_VIE = 15.0
+
+# Commentaire SSE envoyé sans événement : garde la connexion ouverte
+# à travers les proxys et détecte les clients partis
+TRAME_VIE = b": ping\n\n"
+TRAME_RESYNCHRONISER = b"event: resynchroniser\ndata: {}\n\n"
+
+
+def trame_sse(id_: str, type_: str, donnees: Any) -> bytes:
+    """Met en forme un événement SSE (le JSON compact ne contient aucun saut de ligne)."""
+    texte = json.dumps(donnees, ensure_ascii=False, separators=(",", ":"), default=str)
+    return f"id: {id_}\nevent: {type_}\ndata: {texte}\n\n".encode()
+
+# --------------------------------------------------------------
+# ---------- ABONNEMENT ----------
+# Lu par la réponse SSE ; rempli par la boucle asyncio du client
+# (jamais depuis un autre fil : asyncio.Queue n’est pas thread-safe).
+# --------------------------------------------------------------
+class Abonnement:
+    __slots__ = ("boucle", "file", "dernier", "evince")
+
+    def __init__(self, boucle: asyncio.AbstractEventLoop, taille: int) -> None:
+        self.boucle = boucle
+        # None en fin de file : le flux se termine (éviction)
+        self.file: asyncio.Queue = asyncio.Queue(max(taille, 2))
+        # Numéro de la dernière trame reçue : évite les doublons après une reprise
+        self.dernier = 0
+        self.evince = False
+
+    async def trames(
+        self, intervalle_vie: float = INTERVALLE_VIE, duree_max: float = DUREE_MAX
+    ) -> AsyncIterator[bytes]:
+        fin = self.boucle.time() + duree_max
+        while True:
+            reste = fin - self.boucle.time()
+            if reste <= 0:
+                return
+            try:
+                trame = await asyncio.wait_for(self.file.get(), min(intervalle_vie, reste))
+            except asyncio.TimeoutError:
+                if self.boucle.time() < fin:
+                    yield TRAME_VIE
+                continue
+            if trame is None:
+                return
+            yield trame
+
+# --------------------------------------------------------------
+# ---------- DIFFUSEUR ----------
+# --------------------------------------------------------------
+class Diffuseur:
+    def __init__(
+        self,
+        canal: str,
+        backend=None,
+        taille_tampon: int = TAILLE_TAMPON,
+        historique: int = TAILLE_HISTORIQUE,
+    ) -> None:
+        self.canal = canal
+        self.backend = backend
+        self.taille_tampon = taille_tampon
+        self._historique: deque = deque(maxlen=historique)  # (numéro, trame)
+        self._numero = 0
+        # Abonnés groupés par boucle : un seul appel inter-fils par boucle et par événement
+        self._boucles: Dict[asyncio.AbstractEventLoop, Set[Abonnement]] = {}
+        self._verrou = threading.Lock()
+        self._pid_abonne: Optional[int] = None
+        self._origine = ""
+        self._stats = dict(
+            publies=0,
+            recus_distants=0,
+            trames_livrees=0,
+            evinces=0,
+            reprises=0,
+            resynchronisations=0,
+        )
+
+    def _assurer_abonnement(self) -> None:
+        # Comme le cache : une origine et un abonnement pub/sub par processus
+        pid = os.getpid()
+        if self._pid_abonne == pid:
+            return
+        with self._verrou:
+            if self._pid_abonne == pid:
+                return
+            self._origine = f"{pid}-{uuid.uuid4().hex[:8]}"
+            self._boucles.clear()
+            self._historique.clear()
+            if self.backend is not None:
+                try:
+                    self.backend.abonner(self.canal, self._recevoir)
+                except Exception:
+                    log.exception("Abonnement au canal %s échoué", self.canal)
+            self._pid_abonne = pid
+
+    # ---------- Publication ----------
+    def publier(self, type_: str, donnees: Any) -> None:
+        """
+        Diffuse un événement aux abonnés de ce processus, puis (en arrière-plan)
+        aux autres workers. À appeler après le commit de l’écriture.
+        """
+        self._assurer_abonnement()
+        self._diffuser(type_, donnees)
+        if self.backend is not None:
+            message = json.dumps(
+                {"type": type_, "donnees": donnees, "origine": self._origine}, default=str
+            ).encode()
+            file_taches.soumettre(self.backend.publier, self.canal, message, nom="diffusion")
+
+    def _recevoir(self, brut: bytes) -> None:
+        message = json.loads(brut)
+        if message.get("origine") == self._origine:
+            return  # notre propre événement : déjà diffusé
+        self._stats["recus_distants"] += 1
+        self._diffuser(message["type"], message["donnees"])
+
+    def _diffuser(self, type_: str, donnees: Any) -> None:
+        with self._verrou:
+            self._numero += 1
+            numero = self._numero
+            trame = trame_sse(f"{self._origine}.{numero}", type_, donnees)
+            self._historique.append((numero, trame))
+            cibles = list(self._boucles.items())
+            self._stats["publies"] += 1
+        for boucle, abonnes in cibles:
+            try:
+                boucle.call_soon_threadsafe(self._livrer, abonnes, numero, trame)
+            except RuntimeError:
+                pass  # boucle fermée
+
+    def _livrer(self, abonnes: Set[Abonnement], numero: int, trame: bytes) -> None:
+        # Dans la boucle des abonnés : put_nowait ne bloque jamais la diffusion
+        livrees = 0
+        for a in list(abonnes):
+            if a.evince or numero <= a.dernier:
+                continue
+            try:
+                a.file.put_nowait(trame)
+            except asyncio.QueueFull:
+                self._evincer(a)
+                continue
+            a.dernier = numero
+            livrees += 1
+        self._stats["trames_livrees"] += livrees
+
+    def _evincer(self, a: Abonnement) -> None:
+        # Client trop lent : son retard est abandonné, il devra tout relire
+        a.evince = True
+        while not a.file.empty():
+            a.file.get_nowait()
+        a.file.put_nowait(TRAME_RESYNCHRONISER)
+        a.file.put_nowait(None)
+        self._stats["evinces"] += 1
+        self.desabonner(a)
+
+    # ---------- Abonnement ----------
+    def abonner(self, dernier_id: Optional[str] = None) -> Abonnement:
+        """
+        Nouvel abonné (à appeler depuis sa boucle asyncio). Avec `dernier_id`
+        (en-tête Last-Event-ID), les trames manquées lui sont renvoyées.
+        """
+        self._assurer_abonnement()
+        a = Abonnement(asyncio.get_running_loop(), self.taille_tampon)
+        with self._verrou:
+            manquees = self._manquees(dernier_id) if dernier_id else []
+            a.dernier = self._numero
+            self._boucles.setdefault(a.boucle, set()).add(a)
+
+        if manquees is None or len(manquees) >= a.file.maxsize:
+            self._stats["resynchronisations"] += 1
+            a.file.put_nowait(TRAME_RESYNCHRONISER)
+        elif manquees:
+            self._stats["reprises"] += 1
+            for trame in manquees:
+                a.file.put_nowait(trame)
+        return a
+
+    def _manquees(self, dernier_id: str) -> Optional[List[bytes]]:
+        # None : reprise impossible (autre worker, redémarrage, historique dépassé)
+        origine, _, numero = dernier_id.rpartition(".")
+        if origine != self._origine or not numero.isdigit():
+            return None
+        numero = int(numero)
+        if numero >= self._numero:
+            return []
+        if not self._historique or numero < self._historique[0][0] - 1:
+            return None
+        return [trame for n, trame in self._historique if n > numero]
+
+    def desabonner(self, a: Abonnement) -> None:
+        with self._verrou:
+            abonnes = self._boucles.get(a.boucle)
+            if abonnes is not None:
+                abonnes.discard(a)
+                if not abonnes:
+                    del self._boucles[a.boucle]
+
+    # ---------- Mesures ----------
+    def statistiques(self) -> Dict[str, Any]:
+        s: Dict[str, Any] = dict(self._stats)
+        with self._verrou:
+            groupes = [list(abonnes) for abonnes in self._boucles.values()]
+        tampons = [a.file.qsize() for abonnes in groupes for a in abonnes]
+        s["abonnes"] = len(tampons)
+        s["tampon_max"] = max(tampons, default=0)
+        s["taille_tampon"] = self.taille_tampon
+        s["historique"] = len(self._historique)
+        return s
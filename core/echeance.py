@@ -0,0 +1,244 @@
+# ==============================================================
+# core/echeance.py
+# Échéance par requête, propagée jusqu’à la BD. Une recherche lente
+# ne doit pas garder une connexion du pool pendant des minutes après
+# que le client a abandonné : chaque requête reçoit une échéance
+# (selon sa route, ou l’en-tête X-Timeout-Ms du client) qui est
+#   - vérifiée avant chaque instruction SQL (annulée si dépassée),
+#   - transmise au pilote : délai d’instruction de pyodbc
+#     (Cursor.timeout, annulation côté serveur par SQL Server),
+#   - vérifiée entre les étapes du métier : verifier_echeance().
+# Une requête hors délai reçoit un 504 ; les dépassements sont
+# comptés par GET /admin/echeances.
+#
+# L’échéance est un objet partagé (contextvar) : elle suit la requête
+# de la boucle d’événements jusqu’au thread qui exécute la route.
+#
+# Réglages (millisecondes) :
+#     HOTEL_ECHEANCE_LECTURE_MS=2000     GET (listes, détails)
+#     HOTEL_ECHEANCE_RECHERCHE_MS=5000   POST /rechercherReservation
+#     HOTEL_ECHEANCE_ECRITURE_MS=5000    créations, modifications, suppressions
+#     HOTEL_ECHEANCE_MASSE_MS=30000      annulation et modification en masse
+#     HOTEL_ECHEANCE_MAX_MS=60000        plafond de l’en-tête X-Timeout-Ms
+# ==============================================================
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LECTURE = "lecture"
+RECHERCHE = "recherche"
+ECRITURE = "ecriture"
+MASSE = "masse"
+
+DELAIS: Dict[str, float] = {
+    LECTURE: int(os.environ.get("HOTEL_ECHEANCE_LECTURE_MS", "2000")) / 1000,
+    RECHERCHE: int(os.environ.get("HOTEL_ECHEANCE_RECHERCHE_MS", "5000")) / 1000,
+    ECRITURE: int(os.environ.get("HOTEL_ECHEANCE_ECRITURE_MS", "5000")) / 1000,
+    MASSE: int(os.environ.get("HOTEL_ECHEANCE_MASSE_MS", "30000")) / 1000,
+}
+DELAI_MAX = int(os.environ.get("HOTEL_ECHEANCE_MAX_MS", "60000")) / 1000
+
+ENTETE = "x-timeout-ms"
+
+# Étapes où un dépassement est constaté
+ENTRE_ETAPES = "entre_etapes"     # verifier_echeance() dans le métier
+AVANT_REQUETE = "avant_requete"   # instruction SQL jamais envoyée
+REQUETE = "requete"               # instruction annulée par le pilote
+
+
+class DelaiDepasse(TimeoutError):
+    """Échéance de la requête dépassée : le travail restant est abandonné."""
+
+    def __init__(self, etape: str) -> None:
+        super().__init__(f"Délai de la requête dépassé ({etape}).")
+        self.etape = etape
+
+
+class Echeance:
+    __slots__ = ("limite", "delai", "depassement")
+
+    def __init__(self, delai: float) -> None:
+        self.delai = delai
+        self.limite = time.monotonic() + delai
+        # Étape du premier dépassement constaté (None : dans les temps)
+        self.depassement: Optional[str] = None
+
+    @property
+    def restant(self) -> float:
+        return self.limite - time.monotonic()
+
+    def depasser(self, etape: str) -> DelaiDepasse:
+        if self.depassement is None:
+            self.depassement = etape
+        return DelaiDepasse(etape)
+
+
+_echeance: ContextVar[Optional[Echeance]] = ContextVar("echeance", default=None)
+
+
+def echeance_courante() -> Optional[Echeance]:
+    return _echeance.get()
+
+
+def echeance_restante() -> Optional[float]:
+    """Secondes restantes avant l’échéance de la requête courante (None : aucune)."""
+    e = _echeance.get()
+    return None if e is None else e.restant
+
+
+@contextmanager
+def avec_echeance(delai: float):
+    """Échéance hors d’une requête HTTP (scripts, tests)."""
+    e = Echeance(delai)
+    jeton = _echeance.set(e)
+    try:
+        yield e
+    finally:
+        _echeance.reset(jeton)
+
+
+def verifier_echeance() -> None:
+    """Point de contrôle coopératif entre deux étapes du métier."""
+    e = _echeance.get()
+    if e is not None and e.restant <= 0:
+        raise e.depasser(ENTRE_ETAPES)
+
+# --------------------------------------------------------------
+# ---------- PROPAGATION AU PILOTE ----------
+# Avant chaque instruction : annulation si l’échéance est passée,
+# sinon délai d’instruction du pilote = temps restant.
+# Le délai est posé sur le curseur qui exécute l’instruction : pyodbc
+# ne copie Connection.timeout dans un curseur qu’à sa création, et
+# before_cursor_execute arrive après — un délai posé sur la connexion
+# ne vaudrait qu’à partir de l’instruction suivante.
+# --------------------------------------------------------------
+def _appliquer_delai(curseur, restant: Optional[float]) -> None:
+    # pyodbc : Cursor.timeout, en secondes entières (0 : aucun délai)
+    if not hasattr(curseur, "timeout"):
+        return
+    secondes = 0 if restant is None else max(1, math.ceil(restant))
+    if curseur.timeout != secondes:
+        curseur.timeout = secondes
+
+
+def installer(engine: Engine) -> None:
+    @event.listens_for(engine, "before_cursor_execute")
+    def _avant(conn, cursor, statement, parameters, context, executemany):
+        e = _echeance.get()
+        if e is not None and e.restant <= 0:
+            raise e.depasser(AVANT_REQUETE)
+        _appliquer_delai(cursor, None if e is None else e.restant)
+
+    @event.listens_for(engine, "handle_error")
+    def _erreur(contexte):
+        # Délai du pilote expiré (HYT00 chez SQL Server) : même erreur que les autres étapes
+        e = _echeance.get()
+        if e is not None and e.restant <= 0 and not isinstance(contexte.original_exception, DelaiDepasse):
+            raise e.depasser(REQUETE) from contexte.original_exception
+
+# --------------------------------------------------------------
+# ---------- STATISTIQUES ----------
+# --------------------------------------------------------------
+class StatistiquesEcheances:
+    def __init__(self) -> None:
+        self._verrou = threading.Lock()
+        self._requetes: Dict[str, int] = {}
+        self._depassements: Dict[str, Dict[str, int]] = {}
+        self._entetes = 0
+
+    def compter(self, genre: str, echeance: Echeance, entete: bool) -> None:
+        with self._verrou:
+            self._requetes[genre] = self._requetes.get(genre, 0) + 1
+            self._entetes += entete
+            if echeance.depassement is not None:
+                etapes = self._depassements.setdefault(genre, {})
+                etapes[echeance.depassement] = etapes.get(echeance.depassement, 0) + 1
+
+    def statistiques(self) -> dict:
+        with self._verrou:
+            return {
+                "delais_ms": {genre: round(d * 1000) for genre, d in DELAIS.items()},
+                "delai_max_ms": round(DELAI_MAX * 1000),
+                "requetes": dict(self._requetes),
+                "delai_fixe_par_entete": self._entetes,
+                "depassements": {genre: dict(e) for genre, e in self._depassements.items()},
+            }
+
+
+statistiques_echeances = StatistiquesEcheances()
+
+# --------------------------------------------------------------
+# ---------- MIDDLEWARE ASGI ----------
+# `genre(methode, chemin)` donne le genre de la route (clé de DELAIS),
+# ou None pour une route sans échéance (flux longs, imports).
+# --------------------------------------------------------------
+def _delai_entete(scope) -> Optional[float]:
+    for nom, valeur in scope["headers"]:
+        if nom == ENTETE.encode():
+            try:
+                ms = int(valeur)
+            except ValueError:
+                return None
+            return min(max(ms, 1) / 1000, DELAI_MAX)
+    return None
+
+
+class Echeances:
+    def __init__(self, app, genre: Callable[[str, str], Optional[str]]) -> None:
+        self.app = app
+        self.genre = genre
+
+    async def __call__(self, scope, receive, send):
+        genre = self.genre(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        if genre is None:
+            await self.app(scope, receive, send)
+            return
+
+        delai = _delai_entete(scope)
+        echeance = Echeance(delai if delai is not None else DELAIS[genre])
+        jeton = _echeance.set(echeance)
+        reponse_commencee = False
+
+        async def envoyer(message):
+            nonlocal reponse_commencee
+            if message["type"] == "http.response.start":
+                reponse_commencee = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, envoyer)
+        except DelaiDepasse as erreur:
+            if reponse_commencee:
+                raise
+            await self._hors_delai(send, erreur)
+        finally:
+            _echeance.reset(jeton)
+            statistiques_echeances.compter(genre, echeance, delai is not None)
+
+    @staticmethod
+    async def _hors_delai(send, erreur: DelaiDepasse) -> None:
+        corps = json.dumps(
+            {"detail": "Délai de la requête dépassé.", "etape": erreur.etape}, ensure_ascii=False
+        ).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 504,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(corps)).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": corps})
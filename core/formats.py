@@ -0,0 +1,212 @@
+# ==============================================================
+# core/formats.py
+# Formats des réponses en liste, choisis par l’en-tête Accept :
+#
+#   application/json                      lignes JSON (par défaut)
+#   application/vnd.hotel.colonnes+json   JSON en colonnes
+#   application/msgpack                   lignes MessagePack (paquet "msgpack")
+#   application/vnd.apache.arrow.stream   Arrow IPC en colonnes (paquet "pyarrow")
+#
+# Les formats en colonnes donnent un tableau par champ (chemins pointés
+# pour les objets imbriqués : "chambre.type_chambre.nom_type") au lieu
+# de répéter chaque nom de clé à chaque ligne ; les chaînes répétées
+# (nom du type, type d’usager, ...) sont codées par dictionnaire :
+#
+#   {"lignes": 3, "colonnes": {
+#       "numero_chambre": [101, 102, 103],
+#       "type_chambre.nom_type": {"dictionnaire": ["Double", "Suite"],
+#                                 "indices": [0, 1, 0]}}}
+#
+# msgpack et pyarrow sont optionnels : sans eux, leur format n’est
+# pas proposé (406 s’il est le seul accepté). Mesures des tailles et
+# des temps : python -m bench.bench_formats
+# ==============================================================
+
+from __future__ import annotations
+
+import datetime
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+
+JSON = "application/json"
+COLONNES = "application/vnd.hotel.colonnes+json"
+MSGPACK = "application/msgpack"
+ARROW = "application/vnd.apache.arrow.stream"
+
+# Alias courants des mêmes formats
+_ALIAS = {
+    "application/x-msgpack": MSGPACK,
+    "application/vnd.apache.arrow.file": ARROW,
+}
+
+
+class FormatNonDisponible(ValueError):
+    """Aucun format accepté par le client n’est disponible (406)."""
+
+
+# Dépendances optionnelles
+try:
+    import msgpack as _msgpack
+except ImportError:
+    _msgpack = None
+try:
+    import pyarrow as _pyarrow
+    import pyarrow.ipc  # noqa: F401
+except ImportError:
+    _pyarrow = None
+
+
+def formats_disponibles() -> List[str]:
+    formats = [JSON, COLONNES]
+    if _msgpack is not None:
+        formats.append(MSGPACK)
+    if _pyarrow is not None:
+        formats.append(ARROW)
+    return formats
+
+# --------------------------------------------------------------
+# ---------- NÉGOCIATION ----------
+# --------------------------------------------------------------
+
+def negocier(accept: Optional[str]) -> str:
+    """Format de la réponse selon l’en-tête Accept (qualité q décroissante)."""
+    if not accept:
+        return JSON
+    disponibles = formats_disponibles()
+    choix = []
+    for ordre, partie in enumerate(accept.split(",")):
+        type_, *parametres = [p.strip() for p in partie.split(";")]
+        qualite = 1.0
+        for p in parametres:
+            if p.startswith("q="):
+                try:
+                    qualite = float(p[2:])
+                except ValueError:
+                    qualite = 0.0
+        if qualite > 0:
+            choix.append((-qualite, ordre, _ALIAS.get(type_.lower(), type_.lower())))
+    for _, _, type_ in sorted(choix):
+        if type_ in ("*/*", "application/*"):
+            return JSON
+        if type_ in disponibles:
+            return type_
+    raise FormatNonDisponible(f"Formats disponibles : {', '.join(disponibles)}.")
+
+# --------------------------------------------------------------
+# ---------- COLONNES ----------
+# --------------------------------------------------------------
+
+def _transposer(lignes: list, prefixe: str, sortie: Dict[str, list]) -> None:
+    # Une colonne par clé ; une colonne d’objets imbriqués est transposée à son tour
+    # (objet absent : None dans chacune de ses colonnes)
+    exemple = next((l for l in lignes if l is not None), None)
+    if exemple is None:
+        return
+    for nom in exemple:
+        valeurs = [None if l is None else l.get(nom) for l in lignes]
+        if any(isinstance(v, dict) for v in valeurs):
+            _transposer(valeurs, f"{prefixe}{nom}.", sortie)
+        else:
+            sortie[prefixe + nom] = valeurs
+
+
+def colonnes(lignes: List[Dict[str, Any]]) -> Dict[str, list]:
+    """Lignes (objets imbriqués compris) -> une liste de valeurs par chemin pointé."""
+    sortie: Dict[str, list] = {}
+    _transposer(lignes, "", sortie)
+    return sortie
+
+
+def _a_coder(valeurs: list) -> Optional[List[str]]:
+    # Dictionnaire utile : chaînes qui se répètent (au plus une valeur distincte sur deux)
+    distinctes: Dict[str, None] = {}
+    for v in valeurs:
+        if v is None:
+            continue
+        if not isinstance(v, str):
+            return None
+        distinctes.setdefault(v)
+        if len(distinctes) * 2 > len(valeurs):
+            return None
+    return list(distinctes) if distinctes else None
+
+
+def encoder_colonnes(lignes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    resultat: Dict[str, Any] = {}
+    for nom, valeurs in colonnes(lignes).items():
+        dictionnaire = _a_coder(valeurs)
+        if dictionnaire is None:
+            resultat[nom] = valeurs
+        else:
+            indice = {v: i for i, v in enumerate(dictionnaire)}
+            resultat[nom] = {"dictionnaire": dictionnaire, "indices": [indice.get(v) for v in valeurs]}
+    return {"lignes": len(lignes), "colonnes": resultat}
+
+
+def lignes_depuis_colonnes(document: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Inverse d’encoder_colonnes (côté client ou en test) : lignes à nouveau imbriquées."""
+    n = document["lignes"]
+    valeurs = {}
+    for nom, colonne in document["colonnes"].items():
+        if isinstance(colonne, dict):
+            dictionnaire = colonne["dictionnaire"]
+            colonne = [None if i is None else dictionnaire[i] for i in colonne["indices"]]
+        valeurs[nom] = colonne
+    lignes = []
+    for i in range(n):
+        ligne: Dict[str, Any] = {}
+        for nom, colonne in valeurs.items():
+            *chemin, feuille = nom.split(".")
+            cible = ligne
+            for partie in chemin:
+                cible = cible.setdefault(partie, {})
+            cible[feuille] = colonne[i]
+        lignes.append(ligne)
+    return lignes
+
+# --------------------------------------------------------------
+# ---------- ENCODAGE ----------
+# --------------------------------------------------------------
+
+def _scalaire(valeur: Any) -> Any:
+    # Types sans équivalent MessagePack / Arrow direct
+    if isinstance(valeur, UUID):
+        return str(valeur)
+    if isinstance(valeur, (datetime.datetime, datetime.date)):
+        return valeur.isoformat()
+    raise TypeError(f"Type non sérialisable : {type(valeur).__name__}")
+
+
+def _arrow(lignes: List[Dict[str, Any]]) -> bytes:
+    pa = _pyarrow
+    tableaux, noms = [], []
+    for nom, valeurs in colonnes(lignes).items():
+        valeurs = [str(v) if isinstance(v, UUID) else v for v in valeurs]
+        dictionnaire = _a_coder(valeurs)
+        tableau = pa.array(valeurs)
+        if dictionnaire is not None:
+            tableau = tableau.dictionary_encode()
+        tableaux.append(tableau)
+        noms.append(nom)
+    table = pa.Table.from_arrays(tableaux, names=noms)
+    puits = pa.BufferOutputStream()
+    with pa.ipc.new_stream(puits, table.schema) as ecrivain:
+        ecrivain.write_table(table)
+    return puits.getvalue().to_pybytes()
+
+
+def encoder(format_: str, adaptateur: TypeAdapter, objets: list, include: Any = None) -> bytes:
+    """Sérialise une liste de DTO (adaptateur : TypeAdapter(list[DTO])) dans le format négocié."""
+    if format_ == JSON:
+        return adaptateur.dump_json(objets, include=include)
+    lignes = adaptateur.dump_python(objets, include=include)
+    if format_ == COLONNES:
+        return to_json(encoder_colonnes(lignes))
+    if format_ == MSGPACK:
+        return _msgpack.packb(lignes, default=_scalaire)
+    if format_ == ARROW:
+        return _arrow(lignes)
+    raise FormatNonDisponible(format_)
@@ -0,0 +1,107 @@
+# ==============================================================
+# core/lot.py
+# Chargement par lots entre requêtes (style "DataLoader").
+# Les lectures par id qui arrivent pendant une courte fenêtre
+# (ex. 2 ms) ou jusqu’à une taille maximale sont regroupées en
+# une seule requête "WHERE id IN (...)", puis chaque appelant
+# reçoit sa propre ligne.
+# Le premier appelant d’un lot (le meneur) attend la fin de la
+# fenêtre et exécute la requête ; les autres attendent le résultat.
+# Si le meneur dépasse son échéance (core/echeance.py), les autres
+# ne reçoivent pas son 504 : ils rejoignent un nouveau lot.
+# ==============================================================
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from core.echeance import DelaiDepasse
+
+
+class _Lot:
+    __slots__ = ("ids", "plein", "termine", "resultats", "erreur")
+
+    def __init__(self) -> None:
+        self.ids: Dict[Hashable, None] = {}  # dict : garde l’ordre, sans doublons
+        self.plein = threading.Event()
+        self.termine = threading.Event()
+        self.resultats: Dict[Hashable, Any] = {}
+        self.erreur: Optional[BaseException] = None
+
+
+class ChargeurParLot:
+    def __init__(
+        self,
+        charger_lot: Callable[[List[Hashable]], Dict[Hashable, Any]],
+        fenetre: float = 0.002,
+        taille_max: int = 100,
+        cle: Callable[[Any], Hashable] = lambda x: x,
+    ) -> None:
+        """
+        charger_lot : reçoit la liste des ids et retourne {id: valeur}
+                      (les ids absents du dict donnent None).
+        fenetre     : secondes d’attente avant d’exécuter un lot (0 = pas de regroupement).
+        cle         : normalise un id (ex. str -> UUID) avant regroupement.
+        """
+        self.charger_lot = charger_lot
+        self.fenetre = fenetre
+        self.taille_max = taille_max
+        self.cle = cle
+        self._verrou = threading.Lock()
+        self._courant: Optional[_Lot] = None
+        self._stats = {"lots": 0, "demandes": 0, "ids_charges": 0}
+
+    def charger(self, id_) -> Any:
+        cle = self.cle(id_)
+        if self.fenetre <= 0:
+            self._compter(1, 1)
+            return self.charger_lot([cle]).get(cle)
+
+        with self._verrou:
+            lot = self._courant
+            meneur = lot is None
+            if meneur:
+                lot = self._courant = _Lot()
+            lot.ids[cle] = None
+            self._stats["demandes"] += 1
+            if len(lot.ids) >= self.taille_max:
+                # Lot plein : on le ferme, les suivants ouvriront un nouveau lot
+                self._courant = None
+                lot.plein.set()
+
+        if meneur:
+            lot.plein.wait(self.fenetre)
+            with self._verrou:
+                if self._courant is lot:
+                    self._courant = None
+                ids = list(lot.ids)
+                self._stats["lots"] += 1
+                self._stats["ids_charges"] += len(ids)
+            try:
+                lot.resultats = self.charger_lot(ids)
+            except BaseException as e:
+                lot.erreur = e
+            finally:
+                lot.termine.set()
+        else:
+            lot.termine.wait()
+            if isinstance(lot.erreur, DelaiDepasse):
+                # Échéance propre au meneur : on recharge sous la nôtre
+                return self.charger(id_)
+
+        if lot.erreur is not None:
+            raise lot.erreur
+        return lot.resultats.get(cle)
+
+    def _compter(self, demandes: int, ids: int) -> None:
+        with self._verrou:
+            self._stats["lots"] += 1
+            self._stats["demandes"] += demandes
+            self._stats["ids_charges"] += ids
+
+    def statistiques(self) -> Dict[str, Any]:
+        s = dict(self._stats)
+        s["taille_moyenne_lot"] = s["ids_charges"] / s["lots"] if s["lots"] else 0.0
+        s["requetes_evitees"] = s["demandes"] - s["lots"]
+        return s
@@ -0,0 +1,56 @@
+# ==============================================================
+# core/memoire_partagee.py
+# Segment de mémoire partagée (mmap anonyme) entre le processus
+# parent du lanceur et ses workers forkés.
+# Contenu : un objet Python sérialisé (pickle) + un numéro de
+# version. Un worker compare la version (8 octets) à la sienne
+# pour savoir s’il doit relire le segment.
+#
+# Disposition : [version: u64][longueur: u64][données...]
+# Le segment doit être créé AVANT le fork pour être partagé.
+# ==============================================================
+
+from __future__ import annotations
+
+import mmap
+import multiprocessing
+import pickle
+import struct
+from typing import Any, Optional, Tuple
+
+_ENTETE = struct.Struct("<QQ")
+
+
+class SegmentPartage:
+    def __init__(self, taille: int = 16 * 1024 * 1024) -> None:
+        # mmap(-1, ...) : mémoire anonyme partagée (MAP_SHARED) avec les enfants
+        self._mm = mmap.mmap(-1, taille)
+        self._capacite = taille - _ENTETE.size
+        # Verrou inter-processus : sérialise écritures et lectures complètes
+        self.verrou = multiprocessing.Lock()
+
+    def version(self) -> int:
+        """Version courante (0 = segment encore vide). Lecture sans verrou."""
+        return struct.unpack_from("<Q", self._mm, 0)[0]
+
+    def lire(self) -> Tuple[int, Optional[Any]]:
+        """Retourne (version, objet). À appeler avec le verrou pour une lecture cohérente."""
+        version, longueur = _ENTETE.unpack_from(self._mm, 0)
+        if version == 0:
+            return 0, None
+        debut = _ENTETE.size
+        return version, pickle.loads(self._mm[debut:debut + longueur])
+
+    def ecrire(self, objet: Any) -> int:
+        """Publie un nouvel objet et retourne sa version. À appeler avec le verrou."""
+        donnees = pickle.dumps(objet, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(donnees) > self._capacite:
+            raise ValueError(
+                f"Segment partagé trop petit ({len(donnees)} > {self._capacite} octets)."
+            )
+        version = self.version() + 1
+        debut = _ENTETE.size
+        self._mm[debut:debut + len(donnees)] = donnees
+        # L’en-tête (donc la nouvelle version) est écrit en dernier
+        _ENTETE.pack_into(self._mm, 0, version, len(donnees))
+        return version
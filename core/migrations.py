@@ -0,0 +1,378 @@
+# ==============================================================
+# core/migrations.py
+# Migrations versionnées du schéma de la BD.
+# Le schéma n’est plus créé au démarrage de l’API : on l’applique
+# explicitement, une fois par déploiement :
+#     python -m core.migrations
+# La table "schema_version" garde la liste des versions appliquées.
+# Chaque migration est idempotente (elle vérifie l’état réel de la BD)
+# pour pouvoir être rejouée sans danger sur une base existante.
+# ==============================================================
+
+from __future__ import annotations
+
+import logging
+import re
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import (
+    CHAR,
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    MetaData,
+    Numeric,
+    SmallInteger,
+    String,
+    Table,
+    Uuid,
+    bindparam,
+    inspect,
+    select,
+    func,
+    text,
+)
+from sqlalchemy.engine import Connection, Engine
+
+from modele.chambre import Chambre
+from modele.reservation import Reservation
+from modele.type_chambre import TypeChambre
+
+log = logging.getLogger(__name__)
+
+# Table de suivi des versions (hors des modèles métier)
+_meta_versions = MetaData()
+schema_version = Table(
+    "schema_version",
+    _meta_versions,
+    Column("version", Integer, primary_key=True),
+    Column("description", String(200), nullable=False),
+    Column("applique_le", DateTime, nullable=False),
+)
+
+# --------------------------------------------------------------
+# ---------- MIGRATIONS ----------
+# --------------------------------------------------------------
+
+# Schéma initial figé : les quatre tables telles qu’au départ du projet.
+# Jamais les modèles actuels : leurs ajouts (contraintes, index,
+# prix_plafond numérique) sont ceux des migrations suivantes.
+_meta_v1 = MetaData()
+Table(
+    "type_chambre",
+    _meta_v1,
+    Column("id_type_chambre", Uuid, primary_key=True),
+    Column("nom_type", String(50), nullable=False),
+    Column("prix_plancher", Numeric(10, 2), nullable=False),
+    Column("prix_plafond", String(10), nullable=True),
+    Column("description_chambre", String(200), nullable=True),
+)
+Table(
+    "chambre",
+    _meta_v1,
+    Column("id_chambre", Uuid, primary_key=True),
+    Column("numero_chambre", SmallInteger, nullable=False),
+    Column("disponible_reservation", Boolean, nullable=False),
+    Column("autre_informations", String, nullable=True),
+    Column("fk_type_chambre", Uuid, ForeignKey("type_chambre.id_type_chambre"), nullable=False),
+)
+Table(
+    "usager",
+    _meta_v1,
+    Column("id_usager", Uuid, primary_key=True),
+    Column("prenom", String(50), nullable=False),
+    Column("nom", String(50), nullable=False),
+    Column("adresse", String(100), nullable=False),
+    Column("mobile", CHAR(15), nullable=False),
+    Column("mot_de_passe", CHAR(60), nullable=False),
+    Column("type_usager", String(50), nullable=False),
+)
+Table(
+    "reservation",
+    _meta_v1,
+    Column("id_reservation", Uuid, primary_key=True),
+    Column("date_debut_reservation", DateTime, nullable=False),
+    Column("date_fin_reservation", DateTime, nullable=False),
+    Column("prix_jour", Numeric(10, 2), nullable=False),
+    Column("info_reservation", String, nullable=True),
+    Column("fk_id_usager", Uuid, ForeignKey("usager.id_usager"), nullable=False),
+    Column("fk_id_chambre", Uuid, ForeignKey("chambre.id_chambre"), nullable=False),
+)
+
+
+def _v1_schema_initial(conn: Connection) -> None:
+    # Crée les tables manquantes (checkfirst : les tables existantes sont gardées)
+    _meta_v1.create_all(conn)
+
+
+def _v2_contraintes_uniques(conn: Connection) -> None:
+    # Clés naturelles utilisées par les upserts (creerUsager, creerTypeChambre).
+    # Sur une base créée avant cette version, on ajoute un index UNIQUE.
+    # Les doublons déjà présents ne sont pas fusionnés (des réservations
+    # peuvent pointer sur chacun) : la migration s’arrête en les listant,
+    # à corriger à la main avant de la relancer.
+    insp = inspect(conn)
+    for table, nom, colonnes in (
+        ("type_chambre", "uq_type_chambre_nom_type", ("nom_type",)),
+        ("usager", "uq_usager_nom_prenom_mobile", ("nom", "prenom", "mobile")),
+    ):
+        existants = {c["name"] for c in insp.get_unique_constraints(table)}
+        existants |= {i["name"] for i in insp.get_indexes(table)}
+        if nom in existants:
+            continue
+        liste = ", ".join(colonnes)
+        doublons = conn.exec_driver_sql(
+            f"SELECT {liste}, COUNT(*) FROM {table} GROUP BY {liste} "
+            f"HAVING COUNT(*) > 1 ORDER BY {liste}"
+        ).all()
+        if doublons:
+            raise RuntimeError(
+                f"Doublons dans {table} ({liste}), à corriger avant la migration : "
+                + "; ".join(f"{tuple(d[:-1])} × {d[-1]}" for d in doublons)
+            )
+        conn.exec_driver_sql(f"CREATE UNIQUE INDEX {nom} ON {table} ({liste})")
+
+
+def _creer_index_manquants(conn: Connection, *tables: Table) -> None:
+    # Index déclarés dans les modèles (déjà créés par la v1 sur une
+    # base neuve : on n’ajoute que ceux qui manquent)
+    insp = inspect(conn)
+    for table in tables:
+        existants = {i["name"] for i in insp.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existants:
+                index.create(conn)
+
+
+def _v3_index_recherche(conn: Connection) -> None:
+    # Index composites de la recherche de réservations
+    _creer_index_manquants(conn, Reservation.__table__, Chambre.__table__)
+
+
+# Vue des réservations figée telle qu’à la v4 : prix_plafond y est
+# encore du texte, comme dans type_chambre (numérique à partir de la v5)
+_meta_v4 = MetaData()
+_vue_v4 = Table(
+    "reservation_vue",
+    _meta_v4,
+    Column("id_reservation", Uuid, primary_key=True),
+    Column("date_debut_reservation", DateTime, nullable=False),
+    Column("date_fin_reservation", DateTime, nullable=False),
+    Column("prix_jour", Numeric(10, 2), nullable=False),
+    Column("info_reservation", String, nullable=True),
+    Column("id_usager", Uuid, nullable=False),
+    Column("prenom", String(50), nullable=False),
+    Column("nom", String(50), nullable=False),
+    Column("adresse", String(100), nullable=False),
+    Column("mobile", CHAR(15), nullable=False),
+    Column("type_usager", String(50), nullable=False),
+    Column("id_chambre", Uuid, nullable=False),
+    Column("numero_chambre", SmallInteger, nullable=False),
+    Column("disponible_reservation", Boolean, nullable=False),
+    Column("autre_informations", String, nullable=True),
+    Column("nom_type", String(50), nullable=False),
+    Column("prix_plancher", Numeric(10, 2), nullable=False),
+    Column("prix_plafond", String(10), nullable=True),
+    Column("description_chambre", String(200), nullable=True),
+    Index("ix_reservation_vue_chambre_debut", "id_chambre", "date_debut_reservation"),
+    Index("ix_reservation_vue_usager_debut", "id_usager", "date_debut_reservation"),
+    Index("ix_reservation_vue_debut_fin", "date_debut_reservation", "date_fin_reservation"),
+    Index("ix_reservation_vue_fin", "date_fin_reservation"),
+    Index("ix_reservation_vue_numero", "numero_chambre"),
+    Index("ix_reservation_vue_type", "nom_type"),
+    Index("ix_reservation_vue_nom_prenom", "nom", "prenom"),
+)
+
+
+def _v4_vue_reservations(conn: Connection) -> None:
+    # Modèle de lecture dénormalisé des réservations (voir
+    # metier/reservationVue.py), rempli à partir des tables sources
+    # de la v1 : jamais le modèle actuel, dont prix_plafond est numérique
+    _vue_v4.create(conn, checkfirst=True)
+    t = _meta_v1.tables
+    reservation, usager, chambre, type_chambre = (
+        t["reservation"], t["usager"], t["chambre"], t["type_chambre"]
+    )
+    source = (
+        select(
+            reservation.c.id_reservation,
+            reservation.c.date_debut_reservation,
+            reservation.c.date_fin_reservation,
+            reservation.c.prix_jour,
+            reservation.c.info_reservation,
+            usager.c.id_usager,
+            usager.c.prenom,
+            usager.c.nom,
+            usager.c.adresse,
+            usager.c.mobile,
+            usager.c.type_usager,
+            chambre.c.id_chambre,
+            chambre.c.numero_chambre,
+            chambre.c.disponible_reservation,
+            chambre.c.autre_informations,
+            type_chambre.c.nom_type,
+            type_chambre.c.prix_plancher,
+            type_chambre.c.prix_plafond,
+            type_chambre.c.description_chambre,
+        )
+        .join(usager, usager.c.id_usager == reservation.c.fk_id_usager)
+        .join(chambre, chambre.c.id_chambre == reservation.c.fk_id_chambre)
+        .join(type_chambre, type_chambre.c.id_type_chambre == chambre.c.fk_type_chambre)
+    )
+    conn.execute(_vue_v4.delete())
+    conn.execute(_vue_v4.insert().from_select([c.name for c in source.selected_columns], source))
+
+
+# Espaces (dont insécables) et symboles monétaires ignorés ; tout autre
+# caractère rend le prix illisible
+_DECORATIONS_PRIX = re.compile(r"\$CA|CAD|[\s$€]", re.IGNORECASE)
+
+
+def prix_depuis_texte(texte: Optional[str]) -> Optional[Decimal]:
+    """
+    Convertit un ancien prix_plafond texte ("250", "250,50 $", "1 200.00",
+    "$1,200") en Decimal à 2 décimales. None si vide ou illisible.
+    """
+    if texte is None:
+        return None
+    s = _DECORATIONS_PRIX.sub("", texte)
+    if not re.fullmatch(r"[0-9.,]+", s):
+        return None
+    if "," in s and "." in s:
+        # Le premier séparateur est celui des milliers
+        milliers = "," if s.index(",") < s.index(".") else "."
+        s = s.replace(milliers, "").replace(",", ".")
+    elif "," in s:
+        # Virgule décimale (2 chiffres au plus après) ou séparateur de milliers
+        s = s.replace(",", ".") if re.fullmatch(r"\d+,\d{1,2}", s) else s.replace(",", "")
+    try:
+        prix = Decimal(s).quantize(Decimal("0.01"))
+    except InvalidOperation:
+        return None
+    # Numeric(10, 2) : 8 chiffres avant la virgule
+    return prix if prix < Decimal("1e8") else None
+
+
+def _renommer_colonne(conn: Connection, table: str, ancien: str, nouveau: str) -> None:
+    if conn.dialect.name == "mssql":
+        conn.exec_driver_sql(f"EXEC sp_rename '{table}.{ancien}', '{nouveau}', 'COLUMN'")
+    else:
+        conn.exec_driver_sql(f"ALTER TABLE {table} RENAME COLUMN {ancien} TO {nouveau}")
+
+
+def _v5_prix_plafond_numerique(conn: Connection) -> None:
+    # type_chambre.prix_plafond : String(10) -> Numeric(10, 2).
+    # Nouvelle colonne remplie à partir du texte, puis échange des colonnes.
+    insp = inspect(conn)
+    colonnes = {c["name"]: c["type"] for c in insp.get_columns("type_chambre")}
+    if not isinstance(colonnes["prix_plafond"], Numeric):
+        conn.exec_driver_sql("ALTER TABLE type_chambre ADD prix_plafond_num NUMERIC(10, 2) NULL")
+        lignes = conn.exec_driver_sql(
+            "SELECT id_type_chambre, prix_plafond FROM type_chambre WHERE prix_plafond IS NOT NULL"
+        ).all()
+        valeurs = []
+        for id_type, texte in lignes:
+            prix = prix_depuis_texte(texte)
+            if prix is None and texte.strip():
+                log.warning("prix_plafond illisible pour le type %s : %r (mis à NULL)", id_type, texte)
+            valeurs.append({"id": id_type, "prix": prix})
+        if valeurs:
+            conn.execute(
+                text(
+                    "UPDATE type_chambre SET prix_plafond_num = :prix WHERE id_type_chambre = :id"
+                ).bindparams(bindparam("prix", type_=Numeric(10, 2))),
+                valeurs,
+            )
+        conn.exec_driver_sql("ALTER TABLE type_chambre DROP COLUMN prix_plafond")
+        _renommer_colonne(conn, "type_chambre", "prix_plafond_num", "prix_plafond")
+
+    # La vue des réservations recopie la colonne : toujours recréée puis
+    # remplie à partir de la colonne numérique (le type relu par
+    # l’inspection ne dit pas si ses valeurs ont été converties)
+    from metier.reservationVue import reconstruire
+    from modele.reservation_vue import ReservationVue
+
+    ReservationVue.__table__.drop(conn, checkfirst=True)
+    ReservationVue.__table__.create(conn)
+    reconstruire(conn)
+
+    # Index de la recherche des chambres par prix, type et disponibilité
+    _creer_index_manquants(conn, TypeChambre.__table__, Chambre.__table__)
+
+
+def _v6_archive_reservations(conn: Connection) -> None:
+    # Réservations terminées déplacées hors des tables chaudes (metier/archivage.py)
+    from modele.reservation_archive import ReservationArchive
+
+    ReservationArchive.__table__.create(conn, checkfirst=True)
+
+
+def _v7_journal_changements(conn: Connection) -> None:
+    # Journal des changements du flux GET /changements (metier/changementMetier.py)
+    from modele.changement import Changement, ChangementPurge
+
+    Changement.__table__.create(conn, checkfirst=True)
+    ChangementPurge.__table__.create(conn, checkfirst=True)
+
+
+def _v8_importations(conn: Connection) -> None:
+    # Points de reprise des imports en masse (metier/importation.py)
+    from modele.importation import Importation
+
+    Importation.__table__.create(conn, checkfirst=True)
+
+
+# Liste ordonnée : (version, description, fonction)
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "Schéma initial", _v1_schema_initial),
+    (2, "Contraintes UNIQUE des clés naturelles", _v2_contraintes_uniques),
+    (3, "Index composites de la recherche de réservations", _v3_index_recherche),
+    (4, "Vue dénormalisée des réservations (reservation_vue)", _v4_vue_reservations),
+    (5, "prix_plafond numérique et index de recherche des chambres par prix", _v5_prix_plafond_numerique),
+    (6, "Archive des réservations terminées (reservation_archive)", _v6_archive_reservations),
+    (7, "Journal des changements (changement, changement_purge)", _v7_journal_changements),
+    (8, "Points de reprise des imports en masse (importation)", _v8_importations),
+]
+
+DERNIERE_VERSION = MIGRATIONS[-1][0]
+
+# --------------------------------------------------------------
+# ---------- EXÉCUTION ----------
+# --------------------------------------------------------------
+
+def version_courante(conn: Connection) -> int:
+    """Retourne la dernière version appliquée (0 si la BD est vide)."""
+    if not inspect(conn).has_table(schema_version.name):
+        return 0
+    return conn.execute(select(func.max(schema_version.c.version))).scalar() or 0
+
+
+def migrer(engine: Engine) -> int:
+    """Applique les migrations en attente. Retourne la version finale."""
+    with engine.begin() as conn:
+        _meta_versions.create_all(conn)
+        courante = version_courante(conn)
+        for version, description, fonction in MIGRATIONS:
+            if version <= courante:
+                continue
+            log.info("Migration %s : %s", version, description)
+            fonction(conn)
+            conn.execute(
+                schema_version.insert().values(
+                    version=version, description=description, applique_le=datetime.now()
+                )
+            )
+            courante = version
+    return courante
+
+
+if __name__ == "__main__":
+    from core.db import engine
+
+    logging.basicConfig(level=logging.INFO)
+    print(f"Schéma à la version {migrer(engine)}.")
@@ -0,0 +1,265 @@
+# ==============================================================
+# core/requetes_lentes.py
+# Journal des requêtes SQL lentes (événements de l’engine), à la
+# place de echo=True : seules les instructions plus longues que le
+# seuil sont gardées, dans un tampon circulaire borné consultable
+# par GET /admin/requetesLentes. Pour chacune :
+#   - le SQL normalisé (littéraux et listes IN repliés) et son
+#     empreinte, qui regroupe les exécutions d’une même requête,
+#   - les paramètres masqués (textes remplacés par leur longueur :
+#     jamais de nom, de mobile ou de mot de passe dans le journal),
+#   - la durée, le nombre de lignes et la fonction métier d’origine,
+#   - en option, le plan d’exécution (SHOWPLAN_XML sur SQL Server),
+#     capturé une fois par empreinte par la file des tâches, hors du
+#     chemin de la requête.
+#
+# Réglages :
+#     HOTEL_SQL_LENT_MS=100        seuil (0 : tout garder, négatif : désactivé)
+#     HOTEL_SQL_LENT_TAILLE=200    requêtes lentes gardées (les plus récentes)
+#     HOTEL_SQL_PLANS=0            1 : capture des plans d’exécution
+# ==============================================================
+
+from __future__ import annotations
+
+import datetime
+import hashlib
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from core.taches import file_taches
+
+log = logging.getLogger(__name__)
+
+SEUIL = int(os.environ.get("HOTEL_SQL_LENT_MS", "100")) / 1000
+TAILLE = int(os.environ.get("HOTEL_SQL_LENT_TAILLE", "200"))
+PLANS = os.environ.get("HOTEL_SQL_PLANS", "0") == "1"
+
+# Empreintes distinctes suivies au maximum (les suivantes ne sont pas agrégées)
+NB_EMPREINTES = 1000
+# Au-delà, le SQL gardé est tronqué
+TAILLE_MAX_SQL = 4000
+
+# --------------------------------------------------------------
+# ---------- NORMALISATION ET MASQUAGE ----------
+# --------------------------------------------------------------
+_CHAINES = re.compile(r"N?'(?:[^']|'')*'")
+_NOMBRES = re.compile(r"(?<![\w.])\d+(?:\.\d+)?\b")
+_LISTES_IN = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_ESPACES = re.compile(r"\s+")
+_LECTURE = re.compile(r"(SELECT|WITH)\b", re.IGNORECASE)
+
+
+def normaliser(sql: str) -> str:
+    """SQL sans littéraux ni listes IN de longueur variable : une forme par requête."""
+    sql = _CHAINES.sub("?", sql)
+    sql = _NOMBRES.sub("?", sql)
+    sql = _LISTES_IN.sub("(?, ...)", sql)
+    return _ESPACES.sub(" ", sql).strip()
+
+
+def empreinte(sql_normalise: str) -> str:
+    return hashlib.sha1(sql_normalise.encode()).hexdigest()[:12]
+
+
+def _masquer(valeur: Any) -> Any:
+    if valeur is None or isinstance(valeur, (bool, int, float)):
+        return valeur
+    if isinstance(valeur, (Decimal, UUID, datetime.date, datetime.time)):
+        return str(valeur)
+    if isinstance(valeur, str):
+        return f"<texte:{len(valeur)}>"
+    if isinstance(valeur, (bytes, bytearray, memoryview)):
+        return f"<octets:{len(valeur)}>"
+    return f"<{type(valeur).__name__}>"
+
+
+def masquer_parametres(parametres: Any, executemany: bool = False) -> Any:
+    """Paramètres lisibles sans données personnelles (textes remplacés par leur longueur)."""
+    if executemany:
+        lignes = list(parametres or ())
+        return {"lignes": len(lignes), "premiere": masquer_parametres(lignes[0]) if lignes else None}
+    if isinstance(parametres, dict):
+        return {cle: _masquer(v) for cle, v in parametres.items()}
+    if isinstance(parametres, (list, tuple)):
+        return [_masquer(v) for v in parametres]
+    return _masquer(parametres)
+
+
+def origine() -> Optional[str]:
+    """Première fonction métier (ou route) dans la pile d’appels."""
+    cadre = sys._getframe(1)
+    while cadre is not None:
+        module = cadre.f_globals.get("__name__", "")
+        if module.startswith("metier.") or module == "main":
+            return f"{module}.{cadre.f_code.co_name}"
+        cadre = cadre.f_back
+    return None
+
+# --------------------------------------------------------------
+# ---------- JOURNAL ----------
+# Écrit depuis les threads des requêtes : un verrou, pris seulement
+# pour les instructions lentes.
+# --------------------------------------------------------------
+class JournalRequetesLentes:
+    def __init__(self, seuil: float = SEUIL, taille: int = TAILLE, plans: bool = PLANS) -> None:
+        self.seuil = seuil
+        self.plans = plans
+        self._verrou = threading.Lock()
+        self._recentes: deque = deque(maxlen=taille)
+        # empreinte -> agrégat (sql, exécutions, durée totale et maximale, origines, plan)
+        self._agregats: Dict[str, dict] = {}
+        self._instructions = 0
+        self._lentes = 0
+        self._engine: Optional[Engine] = None
+
+    # ---------- Événements de l’engine ----------
+    def installer(self, engine: Engine) -> None:
+        if self.seuil < 0:
+            return
+        self._engine = engine
+        event.listen(engine, "before_cursor_execute", self._avant)
+        event.listen(engine, "after_cursor_execute", self._apres)
+
+    def desinstaller(self) -> None:
+        if self._engine is not None:
+            event.remove(self._engine, "before_cursor_execute", self._avant)
+            event.remove(self._engine, "after_cursor_execute", self._apres)
+            self._engine = None
+
+    @staticmethod
+    def _avant(conn, cursor, statement, parameters, context, executemany):
+        # Sur le contexte d’exécution : rien ne reste en suspens si l’instruction échoue
+        if context is not None:
+            context._debut_requete_lente = time.perf_counter()
+
+    def _apres(self, conn, cursor, statement, parameters, context, executemany):
+        duree = time.perf_counter() - getattr(context, "_debut_requete_lente", time.perf_counter())
+        # Compteur approximatif : pas de verrou sur le chemin des requêtes rapides
+        self._instructions += 1
+        if duree < self.seuil:
+            return
+        self.enregistrer(statement, parameters, duree, cursor.rowcount, executemany, origine())
+
+    # ---------- Enregistrement ----------
+    def enregistrer(
+        self,
+        statement: str,
+        parametres: Any,
+        duree: float,
+        lignes: int = -1,
+        executemany: bool = False,
+        fonction: Optional[str] = None,
+    ) -> dict:
+        sql = normaliser(statement)[:TAILLE_MAX_SQL]
+        cle = empreinte(sql)
+        entree = {
+            "t": round(time.time(), 3),
+            "empreinte": cle,
+            "sql": sql,
+            "parametres": masquer_parametres(parametres, executemany),
+            "duree_ms": round(duree * 1000, 3),
+            "lignes": lignes,
+            "origine": fonction,
+        }
+        capturer = False
+        with self._verrou:
+            self._lentes += 1
+            self._recentes.append(entree)
+            agregat = self._agregats.get(cle)
+            if agregat is None and len(self._agregats) < NB_EMPREINTES:
+                agregat = self._agregats[cle] = {
+                    "empreinte": cle, "sql": sql, "executions": 0, "duree_totale_ms": 0.0,
+                    "duree_max_ms": 0.0, "origines": [], "plan": None,
+                }
+                # Plan des lectures seulement, une fois par empreinte
+                capturer = self.plans and _LECTURE.match(sql) is not None
+            if agregat is not None:
+                agregat["executions"] += 1
+                agregat["duree_totale_ms"] += entree["duree_ms"]
+                agregat["duree_max_ms"] = max(agregat["duree_max_ms"], entree["duree_ms"])
+                if fonction and fonction not in agregat["origines"]:
+                    agregat["origines"].append(fonction)
+        log.warning("Requête lente (%.0f ms, %s) %s : %s", duree * 1000, fonction or "?", cle, sql[:200])
+        if capturer:
+            # Les paramètres réels ne sont gardés que le temps de la capture
+            file_taches.soumettre(self._capturer_plan, cle, statement, parametres, executemany)
+        return entree
+
+    # ---------- Plans d’exécution ----------
+    def _capturer_plan(self, cle: str, statement: str, parametres: Any, executemany: bool) -> None:
+        if self._engine is None:
+            return
+        if executemany:
+            parametres = parametres[0] if parametres else ()
+        dialecte = self._engine.dialect.name
+        # Une capture en échec n’est pas rejouée par la file des tâches :
+        # l’erreur est journalisée et gardée à la place du plan
+        try:
+            # Connexion DBAPI brute : ni ce journal ni les échéances ne voient la capture
+            brute = self._engine.raw_connection()
+            try:
+                curseur = brute.cursor()
+                if dialecte == "mssql":
+                    # La requête n’est pas exécutée : SQL Server retourne seulement son plan estimé
+                    curseur.execute("SET SHOWPLAN_XML ON")
+                    try:
+                        curseur.execute(statement, parametres)
+                        plan = curseur.fetchone()[0]
+                    finally:
+                        curseur.execute("SET SHOWPLAN_XML OFF")
+                else:
+                    prefixe = "EXPLAIN QUERY PLAN" if dialecte == "sqlite" else "EXPLAIN"
+                    curseur.execute(f"{prefixe} {statement}", parametres)
+                    plan = "\n".join(" | ".join(str(c) for c in ligne) for ligne in curseur.fetchall())
+            finally:
+                brute.close()
+        except Exception as e:
+            log.warning("Plan d’exécution non capturé (%s)", cle, exc_info=True)
+            plan = f"erreur : {e}"
+        with self._verrou:
+            if cle in self._agregats:
+                self._agregats[cle]["plan"] = plan
+
+    # ---------- Consultation ----------
+    def recentes(self, limite: int = 50, cle: Optional[str] = None) -> List[dict]:
+        with self._verrou:
+            entrees = [e for e in self._recentes if cle is None or e["empreinte"] == cle]
+        return entrees[::-1][:limite]
+
+    def statistiques(self, limite: int = 50, cle: Optional[str] = None) -> dict:
+        with self._verrou:
+            agregats = [
+                dict(a, duree_totale_ms=round(a["duree_totale_ms"], 3), origines=list(a["origines"]))
+                for a in self._agregats.values()
+                if cle is None or a["empreinte"] == cle
+            ]
+            instructions, lentes = self._instructions, self._lentes
+        agregats.sort(key=lambda a: a["duree_totale_ms"], reverse=True)
+        return {
+            "seuil_ms": round(self.seuil * 1000, 3),
+            "plans": self.plans,
+            "instructions": instructions,
+            "lentes": lentes,
+            "par_empreinte": agregats[:limite],
+            "recentes": self.recentes(limite, cle),
+        }
+
+    def vider(self) -> None:
+        with self._verrou:
+            self._recentes.clear()
+            self._agregats.clear()
+            self._instructions = self._lentes = 0
+
+
+journal_requetes_lentes = JournalRequetesLentes()
@@ -0,0 +1,144 @@
+# ==============================================================
+# core/serveur.py
+# Lanceur multi-processus (Linux / macOS) :
+#   - précharge main.app une seule fois dans le parent,
+#   - charge le catalogue des chambres dans un segment de mémoire
+#     partagée (core/memoire_partagee.py) commun à tous les workers,
+#   - forke N workers uvicorn qui servent le même socket
+#     (chaque enfant repart d’un pool SQL neuf, voir core/db.py),
+#   - affiche le débit par worker et le débit total.
+#
+# Utilisation :
+#     python -m core.serveur --workers 4 --port 8000
+# ==============================================================
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, List
+
+
+class _CompteurRequetes:
+    """Middleware ASGI : compte les requêtes HTTP d’un worker dans un tableau partagé."""
+
+    def __init__(self, app, compteurs, indice: int) -> None:
+        self.app = app
+        self.compteurs = compteurs
+        self.indice = indice
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            # Un seul écrivain par case : pas besoin de verrou
+            self.compteurs[self.indice] += 1
+        await self.app(scope, receive, send)
+
+
+def _ouvrir_socket(hote: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((hote, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _worker(indice: int, sock: socket.socket, compteurs) -> None:
+    import uvicorn
+    import main
+
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    config = uvicorn.Config(
+        _CompteurRequetes(main.app, compteurs, indice),
+        lifespan="on",
+        log_level="warning",
+        access_log=False,
+    )
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def _rapport(compteurs, pids: List[int], precedents: List[int], duree: float) -> List[int]:
+    actuels = list(compteurs)
+    debits = [(a - p) / duree for a, p in zip(actuels, precedents)]
+    lignes = "  ".join(f"w{i}[{pids[i]}]={d:7.1f}/s" for i, d in enumerate(debits))
+    print(f"{lignes}  | total={sum(debits):8.1f}/s  ({sum(actuels)} requêtes)", flush=True)
+    return actuels
+
+
+def lancer(nb_workers: int, hote: str, port: int, intervalle: float) -> None:
+    if not hasattr(os, "fork"):
+        raise SystemExit("Le lanceur multi-processus exige fork() : utiliser `uvicorn --workers` sous Windows.")
+
+    # Préchargement dans le parent : imports, DTO, routes (partagés par copie à l’écriture)
+    import main  # noqa: F401
+    from core.db import engine
+    from core.memoire_partagee import SegmentPartage
+    from metier.catalogueChambre import catalogue_chambres
+
+    segment = SegmentPartage()
+    catalogue_chambres.attacher_segment(segment)
+    catalogue_chambres.charger()
+    engine.dispose()  # le parent ne garde aucune connexion ouverte
+
+    compteurs = multiprocessing.RawArray("Q", nb_workers)
+    sock = _ouvrir_socket(hote, port)
+    pids: Dict[int, int] = {}
+
+    def demarrer(indice: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            try:
+                _worker(indice, sock, compteurs)
+            finally:
+                os._exit(0)
+        pids[indice] = pid
+
+    for i in range(nb_workers):
+        demarrer(i)
+    print(f"{nb_workers} workers sur http://{hote}:{port} (parent {os.getpid()})", flush=True)
+
+    arret = False
+
+    def arreter(signum, frame):
+        nonlocal arret
+        arret = True
+
+    signal.signal(signal.SIGINT, arreter)
+    signal.signal(signal.SIGTERM, arreter)
+
+    precedents = [0] * nb_workers
+    dernier = time.monotonic()
+    while not arret:
+        time.sleep(0.2)
+        # Redémarre un worker mort (le segment et le socket restent partagés)
+        for indice, pid in list(pids.items()):
+            fini, _ = os.waitpid(pid, os.WNOHANG)
+            if fini:
+                print(f"Worker {indice} ({pid}) arrêté : redémarrage.", flush=True)
+                demarrer(indice)
+        maintenant = time.monotonic()
+        if maintenant - dernier >= intervalle:
+            precedents = _rapport(compteurs, [pids[i] for i in range(nb_workers)], precedents, maintenant - dernier)
+            dernier = maintenant
+
+    for pid in pids.values():
+        os.kill(pid, signal.SIGTERM)
+    for pid in pids.values():
+        os.waitpid(pid, 0)
+    print(f"Arrêt. Total : {sum(compteurs)} requêtes.", flush=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lanceur multi-processus de l’API Hôtel")
+    parser.add_argument("--workers", "-w", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--hote", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--intervalle", type=float, default=5.0, help="secondes entre deux rapports de débit")
+    args = parser.parse_args()
+    lancer(args.workers, args.hote, args.port, args.intervalle)
+    sys.exit(0)
@@ -0,0 +1,97 @@
+# ==============================================================
+# core/singleflight.py
+# Regroupement des lectures identiques simultanées ("single-flight").
+# Quand plusieurs requêtes demandent exactement la même chose au
+# même moment (ex. GET /chambres en période d’arrivées), une seule
+# exécute la lecture ; les autres attendent et reçoivent le même
+# résultat (ou la même erreur). Exception : l’échéance dépassée du
+# meneur (core/echeance.py) lui est propre ; les suiveurs relancent
+# alors la lecture, chacun sous sa propre échéance.
+# Les routes FastAPI synchrones tournent dans un pool de threads :
+# la synchronisation se fait donc avec des threading.Event.
+# ==============================================================
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from core.echeance import DelaiDepasse
+
+
+class _Appel:
+    __slots__ = ("evenement", "resultat", "erreur", "suiveurs")
+
+    def __init__(self) -> None:
+        self.evenement = threading.Event()
+        self.resultat: Any = None
+        self.erreur: BaseException | None = None
+        self.suiveurs = 0
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        self._verrou = threading.Lock()
+        self._en_cours: Dict[Tuple[str, Hashable], _Appel] = {}
+        # Par route : [exécutions réelles, requêtes regroupées]
+        self._stats: Dict[str, list] = {}
+
+    def executer(self, route: str, parametres: Hashable, fonction: Callable[[], Any]) -> Any:
+        """
+        Exécute `fonction()` une seule fois pour tous les appels simultanés
+        ayant la même route et les mêmes paramètres (déjà normalisés).
+        """
+        cle = (route, parametres)
+        with self._verrou:
+            stats = self._stats.setdefault(route, [0, 0])
+            appel = self._en_cours.get(cle)
+            meneur = appel is None
+            if meneur:
+                appel = self._en_cours[cle] = _Appel()
+                stats[0] += 1
+            else:
+                appel.suiveurs += 1
+                stats[1] += 1
+
+        if not meneur:
+            appel.evenement.wait()
+            if isinstance(appel.erreur, DelaiDepasse):
+                # Le meneur a dépassé son échéance, pas la nôtre : nouvelle exécution
+                return self.executer(route, parametres, fonction)
+            if appel.erreur is not None:
+                raise appel.erreur
+            return appel.resultat
+
+        try:
+            appel.resultat = fonction()
+            return appel.resultat
+        except BaseException as e:
+            appel.erreur = e
+            raise
+        finally:
+            # Les requêtes arrivées après la fin relanceront une nouvelle exécution
+            with self._verrou:
+                del self._en_cours[cle]
+            appel.evenement.set()
+
+    def statistiques(self) -> Dict[str, Any]:
+        with self._verrou:
+            routes = {
+                route: {"executions": e, "regroupees": r}
+                for route, (e, r) in self._stats.items()
+            }
+            en_cours = len(self._en_cours)
+        executions = sum(r["executions"] for r in routes.values())
+        regroupees = sum(r["regroupees"] for r in routes.values())
+        total = executions + regroupees
+        return {
+            "executions": executions,
+            "regroupees": regroupees,
+            "taux_regroupement": regroupees / total if total else 0.0,
+            "en_cours": en_cours,
+            "routes": routes,
+        }
+
+
+# Instance partagée par les routes de l’API
+single_flight = SingleFlight()
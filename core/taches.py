@@ -0,0 +1,278 @@
+# ==============================================================
+# core/taches.py
+# File de tâches en arrière-plan, dans le processus : le travail
+# non essentiel d’une écriture (diffusion des invalidations, plus
+# tard agrégats, journal d’audit, notifications) est exécuté après
+# le commit par un pool de threads, hors du chemin de la requête.
+# La latence d’une réservation ne compte plus que le commit.
+#
+#     with SessionLocal() as s:
+#         ...
+#         apres_commit(s, cache_metier.invalider, "reservation", ids)
+#         s.commit()          # les tâches partent ici (rien si rollback)
+#
+# File bornée (au-delà, la tâche s’exécute dans l’appelant : rien
+# n’est perdu), nouvelles tentatives avec délai exponentiel, vidage
+# propre à l’arrêt du worker (hook "lifespan") et mesures exposées
+# par GET /admin/taches.
+#
+# Réglages :
+#     HOTEL_TACHES_TRAVAILLEURS=2     threads par processus
+#     HOTEL_TACHES_TAILLE=10000       tâches en attente au maximum
+# ==============================================================
+
+from __future__ import annotations
+
+import atexit
+import heapq
+import itertools
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+log = logging.getLogger(__name__)
+
+NB_TRAVAILLEURS = int(os.environ.get("HOTEL_TACHES_TRAVAILLEURS", "2"))
+TAILLE_FILE = int(os.environ.get("HOTEL_TACHES_TAILLE", "10000"))
+
+# Nouvelles tentatives : 0,1 s, 0,2 s, 0,4 s, ... (au plus 10 s), ±50 %
+ESSAIS_MAX = 5
+DELAI_BASE = 0.1
+DELAI_MAX = 10.0
+
+# Latences gardées pour les centiles (les plus récentes)
+NB_LATENCES = 1000
+
+
+class _Tache:
+    __slots__ = ("fonction", "args", "kwargs", "nom", "essai", "soumise_le")
+
+    def __init__(self, fonction: Callable, args: tuple, kwargs: dict, nom: str) -> None:
+        self.fonction = fonction
+        self.args = args
+        self.kwargs = kwargs
+        self.nom = nom
+        self.essai = 0
+        self.soumise_le = time.perf_counter()
+
+
+class FileTaches:
+    def __init__(
+        self,
+        nb_travailleurs: int = NB_TRAVAILLEURS,
+        taille_max: int = TAILLE_FILE,
+        essais_max: int = ESSAIS_MAX,
+        delai_base: float = DELAI_BASE,
+        delai_max: float = DELAI_MAX,
+    ) -> None:
+        self.nb_travailleurs = nb_travailleurs
+        self.essais_max = essais_max
+        self.delai_base = delai_base
+        self.delai_max = delai_max
+        self._file: "queue.Queue[Optional[_Tache]]" = queue.Queue(taille_max)
+        # Tâches en attente d’une nouvelle tentative : tas (échéance, n°, tâche)
+        self._reessais: list = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._travailleurs: List[threading.Thread] = []
+        self._pid: Optional[int] = None
+        self._vidage = False
+        self._en_cours = 0
+        # Tâches sorties du tas, pas encore remises dans la file
+        self._en_transit = 0
+        self._latences: "deque[float]" = deque(maxlen=NB_LATENCES)
+        self._stats = dict(
+            soumises=0,
+            terminees=0,
+            echouees=0,
+            reessais=0,
+            executees_en_ligne=0,
+        )
+        self._duree_totale = 0.0
+        self._latence_max = 0.0
+        atexit.register(self.vider)
+
+    # ---------- Démarrage (paresseux, un pool par processus) ----------
+    def _assurer_travailleurs(self) -> None:
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._condition:
+            if self._pid == pid:
+                return
+            # Après un fork, les threads du parent n’existent pas chez l’enfant
+            self._pid = pid
+            self._file = queue.Queue(self._file.maxsize)
+            self._reessais = []
+            self._en_transit = 0
+            self._travailleurs = [
+                threading.Thread(target=self._boucle, name=f"taches-{i}", daemon=True)
+                for i in range(self.nb_travailleurs)
+            ]
+            self._travailleurs.append(
+                threading.Thread(target=self._planifier_reessais, name="taches-reessais", daemon=True)
+            )
+            for t in self._travailleurs:
+                t.start()
+
+    # ---------- Soumission ----------
+    def soumettre(self, fonction: Callable, *args: Any, nom: Optional[str] = None, **kwargs: Any) -> bool:
+        """
+        Ajoute une tâche. Retourne False si elle a été exécutée tout de suite
+        dans l’appelant (file pleine ou vidage en cours).
+        """
+        tache = _Tache(fonction, args, kwargs, nom or getattr(fonction, "__qualname__", repr(fonction)))
+        self._stats["soumises"] += 1
+        if not self._vidage:
+            self._assurer_travailleurs()
+            try:
+                self._file.put_nowait(tache)
+                return True
+            except queue.Full:
+                log.warning("File de tâches pleine : %s exécutée dans l’appelant", tache.nom)
+        self._stats["executees_en_ligne"] += 1
+        self._executer(tache, reessayer=False)
+        return False
+
+    # ---------- Exécution ----------
+    def _boucle(self) -> None:
+        while True:
+            tache = self._file.get()
+            try:
+                if tache is None:
+                    return
+                with self._condition:
+                    self._en_cours += 1
+                self._executer(tache, reessayer=True)
+            finally:
+                if tache is not None:
+                    with self._condition:
+                        self._en_cours -= 1
+                        self._condition.notify_all()
+                self._file.task_done()
+
+    def _executer(self, tache: _Tache, reessayer: bool) -> None:
+        tache.essai += 1
+        debut = time.perf_counter()
+        try:
+            tache.fonction(*tache.args, **tache.kwargs)
+        except Exception:
+            if reessayer and tache.essai < self.essais_max:
+                delai = min(self.delai_max, self.delai_base * 2 ** (tache.essai - 1))
+                delai *= random.uniform(0.5, 1.5)
+                log.warning("Tâche %s en échec (essai %s), nouvel essai dans %.2f s",
+                            tache.nom, tache.essai, delai, exc_info=True)
+                self._stats["reessais"] += 1
+                with self._condition:
+                    heapq.heappush(self._reessais, (time.monotonic() + delai, next(self._sequence), tache))
+                    self._condition.notify_all()
+                return
+            log.exception("Tâche %s abandonnée après %s essai(s)", tache.nom, tache.essai)
+            self._stats["echouees"] += 1
+        else:
+            self._stats["terminees"] += 1
+        fin = time.perf_counter()
+        self._duree_totale += fin - debut
+        latence = fin - tache.soumise_le
+        self._latences.append(latence)
+        self._latence_max = max(self._latence_max, latence)
+
+    def _planifier_reessais(self) -> None:
+        # Remet dans la file les tâches dont le délai est écoulé
+        # (toutes, sans attendre, pendant un vidage)
+        while True:
+            with self._condition:
+                while True:
+                    if self._pid != os.getpid():
+                        return
+                    maintenant = time.monotonic()
+                    if self._reessais and (self._vidage or self._reessais[0][0] <= maintenant):
+                        tache = heapq.heappop(self._reessais)[2]
+                        self._en_transit += 1
+                        break
+                    attente = self._reessais[0][0] - maintenant if self._reessais else None
+                    self._condition.wait(attente)
+            self._file.put(tache)
+            with self._condition:
+                self._en_transit -= 1
+
+    # ---------- Arrêt propre ----------
+    def vider(self, delai: float = 10.0) -> bool:
+        """
+        Attend la fin des tâches en attente (et de leurs nouveaux essais),
+        puis arrête les threads. Pendant le vidage, les nouvelles tâches
+        s’exécutent dans l’appelant. Le pool redémarre à la prochaine
+        soumission. Retourne False si le délai a été dépassé.
+        """
+        if self._pid != os.getpid():
+            return True
+        fin = time.monotonic() + delai
+        with self._condition:
+            self._vidage = True
+            self._condition.notify_all()
+            while self._file.unfinished_tasks or self._reessais or self._en_transit or self._en_cours:
+                reste = fin - time.monotonic()
+                if reste <= 0:
+                    log.warning("Vidage de la file de tâches incomplet : %s tâche(s) restante(s)",
+                                self._file.qsize() + len(self._reessais))
+                    self._vidage = False
+                    return False
+                self._condition.wait(min(reste, 0.05))
+            travailleurs, self._travailleurs = self._travailleurs, []
+            self._pid = None
+            self._condition.notify_all()
+        for _ in range(self.nb_travailleurs):
+            self._file.put(None)
+        for t in travailleurs:
+            t.join(max(0.0, fin - time.monotonic()))
+        self._vidage = False
+        return True
+
+    # ---------- Mesures ----------
+    def statistiques(self) -> Dict[str, Any]:
+        s: Dict[str, Any] = dict(self._stats)
+        s["profondeur"] = self._file.qsize()
+        s["en_cours"] = self._en_cours
+        s["en_attente_reessai"] = len(self._reessais)
+        executees = s["terminees"] + s["echouees"]
+        latences = sorted(self._latences)
+        s["latence_moyenne_ms"] = sum(latences) / len(latences) * 1000 if latences else 0.0
+        s["latence_p95_ms"] = latences[int(0.95 * (len(latences) - 1))] * 1000 if latences else 0.0
+        s["latence_max_ms"] = self._latence_max * 1000
+        s["duree_moyenne_ms"] = self._duree_totale / executees * 1000 if executees else 0.0
+        return s
+
+
+# Instance partagée par la couche métier
+file_taches = FileTaches()
+
+# --------------------------------------------------------------
+# ---------- HOOKS APRÈS COMMIT ----------
+# Les tâches sont gardées dans session.info jusqu’au commit ; un
+# rollback les oublie (l’écriture n’a pas eu lieu).
+# --------------------------------------------------------------
+_CLE_TACHES = "taches_apres_commit"
+
+
+def apres_commit(s: Session, fonction: Callable, *args: Any, **kwargs: Any) -> None:
+    """Exécute `fonction(*args, **kwargs)` en arrière-plan après le commit de `s`."""
+    s.info.setdefault(_CLE_TACHES, []).append((fonction, args, kwargs))
+
+
+@event.listens_for(Session, "after_commit")
+def _soumettre_apres_commit(s: Session) -> None:
+    for fonction, args, kwargs in s.info.pop(_CLE_TACHES, ()):
+        file_taches.soumettre(fonction, *args, **kwargs)
+
+
+@event.listens_for(Session, "after_rollback")
+def _oublier_apres_rollback(s: Session) -> None:
+    s.info.pop(_CLE_TACHES, None)
@@ -0,0 +1,88 @@
+# ==============================================================
+# core/upsert.py
+# « Insérer ou récupérer » en une seule instruction SQL, selon le
+# dialecte de la BD :
+#   - SQLite / PostgreSQL : INSERT ... ON CONFLICT DO UPDATE ... RETURNING
+#   - SQL Server          : MERGE ... WITH (HOLDLOCK) ... OUTPUT inserted.*
+# La contrainte UNIQUE sur les colonnes clés garantit qu’il n’y a
+# jamais de doublon, même quand plusieurs requêtes arrivent en même temps.
+# ==============================================================
+
+from __future__ import annotations
+
+from typing import Any, Dict, Sequence, Type, TypeVar
+
+from sqlalchemy import bindparam, select, text
+from sqlalchemy.orm import Session
+
+T = TypeVar("T")
+
+
+def inserer_ou_recuperer(
+    session: Session,
+    modele: Type[T],
+    valeurs: Dict[str, Any],
+    cles: Sequence[str],
+) -> T:
+    """
+    Insère une ligne ou retourne la ligne existante ayant les mêmes `cles`.
+    `cles` doit correspondre à une contrainte UNIQUE de la table.
+    Retourne l’entité ORM (nouvelle ou existante), sans commit.
+    """
+    table = modele.__table__
+    valeurs = dict(valeurs)
+
+    # Les défauts Python de la clé primaire (uuid4) sont calculés ici,
+    # car le MERGE textuel ne passe pas par SQLAlchemy pour les remplir.
+    for col in table.primary_key.columns:
+        if col.key not in valeurs and col.default is not None and col.default.is_callable:
+            valeurs[col.key] = col.default.arg(None)
+
+    dialecte = session.get_bind().dialect.name
+
+    if dialecte in ("sqlite", "postgresql"):
+        if dialecte == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+
+        stmt = dialect_insert(modele).values(**valeurs)
+        # Mise à jour « vide » (clé = elle-même) : la ligne existante est
+        # retournée par RETURNING sans changer ses valeurs.
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(cles),
+            set_={cles[0]: getattr(stmt.excluded, cles[0])},
+        ).returning(modele)
+        return session.scalars(
+            stmt, execution_options={"populate_existing": True}
+        ).one()
+
+    if dialecte == "mssql":
+        colonnes = list(valeurs)
+        source = ", ".join(f":{c} AS {c}" for c in colonnes)
+        condition = " AND ".join(f"cible.{c} = source.{c}" for c in cles)
+        sql = text(
+            f"MERGE {table.name} WITH (HOLDLOCK) AS cible "
+            f"USING (SELECT {source}) AS source "
+            f"ON {condition} "
+            f"WHEN MATCHED THEN UPDATE SET cible.{cles[0]} = source.{cles[0]} "
+            f"WHEN NOT MATCHED THEN INSERT ({', '.join(colonnes)}) "
+            f"VALUES ({', '.join(f'source.{c}' for c in colonnes)}) "
+            f"OUTPUT inserted.*;"
+        ).bindparams(*[bindparam(c, type_=table.c[c].type) for c in colonnes])
+        return session.scalars(
+            select(modele).from_statement(sql),
+            valeurs,
+            execution_options={"populate_existing": True},
+        ).one()
+
+    # Autres dialectes : repli sur SELECT puis INSERT (non atomique)
+    existant = session.execute(
+        select(modele).where(*[getattr(modele, c) == valeurs[c] for c in cles])
+    ).scalar_one_or_none()
+    if existant is not None:
+        return existant
+    entite = modele(**valeurs)
+    session.add(entite)
+    session.flush()
+    return entite
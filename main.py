@@ -1,6 +1,9 @@
 """
 Application principale FastAPI pour gérer les chambres et les réservations d'hôtel.
 
+Avant le premier lancement (et à chaque déploiement), appliquer le schéma :
+    python -m core.migrations
+
 Pour lancer le serveur :
     uvicorn main:app --reload
 
@@ -8,15 +11,26 @@ Docs :
     http://127.0.0.1:8000/docs
 """
 
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Iterator, Literal, Optional
+from uuid import UUID
+
 # Importation des modules principaux de FastAPI
-from fastapi import FastAPI, HTTPException, Response, status
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import TypeAdapter
 
 # ------------------------------------------------------------
 # Importation des DTOs (objets de transfert de données)
 # Ces classes définissent la structure des données échangées
 # entre le backend et le frontend (validation automatique)
 # ------------------------------------------------------------
+from DTO.changementDTO import PageChangementsDTO
+from DTO.importationDTO import ResultatImportDTO
+from DTO.projection import Projection
 from DTO.chambreDTO import (
     ChambreDTO,
     TypeChambreDTO,
@@ -24,11 +38,15 @@ from DTO.chambreDTO import (
     TypeChambreUpdateDTO,
     ChambreCreateDTO,
     ChambreUpdateDTO,
+    ModificationChambresDTO,
+    ResultatModificationChambresDTO,
 )
 from DTO.reservationDTO import (
+    CriteresAnnulationDTO,
     CriteresRechercheDTO,
     ReservationDTO,
     ReservationUpdateDTO,
+    ResultatAnnulationDTO,
 )
 from DTO.usagerDTO import (
     UsagerDTO,
@@ -40,22 +58,35 @@ from DTO.usagerDTO import (
 # Importation de la logique métier (fonctions principales)
 # C’est ici que se trouvent les opérations avec la base SQL
 # ------------------------------------------------------------
+from metier.changementMetier import CurseurExpire, attendreChangements
+from metier.importation import (
+    IMPORTS,
+    TAILLE_LOT_IMPORT,
+    ImportEnCours,
+    ImportInterrompu,
+    cheminRejets,
+    format_du_contenu,
+    getImportation,
+)
 from metier.chambreMetier import (
     creerChambre,
     creerTypeChambre,
     getChambreParNumero,
     listerChambres,
     listerTypesChambre,
+    rechercherChambres,
     modifierChambre,
+    modifierChambresEnMasse,
     supprimerChambre,
     modifierTypeChambre,
     supprimerTypeChambre,
 )
 from metier.reservationMetier import (
-    rechercherReservation,
+    rechercherReservationPage,
     creerReservation,          # version DTO complète exigée par le prof
     modifierReservation,
     supprimerReservation,
+    annulerReservationsEnMasse,
 )
 from metier.usagerMetier import (
     creerUsager,
@@ -64,6 +95,32 @@ from metier.usagerMetier import (
     getUsagerParId,
 )
 
+from core.admission import LECTURE, LIMITE, MASSE, RESERVATION, Admission, controle_admission
+from core.cache import cache_metier
+from core import echeance
+from core.echeance import Echeances, statistiques_echeances
+from core.capture import TAUX_CAPTURE, CaptureTrafic
+from core.requetes_lentes import journal_requetes_lentes
+from core.formats import ARROW, COLONNES, MSGPACK, FormatNonDisponible, encoder, negocier
+from core.demarrage import rechauffer
+from core.singleflight import single_flight
+from core.taches import file_taches
+from metier.chargeurs import statistiques as statistiques_chargeurs
+from metier.fluxChambres import flux_chambres
+
+# ------------------------------------------------------------
+# Cycle de vie : réchauffement du worker avant la première requête
+# (pool, cache de compilation SQL, DTO, schéma OpenAPI), puis à
+# l’arrêt, vidage de la file des tâches d’arrière-plan.
+# Le schéma de la BD n’est PAS créé ici : voir core/migrations.py
+# ------------------------------------------------------------
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    rechauffer(app)
+    yield
+    await run_in_threadpool(file_taches.vider)
+
+
 # ------------------------------------------------------------
 # Initialisation de l’application FastAPI
 # On définit le titre, la description et la version de l’API
@@ -72,8 +129,59 @@ app = FastAPI(
     title="API Hôtel - Projet Partiel",
     description="API permettant de gérer les chambres, les usagers et les réservations d'un hôtel.",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
+# ------------------------------------------------------------
+# Contrôle d’admission (voir core/admission.py) : au plus
+# HOTEL_ADMISSION_MAX requêtes en cours, les écritures de réservation
+# d’abord, 503 + Retry-After au-delà d’une attente bornée.
+# Ajouté avant CORS (donc à l’intérieur) : les refus gardent les
+# en-têtes CORS.
+# ------------------------------------------------------------
+_SANS_ADMISSION = ("/admin/", "/flux/", "/changements", "/docs", "/redoc", "/openapi.json")
+
+
+def _classe_admission(methode: str, chemin: str) -> Optional[str]:
+    # Santé, administration et flux longs (SSE, long-polling) : jamais retenus
+    if chemin in ("/", "/health") or chemin.startswith(_SANS_ADMISSION):
+        return None
+    if chemin.startswith("/import/"):
+        return MASSE if methode == "POST" else LECTURE
+    # Écritures en masse : jamais sur les places réservées aux réservations unitaires
+    if chemin == "/reservations/annulationMasse" or (methode == "PATCH" and chemin == "/chambres"):
+        return MASSE
+    if methode not in ("GET", "HEAD") and chemin.startswith(("/reservations", "/usagers")):
+        return RESERVATION
+    return LECTURE
+
+
+if LIMITE > 0:
+    app.add_middleware(Admission, classer=_classe_admission)
+
+# ------------------------------------------------------------
+# Échéance par requête (voir core/echeance.py) : délai selon la
+# route, ou en-tête X-Timeout-Ms, propagé aux instructions SQL.
+# Ajoutée après l’admission (donc à l’extérieur) : l’attente d’une
+# place compte dans le délai de la requête.
+# ------------------------------------------------------------
+def _genre_echeance(methode: str, chemin: str) -> Optional[str]:
+    # Flux longs et imports en masse (découpés en lots) : pas d’échéance
+    if chemin in ("/", "/health") or chemin.startswith(_SANS_ADMISSION):
+        return None
+    if chemin.startswith("/import/"):
+        return None if methode == "POST" else echeance.LECTURE
+    if chemin == "/rechercherReservation":
+        return echeance.RECHERCHE
+    if methode in ("GET", "HEAD"):
+        return echeance.LECTURE
+    if chemin == "/reservations/annulationMasse" or (methode == "PATCH" and chemin == "/chambres"):
+        return echeance.MASSE
+    return echeance.ECRITURE
+
+
+app.add_middleware(Echeances, genre=_genre_echeance)
+
 # ------------------------------------------------------------
 # Configuration du middleware CORS
 # Permet au frontend (ex: React, Vue, etc.) d’accéder à l’API
@@ -87,6 +195,80 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ------------------------------------------------------------
+# Capture d’un échantillon du trafic réel (JSONL pseudonymisé),
+# rejouable par bench/rejeu.py. Désactivée par défaut :
+# voir HOTEL_CAPTURE_TAUX dans core/capture.py
+# ------------------------------------------------------------
+if TAUX_CAPTURE > 0:
+    app.add_middleware(CaptureTrafic)
+
+# ------------------------------------------------------------
+# Lectures regroupées (single-flight)
+# Les lectures identiques simultanées partagent une seule exécution
+# et une seule sérialisation JSON (les octets sont réutilisés).
+# ------------------------------------------------------------
+_json_chambre = TypeAdapter(ChambreDTO)
+_json_chambres = TypeAdapter(list[ChambreDTO])
+_json_reservations = TypeAdapter(list[ReservationDTO])
+
+
+def _reponse_json(contenu: bytes) -> Response:
+    return Response(content=contenu, media_type="application/json")
+
+# ------------------------------------------------------------
+# Projection des réponses : ?fields= et ?inclure= (voir DTO/projection.py)
+# ------------------------------------------------------------
+_DESCRIPTION_FIELDS = "Champs retournés, séparés par des virgules (chemins pointés : chambre.numero_chambre)."
+_DESCRIPTION_INCLURE = "Objets imbriqués retournés en entier (ex. usager, chambre.type_chambre)."
+
+
+def _projection(modele, fields: Optional[str], inclure: Optional[str]) -> Projection:
+    try:
+        return Projection.depuis_parametres(modele, fields, inclure)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _inclusion_liste(projection: Projection):
+    return None if projection.complete else {"__all__": projection.inclusion}
+
+
+# ------------------------------------------------------------
+# Formats des listes (en-tête Accept, voir core/formats.py) :
+# JSON par défaut, JSON en colonnes, MessagePack, Arrow IPC
+# ------------------------------------------------------------
+_FORMATS_LISTE = {
+    200: {
+        "content": {
+            COLONNES: {},
+            MSGPACK: {},
+            ARROW: {},
+        },
+        "description": "Liste au format demandé par l’en-tête Accept (JSON par défaut).",
+    },
+    406: {"description": "Aucun format accepté n’est disponible."},
+}
+
+
+def _format(accept: Optional[str]) -> str:
+    try:
+        return negocier(accept)
+    except FormatNonDisponible as e:
+        raise HTTPException(status_code=406, detail=str(e))
+
+
+def _reponse_liste(contenu: bytes, format_: str) -> Response:
+    # Vary : un cache HTTP garde une copie par format
+    return Response(content=contenu, media_type=format_, headers={"Vary": "Accept"})
+
+
+def _reponse_projetee(dto, projection: Projection):
+    # Forme complète : sérialisée par FastAPI comme avant
+    if projection.complete:
+        return dto
+    return _reponse_json(dto.model_dump_json(include=projection.inclusion).encode())
+
 # ------------------------------------------------------------
 # Routes utilitaires (diagnostic de base)
 # ------------------------------------------------------------
@@ -110,24 +292,65 @@ def health():
     summary="Obtenir une chambre par numéro",
     description="Retourne les informations complètes d'une chambre selon son numéro."
 )
-def api_get_chambre(no_chambre: int):
-    # Recherche d'une chambre selon son numéro
-    chambre = getChambreParNumero(no_chambre)
-    if not chambre:
+def api_get_chambre(
+    no_chambre: int,
+    fields: Optional[str] = Query(default=None, description=_DESCRIPTION_FIELDS),
+    inclure: Optional[str] = Query(default=None, description=_DESCRIPTION_INCLURE),
+):
+    # Recherche d'une chambre selon son numéro (lectures simultanées regroupées)
+    projection = _projection(ChambreDTO, fields, inclure)
+
+    def lire():
+        chambre = getChambreParNumero(no_chambre)
+        return _json_chambre.dump_json(chambre, include=projection.inclusion) if chambre else None
+
+    contenu = single_flight.executer("GET /chambres/{no}", (no_chambre, projection.cle()), lire)
+    if contenu is None:
         # Si non trouvée, on retourne une erreur 404
         raise HTTPException(status_code=404, detail=f"Chambre {no_chambre} non trouvée.")
-    return chambre
+    return _reponse_json(contenu)
 
 
 @app.get(
     "/chambres",
     response_model=list[ChambreDTO],
+    responses=_FORMATS_LISTE,
     summary="Lister les chambres",
-    description="Retourne la liste de toutes les chambres."
+    description=(
+        "Retourne la liste des chambres, filtrée au besoin par fourchette de prix "
+        "(prixMin, prixMax), nom de type (type) et disponibilité (disponible). "
+        "fields / inclure réduisent la réponse (ex. fields=numero_chambre,disponible_reservation). "
+        "Accept choisit le format : JSON, JSON en colonnes, MessagePack ou Arrow IPC."
+    )
 )
-def api_lister_chambres():
-    # Retourne toutes les chambres disponibles dans la BD
-    return listerChambres()
+def api_lister_chambres(
+    prixMin: Optional[float] = Query(default=None, ge=0),
+    prixMax: Optional[float] = Query(default=None, ge=0),
+    nom_type: Optional[str] = Query(default=None, alias="type", min_length=1, max_length=50),
+    disponible: Optional[bool] = None,
+    fields: Optional[str] = Query(default=None, description=_DESCRIPTION_FIELDS),
+    inclure: Optional[str] = Query(default=None, description=_DESCRIPTION_INCLURE),
+    accept: Optional[str] = Header(default=None),
+):
+    # Sans filtre : toutes les chambres, servies par le catalogue en mémoire.
+    # Avec filtres : une requête SQL indexée (metier.rechercherChambres),
+    # limitée aux colonnes de la projection.
+    # (une seule sérialisation partagée par les appels simultanés)
+    projection = _projection(ChambreDTO, fields, inclure)
+    format_ = _format(accept)
+    filtres = (prixMin, prixMax, nom_type, disponible)
+    if filtres == (None, None, None, None):
+        lire = listerChambres
+    else:
+        lire = lambda: rechercherChambres(prixMin, prixMax, nom_type, disponible, projection)  # noqa: E731
+    return _reponse_liste(
+        single_flight.executer(
+            "GET /chambres",
+            (filtres, projection.cle(), format_),
+            lambda: encoder(format_, _json_chambres, lire(), _inclusion_liste(projection)),
+        ),
+        format_,
+    )
 
 
 @app.post(
@@ -159,6 +382,25 @@ def api_modifier_chambre(id_chambre: str, body: ChambreUpdateDTO):
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@app.patch(
+    "/chambres",
+    response_model=ResultatModificationChambresDTO,
+    summary="Modifier des chambres en masse",
+    description=(
+        "Applique les mêmes changements (disponibilité, infos, type) à toutes les chambres "
+        "d’un filtre (plage de numéros, type, liste d’ids), en une seule transaction."
+    )
+)
+def api_modifier_chambres_en_masse(body: ModificationChambresDTO):
+    # Ex. : un étage en rénovation, toutes ses chambres deviennent indisponibles
+    try:
+        return ResultatModificationChambresDTO(
+            nombre=modifierChambresEnMasse(body.filtre, body.changements)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @app.delete(
     "/chambres/{id_chambre}",
     status_code=status.HTTP_204_NO_CONTENT,
@@ -236,15 +478,41 @@ def api_supprimer_type_chambre(id_type_chambre: str):
 @app.post(
     "/rechercherReservation",
     response_model=list[ReservationDTO],
+    responses=_FORMATS_LISTE,
     summary="Rechercher des réservations",
-    description="Recherche des réservations selon différents critères (id, nom, prénom, etc.)."
+    description=(
+        "Recherche des réservations selon différents critères (id, nom, prénom, plages de dates, "
+        "numéro et type de chambre, prix). Avec total=true, le nombre total de réservations "
+        "correspondantes est retourné dans l’en-tête X-Total-Count. fields / inclure limitent "
+        "les colonnes lues et la réponse (ex. fields=dateDebut,dateFin,chambre.numero_chambre). "
+        "Accept choisit le format : JSON, JSON en colonnes, MessagePack ou Arrow IPC."
+    )
 )
-def api_rechercher_reservation(critere: CriteresRechercheDTO):
-    # Permet de faire une recherche filtrée selon différents critères
+def api_rechercher_reservation(
+    critere: CriteresRechercheDTO,
+    fields: Optional[str] = Query(default=None, description=_DESCRIPTION_FIELDS),
+    inclure: Optional[str] = Query(default=None, description=_DESCRIPTION_INCLURE),
+    accept: Optional[str] = Header(default=None),
+):
+    # Permet de faire une recherche filtrée selon différents critères.
+    # Les recherches identiques simultanées partagent une seule requête SQL.
+    projection = _projection(ReservationDTO, fields, inclure)
+    format_ = _format(accept)
+
+    def executer():
+        resultats, total = rechercherReservationPage(critere, projection)
+        return encoder(format_, _json_reservations, resultats, _inclusion_liste(projection)), total
+
     try:
-        return rechercherReservation(critere)
+        contenu, total = single_flight.executer(
+            "POST /rechercherReservation", (critere.cle_canonique(), projection.cle(), format_), executer
+        )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    reponse = _reponse_liste(contenu, format_)
+    if total is not None:
+        reponse.headers["X-Total-Count"] = str(total)
+    return reponse
 
 
 @app.post(
@@ -291,6 +559,24 @@ def api_supprimer_reservation(id_reservation: str):
         raise HTTPException(status_code=404, detail="Réservation introuvable.")
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
+
+@app.post(
+    "/reservations/annulationMasse",
+    response_model=ResultatAnnulationDTO,
+    summary="Annuler des réservations en masse",
+    description=(
+        "Annule toutes les réservations correspondant aux critères (liste d’ids, usager, chambre, "
+        "plage d’arrivée, séjours à venir) en une seule transaction. Retourne les ids annulés."
+    )
+)
+def api_annuler_reservations_en_masse(criteres: CriteresAnnulationDTO):
+    # Ex. : annulation d’un groupe, ou de tous les séjours à venir d’un usager
+    try:
+        ids = annulerReservationsEnMasse(criteres)
+        return ResultatAnnulationDTO(nombre=len(ids), idReservations=ids)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 # ------------------------------------------------------------
 # Routes API - Usagers
 # ------------------------------------------------------------
@@ -300,10 +586,14 @@ def api_supprimer_reservation(id_reservation: str):
     summary="Créer un usager",
     description="Ajoute un usager (évite les doublons simples nom+prénom+mobile)."
 )
-def api_creer_usager(body: UsagerCreateDTO):
+def api_creer_usager(
+    body: UsagerCreateDTO,
+    fields: Optional[str] = Query(default=None, description=_DESCRIPTION_FIELDS),
+):
     # Création d’un nouvel usager dans la base
+    projection = _projection(UsagerDTO, fields, None)
     try:
-        return creerUsager(body)
+        return _reponse_projetee(creerUsager(body), projection)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -314,12 +604,16 @@ def api_creer_usager(body: UsagerCreateDTO):
     summary="Obtenir un usager",
     description="Retourne un usager par son identifiant."
 )
-def api_get_usager(id_usager: str):
+def api_get_usager(
+    id_usager: str,
+    fields: Optional[str] = Query(default=None, description=_DESCRIPTION_FIELDS),
+):
     # Recherche d’un usager par ID unique
+    projection = _projection(UsagerDTO, fields, None)
     u = getUsagerParId(id_usager)
     if not u:
         raise HTTPException(status_code=404, detail="Usager introuvable.")
-    return u
+    return _reponse_projetee(u, projection)
 
 
 @app.put(
@@ -328,10 +622,15 @@ def api_get_usager(id_usager: str):
     summary="Modifier un usager",
     description="Modifie partiellement un usager (profil)."
 )
-def api_modifier_usager(id_usager: str, body: UsagerUpdateDTO):
+def api_modifier_usager(
+    id_usager: str,
+    body: UsagerUpdateDTO,
+    fields: Optional[str] = Query(default=None, description=_DESCRIPTION_FIELDS),
+):
     # Modification du profil d’un usager existant
+    projection = _projection(UsagerDTO, fields, None)
     try:
-        return modifierUsager(id_usager, body)
+        return _reponse_projetee(modifierUsager(id_usager, body), projection)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -340,14 +639,237 @@ def api_modifier_usager(id_usager: str, body: UsagerUpdateDTO):
     "/usagers/{id_usager}",
     status_code=status.HTTP_204_NO_CONTENT,
     summary="Supprimer un usager",
-    description="Supprime un usager."
+    description="Supprime un usager (échoue si des réservations y sont rattachées)."
 )
 def api_supprimer_usager(id_usager: str):
     # Suppression d’un usager de la base de données
-    ok = supprimerUsager(id_usager)
-    if not ok:
-        raise HTTPException(status_code=404, detail="Usager introuvable.")
-    return Response(status_code=status.HTTP_204_NO_CONTENT)
+    try:
+        ok = supprimerUsager(id_usager)
+        if not ok:
+            raise HTTPException(status_code=404, detail="Usager introuvable.")
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# ------------------------------------------------------------
+# Import en masse (reprise des données d’un ancien système)
+# Le corps est lu en flux : un fil de travail consomme les morceaux
+# reçus par la boucle asyncio au fur et à mesure de l’import.
+# ------------------------------------------------------------
+def _corps_synchrone(request: Request) -> Iterator[bytes]:
+    boucle = asyncio.get_running_loop()
+    flux = request.stream()
+
+    def morceaux():
+        while True:
+            try:
+                yield asyncio.run_coroutine_threadsafe(flux.__anext__(), boucle).result()
+            except StopAsyncIteration:
+                return
+
+    return morceaux()
+
+
+@app.post(
+    "/import/{entite}",
+    response_model=ResultatImportDTO,
+    summary="Importer des usagers ou des réservations (CSV / NDJSON)",
+    description=(
+        "Corps text/csv (en-tête de colonnes) ou application/x-ndjson, lu en flux. "
+        "Usagers : colonnes de la création d’usager (doublons nom+prénom+mobile comptés existants). "
+        "Réservations : dateDebut, dateFin, prixParJour, infoReservation, usager (idUsager, ou nom, "
+        "prenom et mobile) et chambre (idChambre ou numeroChambre). "
+        "Insertion par lots avec point de reprise : après un échec (500), renvoyer le même fichier "
+        "avec le même idImport pour continuer. Les lignes refusées sont dans GET /import/{idImport}/rejets."
+    )
+)
+async def api_importer(
+    entite: Literal["usagers", "reservations"],
+    request: Request,
+    idImport: Optional[UUID] = Query(default=None, description="Identifiant choisi par le client (reprise)."),
+    lot: int = Query(default=TAILLE_LOT_IMPORT, ge=1, le=5000),
+    content_type: Optional[str] = Header(default=None),
+):
+    format_ = format_du_contenu(content_type)
+    if format_ is None:
+        raise HTTPException(status_code=415, detail="Content-Type attendu : text/csv ou application/x-ndjson.")
+    try:
+        return await run_in_threadpool(
+            IMPORTS[entite], _corps_synchrone(request), format_, idImport, None, lot
+        )
+    except ImportEnCours as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ImportInterrompu as e:
+        raise HTTPException(
+            status_code=500,
+            detail={"message": str(e), "idImport": str(e.id_import), "traites": e.traites},
+        )
+
+
+@app.get(
+    "/import/{id_import}",
+    response_model=ResultatImportDTO,
+    summary="État d’un import",
+    description="Enregistrements traités (point de reprise), insérés, existants et rejetés."
+)
+def api_etat_import(id_import: UUID):
+    resultat = getImportation(id_import)
+    if resultat is None:
+        raise HTTPException(status_code=404, detail="Import introuvable.")
+    return resultat
+
+
+@app.get(
+    "/import/{id_import}/rejets",
+    response_class=FileResponse,
+    summary="Lignes refusées d’un import",
+    description="Fichier NDJSON : numéro d’enregistrement, ligne du fichier, erreurs et données reçues."
+)
+def api_rejets_import(id_import: UUID):
+    chemin = cheminRejets(id_import)
+    if chemin is None:
+        raise HTTPException(status_code=404, detail="Aucun rejet pour cet import.")
+    return FileResponse(chemin, media_type="application/x-ndjson", filename=f"{id_import}.rejets.ndjson")
+
+# ------------------------------------------------------------
+# Flux des changements (intégrations : canaux de vente, ménage)
+# ------------------------------------------------------------
+@app.get(
+    "/changements",
+    response_model=PageChangementsDTO,
+    summary="Lire les changements depuis un curseur",
+    description=(
+        "Retourne, dans l’ordre, les créations, modifications, suppressions et archivages "
+        "postérieurs au curseur `depuis`. Avec `attente` > 0, la requête attend jusqu’à "
+        "ce nombre de secondes un premier changement (long-polling). 410 si le curseur "
+        "est antérieur à la rétention : relire les listes complètes puis repartir de 0."
+    )
+)
+async def api_changements(
+    depuis: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    attente: float = Query(0, ge=0, le=60),
+):
+    try:
+        return await attendreChangements(depuis, limit, attente)
+    except CurseurExpire as e:
+        raise HTTPException(status_code=410, detail=str(e))
+
+# ------------------------------------------------------------
+# Flux des chambres (Server-Sent Events) pour les tableaux de bord
+# ------------------------------------------------------------
+@app.get(
+    "/flux/chambres",
+    response_class=StreamingResponse,
+    summary="Flux des changements de chambres (SSE)",
+    description=(
+        "Flux text/event-stream : événements `chambres` (disponibilité, infos, type) et "
+        "`reservations` (occupation) poussés après chaque écriture. Charger GET /chambres "
+        "une fois, puis appliquer les événements ; sur `resynchroniser`, relire GET /chambres. "
+        "L’en-tête Last-Event-ID (envoyé par EventSource à la reconnexion) reprend le flux."
+    )
+)
+async def api_flux_chambres(last_event_id: Optional[str] = Header(None)):
+    abonnement = flux_chambres.abonner(last_event_id)
+
+    async def trames():
+        try:
+            # Délai de reconnexion d’EventSource (ms)
+            yield b"retry: 3000\n\n"
+            async for trame in abonnement.trames():
+                yield trame
+        finally:
+            flux_chambres.desabonner(abonnement)
+
+    return StreamingResponse(
+        trames(),
+        media_type="text/event-stream",
+        # Pas de mise en cache ni de tampon dans un proxy (nginx)
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# ------------------------------------------------------------
+# Routes d’administration (diagnostic des performances)
+# ------------------------------------------------------------
+@app.get(
+    "/admin/cache",
+    summary="Statistiques du cache métier",
+    description="Taux de succès du cache (local et partagé) et délai des invalidations entre workers."
+)
+def api_admin_cache():
+    return cache_metier.statistiques()
+
+
+@app.get(
+    "/admin/regroupement",
+    summary="Statistiques du regroupement des lectures",
+    description="Nombre de lectures exécutées et de requêtes regroupées (single-flight), par route."
+)
+def api_admin_regroupement():
+    return single_flight.statistiques()
+
+
+@app.get(
+    "/admin/chargeurs",
+    summary="Statistiques des chargeurs par lot",
+    description="Nombre de lectures par id, de lots SQL exécutés et taille moyenne des lots."
+)
+def api_admin_chargeurs():
+    return statistiques_chargeurs()
+
+
+@app.get(
+    "/admin/taches",
+    summary="Statistiques de la file des tâches d’arrière-plan",
+    description="Profondeur de la file, nouveaux essais, échecs et latence des tâches exécutées après commit."
+)
+def api_admin_taches():
+    return file_taches.statistiques()
+
+
+@app.get(
+    "/admin/flux",
+    summary="Statistiques du flux des chambres",
+    description="Abonnés connectés, événements publiés et relayés, trames livrées, clients évincés et reprises."
+)
+def api_admin_flux():
+    return flux_chambres.statistiques()
+
+
+@app.get(
+    "/admin/admission",
+    summary="Statistiques du contrôle d’admission",
+    description="Requêtes en cours et en file par classe, admises et refusées (503), attente de la file et du pool SQL."
+)
+def api_admin_admission():
+    return controle_admission.statistiques()
+
+
+@app.get(
+    "/admin/echeances",
+    summary="Statistiques des échéances des requêtes",
+    description="Délais par genre de route, requêtes suivies et dépassements (annulées avant ou pendant une instruction SQL, ou entre deux étapes)."
+)
+def api_admin_echeances():
+    return statistiques_echeances.statistiques()
+
+
+@app.get(
+    "/admin/requetesLentes",
+    summary="Journal des requêtes SQL lentes",
+    description=(
+        "Requêtes SQL plus longues que le seuil (HOTEL_SQL_LENT_MS) : agrégats par empreinte "
+        "(SQL normalisé, exécutions, durées, fonctions métier d’origine, plan si capturé) "
+        "et dernières exécutions avec leurs paramètres masqués. empreinte filtre une requête."
+    )
+)
+def api_admin_requetes_lentes(
+    limite: int = Query(default=50, ge=1, le=1000),
+    empreinte: Optional[str] = Query(default=None),
+):
+    return journal_requetes_lentes.statistiques(limite, empreinte)
 
 # ------------------------------------------------------------
 # Point d’entrée du serveur (exécution locale)
@@ -0,0 +1,149 @@
+# ==============================================================
+# metier/archivage.py
+# Archivage des réservations terminées : celles dont la date de fin
+# est plus ancienne que l’horizon (HOTEL_ARCHIVE_HORIZON_JOURS,
+# 365 jours par défaut) sont déplacées de la table reservation (et
+# de la vue) vers reservation_archive, par lots.
+# Les tables chaudes ne gardent que les séjours récents ou à venir :
+# vérifications de disponibilité, recherches et suppressions gardées
+# par clé étrangère ne parcourent plus des années d’historique.
+#
+# La recherche ne lit l’archive que si ses critères de dates peuvent
+# y trouver des réservations (voir lire_archive).
+#
+# À lancer périodiquement (cron, tâche planifiée) :
+#     python -m metier.archivage [horizon_jours]
+# ==============================================================
+
+from __future__ import annotations
+
+import logging
+import os
+import sys
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from core.cache import cache_metier
+from core.db import SessionLocal
+from core.taches import apres_commit
+from DTO.reservationDTO import CriteresRechercheDTO
+from metier import reservationVue as vue
+from metier.changementMetier import ARCHIVAGE, journaliser
+from modele.reservation import Reservation
+from modele.reservation_archive import ReservationArchive
+
+log = logging.getLogger(__name__)
+
+HORIZON_ARCHIVE_JOURS = int(os.environ.get("HOTEL_ARCHIVE_HORIZON_JOURS", "365"))
+
+# Une transaction par lot : verrous courts sur les tables chaudes, sous
+# le seuil d’escalade de SQL Server et la limite de 2 100 paramètres
+TAILLE_LOT_ARCHIVE = 1000
+
+# --------------------------------------------------------------
+# ---------- BORNE DE L’ARCHIVE ----------
+# Date de fin la plus récente de l’archive, relue à chaque recherche
+# (un MAX sur une colonne indexée) : jamais en cache, car l’archivage
+# tourne dans un autre processus (cron), dont les invalidations
+# n’atteignent pas les workers de l’API sans cache partagé.
+# --------------------------------------------------------------
+
+def borne_archive(s: Optional[Session] = None) -> Optional[datetime]:
+    """Fin de séjour la plus récente de l’archive (None si l’archive est vide)."""
+    requete = select(func.max(ReservationArchive.date_fin_reservation))
+    if s is not None:
+        return s.scalar(requete)
+    with SessionLocal() as s:
+        return s.scalar(requete)
+
+
+def _fin_minimale(criteres: CriteresRechercheDTO) -> Optional[datetime]:
+    # Plus petite date de fin possible d’une réservation qui répond aux
+    # critères (une réservation finit après son arrivée)
+    bornes = []
+    if criteres.arrivantEntre:
+        bornes.append(criteres.arrivantEntre.debut)
+    if criteres.partantEntre:
+        bornes.append(criteres.partantEntre.debut)
+    if criteres.presentLe:
+        bornes.append(criteres.presentLe)
+    return max(bornes) if bornes else None
+
+
+def lire_archive(criteres: CriteresRechercheDTO, s: Optional[Session] = None) -> bool:
+    """
+    Vrai si la recherche doit aussi lire l’archive : l’archive n’est pas
+    vide et les critères de dates n’excluent pas toutes ses réservations.
+    """
+    borne = borne_archive(s)
+    if borne is None:
+        return False
+    fin_minimale = _fin_minimale(criteres)
+    return fin_minimale is None or fin_minimale <= borne
+
+# --------------------------------------------------------------
+# ---------- ARCHIVAGE ----------
+# Pour chaque lot : copie depuis les tables sources (INSERT ... SELECT),
+# retrait de la vue, puis DELETE des réservations, dans une seule
+# transaction. Un arrêt en cours de route laisse les lots déjà validés
+# archivés et le reste intact : relancer suffit.
+# --------------------------------------------------------------
+
+def _archiver_lot(s: Session, limite: datetime, taille_lot: int) -> int:
+    ids = s.scalars(
+        select(Reservation.id_reservation)
+        .where(Reservation.date_fin_reservation < limite)
+        .order_by(Reservation.date_fin_reservation)
+        .limit(taille_lot)
+    ).all()
+    if not ids:
+        return 0
+
+    source = vue.select_source().where(Reservation.id_reservation.in_(ids))
+    s.execute(
+        insert(ReservationArchive).from_select([c.name for c in source.selected_columns], source)
+    )
+    vue.retirer_reservations(s, ids)
+    s.execute(
+        delete(Reservation)
+        .where(Reservation.id_reservation.in_(ids))
+        .execution_options(synchronize_session=False)
+    )
+    journaliser(s, "reservation", ARCHIVAGE, ids)
+    apres_commit(s, cache_metier.invalider, "reservation", ids, tolerant=False)
+    s.commit()
+    return len(ids)
+
+
+def archiverReservations(
+    horizon_jours: int = HORIZON_ARCHIVE_JOURS,
+    taille_lot: int = TAILLE_LOT_ARCHIVE,
+    maintenant: Optional[datetime] = None,
+) -> int:
+    """
+    Déplace vers l’archive les réservations terminées avant
+    maintenant - horizon_jours. Retourne le nombre de réservations archivées.
+    """
+    if horizon_jours < 0:
+        raise ValueError("L’horizon d’archivage doit être positif.")
+    limite = (maintenant or datetime.now()) - timedelta(days=horizon_jours)
+
+    archivees = 0
+    with SessionLocal() as s:
+        s: Session
+        while True:
+            nombre = _archiver_lot(s, limite, taille_lot)
+            if not nombre:
+                break
+            archivees += nombre
+            log.info("Archivage : %s réservations (fin avant %s)", archivees, limite)
+    return archivees
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    horizon = int(sys.argv[1]) if len(sys.argv) > 1 else HORIZON_ARCHIVE_JOURS
+    print(f"{archiverReservations(horizon)} réservations archivées (horizon : {horizon} jours).")
@@ -0,0 +1,465 @@
+# ==============================================================
+# metier/catalogueChambre.py
+# Catalogue en mémoire des chambres et des types de chambre.
+# Ces données sont petites et lues tout le temps : on les garde
+# dans le processus (enregistrements à __slots__, indexés par
+# numéro et par id) au lieu de refaire une requête à chaque
+# GET /chambres ou GET /chambres/{no}.
+#
+# Le catalogue est chargé une fois (au réchauffement ou à la
+# première lecture), puis tenu à jour par les écritures de
+# chambreMetier. Une écriture qui contourne chambreMetier doit
+# appeler catalogue_chambres.invalider().
+#
+# En mode multi-processus (core/serveur.py), le catalogue est aussi
+# publié dans un segment de mémoire partagée : une écriture faite
+# dans un worker est vue par les autres à leur prochaine lecture.
+# L’instantané publié note l’heure de la lecture BD dont il part et
+# les workers qui l’ont publié :
+#   - invalidation d’un worker voisin : déjà dans le segment, qui
+#     est seulement relu ;
+#   - invalidation d’un autre serveur : la BD est relue une seule
+#     fois (par le premier worker qui en a besoin), les autres
+#     reprennent sa publication.
+# Segment vide (catalogue trop grand pour le segment, ou invalider()) :
+# chaque worker garde son catalogue et relit la BD à chaque
+# invalidation, comme sans segment.
+# ==============================================================
+
+from __future__ import annotations
+
+import logging
+import sys
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import select
+
+from core.cache import cache_metier
+from core.db import SessionLocal
+from core.memoire_partagee import SegmentPartage
+from DTO.chambreDTO import ChambreDTO, TypeChambreDTO
+from modele.chambre import Chambre
+from modele.type_chambre import TypeChambre
+
+log = logging.getLogger(__name__)
+
+# Origines (workers) gardées dans l’instantané, les plus récentes
+NB_PUBLIEURS = 64
+
+# --------------------------------------------------------------
+# ---------- ENREGISTREMENTS ----------
+# Mêmes noms d’attributs que les modèles ORM : les constructeurs
+# ChambreDTO(...) et TypeChambreDTO(...) les acceptent tels quels.
+# --------------------------------------------------------------
+class _Type:
+    __slots__ = ("id_type_chambre", "nom_type", "prix_plancher", "prix_plafond", "description_chambre")
+
+    def __init__(self, id_type_chambre, nom_type, prix_plancher, prix_plafond, description_chambre):
+        self.id_type_chambre = id_type_chambre
+        self.nom_type = sys.intern(nom_type)  # nom partagé par toutes les chambres du type
+        self.prix_plancher = prix_plancher
+        self.prix_plafond = prix_plafond
+        self.description_chambre = description_chambre
+
+
+class _Chambre:
+    __slots__ = ("id_chambre", "numero_chambre", "disponible_reservation", "autre_informations", "type_chambre")
+
+    def __init__(self, id_chambre, numero_chambre, disponible_reservation, autre_informations, type_chambre):
+        self.id_chambre = id_chambre
+        self.numero_chambre = numero_chambre
+        self.disponible_reservation = disponible_reservation
+        self.autre_informations = autre_informations
+        self.type_chambre = type_chambre  # référence vers le _Type partagé
+
+
+# Lignes simples (picklables) pour l’instantané publié dans le segment partagé
+_LigneType = namedtuple(
+    "_LigneType", "id_type_chambre nom_type prix_plancher prix_plafond description_chambre"
+)
+_LigneChambre = namedtuple(
+    "_LigneChambre", "id_chambre numero_chambre disponible_reservation autre_informations fk_type_chambre"
+)
+
+
+def _uuid(valeur) -> UUID:
+    return valeur if isinstance(valeur, UUID) else UUID(str(valeur))
+
+
+# --------------------------------------------------------------
+# ---------- CATALOGUE ----------
+# --------------------------------------------------------------
+class CatalogueChambres:
+    def __init__(self) -> None:
+        self._verrou = threading.RLock()
+        self._charge = False
+        self._types: Dict[UUID, _Type] = {}
+        self._par_id: Dict[UUID, _Chambre] = {}
+        self._par_numero: Dict[int, _Chambre] = {}
+        # Listes de DTO triées, reconstruites seulement après une écriture
+        self._liste_chambres: Optional[List[ChambreDTO]] = None
+        self._liste_types: Optional[List[TypeChambreDTO]] = None
+        # Segment partagé entre workers (None en mode mono-processus)
+        self._segment: Optional[SegmentPartage] = None
+        self._version_segment = 0
+        # Instantané relu : contient-il un catalogue, heure de sa lecture BD, workers publieurs
+        self._segment_plein = False
+        self._lu_bd = 0.0
+        self._publieurs: Tuple[str, ...] = ()
+        # Invalidation d’un autre serveur pas encore relue (heure de réception)
+        self._relire_depuis: Optional[float] = None
+
+    # ---------- Chargement ----------
+    def charger(self, types: Optional[Iterable] = None, chambres: Optional[Iterable] = None) -> None:
+        """
+        Charge tout le catalogue. Sans arguments, lit la BD (deux requêtes).
+        `types` / `chambres` : lignes ayant les attributs des modèles ORM.
+        Avec un segment partagé, le résultat y est publié pour les autres workers.
+        """
+        if self._segment is None:
+            if types is None or chambres is None:
+                types, chambres = self._lire_bd()
+            self._installer(types, chambres)
+            return
+        with self._segment.verrou, self._verrou:
+            if types is None or chambres is None:
+                self._recharger_bd()
+                return
+            self._installer(types, chambres)
+            self._publier()
+
+    @staticmethod
+    def _lire_bd() -> Tuple[list, list]:
+        with SessionLocal() as s:
+            types = s.execute(
+                select(
+                    TypeChambre.id_type_chambre,
+                    TypeChambre.nom_type,
+                    TypeChambre.prix_plancher,
+                    TypeChambre.prix_plafond,
+                    TypeChambre.description_chambre,
+                )
+            ).all()
+            chambres = s.execute(
+                select(
+                    Chambre.id_chambre,
+                    Chambre.numero_chambre,
+                    Chambre.disponible_reservation,
+                    Chambre.autre_informations,
+                    Chambre.fk_type_chambre,
+                )
+            ).all()
+        return types, chambres
+
+    def _installer(self, types: Iterable, chambres: Iterable) -> None:
+        """Reconstruit les index à partir de lignes (BD, segment partagé ou test)."""
+        nouveaux_types = {
+            _uuid(t.id_type_chambre): _Type(
+                _uuid(t.id_type_chambre), t.nom_type, t.prix_plancher, t.prix_plafond, t.description_chambre
+            )
+            for t in types
+        }
+        par_id: Dict[UUID, _Chambre] = {}
+        par_numero: Dict[int, _Chambre] = {}
+        for c in chambres:
+            enr = _Chambre(
+                _uuid(c.id_chambre),
+                c.numero_chambre,
+                c.disponible_reservation,
+                c.autre_informations,
+                nouveaux_types[_uuid(c.fk_type_chambre)],
+            )
+            par_id[enr.id_chambre] = enr
+            par_numero[enr.numero_chambre] = enr
+
+        with self._verrou:
+            self._types, self._par_id, self._par_numero = nouveaux_types, par_id, par_numero
+            self._liste_chambres = self._liste_types = None
+            self._charge = True
+
+    def _assurer_charge(self) -> None:
+        segment = self._segment
+        if segment is not None:
+            if (
+                self._charge
+                and self._relire_depuis is None
+                and segment.version() == self._version_segment
+            ):
+                return
+            # Verrous dans l’ordre : segment, puis local
+            with segment.verrou, self._verrou:
+                self._synchroniser()
+                if not self._charge:
+                    self._recharger_bd()
+            return
+        if not self._charge:
+            with self._verrou:
+                if not self._charge:
+                    self.charger()
+
+    def invalider(self) -> None:
+        """
+        Oublie tout : le prochain accès relit la BD. Avec un segment partagé,
+        l’instantané est aussi retiré (les autres workers relisent la BD à la
+        réception de l’invalidation).
+        """
+        segment = self._segment
+        if segment is None:
+            self._vider()
+            return
+        with segment.verrou, self._verrou:
+            self._vider()
+            self._relire_depuis = None
+            self._publier()
+
+    def _vider(self) -> None:
+        with self._verrou:
+            self._charge = False
+            self._types, self._par_id, self._par_numero = {}, {}, {}
+            self._liste_chambres = self._liste_types = None
+
+    def sur_invalidation(self, origine: Optional[str]) -> None:
+        """Chambre ou type modifié par un autre processus (message de `origine`)."""
+        recu = time.time()
+        segment = self._segment
+        if segment is None:
+            self.invalider()
+            return
+        with segment.verrou, self._verrou:
+            self._relire_segment()
+            if self._segment_plein and origine in self._publieurs:
+                return  # worker voisin : son écriture est déjà dans le segment
+            # Autre serveur (ou voisin qui n’a pas pu publier) : BD à relire au prochain accès
+            self._relire_depuis = max(self._relire_depuis or 0.0, recu)
+
+    # ---------- Mémoire partagée (multi-processus) ----------
+    def attacher_segment(self, segment: Optional[SegmentPartage]) -> None:
+        """Partage le catalogue avec les autres processus qui ont le même segment."""
+        with self._verrou:
+            self._segment = segment
+            self._version_segment = 0
+            self._segment_plein = False
+            self._lu_bd = 0.0
+            self._publieurs = ()
+            self._relire_depuis = None
+
+    def _instantane(self, publieurs: Tuple[str, ...], vide: bool = False) -> dict:
+        if vide or not self._charge:
+            return {"types": None, "chambres": None, "lu_bd": self._lu_bd, "publieurs": publieurs}
+        types = [
+            _LigneType(t.id_type_chambre, t.nom_type, t.prix_plancher, t.prix_plafond, t.description_chambre)
+            for t in self._types.values()
+        ]
+        chambres = [
+            _LigneChambre(
+                c.id_chambre, c.numero_chambre, c.disponible_reservation,
+                c.autre_informations, c.type_chambre.id_type_chambre,
+            )
+            for c in self._par_id.values()
+        ]
+        return {"types": types, "chambres": chambres, "lu_bd": self._lu_bd, "publieurs": publieurs}
+
+    # Méthodes suivantes : appelées avec le verrou du segment et le verrou local
+    def _relire_segment(self) -> None:
+        version = self._segment.version()
+        if version == self._version_segment:
+            return
+        version, donnees = self._segment.lire()
+        self._version_segment = version
+        if donnees is None:
+            self._segment_plein, self._publieurs = False, ()
+            return
+        self._lu_bd, self._publieurs = donnees["lu_bd"], tuple(donnees["publieurs"])
+        self._segment_plein = donnees["types"] is not None
+        if self._segment_plein:
+            self._installer(donnees["types"], donnees["chambres"])
+        # Segment vide : chaque worker garde son propre catalogue
+
+    def _synchroniser(self) -> None:
+        """Relit le segment, puis la BD si une invalidation distante n’y est pas encore."""
+        self._relire_segment()
+        if self._relire_depuis is None:
+            return
+        if self._segment_plein and self._lu_bd >= self._relire_depuis:
+            # Un autre worker a relu la BD après la réception : sa publication suffit
+            self._relire_depuis = None
+            return
+        self._recharger_bd()
+
+    def _recharger_bd(self) -> None:
+        lu_bd = time.time()
+        self._installer(*self._lire_bd())
+        self._relire_depuis = None
+        self._lu_bd = lu_bd
+        self._publier()
+
+    def _publier(self) -> None:
+        moi = cache_metier.origine
+        publieurs = (tuple(p for p in self._publieurs if p != moi) + (moi,))[-NB_PUBLIEURS:]
+        try:
+            self._version_segment = self._segment.ecrire(self._instantane(publieurs))
+            self._segment_plein = self._charge
+        except ValueError:
+            # Catalogue trop grand pour le segment : on le vide (jamais d’instantané
+            # périmé) et chaque worker garde le sien, relu de la BD à l’invalidation.
+            log.warning("Catalogue non publié dans le segment partagé", exc_info=True)
+            self._version_segment = self._segment.ecrire(self._instantane(publieurs, vide=True))
+            self._segment_plein = False
+        self._publieurs = publieurs
+
+    @contextmanager
+    def _ecriture(self) -> Iterator[None]:
+        """
+        Encadre une mise à jour incrémentale. Avec un segment partagé : relit
+        d’abord la dernière version (pour ne pas écraser l’écriture d’un autre
+        worker), puis republie le catalogue complet. Un segment vide n’est
+        rempli que par une lecture de la BD : le catalogue local peut ne pas
+        avoir les écritures des autres workers.
+        """
+        if self._segment is None:
+            with self._verrou:
+                yield
+            return
+        with self._segment.verrou, self._verrou:
+            self._synchroniser()
+            yield
+            if self._charge and self._segment_plein:
+                self._publier()
+
+    @property
+    def charge(self) -> bool:
+        return self._charge
+
+    # ---------- Lecture ----------
+    def chambre_par_numero(self, no_chambre: int) -> Optional[ChambreDTO]:
+        self._assurer_charge()
+        enr = self._par_numero.get(no_chambre)
+        return ChambreDTO(enr) if enr else None
+
+    def chambre_par_id(self, id_chambre) -> Optional[ChambreDTO]:
+        self._assurer_charge()
+        enr = self._par_id.get(_uuid(id_chambre))
+        return ChambreDTO(enr) if enr else None
+
+    def lister_chambres(self) -> List[ChambreDTO]:
+        self._assurer_charge()
+        liste = self._liste_chambres
+        if liste is None:
+            with self._verrou:
+                liste = [
+                    ChambreDTO(c)
+                    for c in sorted(
+                        self._par_id.values(), key=lambda c: (c.numero_chambre, str(c.id_chambre))
+                    )
+                ]
+                self._liste_chambres = liste
+        return list(liste)
+
+    def lister_types(self) -> List[TypeChambreDTO]:
+        self._assurer_charge()
+        liste = self._liste_types
+        if liste is None:
+            with self._verrou:
+                liste = [
+                    TypeChambreDTO(t)
+                    for t in sorted(self._types.values(), key=lambda t: t.nom_type.casefold())
+                ]
+                self._liste_types = liste
+        return list(liste)
+
+    def construire_dto(self, ch) -> Optional[ChambreDTO]:
+        """
+        ChambreDTO pour une ligne de chambre (ex. retour d’un UPDATE ... RETURNING)
+        en prenant le type dans le catalogue. None si le type n’y est pas.
+        """
+        if not self._charge:
+            return None
+        t = self._types.get(_uuid(ch.fk_type_chambre))
+        if t is None:
+            return None
+        return ChambreDTO(
+            _Chambre(ch.id_chambre, ch.numero_chambre, ch.disponible_reservation, ch.autre_informations, t)
+        )
+
+    # ---------- Mise à jour incrémentale (après commit) ----------
+    # Sans effet tant que le catalogue n’est pas chargé : le chargement lira la BD.
+    def maj_type(self, id_type_chambre, dto: TypeChambreDTO) -> None:
+        with self._ecriture():
+            if not self._charge:
+                return
+            self._maj_type_local(_uuid(id_type_chambre), dto)
+
+    def _maj_type_local(self, id_type: UUID, dto: TypeChambreDTO) -> _Type:
+        t = self._types.get(id_type)
+        if t is None:
+            t = self._types[id_type] = _Type(
+                id_type, dto.nom_type, dto.prix_plancher, dto.prix_plafond, dto.description_chambre
+            )
+        else:
+            # Modification en place : toutes les chambres du type la voient
+            t.nom_type = sys.intern(dto.nom_type)
+            t.prix_plancher = dto.prix_plancher
+            t.prix_plafond = dto.prix_plafond
+            t.description_chambre = dto.description_chambre
+        self._liste_chambres = self._liste_types = None
+        return t
+
+    def retirer_type(self, id_type_chambre) -> None:
+        with self._ecriture():
+            if not self._charge:
+                return
+            self._types.pop(_uuid(id_type_chambre), None)
+            self._liste_types = None
+
+    def maj_chambre(self, dto: ChambreDTO, id_type_chambre) -> None:
+        self.maj_chambres([(dto, id_type_chambre)])
+
+    def maj_chambres(self, chambres: Iterable[Tuple[ChambreDTO, Any]]) -> None:
+        """Mise à jour groupée (modification en masse) : un seul verrou, une seule publication."""
+        with self._ecriture():
+            if not self._charge:
+                return
+            for dto, id_type_chambre in chambres:
+                id_type = _uuid(id_type_chambre)
+                t = self._types.get(id_type)
+                if t is None:
+                    t = self._maj_type_local(id_type, dto.type_chambre)
+                ancien = self._par_id.get(dto.idChambre)
+                if ancien is not None and self._par_numero.get(ancien.numero_chambre) is ancien:
+                    del self._par_numero[ancien.numero_chambre]
+                enr = _Chambre(
+                    dto.idChambre, dto.numero_chambre, dto.disponible_reservation, dto.autre_informations, t
+                )
+                self._par_id[enr.id_chambre] = enr
+                self._par_numero[enr.numero_chambre] = enr
+            self._liste_chambres = None
+
+    def retirer_chambre(self, id_chambre) -> None:
+        with self._ecriture():
+            if not self._charge:
+                return
+            enr = self._par_id.pop(_uuid(id_chambre), None)
+            if enr is not None and self._par_numero.get(enr.numero_chambre) is enr:
+                del self._par_numero[enr.numero_chambre]
+            self._liste_chambres = None
+
+    # ---------- Mesures ----------
+    def __len__(self) -> int:
+        return len(self._par_id)
+
+
+# Instance unique partagée par le processus
+catalogue_chambres = CatalogueChambres()
+
+
+def _sur_invalidation(entite: str, ids, origine: Optional[str] = None) -> None:
+    if entite in ("chambre", "type_chambre"):
+        catalogue_chambres.sur_invalidation(origine)
+
+
+cache_metier.ecouter(_sur_invalidation)
@@ -8,12 +8,22 @@
 
 from __future__ import annotations
 
-from typing import List
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from decimal import Decimal
+from typing import List, Optional
+from uuid import uuid4
+from sqlalchemy import select, insert, update, delete, exists, func, or_
+from sqlalchemy.orm import Session, contains_eager, load_only
 from sqlalchemy.exc import IntegrityError
 
+from core.cache import cache_metier
 from core.db import SessionLocal
+from core.echeance import verifier_echeance
+from core.upsert import inserer_ou_recuperer
+from metier.catalogueChambre import catalogue_chambres
+from metier import reservationVue as vue
+from metier.changementMetier import CREATION, MODIFICATION, SUPPRESSION, journaliser
+from metier.fluxChambres import etat_chambre, publierChambres, publierChambresSupprimees
+from DTO.projection import Projection, colonnes, construire
 from DTO.chambreDTO import (
     ChambreDTO,
     TypeChambreDTO,
@@ -21,9 +31,12 @@ from DTO.chambreDTO import (
     TypeChambreUpdateDTO,
     ChambreCreateDTO,
     ChambreUpdateDTO,
+    FiltreChambresDTO,
+    ChangementsChambresDTO,
 )
 from modele.chambre import Chambre
 from modele.type_chambre import TypeChambre
+from modele.reservation import Reservation
 
 # --------------------------------------------------------------
 # ---------- CREATE ----------
@@ -32,25 +45,31 @@ from modele.type_chambre import TypeChambre
 
 def creerTypeChambre(data: TypeChambreCreateDTO) -> TypeChambreDTO:
     with SessionLocal() as session:  # ouverture d’une session SQLAlchemy
-        exists = session.execute(
-            select(TypeChambre).where(TypeChambre.nom_type == data.nom_type)
-        ).scalar_one_or_none()
-
-        # Si un type avec le même nom existe déjà, on le retourne tel quel
-        if exists:
-            return TypeChambreDTO(exists)
-
-        # Création du nouvel objet TypeChambre à partir des données reçues
-        new_tc = TypeChambre(
-            nom_type=data.nom_type,
-            prix_plancher=data.prix_plancher,
-            prix_plafond=data.prix_plafond,
-            description_chambre=data.description_chambre,
+        # Upsert natif sur nom_type (contrainte UNIQUE) : si un type avec le
+        # même nom existe déjà, on le retourne tel quel, sinon il est créé.
+        # Une seule requête, sans doublon possible en concurrence.
+        # L’id choisi ici dit si le type a été créé ou retourné tel quel.
+        id_nouveau = uuid4()
+        tc = inserer_ou_recuperer(
+            session,
+            TypeChambre,
+            dict(
+                id_type_chambre=id_nouveau,
+                nom_type=data.nom_type,
+                prix_plancher=data.prix_plancher,
+                prix_plafond=data.prix_plafond,
+                description_chambre=data.description_chambre,
+            ),
+            cles=("nom_type",),
         )
-        session.add(new_tc)
+        dto = TypeChambreDTO(tc)  # construit avant le commit (qui expire l’objet)
+        id_type = tc.id_type_chambre
+        if id_type == id_nouveau:
+            journaliser(session, "type_chambre", CREATION, [id_type])
         session.commit()
-        session.refresh(new_tc)
-        return TypeChambreDTO(new_tc)
+        catalogue_chambres.maj_type(id_type, dto)
+        cache_metier.invalider("type_chambre", [id_type])
+        return dto
 
 
 def creerChambre(data: ChambreCreateDTO) -> ChambreDTO:
@@ -62,17 +81,26 @@ def creerChambre(data: ChambreCreateDTO) -> ChambreDTO:
         if tc is None:
             raise ValueError(f"Type de chambre '{data.nom_type}' introuvable.")
 
-        # Création de la nouvelle chambre avec ses informations
-        ch = Chambre(
-            numero_chambre=data.numero_chambre,
-            disponible_reservation=data.disponible_reservation,
-            autre_informations=data.autre_informations,
-            type_chambre=tc,
-        )
-        session.add(ch)
+        # Création de la nouvelle chambre en un seul INSERT ... RETURNING.
+        # Le type est déjà dans la session : ch.type_chambre ne relance pas de requête.
+        ch = session.scalars(
+            insert(Chambre)
+            .values(
+                numero_chambre=data.numero_chambre,
+                disponible_reservation=data.disponible_reservation,
+                autre_informations=data.autre_informations,
+                fk_type_chambre=tc.id_type_chambre,
+            )
+            .returning(Chambre)
+        ).one()
+        dto = ChambreDTO(ch)
+        etat = etat_chambre(ch)
+        journaliser(session, "chambre", CREATION, [dto.idChambre])
         session.commit()
-        session.refresh(ch)
-        return ChambreDTO(ch)
+        catalogue_chambres.maj_chambre(dto, tc.id_type_chambre)
+        cache_metier.invalider("chambre", [dto.idChambre])
+        publierChambres(CREATION, [etat])
+        return dto
 
 # --------------------------------------------------------------
 # ---------- READ / LIST ----------
@@ -80,30 +108,89 @@ def creerChambre(data: ChambreCreateDTO) -> ChambreDTO:
 # --------------------------------------------------------------
 
 def getChambreParNumero(no_chambre: int) -> ChambreDTO | None:
-    with SessionLocal() as session:
-        # Cherche une chambre par son numéro
-        ch = session.execute(
-            select(Chambre).where(Chambre.numero_chambre == no_chambre)
-        ).scalar_one_or_none()
-        return ChambreDTO(ch) if ch else None
+    # Cherche une chambre par son numéro (servi depuis le catalogue en mémoire)
+    return catalogue_chambres.chambre_par_numero(no_chambre)
 
 
 def listerTypesChambre() -> List[TypeChambreDTO]:
-    with SessionLocal() as session:
-        # Retourne tous les types de chambres triés par nom
-        rows = session.execute(
-            select(TypeChambre).order_by(TypeChambre.nom_type)
-        ).scalars().all()
-        return [TypeChambreDTO(t) for t in rows]
+    # Retourne tous les types de chambres triés par nom (catalogue en mémoire)
+    return catalogue_chambres.lister_types()
 
 
 def listerChambres() -> List[ChambreDTO]:
+    # Retourne toutes les chambres triées par numéro (catalogue en mémoire)
+    return catalogue_chambres.lister_chambres()
+
+
+# Champs du ChambreDTO -> colonnes de la chambre et de son type
+CORRESPONDANCE_CHAMBRE = {
+    "idChambre": "id_chambre",
+    "numero_chambre": "numero_chambre",
+    "disponible_reservation": "disponible_reservation",
+    "autre_informations": "autre_informations",
+    "type_chambre": ("type_chambre", {
+        "nom_type": "nom_type",
+        "prix_plafond": "prix_plafond",
+        "prix_plancher": "prix_plancher",
+        "description_chambre": "description_chambre",
+    }),
+}
+
+
+def rechercherChambres(
+    prix_min: Optional[float] = None,
+    prix_max: Optional[float] = None,
+    nom_type: Optional[str] = None,
+    disponible: Optional[bool] = None,
+    projection: Optional[Projection] = None,
+) -> List[ChambreDTO]:
+    """
+    Chambres filtrées par fourchette de prix, type et disponibilité, en une
+    seule requête (chambre JOIN type_chambre) servie par les index
+    ix_type_chambre_prix et ix_chambre_type_disponible.
+    Un type correspond si sa fourchette [plancher, plafond] croise [prix_min, prix_max]
+    (sans plafond, la fourchette se réduit au prix plancher).
+    Avec une projection partielle, seules ses colonnes sont lues ; la
+    jointure n’a lieu que si le type est demandé ou filtré.
+    """
+    partielle = projection is not None and not projection.complete
+    avec_type = not partielle or projection.contient("type_chambre")
     with SessionLocal() as session:
-        # Retourne toutes les chambres triées par numéro
-        rows = session.execute(
-            select(Chambre).order_by(Chambre.numero_chambre)
-        ).scalars().all()
-        return [ChambreDTO(c) for c in rows]
+        session: Session
+
+        stmt = select(Chambre)
+        if avec_type or prix_min is not None or prix_max is not None or nom_type is not None:
+            stmt = stmt.join(Chambre.type_chambre)
+        if avec_type:
+            chargement = contains_eager(Chambre.type_chambre)
+            if partielle:
+                sous = projection.arbre["type_chambre"]
+                colonnes_type = colonnes(None if sous is True else sous, CORRESPONDANCE_CHAMBRE["type_chambre"][1])
+                chargement = chargement.load_only(*(getattr(TypeChambre, c) for c in colonnes_type), raiseload=True)
+            stmt = stmt.options(chargement)
+        if partielle:
+            # autre_informations (texte non borné) n’est lu que s’il est demandé
+            colonnes_chambre = colonnes(projection.arbre, CORRESPONDANCE_CHAMBRE)
+            stmt = stmt.options(load_only(*(getattr(Chambre, c) for c in colonnes_chambre), raiseload=True))
+        if prix_max is not None:
+            stmt = stmt.where(TypeChambre.prix_plancher <= Decimal(str(prix_max)))
+        if prix_min is not None:
+            stmt = stmt.where(
+                func.coalesce(TypeChambre.prix_plafond, TypeChambre.prix_plancher) >= Decimal(str(prix_min))
+            )
+        if nom_type is not None:
+            stmt = stmt.where(TypeChambre.nom_type == nom_type)
+        if disponible is not None:
+            stmt = stmt.where(Chambre.disponible_reservation == disponible)
+
+        # Même ordre que listerChambres
+        stmt = stmt.order_by(Chambre.numero_chambre, Chambre.id_chambre)
+        if partielle:
+            return [
+                construire(ChambreDTO, projection.arbre, ch, CORRESPONDANCE_CHAMBRE)
+                for ch in session.execute(stmt).scalars()
+            ]
+        return [ChambreDTO(ch) for ch in session.execute(stmt).scalars()]
 
 # --------------------------------------------------------------
 # ---------- UPDATE ----------
@@ -113,39 +200,55 @@ def listerChambres() -> List[ChambreDTO]:
 def modifierTypeChambre(id_type_chambre: str, data: TypeChambreUpdateDTO) -> TypeChambreDTO:
     with SessionLocal() as session:
         session: Session
-        tc = session.get(TypeChambre, id_type_chambre)
-        if not tc:
-            raise ValueError("Type de chambre introuvable.")
 
         # Mise à jour des champs modifiés seulement
-        if data.nom_type is not None:
-            tc.nom_type = data.nom_type
-        if data.prix_plancher is not None:
-            tc.prix_plancher = data.prix_plancher
-        if data.prix_plafond is not None:
-            tc.prix_plafond = data.prix_plafond
-        if data.description_chambre is not None:
-            tc.description_chambre = data.description_chambre
+        # (les noms des champs du DTO sont ceux des colonnes)
+        valeurs = data.model_dump(exclude_none=True)
+        stmt = update(TypeChambre).where(TypeChambre.id_type_chambre == id_type_chambre)
+
+        # Une seule borne de prix envoyée : vérifiée contre l’autre, déjà en base,
+        # dans le WHERE (donc dans le même UPDATE)
+        if data.prix_plancher is not None and data.prix_plafond is None:
+            stmt = stmt.where(
+                or_(TypeChambre.prix_plafond.is_(None), TypeChambre.prix_plafond >= data.prix_plancher)
+            )
+        if data.prix_plafond is not None and data.prix_plancher is None:
+            stmt = stmt.where(TypeChambre.prix_plancher <= data.prix_plafond)
+
+        if not valeurs:
+            tc = session.get(TypeChambre, id_type_chambre)
+        else:
+            # Un seul UPDATE ... RETURNING au lieu de get + commit + refresh
+            try:
+                tc = session.scalars(stmt.values(**valeurs).returning(TypeChambre)).one_or_none()
+            except IntegrityError:
+                # Contrainte UNIQUE sur nom_type violée
+                session.rollback()
+                raise ValueError(f"Le type de chambre '{data.nom_type}' existe déjà.")
+        if not tc:
+            # Aucune ligne touchée : type absent ou fourchette de prix incohérente
+            if not valeurs or session.get(TypeChambre, id_type_chambre) is None:
+                raise ValueError("Type de chambre introuvable.")
+            raise ValueError("Le prix plafond doit être supérieur ou égal au prix plancher.")
 
+        dto = TypeChambreDTO(tc)
+        id_type = tc.id_type_chambre
+        if valeurs:
+            # Copie du type dans la vue des réservations (même transaction)
+            vue.maj_type(session, id_type, dto)
+            journaliser(session, "type_chambre", MODIFICATION, [id_type])
         session.commit()
-        session.refresh(tc)
-        return TypeChambreDTO(tc)
+        catalogue_chambres.maj_type(id_type, dto)
+        cache_metier.invalider("type_chambre", [id_type])
+        return dto
 
 
 def modifierChambre(id_chambre: str, data: ChambreUpdateDTO) -> ChambreDTO:
     with SessionLocal() as session:
         session: Session
-        ch = session.get(Chambre, id_chambre)
-        if not ch:
-            raise ValueError("Chambre introuvable.")
 
         # Mise à jour des champs si fournis
-        if data.numero_chambre is not None:
-            ch.numero_chambre = data.numero_chambre
-        if data.disponible_reservation is not None:
-            ch.disponible_reservation = data.disponible_reservation
-        if data.autre_informations is not None:
-            ch.autre_informations = data.autre_informations
+        valeurs = data.model_dump(exclude_none=True, exclude={"nom_type"})
 
         # Si le type de chambre change, on valide que le nouveau type existe
         if data.nom_type is not None:
@@ -154,50 +257,186 @@ def modifierChambre(id_chambre: str, data: ChambreUpdateDTO) -> ChambreDTO:
             ).scalar_one_or_none()
             if not tc:
                 raise ValueError(f"Type de chambre '{data.nom_type}' introuvable.")
-            ch.fk_type_chambre = tc.id_type_chambre
-            ch.type_chambre = tc  # garde la relation à jour
+            valeurs["fk_type_chambre"] = tc.id_type_chambre
+
+        if not valeurs:
+            ch = session.get(Chambre, id_chambre)
+        else:
+            # Un seul UPDATE ... RETURNING (OUTPUT sur MSSQL)
+            ch = session.scalars(
+                update(Chambre)
+                .where(Chambre.id_chambre == id_chambre)
+                .values(**valeurs)
+                .returning(Chambre)
+            ).one_or_none()
+        if not ch:
+            raise ValueError("Chambre introuvable.")
+
+        # Le type vient du catalogue en mémoire ; sinon il est chargé
+        # par clé primaire (aucune requête s’il est déjà en session)
+        dto = catalogue_chambres.construire_dto(ch) or ChambreDTO(ch)
+        id_type = ch.fk_type_chambre
+        etat = etat_chambre(ch)
+        if valeurs:
+            # Copie de la chambre dans la vue des réservations (même transaction)
+            vue.maj_chambre(session, dto)
+            journaliser(session, "chambre", MODIFICATION, [dto.idChambre])
+        session.commit()
+        catalogue_chambres.maj_chambre(dto, id_type)
+        cache_metier.invalider("chambre", [dto.idChambre])
+        if valeurs:
+            publierChambres(MODIFICATION, [etat])
+        return dto
 
+# --------------------------------------------------------------
+# ---------- MISE À JOUR EN MASSE ----------
+# PATCH /chambres : mêmes changements pour toutes les chambres d’un
+# filtre, par UPDATE ... WHERE id IN (lot) RETURNING, dans une seule
+# transaction. Lots de 1 000 : sous le seuil d’escalade des verrous
+# de SQL Server (5 000 par instruction) et sous la limite de 2 100
+# paramètres par requête.
+# --------------------------------------------------------------
+TAILLE_LOT_MASSE = 1000
+
+
+def _conditions_filtre(filtre: FiltreChambresDTO) -> list:
+    # Le filtre sur les ids est appliqué par le découpage en lots
+    conditions = []
+    if filtre.numero_min is not None:
+        conditions.append(Chambre.numero_chambre >= filtre.numero_min)
+    if filtre.numero_max is not None:
+        conditions.append(Chambre.numero_chambre <= filtre.numero_max)
+    if filtre.nom_type is not None:
+        conditions.append(
+            Chambre.fk_type_chambre.in_(
+                select(TypeChambre.id_type_chambre).where(TypeChambre.nom_type == filtre.nom_type)
+            )
+        )
+    return conditions
+
+
+def modifierChambresEnMasse(filtre: FiltreChambresDTO, changements: ChangementsChambresDTO) -> int:
+    """Applique `changements` aux chambres du filtre. Retourne le nombre de chambres modifiées."""
+    with SessionLocal() as session:
+        session: Session
+
+        valeurs = changements.model_dump(exclude_none=True, exclude={"nom_type"})
+        nouveau_type = None
+        if changements.nom_type is not None:
+            tc = session.execute(
+                select(TypeChambre).where(TypeChambre.nom_type == changements.nom_type)
+            ).scalar_one_or_none()
+            if not tc:
+                raise ValueError(f"Type de chambre '{changements.nom_type}' introuvable.")
+            valeurs["fk_type_chambre"] = tc.id_type_chambre
+            nouveau_type = TypeChambreDTO(tc)
+
+        # Candidats : la liste d’ids fournie, sinon une lecture des ids du filtre
+        conditions = _conditions_filtre(filtre)
+        if filtre.ids:
+            candidats = list(dict.fromkeys(filtre.ids))
+        else:
+            candidats = session.scalars(select(Chambre.id_chambre).where(*conditions)).all()
+
+        modifiees: List[Chambre] = []
+        for debut in range(0, len(candidats), TAILLE_LOT_MASSE):
+            verifier_echeance()
+            lot = candidats[debut:debut + TAILLE_LOT_MASSE]
+            lignes = session.scalars(
+                update(Chambre)
+                .where(Chambre.id_chambre.in_(lot), *conditions)
+                .values(**valeurs)
+                .returning(Chambre)
+            ).all()
+            if lignes:
+                vue.maj_chambres(session, [ch.id_chambre for ch in lignes], valeurs, nouveau_type)
+            modifiees.extend(lignes)
+
+        # DTO construits avant le commit (qui expire les objets)
+        dtos = [(catalogue_chambres.construire_dto(ch), ch.fk_type_chambre) for ch in modifiees]
+        etats = [etat_chambre(ch) for ch in modifiees]
+        ids = [ch.id_chambre for ch in modifiees]
+        journaliser(session, "chambre", MODIFICATION, ids)
         session.commit()
-        session.refresh(ch)
-        return ChambreDTO(ch)
+
+    if any(dto is None for dto, _ in dtos):
+        # Catalogue pas chargé (ou type absent) : il relira la BD
+        catalogue_chambres.invalider()
+    else:
+        catalogue_chambres.maj_chambres(dtos)
+    for debut in range(0, len(ids), TAILLE_LOT_MASSE):
+        cache_metier.invalider("chambre", ids[debut:debut + TAILLE_LOT_MASSE])
+    publierChambres(MODIFICATION, etats)
+    return len(ids)
 
 # --------------------------------------------------------------
 # ---------- DELETE ----------
 # Fonctions pour supprimer un type de chambre ou une chambre
-# avec gestion des contraintes de clé étrangère
+# avec gestion des contraintes de clé étrangère.
+# Un seul DELETE ... WHERE id = :id AND NOT EXISTS (enfants) :
+# ni l’entité ni ses collections ne sont chargées en mémoire.
 # --------------------------------------------------------------
 
 def supprimerTypeChambre(id_type_chambre: str) -> bool:
     with SessionLocal() as session:
         session: Session
-        tc = session.get(TypeChambre, id_type_chambre)
-        if not tc:
-            return False
         try:
-            session.delete(tc)
+            res = session.execute(
+                delete(TypeChambre)
+                .where(TypeChambre.id_type_chambre == id_type_chambre)
+                .where(~exists().where(Chambre.fk_type_chambre == TypeChambre.id_type_chambre))
+                .execution_options(synchronize_session=False)
+            )
+            if res.rowcount:
+                journaliser(session, "type_chambre", SUPPRESSION, [id_type_chambre])
             session.commit()
-            return True
         except IntegrityError:
-            # Si des chambres utilisent encore ce type, la suppression échoue
+            # Une chambre a été rattachée entre-temps (concurrence)
             session.rollback()
+            res = None
+
+        if res is not None and res.rowcount:
+            catalogue_chambres.retirer_type(id_type_chambre)
+            cache_metier.invalider("type_chambre", [id_type_chambre])
+            return True
+
+        # Aucune ligne supprimée : type absent (404) ou encore utilisé (400)
+        if session.scalar(
+            select(exists().where(TypeChambre.id_type_chambre == id_type_chambre))
+        ):
             raise ValueError(
                 "Impossible de supprimer ce type de chambre car des chambres y sont rattachées."
             )
+        return False
 
 
 def supprimerChambre(id_chambre: str) -> bool:
     with SessionLocal() as session:
         session: Session
-        ch = session.get(Chambre, id_chambre)
-        if not ch:
-            return False
         try:
-            session.delete(ch)
+            res = session.execute(
+                delete(Chambre)
+                .where(Chambre.id_chambre == id_chambre)
+                .where(~exists().where(Reservation.fk_id_chambre == Chambre.id_chambre))
+                .execution_options(synchronize_session=False)
+            )
+            if res.rowcount:
+                journaliser(session, "chambre", SUPPRESSION, [id_chambre])
             session.commit()
-            return True
         except IntegrityError:
-            # Si des réservations sont liées à la chambre, la suppression échoue
+            # Une réservation a été ajoutée entre-temps (concurrence)
             session.rollback()
+            res = None
+
+        if res is not None and res.rowcount:
+            catalogue_chambres.retirer_chambre(id_chambre)
+            cache_metier.invalider("chambre", [id_chambre])
+            publierChambresSupprimees([id_chambre])
+            return True
+
+        # Aucune ligne supprimée : chambre absente (404) ou réservée (400)
+        if session.scalar(select(exists().where(Chambre.id_chambre == id_chambre))):
             raise ValueError(
                 "Impossible de supprimer cette chambre car des réservations y sont rattachées."
             )
+        return False
@@ -0,0 +1,243 @@
+# ==============================================================
+# metier/changementMetier.py
+# Journal des changements (flux de deltas) : chaque écriture du
+# métier ajoute, dans sa propre transaction, une ligne par entité
+# touchée (entité, id, opération, version, instant). Les intégrations
+# lisent GET /changements?depuis=<curseur> au lieu de relire toutes
+# les chambres ou de grandes recherches de réservations chaque minute,
+# et peuvent attendre le prochain changement (long-polling).
+#
+# Le journal reste petit :
+#   - compaction : seule la dernière ligne de chaque entité est
+#     gardée au-delà de HOTEL_CHANGEMENTS_COMPACTION_HEURES (1 h) ;
+#   - rétention : les suppressions (et archivages) sont retirées après
+#     HOTEL_CHANGEMENTS_RETENTION_JOURS (7 jours). Un client dont le
+#     curseur est plus ancien reçoit 410 et doit tout relire.
+#     python -m metier.changementMetier     (à planifier, ex. chaque heure)
+# ==============================================================
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+from uuid import UUID
+
+from sqlalchemy import DateTime, String, Uuid, bindparam, delete, exists, func, insert, select
+from sqlalchemy.orm import Session, aliased
+
+from core.db import SessionLocal
+from core.taches import apres_commit
+from DTO.changementDTO import ChangementDTO, PageChangementsDTO
+from modele.changement import Changement, ChangementPurge
+
+log = logging.getLogger(__name__)
+
+CREATION = "creation"
+MODIFICATION = "modification"
+SUPPRESSION = "suppression"
+ARCHIVAGE = "archivage"
+# Opérations après lesquelles l’entité n’est plus dans les tables chaudes
+_FINALES = (SUPPRESSION, ARCHIVAGE)
+
+RETENTION_JOURS = int(os.environ.get("HOTEL_CHANGEMENTS_RETENTION_JOURS", "7"))
+COMPACTION_HEURES = int(os.environ.get("HOTEL_CHANGEMENTS_COMPACTION_HEURES", "1"))
+
+# Un trou dans les séquences plus récent que ce délai peut être une
+# transaction pas encore validée : la lecture s’arrête avant lui
+MARGE_VISIBILITE = 5.0
+# Long-polling : relecture au moins toutes les secondes (les changements
+# des autres workers ne sont pas signalés dans ce processus)
+INTERVALLE_SONDAGE = 1.0
+TAILLE_LOT_PURGE = 1000
+
+
+class CurseurExpire(ValueError):
+    """Le curseur est antérieur à la rétention : des suppressions ont été oubliées."""
+
+# --------------------------------------------------------------
+# ---------- ÉCRITURE ----------
+# INSERT ... SELECT : la version est calculée par la BD à partir de la
+# dernière ligne de l’entité (SQL Server refuse une sous-requête dans
+# VALUES). Plusieurs ids : un seul executemany.
+# À appeler juste avant le commit : une transaction longue garderait
+# sinon une séquence invisible plus longtemps que MARGE_VISIBILITE.
+# --------------------------------------------------------------
+# Alias de la table (pas aliased() : aucune configuration des mappers à l’import)
+_precedente = Changement.__table__.alias("precedente")
+_INSERTION = insert(Changement.__table__).from_select(
+    ["entite", "id_entite", "operation", "version", "moment"],
+    select(
+        bindparam("entite", type_=String(30)),
+        bindparam("id_entite", type_=Uuid()),
+        bindparam("operation", type_=String(20)),
+        select(func.coalesce(func.max(_precedente.c.version), 0) + 1)
+        .where(_precedente.c.entite == bindparam("entite"), _precedente.c.id_entite == bindparam("id_entite"))
+        .scalar_subquery(),
+        bindparam("moment", type_=DateTime()),
+    ),
+)
+
+
+def journaliser(s: Session, entite: str, operation: str, ids: Iterable) -> None:
+    """Ajoute au journal un changement par id, dans la transaction de `s`."""
+    moment = datetime.now()
+    lignes = [
+        {"entite": entite, "id_entite": i if isinstance(i, UUID) else UUID(str(i)),
+         "operation": operation, "moment": moment}
+        for i in ids
+    ]
+    if not lignes:
+        return
+    s.connection().execute(_INSERTION, lignes)
+    apres_commit(s, _signaler)
+
+# --------------------------------------------------------------
+# ---------- LECTURE ----------
+# --------------------------------------------------------------
+
+def _plancher(s: Session) -> int:
+    # Plus grande séquence retirée par la rétention, relue à chaque lecture
+    # (une ligne par purge) : jamais en cache, car la purge tourne dans un
+    # autre processus (cron), dont les invalidations n’atteignent pas les
+    # workers de l’API sans cache partagé
+    return s.scalar(select(func.max(ChangementPurge.sequence_max))) or 0
+
+
+def lireChangements(depuis: int = 0, limite: int = 100) -> PageChangementsDTO:
+    """
+    Changements de séquence > depuis, dans l’ordre. Lève CurseurExpire si
+    la rétention a retiré des changements que le client n’a pas lus.
+    """
+    with SessionLocal() as s:
+        s: Session
+        if depuis and depuis < _plancher(s):
+            raise CurseurExpire("Curseur expiré : relire les listes complètes puis repartir de 0.")
+
+        lignes = s.scalars(
+            select(Changement).where(Changement.sequence > depuis).order_by(Changement.sequence).limit(limite + 1)
+        ).all()
+
+        # Arrêt avant un trou récent (transaction en cours) ; les trous anciens
+        # viennent d’un rollback ou de la compaction et sont définitifs
+        recent = datetime.now() - timedelta(seconds=MARGE_VISIBILITE)
+        visibles: List[Changement] = []
+        attendu = depuis + 1
+        for c in lignes[:limite]:
+            if c.sequence != attendu and c.moment > recent:
+                break
+            visibles.append(c)
+            attendu = c.sequence + 1
+
+        return PageChangementsDTO(
+            changements=[ChangementDTO(c) for c in visibles],
+            curseur=visibles[-1].sequence if visibles else depuis,
+            suite=len(visibles) < len(lignes),
+        )
+
+# --------------------------------------------------------------
+# ---------- LONG-POLLING ----------
+# Les écritures de ce processus réveillent les attentes (tâche après
+# commit) ; celles des autres workers sont vues au sondage suivant.
+# --------------------------------------------------------------
+_attentes: set = set()
+_verrou_attentes = threading.Lock()
+
+
+def _signaler() -> None:
+    with _verrou_attentes:
+        attentes = list(_attentes)
+    for boucle, evenement in attentes:
+        try:
+            boucle.call_soon_threadsafe(evenement.set)
+        except RuntimeError:
+            pass  # boucle fermée
+
+
+async def attendreChangements(depuis: int = 0, limite: int = 100, attente: float = 0.0) -> PageChangementsDTO:
+    """Comme lireChangements, mais attend jusqu’à `attente` secondes un premier changement."""
+    boucle = asyncio.get_running_loop()
+    fin = boucle.time() + attente
+    evenement = asyncio.Event()
+    inscription = (boucle, evenement)
+    with _verrou_attentes:
+        _attentes.add(inscription)
+    try:
+        while True:
+            evenement.clear()
+            page = await asyncio.to_thread(lireChangements, depuis, limite)
+            reste = fin - boucle.time()
+            if page.changements or page.suite or reste <= 0:
+                return page
+            try:
+                await asyncio.wait_for(evenement.wait(), min(reste, INTERVALLE_SONDAGE))
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        with _verrou_attentes:
+            _attentes.discard(inscription)
+
+# --------------------------------------------------------------
+# ---------- COMPACTION ET RÉTENTION ----------
+# Par lots de séquences (une transaction chacun), comme l’archivage.
+# --------------------------------------------------------------
+
+def _purger(s: Session, *conditions) -> int:
+    total = 0
+    while True:
+        lot = s.scalars(
+            select(Changement.sequence).where(*conditions).order_by(Changement.sequence).limit(TAILLE_LOT_PURGE)
+        ).all()
+        if not lot:
+            return total
+        s.execute(
+            delete(Changement).where(Changement.sequence.in_(lot)).execution_options(synchronize_session=False)
+        )
+        s.commit()
+        total += len(lot)
+
+
+def compacterChangements(
+    retention_jours: int = RETENTION_JOURS,
+    compaction_heures: int = COMPACTION_HEURES,
+    maintenant: Optional[datetime] = None,
+) -> Dict[str, int]:
+    """Compacte puis purge le journal. Retourne le nombre de lignes retirées par étape."""
+    maintenant = maintenant or datetime.now()
+    with SessionLocal() as s:
+        s: Session
+
+        # Compaction : lignes remplacées par une ligne plus récente de la même entité
+        suivante = aliased(Changement)
+        compactees = _purger(
+            s,
+            Changement.moment < maintenant - timedelta(hours=compaction_heures),
+            exists().where(
+                suivante.entite == Changement.entite,
+                suivante.id_entite == Changement.id_entite,
+                suivante.sequence > Changement.sequence,
+            ),
+        )
+
+        # Rétention : dernières lignes des entités supprimées ou archivées
+        finales = (
+            Changement.operation.in_(_FINALES),
+            Changement.moment < maintenant - timedelta(days=retention_jours),
+        )
+        sequence_max = s.scalar(select(func.max(Changement.sequence)).where(*finales))
+        retirees = 0
+        if sequence_max is not None:
+            retirees = _purger(s, *finales, Changement.sequence <= sequence_max)
+            if sequence_max > _plancher(s):
+                s.execute(insert(ChangementPurge).values(sequence_max=sequence_max, purge_le=maintenant))
+                s.commit()
+
+    return {"compactees": compactees, "retirees": retirees}
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(compacterChangements())
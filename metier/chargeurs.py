@@ -0,0 +1,87 @@
+# ==============================================================
+# metier/chargeurs.py
+# Chargeurs par lots (core/lot.py) pour les lectures par id
+# des usagers, des chambres et des réservations.
+# Sous charge, les centaines de lectures ponctuelles simultanées
+# deviennent une requête "WHERE id IN (...)" par fenêtre de 2 ms.
+# Les valeurs retournées sont des DTO (aucun objet ORM ne sort
+# de la session qui l’a chargé).
+# ==============================================================
+
+from __future__ import annotations
+
+import os
+from typing import Dict, List
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
+
+from core.cache import cache_metier
+from core.db import SessionLocal
+from core.lot import ChargeurParLot
+from DTO.chambreDTO import ChambreDTO
+from DTO.reservationDTO import ReservationDTO
+from DTO.usagerDTO import UsagerDTO
+from metier.catalogueChambre import catalogue_chambres
+from metier.reservationVue import dto_depuis_vue
+from modele.chambre import Chambre
+from modele.reservation_vue import ReservationVue
+from modele.usager import Usager
+
+# Fenêtre de regroupement en secondes (0 désactive le regroupement)
+FENETRE_LOT = float(os.environ.get("HOTEL_FENETRE_LOT_MS", "2")) / 1000
+TAILLE_MAX_LOT = 100
+
+
+def _uuid(valeur) -> UUID:
+    # Un id mal formé lève ValueError dans le thread de l’appelant (400 côté API)
+    return valeur if isinstance(valeur, UUID) else UUID(str(valeur))
+
+
+def _usagers(ids: List[UUID]) -> Dict[UUID, UsagerDTO]:
+    with SessionLocal() as s:
+        rows = s.execute(select(Usager).where(Usager.id_usager.in_(ids))).scalars()
+        return {u.id_usager: UsagerDTO(u) for u in rows}
+
+
+def _chambres(ids: List[UUID]) -> Dict[UUID, ChambreDTO]:
+    with SessionLocal() as s:
+        rows = s.execute(
+            select(Chambre).options(joinedload(Chambre.type_chambre)).where(Chambre.id_chambre.in_(ids))
+        ).scalars()
+        return {c.id_chambre: ChambreDTO(c) for c in rows}
+
+
+def _reservations(ids: List[UUID]) -> Dict[UUID, ReservationDTO]:
+    # Lues dans la vue dénormalisée : aucune jointure
+    with SessionLocal() as s:
+        rows = s.execute(select(ReservationVue).where(ReservationVue.id_reservation.in_(ids))).scalars()
+        return {v.id_reservation: dto_depuis_vue(v) for v in rows}
+
+
+chargeur_usagers = ChargeurParLot(_usagers, FENETRE_LOT, TAILLE_MAX_LOT, cle=_uuid)
+chargeur_chambres = ChargeurParLot(_chambres, FENETRE_LOT, TAILLE_MAX_LOT, cle=_uuid)
+chargeur_reservations = ChargeurParLot(_reservations, FENETRE_LOT, TAILLE_MAX_LOT, cle=_uuid)
+
+# --------------------------------------------------------------
+# ---------- ACCÈS COMBINÉS ----------
+# Mémoire d’abord (cache métier, catalogue), puis lot SQL.
+# --------------------------------------------------------------
+
+def usager_par_id(id_usager) -> UsagerDTO | None:
+    cle = _uuid(id_usager)
+    return cache_metier.obtenir("usager", cle, lambda: chargeur_usagers.charger(cle), UsagerDTO)
+
+
+def chambre_par_id(id_chambre) -> ChambreDTO | None:
+    cle = _uuid(id_chambre)
+    return catalogue_chambres.chambre_par_id(cle) or chargeur_chambres.charger(cle)
+
+
+def statistiques() -> Dict[str, dict]:
+    return {
+        "usagers": chargeur_usagers.statistiques(),
+        "chambres": chargeur_chambres.statistiques(),
+        "reservations": chargeur_reservations.statistiques(),
+    }
@@ -0,0 +1,84 @@
+# ==============================================================
+# metier/fluxChambres.py
+# Flux des chambres (GET /flux/chambres, Server-Sent Events) : les
+# tableaux de bord du hall chargent GET /chambres une fois, puis
+# appliquent les événements poussés par les écritures du métier au
+# lieu de relire la liste en boucle.
+#
+#   event: chambres       création / modification / suppression de
+#                         chambres (numéro, disponibilité, infos, id du type)
+#   event: reservations   réservations créées, modifiées ou annulées
+#                         (occupation des chambres)
+#   event: resynchroniser relire GET /chambres (client évincé ou
+#                         reprise impossible)
+#
+# Un événement porte une liste : une modification en masse reste
+# quelques trames (lots de TAILLE_LOT_EVENEMENT), sans remplir le
+# tampon des abonnés. Les événements d’une réservation portent son
+# id : un client la retire de son ancienne chambre si elle change.
+# ==============================================================
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Iterable, List, Tuple
+from uuid import UUID
+
+from core.cache import cache_metier
+from core.diffusion import Diffuseur
+from metier.changementMetier import SUPPRESSION
+from modele.chambre import Chambre
+
+CANAL_FLUX_CHAMBRES = "hotel:flux:chambres"
+TAILLE_LOT_EVENEMENT = 1000
+
+# Instance partagée (les autres workers relaient par le cache partagé)
+flux_chambres = Diffuseur(CANAL_FLUX_CHAMBRES, cache_metier.backend)
+
+
+def _par_lots(elements: list) -> Iterable[list]:
+    for debut in range(0, len(elements), TAILLE_LOT_EVENEMENT):
+        yield elements[debut:debut + TAILLE_LOT_EVENEMENT]
+
+# --------------------------------------------------------------
+# ---------- ÉVÉNEMENTS ----------
+# À appeler après le commit, dans le fil de l’écriture : les abonnés
+# de ce processus reçoivent les événements dans l’ordre des commits.
+# --------------------------------------------------------------
+
+def etat_chambre(ch: Chambre) -> dict:
+    """État diffusé d’une chambre (à lire avant le commit, qui expire l’objet)."""
+    return {
+        "idChambre": str(ch.id_chambre),
+        "numero_chambre": ch.numero_chambre,
+        "disponible_reservation": ch.disponible_reservation,
+        "autre_informations": ch.autre_informations,
+        "idTypeChambre": str(ch.fk_type_chambre),
+    }
+
+
+def publierChambres(operation: str, chambres: List[dict]) -> None:
+    """Chambres créées ou modifiées (états lus par etat_chambre)."""
+    for lot in _par_lots(chambres):
+        flux_chambres.publier("chambres", {"operation": operation, "chambres": lot})
+
+
+def publierChambresSupprimees(ids: Iterable) -> None:
+    chambres = [{"idChambre": str(i)} for i in ids]
+    for lot in _par_lots(chambres):
+        flux_chambres.publier("chambres", {"operation": SUPPRESSION, "chambres": lot})
+
+
+def publierReservations(operation: str, lignes: Iterable[Tuple[UUID, UUID, datetime, datetime]]) -> None:
+    """Réservations (id, id de chambre, début, fin) créées, modifiées ou annulées."""
+    reservations: List[dict] = [
+        {
+            "idReservation": str(id_reservation),
+            "idChambre": str(id_chambre),
+            "dateDebut": debut.isoformat(),
+            "dateFin": fin.isoformat(),
+        }
+        for id_reservation, id_chambre, debut, fin in lignes
+    ]
+    for lot in _par_lots(reservations):
+        flux_chambres.publier("reservations", {"operation": operation, "reservations": lot})
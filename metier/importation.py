@@ -0,0 +1,624 @@
+# ==============================================================
+# metier/importation.py
+# Import en masse des usagers et des réservations (reprise des
+# données d’un ancien système de gestion) depuis un flux CSV ou
+# NDJSON, sans passer une ligne à la fois par POST /usagers et
+# POST /reservations :
+#
+#   - le flux est lu morceau par morceau, jamais en entier en mémoire ;
+#   - les enregistrements sont validés par lots avec les règles des DTO
+#     (UsagerCreateDTO, ReservationImportDTO) ;
+#   - les références d’un lot sont résolues d’un coup : chambres par le
+#     catalogue en mémoire (une requête pour celles qui y manquent),
+#     usagers par une seule requête (id ou nom + prénom + mobile) ;
+#   - chaque lot est inséré en un executemany, dans une transaction qui
+#     avance aussi le point de reprise (table importation) ;
+#   - les enregistrements refusés vont dans un fichier de rejets NDJSON
+#     (numéro, ligne du fichier, erreurs, données reçues).
+#
+# Un usager déjà présent (même nom, prénom et mobile, comme pour
+# creerUsager) n’est pas recréé : il est compté dans "existants".
+#
+# Un import interrompu (erreur de BD, processus arrêté) se reprend avec
+# le même identifiant et le même fichier : les enregistrements des lots
+# validés sont relus puis sautés, jamais insérés deux fois.
+#
+#     python -m metier.importation usagers clients.csv
+#     python -m metier.importation reservations sejours.ndjson --reprise <id>
+#
+# API : POST /import/usagers et POST /import/reservations (corps en flux)
+# ==============================================================
+
+from __future__ import annotations
+
+import argparse
+import codecs
+import csv
+import json
+import logging
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Type
+from uuid import UUID, uuid4
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload
+
+from core.cache import cache_metier
+from core.db import SessionLocal
+from core.taches import apres_commit
+from DTO.chambreDTO import ChambreDTO
+from DTO.importationDTO import ReservationImportDTO, ResultatImportDTO
+from DTO.usagerDTO import UsagerCreateDTO, UsagerDTO
+from metier import reservationVue as vue
+from metier.catalogueChambre import catalogue_chambres
+from metier.changementMetier import CREATION, journaliser
+from metier.fluxChambres import publierReservations
+from metier.usagerMetier import mot_de_passe_colonne
+from modele.chambre import Chambre
+from modele.importation import Importation
+from modele.reservation import Reservation
+from modele.usager import Usager
+
+log = logging.getLogger(__name__)
+
+CSV = "csv"
+NDJSON = "ndjson"
+
+# Un lot = une transaction et un executemany ; ses IN (résolution des
+# références) restent sous la limite de 2 100 paramètres de SQL Server
+TAILLE_LOT_IMPORT = 1000
+
+# Un import "en_cours" sans lot validé depuis ce délai a été abandonné
+# (processus tué) : il peut être repris
+DELAI_ABANDON = timedelta(seconds=int(os.environ.get("HOTEL_IMPORT_ABANDON_S", "300")))
+
+# Fichiers de rejets des imports reçus par l’API
+DOSSIER_REJETS = os.environ.get(
+    "HOTEL_IMPORT_REJETS", os.path.join(tempfile.gettempdir(), "hotel-imports")
+)
+
+EN_COURS = "en_cours"
+INTERROMPU = "interrompu"
+TERMINE = "termine"
+
+
+class ImportInvalide(ValueError):
+    """Flux illisible, colonnes manquantes ou import d’une autre nature (400)."""
+
+
+class ImportEnCours(ValueError):
+    """Le même import avance encore dans un autre processus (409)."""
+
+
+class ImportInterrompu(RuntimeError):
+    """Erreur en cours d’import : les lots validés sont gardés, reprendre avec `id_import`."""
+
+    def __init__(self, id_import: UUID, traites: int, cause: BaseException) -> None:
+        super().__init__(f"Import {id_import} interrompu après {traites} enregistrements : {cause}")
+        self.id_import = id_import
+        self.traites = traites
+
+# --------------------------------------------------------------
+# ---------- LECTURE DU FLUX ----------
+# --------------------------------------------------------------
+
+_TYPES_CONTENU = {
+    "text/csv": CSV,
+    "application/csv": CSV,
+    "application/x-ndjson": NDJSON,
+    "application/ndjson": NDJSON,
+    "application/jsonl": NDJSON,
+    "application/x-jsonlines": NDJSON,
+}
+
+
+def format_du_contenu(type_contenu: Optional[str]) -> Optional[str]:
+    """Format d’après l’en-tête Content-Type (None : non pris en charge)."""
+    return _TYPES_CONTENU.get((type_contenu or "").split(";")[0].strip().lower())
+
+
+def format_du_fichier(chemin: str) -> str:
+    return CSV if chemin.lower().endswith(".csv") else NDJSON
+
+
+def lignes_texte(morceaux: Iterable[bytes]) -> Iterator[str]:
+    """Morceaux d’octets UTF-8 coupés n’importe où -> lignes (fin de ligne comprise)."""
+    decodeur = codecs.getincrementaldecoder("utf-8-sig")()
+    reste = ""
+    for morceau in morceaux:
+        *lignes, reste = (reste + decodeur.decode(morceau)).split("\n")
+        for ligne in lignes:
+            yield ligne + "\n"
+    reste += decodeur.decode(b"", final=True)
+    if reste:
+        yield reste
+
+
+class _Enregistrement:
+    __slots__ = ("numero", "ligne", "donnees", "dto", "erreurs")
+
+    def __init__(self, numero: int, ligne: int, donnees: Any, erreur: Optional[str] = None) -> None:
+        self.numero = numero      # rang dans le flux (point de reprise)
+        self.ligne = ligne        # ligne du fichier, pour le fichier de rejets
+        self.donnees = donnees
+        self.dto: Optional[BaseModel] = None
+        self.erreurs: List[str] = [erreur] if erreur else []
+
+
+def _lignes_csv(lignes: Iterator[str], requises: List[str]) -> Iterator[Tuple[int, Any, Optional[str]]]:
+    lecteur = csv.DictReader(lignes)
+    if lecteur.fieldnames is None:
+        return  # flux vide
+    manquantes = [c for c in requises if c not in lecteur.fieldnames]
+    if manquantes:
+        raise ImportInvalide(f"Colonnes manquantes : {', '.join(manquantes)}.")
+    for ligne in lecteur:
+        if None in ligne:
+            surplus = ligne.pop(None)
+            yield lecteur.line_num, {**ligne, "(surplus)": surplus}, "Plus de valeurs que de colonnes."
+            continue
+        # Cellule vide : champ absent (valeur par défaut du DTO)
+        yield lecteur.line_num, {c: v for c, v in ligne.items() if v not in ("", None)}, None
+
+
+def _lignes_ndjson(lignes: Iterator[str]) -> Iterator[Tuple[int, Any, Optional[str]]]:
+    for numero, ligne in enumerate(lignes, 1):
+        if not ligne.strip():
+            continue
+        try:
+            donnees = json.loads(ligne)
+        except ValueError as e:
+            yield numero, ligne.rstrip("\r\n"), f"JSON invalide : {e}"
+            continue
+        if not isinstance(donnees, dict):
+            yield numero, donnees, "Un objet JSON est attendu."
+        else:
+            yield numero, donnees, None
+
+
+def _enregistrements(
+    morceaux: Iterable[bytes], format_: str, modele: Type[BaseModel]
+) -> Iterator[_Enregistrement]:
+    lignes = lignes_texte(morceaux)
+    if format_ == CSV:
+        requises = [nom for nom, champ in modele.model_fields.items() if champ.is_required()]
+        source = _lignes_csv(lignes, requises)
+    else:
+        source = _lignes_ndjson(lignes)
+    try:
+        for numero, (ligne, donnees, erreur) in enumerate(source, 1):
+            yield _Enregistrement(numero, ligne, donnees, erreur)
+    except UnicodeDecodeError:
+        raise ImportInvalide("Le flux doit être encodé en UTF-8.")
+    except csv.Error as e:
+        raise ImportInvalide(f"CSV invalide : {e}")
+
+# --------------------------------------------------------------
+# ---------- VALIDATION ----------
+# --------------------------------------------------------------
+
+def _erreurs(e: ValidationError) -> List[str]:
+    erreurs = []
+    for detail in e.errors():
+        champ = ".".join(str(p) for p in detail["loc"])
+        # Règle du DTO (model_post_init) : son message, sans préfixe de pydantic
+        cause = detail.get("ctx", {}).get("error")
+        message = str(cause) if cause is not None else detail["msg"]
+        erreurs.append(f"{champ} : {message}" if champ else message)
+    return erreurs
+
+
+def _valider(lot: List[_Enregistrement], modele: Type[BaseModel]) -> None:
+    for e in lot:
+        if e.erreurs:
+            continue
+        try:
+            e.dto = modele.model_validate(e.donnees)
+        except ValidationError as err:
+            e.erreurs = _erreurs(err)
+
+# --------------------------------------------------------------
+# ---------- INSERTION D’UN LOT ----------
+# Dans la transaction du lot. Retourne (nombre inséré, action à faire
+# après le commit) ; une référence introuvable devient un rejet.
+# --------------------------------------------------------------
+
+def _inserer_usagers(s: Session, valides: List[_Enregistrement]) -> Tuple[int, Optional[Callable]]:
+    # Doublons du lot : le premier est gardé
+    nouveaux: Dict[tuple, dict] = {}
+    for e in valides:
+        d: UsagerCreateDTO = e.dto
+        nouveaux.setdefault(
+            (d.nom, d.prenom, d.mobile),
+            dict(
+                id_usager=uuid4(),
+                prenom=d.prenom,
+                nom=d.nom,
+                adresse=d.adresse,
+                mobile=d.mobile,
+                mot_de_passe=mot_de_passe_colonne(d.mot_de_passe),
+                type_usager=d.type_usager,
+            ),
+        )
+
+    # Déjà en base (lots précédents ou API) : une requête par lot.
+    # CHAR(15) : le mobile peut revenir complété d’espaces
+    mobiles = {cle[2] for cle in nouveaux}
+    for nom, prenom, mobile in s.execute(
+        select(Usager.nom, Usager.prenom, Usager.mobile).where(Usager.mobile.in_(mobiles))
+    ):
+        nouveaux.pop((nom, prenom, mobile), None)
+        nouveaux.pop((nom, prenom, mobile.rstrip()), None)
+
+    lignes = list(nouveaux.values())
+    if lignes:
+        s.execute(insert(Usager), lignes)
+        ids = [ligne["id_usager"] for ligne in lignes]
+        journaliser(s, "usager", CREATION, ids)
+        apres_commit(s, cache_metier.invalider, "usager", ids, tolerant=False)
+    return len(lignes), None
+
+
+def _chambres(s: Session, valides: List[_Enregistrement]) -> Tuple[Dict[UUID, ChambreDTO], Dict[int, ChambreDTO]]:
+    par_id: Dict[UUID, ChambreDTO] = {}
+    par_numero: Dict[int, ChambreDTO] = {}
+    ids_manquants, numeros_manquants = set(), set()
+    for e in valides:
+        d: ReservationImportDTO = e.dto
+        if d.idChambre is not None:
+            if d.idChambre not in par_id:
+                chambre = catalogue_chambres.chambre_par_id(d.idChambre)
+                if chambre is None:
+                    ids_manquants.add(d.idChambre)
+                else:
+                    par_id[d.idChambre] = chambre
+        elif d.numeroChambre not in par_numero:
+            chambre = catalogue_chambres.chambre_par_numero(d.numeroChambre)
+            if chambre is None:
+                numeros_manquants.add(d.numeroChambre)
+            else:
+                par_numero[d.numeroChambre] = chambre
+
+    # Chambres absentes du catalogue (créées dans un autre worker, par ex.) : une requête
+    if ids_manquants or numeros_manquants:
+        for c in s.scalars(
+            select(Chambre)
+            .options(joinedload(Chambre.type_chambre))
+            .where(or_(Chambre.id_chambre.in_(ids_manquants), Chambre.numero_chambre.in_(numeros_manquants)))
+        ):
+            dto = ChambreDTO(c)
+            par_id[dto.idChambre] = dto
+            par_numero[dto.numero_chambre] = dto
+    return par_id, par_numero
+
+
+def _usagers(s: Session, valides: List[_Enregistrement]) -> Tuple[Dict[UUID, UsagerDTO], Dict[tuple, UsagerDTO]]:
+    ids = {e.dto.idUsager for e in valides if e.dto.idUsager is not None}
+    mobiles = {e.dto.mobile for e in valides if e.dto.idUsager is None}
+    par_id: Dict[UUID, UsagerDTO] = {}
+    par_cle: Dict[tuple, UsagerDTO] = {}
+    if ids or mobiles:
+        for u in s.scalars(
+            select(Usager).where(or_(Usager.id_usager.in_(ids), Usager.mobile.in_(mobiles)))
+        ):
+            dto = UsagerDTO(u)
+            par_id[dto.idUsager] = dto
+            par_cle[(dto.nom, dto.prenom, dto.mobile.rstrip())] = dto
+    return par_id, par_cle
+
+
+def _inserer_reservations(s: Session, valides: List[_Enregistrement]) -> Tuple[int, Optional[Callable]]:
+    chambres_par_id, chambres_par_numero = _chambres(s, valides)
+    usagers_par_id, usagers_par_cle = _usagers(s, valides)
+
+    lignes: List[dict] = []
+    evenements: List[tuple] = []
+    for e in valides:
+        d: ReservationImportDTO = e.dto
+        if d.idUsager is not None:
+            usager = usagers_par_id.get(d.idUsager)
+        else:
+            usager = usagers_par_cle.get((d.nom, d.prenom, d.mobile.rstrip()))
+        if d.idChambre is not None:
+            chambre = chambres_par_id.get(d.idChambre)
+        else:
+            chambre = chambres_par_numero.get(d.numeroChambre)
+        if usager is None:
+            e.erreurs.append("Usager introuvable.")
+        if chambre is None:
+            e.erreurs.append("Chambre introuvable.")
+        if e.erreurs:
+            continue
+
+        valeurs = dict(
+            id_reservation=uuid4(),
+            date_debut_reservation=d.dateDebut,
+            date_fin_reservation=d.dateFin,
+            prix_jour=Decimal(str(d.prixParJour)),
+            info_reservation=d.infoReservation,
+            fk_id_usager=usager.idUsager,
+            fk_id_chambre=chambre.idChambre,
+        )
+        lignes.append(valeurs)
+        evenements.append((valeurs["id_reservation"], chambre.idChambre, d.dateDebut, d.dateFin))
+
+    if not lignes:
+        return 0, None
+    s.execute(insert(Reservation), lignes)
+    ids = [ligne["id_reservation"] for ligne in lignes]
+    vue.inserer_reservations(s, ids)
+    journaliser(s, "reservation", CREATION, ids)
+    apres_commit(s, cache_metier.invalider, "reservation", ids, tolerant=False)
+    return len(lignes), lambda: publierReservations(CREATION, evenements)
+
+
+_ENTITES: Dict[str, Tuple[Type[BaseModel], Callable]] = {
+    "usagers": (UsagerCreateDTO, _inserer_usagers),
+    "reservations": (ReservationImportDTO, _inserer_reservations),
+}
+
+# --------------------------------------------------------------
+# ---------- FICHIER DE REJETS ----------
+# Écrit (et vidé sur disque) avant le commit du lot : à la reprise,
+# les rejets d’un lot jamais validé sont retirés puis réécrits.
+# --------------------------------------------------------------
+class _FichierRejets:
+    def __init__(self, chemin: str, traites: int) -> None:
+        self.chemin = chemin
+        self._fichier = None
+        if os.path.exists(chemin):
+            with open(chemin, encoding="utf-8") as f:
+                gardes = [ligne for ligne in f if json.loads(ligne)["enregistrement"] <= traites]
+            with open(chemin, "w", encoding="utf-8") as f:
+                f.writelines(gardes)
+
+    def ecrire(self, rejets: List[_Enregistrement]) -> None:
+        if not rejets:
+            return
+        if self._fichier is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.chemin)), exist_ok=True)
+            self._fichier = open(self.chemin, "a", encoding="utf-8")
+        for e in rejets:
+            self._fichier.write(json.dumps(
+                {"enregistrement": e.numero, "ligne": e.ligne, "erreurs": e.erreurs, "donnees": e.donnees},
+                ensure_ascii=False,
+                default=str,
+            ) + "\n")
+        self._fichier.flush()
+
+    def fermer(self) -> None:
+        if self._fichier is not None:
+            self._fichier.close()
+
+# --------------------------------------------------------------
+# ---------- SUIVI (POINT DE REPRISE) ----------
+# --------------------------------------------------------------
+
+def _demarrer(entite: str, format_: str, id_import: UUID, chemin_rejets: Optional[str]) -> Importation:
+    """Crée l’import, ou le reprend s’il est interrompu (ou abandonné)."""
+    maintenant = datetime.now()
+    with SessionLocal() as s:
+        s: Session
+        i = s.get(Importation, id_import)
+        if i is None:
+            s.add(Importation(
+                id_import=id_import,
+                entite=entite,
+                format=format_,
+                etat=EN_COURS,
+                traites=0,
+                inseres=0,
+                existants=0,
+                rejetes=0,
+                fichier_rejets=chemin_rejets or os.path.join(DOSSIER_REJETS, f"{id_import}.rejets.ndjson"),
+                debut=maintenant,
+                maj=maintenant,
+            ))
+            try:
+                s.commit()
+            except IntegrityError:
+                # Même identifiant créé au même moment par un autre appel
+                raise ImportEnCours(f"L’import {id_import} est déjà en cours.")
+        else:
+            if (i.entite, i.format) != (entite, format_):
+                raise ImportInvalide(f"L’import {id_import} est un import de {i.entite} ({i.format}).")
+            if i.etat != TERMINE:
+                # Un seul processus à la fois fait avancer un import
+                pris = s.execute(
+                    update(Importation)
+                    .where(
+                        Importation.id_import == id_import,
+                        or_(Importation.etat == INTERROMPU, Importation.maj < maintenant - DELAI_ABANDON),
+                    )
+                    .values(etat=EN_COURS, maj=maintenant, fichier_rejets=chemin_rejets or i.fichier_rejets)
+                    .execution_options(synchronize_session=False)
+                ).rowcount
+                if not pris:
+                    raise ImportEnCours(f"L’import {id_import} est déjà en cours.")
+                s.commit()
+        i = s.get(Importation, id_import, populate_existing=True)
+        s.expunge(i)
+        return i
+
+
+def _marquer(id_import: UUID, etat: str, **valeurs) -> None:
+    with SessionLocal() as s:
+        s.execute(
+            update(Importation)
+            .where(Importation.id_import == id_import)
+            .values(etat=etat, maj=datetime.now(), **valeurs)
+            .execution_options(synchronize_session=False)
+        )
+        s.commit()
+
+# --------------------------------------------------------------
+# ---------- IMPORT ----------
+# --------------------------------------------------------------
+
+def _importer(
+    entite: str,
+    morceaux: Iterable[bytes],
+    format_: str,
+    id_import: Optional[UUID],
+    chemin_rejets: Optional[str],
+    taille_lot: int,
+) -> ResultatImportDTO:
+    if format_ not in (CSV, NDJSON):
+        raise ImportInvalide(f"Format non pris en charge : {format_} (csv ou ndjson).")
+    if taille_lot < 1:
+        raise ImportInvalide("La taille des lots doit être positive.")
+    modele, inserer = _ENTITES[entite]
+    importation = _demarrer(entite, format_, id_import or uuid4(), chemin_rejets)
+    if importation.etat == TERMINE:
+        return ResultatImportDTO(importation)  # déjà fait : rien n’est réinséré
+
+    id_import = importation.id_import
+    compteurs = dict(
+        traites=importation.traites,
+        inseres=importation.inseres,
+        existants=importation.existants,
+        rejetes=importation.rejetes,
+    )
+    reprise = importation.traites
+    rejets: Optional[_FichierRejets] = None
+
+    def valider_lot(lot: List[_Enregistrement]) -> None:
+        _valider(lot, modele)
+        valides = [e for e in lot if e.dto is not None]
+        with SessionLocal() as s:
+            s: Session
+            inseres, apres = inserer(s, valides) if valides else (0, None)
+            refuses = [e for e in lot if e.erreurs]
+            compteurs["traites"] = lot[-1].numero
+            compteurs["inseres"] += inseres
+            compteurs["existants"] += len(lot) - inseres - len(refuses)
+            compteurs["rejetes"] += len(refuses)
+            rejets.ecrire(refuses)
+            s.execute(
+                update(Importation)
+                .where(Importation.id_import == id_import)
+                .values(maj=datetime.now(), **compteurs)
+                .execution_options(synchronize_session=False)
+            )
+            s.commit()
+        if apres is not None:
+            apres()
+        log.info("Import %s (%s) : %s enregistrements traités", id_import, entite, compteurs["traites"])
+
+    try:
+        rejets = _FichierRejets(importation.fichier_rejets, reprise)
+        lot: List[_Enregistrement] = []
+        for e in _enregistrements(morceaux, format_, modele):
+            if e.numero <= reprise:
+                continue  # lot déjà validé avant l’interruption
+            lot.append(e)
+            if len(lot) >= taille_lot:
+                valider_lot(lot)
+                lot = []
+        if lot:
+            valider_lot(lot)
+    except BaseException as erreur:
+        try:
+            _marquer(id_import, INTERROMPU)
+        except Exception:
+            log.exception("Import %s : état interrompu non enregistré", id_import)
+        if isinstance(erreur, (ImportInvalide, KeyboardInterrupt)):
+            raise
+        # Concurrence (usager créé ou chambre supprimée entre la lecture et
+        # l’INSERT), BD indisponible, flux coupé : la reprise refait le lot
+        raise ImportInterrompu(id_import, compteurs["traites"], erreur) from erreur
+    finally:
+        if rejets is not None:
+            rejets.fermer()
+
+    _marquer(id_import, TERMINE)
+    return getImportation(id_import)
+
+
+def importerUsagers(
+    morceaux: Iterable[bytes],
+    format_: str = CSV,
+    id_import: Optional[UUID] = None,
+    chemin_rejets: Optional[str] = None,
+    taille_lot: int = TAILLE_LOT_IMPORT,
+) -> ResultatImportDTO:
+    """
+    Importe des usagers (colonnes de UsagerCreateDTO) depuis un flux d’octets
+    CSV ou NDJSON. Avec l’id d’un import interrompu, le reprend.
+    """
+    return _importer("usagers", morceaux, format_, id_import, chemin_rejets, taille_lot)
+
+
+def importerReservations(
+    morceaux: Iterable[bytes],
+    format_: str = CSV,
+    id_import: Optional[UUID] = None,
+    chemin_rejets: Optional[str] = None,
+    taille_lot: int = TAILLE_LOT_IMPORT,
+) -> ResultatImportDTO:
+    """
+    Importe des réservations (colonnes de ReservationImportDTO : usager par id
+    ou par nom, prénom et mobile ; chambre par id ou par numéro).
+    """
+    return _importer("reservations", morceaux, format_, id_import, chemin_rejets, taille_lot)
+
+
+IMPORTS: Dict[str, Callable[..., ResultatImportDTO]] = {
+    "usagers": importerUsagers,
+    "reservations": importerReservations,
+}
+
+# --------------------------------------------------------------
+# ---------- LECTURE DU SUIVI ----------
+# --------------------------------------------------------------
+
+def getImportation(id_import: UUID) -> Optional[ResultatImportDTO]:
+    with SessionLocal() as s:
+        i = s.get(Importation, id_import)
+        return ResultatImportDTO(i) if i else None
+
+
+def cheminRejets(id_import: UUID) -> Optional[str]:
+    """Fichier des rejets de l’import (None s’il n’y a eu aucun rejet)."""
+    with SessionLocal() as s:
+        chemin = s.scalar(select(Importation.fichier_rejets).where(Importation.id_import == id_import))
+    return chemin if chemin and os.path.exists(chemin) else None
+
+
+def _morceaux(fichier, taille: int = 1 << 16) -> Iterator[bytes]:
+    return iter(lambda: fichier.read(taille), b"")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(
+        prog="python -m metier.importation", description="Import en masse d’usagers ou de réservations."
+    )
+    parser.add_argument("entite", choices=sorted(IMPORTS))
+    parser.add_argument("fichier", help="fichier .csv ou .ndjson")
+    parser.add_argument("--format", choices=(CSV, NDJSON), help="par défaut : d’après l’extension")
+    parser.add_argument("--reprise", type=UUID, help="identifiant d’un import interrompu")
+    parser.add_argument("--rejets", help="fichier des rejets (défaut : <fichier>.rejets.ndjson)")
+    parser.add_argument("--lot", type=int, default=TAILLE_LOT_IMPORT, help="enregistrements par transaction")
+    args = parser.parse_args()
+
+    id_import = args.reprise or uuid4()
+    print(f"Import {id_import} (en cas d’échec : --reprise {id_import})")
+    with open(args.fichier, "rb") as f:
+        try:
+            r = IMPORTS[args.entite](
+                _morceaux(f),
+                args.format or format_du_fichier(args.fichier),
+                id_import,
+                args.rejets or f"{args.fichier}.rejets.ndjson",
+                args.lot,
+            )
+        except (ImportInvalide, ImportEnCours, ImportInterrompu) as e:
+            sys.exit(str(e))
+    print(f"{r.traites} enregistrements : {r.inseres} insérés, {r.existants} existants, {r.rejetes} rejetés.")
@@ -7,56 +7,181 @@
 
 from __future__ import annotations
 
-from typing import List, Any, Dict
+from typing import List, Any, Dict, Optional, Tuple
 from datetime import datetime
 from decimal import Decimal
+from uuid import UUID
 
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import select, insert, update, delete, func, union_all
+from sqlalchemy.orm import Session, aliased, load_only
+from sqlalchemy.exc import IntegrityError
 
+from core.cache import cache_metier
 from core.db import SessionLocal
+from core.echeance import verifier_echeance
+from core.taches import apres_commit
 from DTO.reservationDTO import (
+    CriteresAnnulationDTO,
     CriteresRechercheDTO,
     ReservationDTO,
     ReservationUpdateDTO,
 )
+from DTO.projection import Projection
+from metier.archivage import borne_archive, lire_archive
+from metier.changementMetier import CREATION, MODIFICATION, SUPPRESSION, journaliser
+from metier.fluxChambres import publierReservations
+from metier.chargeurs import chambre_par_id, chargeur_reservations, usager_par_id
+from metier import reservationVue as vue
+from metier.reservationVue import colonnes_projetees, dto_depuis_vue, dto_projete_depuis_vue
 from modele.reservation import Reservation
-from modele.chambre import Chambre
+from modele.reservation_archive import ReservationArchive
+from modele.reservation_vue import ReservationVue
 from modele.usager import Usager
 
+# --------------------------------------------------------------
+# ---------- OUTILS INTERNES ----------
+# Références du ReservationDTO : servies par la mémoire (cache usager,
+# catalogue des chambres) ou par les chargeurs par lot (metier/chargeurs.py)
+# --------------------------------------------------------------
+def _erreur_reference(s: Session, id_usager, id_chambre) -> ValueError:
+    # Chemin d’erreur seulement : on identifie la référence manquante
+    if id_usager is not None and s.get(Usager, id_usager) is None:
+        return ValueError("Usager introuvable.")
+    return ValueError("Chambre introuvable.")
+
 # --------------------------------------------------------------
 # ---------- RECHERCHE / LECTURE ----------
 # Permet de filtrer les réservations selon différents critères :
-# id, chambre, usager, nom, prénom, etc.
+# id, chambre, usager, nom, prénom, dates, numéro, type, prix.
+# Tous les filtres sont compilés en une seule requête SQL sur la vue
+# dénormalisée reservation_vue (sans jointure), servie par ses index.
+# Les réservations archivées (metier/archivage.py) sont ajoutées par
+# un UNION ALL, seulement si les critères de dates peuvent les viser.
 # --------------------------------------------------------------
-def rechercherReservation(criteres: CriteresRechercheDTO) -> List["ReservationDTO"]:
+def _conditions_recherche(criteres: CriteresRechercheDTO, v) -> list:
+    """Filtres des critères sur la vue ou l’archive (mêmes colonnes)."""
+    conditions = []
+
+    # Application des filtres si les critères sont fournis
+    if criteres.idReservation:
+        conditions.append(v.id_reservation == criteres.idReservation)
+    if criteres.idChambre:
+        conditions.append(v.id_chambre == criteres.idChambre)
+    if criteres.idUsager:
+        conditions.append(v.id_usager == criteres.idUsager)
+    if criteres.nom and criteres.prenom:
+        conditions.append((v.nom == criteres.nom) & (v.prenom == criteres.prenom))
+
+    # Dates : bornes incluses pour les plages, séjour en cours pour presentLe
+    if criteres.arrivantEntre:
+        conditions.append(
+            v.date_debut_reservation.between(criteres.arrivantEntre.debut, criteres.arrivantEntre.fin)
+        )
+    if criteres.partantEntre:
+        conditions.append(
+            v.date_fin_reservation.between(criteres.partantEntre.debut, criteres.partantEntre.fin)
+        )
+    if criteres.presentLe:
+        conditions.append(v.date_debut_reservation <= criteres.presentLe)
+        conditions.append(v.date_fin_reservation > criteres.presentLe)
+
+    # Chambre, type et prix par jour
+    if criteres.numeroChambre is not None:
+        conditions.append(v.numero_chambre == criteres.numeroChambre)
+    if criteres.nomType:
+        conditions.append(v.nom_type == criteres.nomType)
+    if criteres.prixMin is not None:
+        conditions.append(v.prix_jour >= Decimal(str(criteres.prixMin)))
+    if criteres.prixMax is not None:
+        conditions.append(v.prix_jour <= Decimal(str(criteres.prixMax)))
+    return conditions
+
+
+def _requete_recherche(criteres: CriteresRechercheDTO, archive: bool = False):
+    """
+    Construit le SELECT filtré sur la vue dénormalisée (aucune jointure).
+    Avec archive=True, la vue et l’archive sont lues ensemble (UNION ALL).
+    Retourne (requête, entité à utiliser pour le tri et les colonnes).
+    """
+    stmt = select(ReservationVue).where(*_conditions_recherche(criteres, ReservationVue))
+    if not archive:
+        return stmt, ReservationVue
+
+    a = ReservationArchive
+    reservations = union_all(stmt, select(a).where(*_conditions_recherche(criteres, a))).subquery()
+    v = aliased(ReservationVue, reservations)
+    return select(v), v
+
+
+def rechercherReservationPage(
+    criteres: CriteresRechercheDTO, projection: Optional[Projection] = None
+) -> Tuple[List[ReservationDTO], Optional[int]]:
     """
     Recherche de réservations selon des critères optionnels.
-    Retourne une liste de ReservationDTO.
+    Retourne (liste de ReservationDTO, total) ; total vaut None sauf si
+    criteres.total est demandé : il est alors calculé dans la même requête
+    (COUNT(*) OVER ()), sans second aller-retour vers la BD.
+    Avec une projection partielle, seules ses colonnes sont lues et les
+    DTO ne portent que ses champs (à sérialiser avec projection.inclusion).
     """
+    # Lecture par id seul : regroupée avec les lectures simultanées
+    # (une réservation absente peut encore être dans l’archive)
+    if criteres.model_dump(exclude_defaults=True).keys() == {"idReservation"}:
+        r = chargeur_reservations.charger(criteres.idReservation)
+        if r or borne_archive() is None:
+            return ([r] if r else []), None
+
     with SessionLocal() as s:
         s: Session
 
-        # Requête de base : jointure avec la chambre
-        stmt = select(Reservation).join(Reservation.chambre)
-
-        # Application des filtres si les critères sont fournis
-        if criteres.idReservation:
-            stmt = stmt.where(Reservation.id_reservation == criteres.idReservation)
-        if criteres.idChambre:
-            stmt = stmt.where(Reservation.fk_id_chambre == criteres.idChambre)
-        if criteres.idUsager:
-            stmt = stmt.where(Reservation.fk_id_usager == criteres.idUsager)
-        if criteres.nom and criteres.prenom:
-            stmt = stmt.join(Usager).where(
-                (Usager.nom == criteres.nom) & (Usager.prenom == criteres.prenom)
+        # L’archive n’est lue que si les critères de dates peuvent y trouver des réservations
+        archive = lire_archive(criteres, s)
+        stmt, v = _requete_recherche(criteres, archive)
+        partielle = projection is not None and not projection.complete
+        if partielle:
+            # Colonnes non demandées différées ; raiseload : jamais de lecture ligne à ligne
+            stmt = stmt.options(
+                load_only(*(getattr(v, c) for c in colonnes_projetees(projection)), raiseload=True)
             )
+        if criteres.total:
+            stmt = stmt.add_columns(func.count().over().label("total"))
+
+        # Ordre stable (nécessaire à la pagination)
+        stmt = stmt.order_by(v.date_debut_reservation, v.id_reservation)
+        if criteres.decalage:
+            stmt = stmt.offset(criteres.decalage)
+        if criteres.limite:
+            stmt = stmt.limit(criteres.limite)
 
         # Exécution et transformation en DTOs
-        results: list[ReservationDTO] = []
-        for r in s.execute(stmt).scalars():
-            results.append(ReservationDTO.from_entity(r))
-        return results
+        lignes = s.execute(stmt).all()
+        # Client déjà parti : inutile de construire des milliers de DTO
+        verifier_echeance()
+        if partielle:
+            results: list[ReservationDTO] = [dto_projete_depuis_vue(ligne[0], projection) for ligne in lignes]
+        else:
+            results = [dto_depuis_vue(ligne[0]) for ligne in lignes]
+
+        total: Optional[int] = None
+        if criteres.total:
+            if lignes:
+                total = lignes[0].total
+            elif criteres.decalage:
+                # Page au-delà de la fin : seul cas où un COUNT séparé est nécessaire
+                sous_requete, v = _requete_recherche(criteres, archive)
+                sous_requete = sous_requete.with_only_columns(v.id_reservation)
+                total = s.scalar(select(func.count()).select_from(sous_requete.subquery()))
+            else:
+                total = 0
+        return results, total
+
+
+def rechercherReservation(criteres: CriteresRechercheDTO) -> List["ReservationDTO"]:
+    """
+    Recherche de réservations selon des critères optionnels.
+    Retourne une liste de ReservationDTO.
+    """
+    return rechercherReservationPage(criteres)[0]
 
 # --------------------------------------------------------------
 # ---------- CRÉATION ----------
@@ -76,34 +201,46 @@ def creerReservation(dto: ReservationDTO) -> ReservationDTO:
     if not dto.chambre or not getattr(dto.chambre, "idChambre", None):
         raise ValueError("ChambreDTO avec idChambre requis.")
 
+    # Récupère l’usager et la chambre (mémoire, sinon lecture groupée par lot)
+    usager = usager_par_id(dto.usager.idUsager)
+    if usager is None:
+        raise ValueError("Usager introuvable.")
+    chambre = chambre_par_id(dto.chambre.idChambre)
+    if chambre is None:
+        raise ValueError("Chambre introuvable.")
+
     with SessionLocal() as s:
         s: Session
 
-        # Récupère l’usager et la chambre à partir de leur ID
-        u = s.get(Usager, str(dto.usager.idUsager))
-        ch = s.get(Chambre, str(dto.chambre.idChambre))
-        if not u:
-            raise ValueError("Usager introuvable.")
-        if not ch:
-            raise ValueError("Chambre introuvable.")
-
-        # Création de la nouvelle réservation
-        r = Reservation(
-            date_debut_reservation=dto.dateDebut,
-            date_fin_reservation=dto.dateFin,
-            prix_jour=Decimal(str(dto.prixParJour)),
-            info_reservation=dto.infoReservation,
-            fk_id_usager=u.id_usager,
-            fk_id_chambre=ch.id_chambre,
-        )
+        # Création de la nouvelle réservation : INSERT ... RETURNING
+        # (OUTPUT sur MSSQL), sans commit + refresh + chargements paresseux
+        try:
+            r = s.scalars(
+                insert(Reservation)
+                .values(
+                    date_debut_reservation=dto.dateDebut,
+                    date_fin_reservation=dto.dateFin,
+                    prix_jour=Decimal(str(dto.prixParJour)),
+                    info_reservation=dto.infoReservation,
+                    fk_id_usager=usager.idUsager,
+                    fk_id_chambre=chambre.idChambre,
+                )
+                .returning(Reservation)
+            ).one()
+        except IntegrityError:
+            # Référence supprimée entre la lecture en mémoire et l’INSERT
+            s.rollback()
+            raise _erreur_reference(s, usager.idUsager, chambre.idChambre)
 
-        # Enregistrement en base
-        s.add(r)
+        # Le DTO est construit avant le commit (qui expire les objets)
+        resultat = ReservationDTO.from_entity(r, chambre=chambre, usager=usager)
+        vue.inserer_reservation(s, r.id_reservation)
+        journaliser(s, "reservation", CREATION, [resultat.idReservation])
+        # Diffusion de l’invalidation après le commit, hors du chemin de la requête
+        apres_commit(s, cache_metier.invalider, "reservation", [resultat.idReservation], tolerant=False)
         s.commit()
-        s.refresh(r)
-
-        # Retourne le DTO résultant
-        return ReservationDTO.from_entity(r)
+        publierReservations(CREATION, [(resultat.idReservation, chambre.idChambre, resultat.dateDebut, resultat.dateFin)])
+        return resultat
 
 
 # --------------------------------------------------------------
@@ -115,57 +252,166 @@ def modifierReservation(id_reservation: str, data: ReservationUpdateDTO) -> Rese
     with SessionLocal() as s:
         s: Session
 
-        r = s.get(Reservation, id_reservation)
-        if not r:
-            raise ValueError("Réservation introuvable.")
+        valeurs: Dict[str, Any] = {}
+        stmt = update(Reservation).where(Reservation.id_reservation == id_reservation)
 
-        # Mise à jour de l’usager s’il est changé
+        # Mise à jour de l’usager et/ou de la chambre s’ils sont changés
+        # (la clé étrangère garantit leur existence)
         if data.idUsager:
-            u = s.get(Usager, data.idUsager)
-            if not u:
-                raise ValueError("Usager introuvable.")
-            r.fk_id_usager = u.id_usager
-
-        # Mise à jour de la chambre s’il y a changement
+            valeurs["fk_id_usager"] = data.idUsager
         if data.idChambre:
-            ch = s.get(Chambre, data.idChambre)
-            if not ch:
-                raise ValueError("Chambre introuvable.")
-            r.fk_id_chambre = ch.id_chambre
+            valeurs["fk_id_chambre"] = data.idChambre
 
-        # Validation et mise à jour des dates
+        # Mise à jour des dates : la validation contre la date déjà en base
+        # se fait dans le WHERE, donc dans le même UPDATE
         if data.dateDebut:
-            if r.date_fin_reservation and data.dateDebut >= r.date_fin_reservation:
-                raise ValueError("La date de début doit être avant la date de fin.")
-            r.date_debut_reservation = data.dateDebut
-
+            valeurs["date_debut_reservation"] = data.dateDebut
+            if not data.dateFin:
+                stmt = stmt.where(Reservation.date_fin_reservation > data.dateDebut)
         if data.dateFin:
-            if r.date_debut_reservation and data.dateFin <= r.date_debut_reservation:
-                raise ValueError("La date de fin doit être après la date de début.")
-            r.date_fin_reservation = data.dateFin
+            valeurs["date_fin_reservation"] = data.dateFin
+            if not data.dateDebut:
+                stmt = stmt.where(Reservation.date_debut_reservation < data.dateFin)
 
         # Mise à jour du prix et des infos
         if data.prixParJour is not None:
-            r.prix_jour = Decimal(str(data.prixParJour))
-
+            valeurs["prix_jour"] = Decimal(str(data.prixParJour))
         if data.infoReservation is not None:
-            r.info_reservation = data.infoReservation
+            valeurs["info_reservation"] = data.infoReservation
 
-        s.commit()
-        s.refresh(r)
+        if not valeurs:
+            r = s.get(Reservation, id_reservation)
+        else:
+            try:
+                # Un seul UPDATE ... RETURNING au lieu de get + commit + refresh
+                r = s.scalars(stmt.values(**valeurs).returning(Reservation)).one_or_none()
+            except IntegrityError:
+                s.rollback()
+                raise _erreur_reference(s, data.idUsager, data.idChambre)
+
+        if not r:
+            # Aucune ligne touchée : réservation absente ou dates incohérentes
+            if s.get(Reservation, id_reservation) is None:
+                raise ValueError("Réservation introuvable.")
+            if data.dateDebut:
+                raise ValueError("La date de début doit être avant la date de fin.")
+            raise ValueError("La date de fin doit être après la date de début.")
 
-        return ReservationDTO.from_entity(r)
+        # Usager et chambre de la réponse : mémoire, sinon lecture groupée par lot
+        usager = usager_par_id(r.fk_id_usager)
+        chambre = chambre_par_id(r.fk_id_chambre)
+        if usager is None or chambre is None:
+            raise _erreur_reference(s, r.fk_id_usager if usager is None else None, r.fk_id_chambre)
+
+        resultat = ReservationDTO.from_entity(r, chambre=chambre, usager=usager)
+        if valeurs:
+            vue.maj_reservation(s, r.id_reservation)
+            journaliser(s, "reservation", MODIFICATION, [resultat.idReservation])
+        apres_commit(s, cache_metier.invalider, "reservation", [resultat.idReservation], tolerant=False)
+        s.commit()
+        if valeurs:
+            publierReservations(
+                MODIFICATION, [(resultat.idReservation, chambre.idChambre, resultat.dateDebut, resultat.dateFin)]
+            )
+        return resultat
 
 # --------------------------------------------------------------
 # ---------- SUPPRESSION ----------
 # Supprime une réservation de la base (aucune contrainte particulière ici)
+# Un DELETE direct par id : la ligne retournée (chambre et dates, pour
+# le flux des chambres) décide du 404.
 # --------------------------------------------------------------
+_COLONNES_FLUX = (
+    Reservation.id_reservation,
+    Reservation.fk_id_chambre,
+    Reservation.date_debut_reservation,
+    Reservation.date_fin_reservation,
+)
+
+
 def supprimerReservation(id_reservation: str) -> bool:
     with SessionLocal() as s:
         s: Session
-        r = s.get(Reservation, id_reservation)
-        if not r:
+        ligne = s.execute(
+            delete(Reservation)
+            .where(Reservation.id_reservation == id_reservation)
+            .returning(*_COLONNES_FLUX)
+            .execution_options(synchronize_session=False)
+        ).one_or_none()
+        if ligne is None:
             return False
-        s.delete(r)
+        vue.retirer_reservations(s, [id_reservation])
+        journaliser(s, "reservation", SUPPRESSION, [id_reservation])
+        apres_commit(s, cache_metier.invalider, "reservation", [id_reservation], tolerant=False)
         s.commit()
+        publierReservations(SUPPRESSION, [tuple(ligne)])
         return True
+
+
+# --------------------------------------------------------------
+# ---------- ANNULATION EN MASSE ----------
+# Annule (supprime) toutes les réservations de critères donnés, par
+# DELETE ... WHERE id IN (lot) RETURNING (OUTPUT sur MSSQL) dans une
+# seule transaction : aucune réservation n’est chargée en mémoire.
+# Lots de 1 000 : sous le seuil d’escalade des verrous de SQL Server
+# et sous la limite de 2 100 paramètres par requête.
+# --------------------------------------------------------------
+TAILLE_LOT_ANNULATION = 1000
+
+
+def _conditions_annulation(criteres: CriteresAnnulationDTO) -> list:
+    # Le filtre sur les ids est appliqué par le découpage en lots
+    conditions = []
+    if criteres.idUsager:
+        conditions.append(Reservation.fk_id_usager == criteres.idUsager)
+    if criteres.idChambre:
+        conditions.append(Reservation.fk_id_chambre == criteres.idChambre)
+    if criteres.arrivantEntre:
+        conditions.append(
+            Reservation.date_debut_reservation.between(
+                criteres.arrivantEntre.debut, criteres.arrivantEntre.fin
+            )
+        )
+    if criteres.aVenir:
+        conditions.append(Reservation.date_debut_reservation > datetime.now())
+    return conditions
+
+
+def annulerReservationsEnMasse(criteres: CriteresAnnulationDTO) -> List[UUID]:
+    """Supprime les réservations correspondant aux critères. Retourne les ids annulés."""
+    # aVenir seul annulerait tous les séjours futurs de l’hôtel : un critère restrictif est exigé
+    if not (criteres.idReservations or criteres.idUsager or criteres.idChambre or criteres.arrivantEntre):
+        raise ValueError("Critère requis en plus de aVenir : idReservations, idUsager, idChambre ou arrivantEntre.")
+
+    with SessionLocal() as s:
+        s: Session
+
+        # Candidats : la liste d’ids fournie, sinon une lecture des ids des critères
+        conditions = _conditions_annulation(criteres)
+        if criteres.idReservations:
+            candidats = list(dict.fromkeys(criteres.idReservations))
+        else:
+            candidats = s.scalars(select(Reservation.id_reservation).where(*conditions)).all()
+
+        annulees: List[UUID] = []
+        lignes: List[tuple] = []
+        for debut in range(0, len(candidats), TAILLE_LOT_ANNULATION):
+            # Hors délai : rollback de toute l’annulation plutôt que des lots de plus
+            verifier_echeance()
+            lot = candidats[debut:debut + TAILLE_LOT_ANNULATION]
+            lignes_lot = s.execute(
+                delete(Reservation)
+                .where(Reservation.id_reservation.in_(lot), *conditions)
+                .returning(*_COLONNES_FLUX)
+                .execution_options(synchronize_session=False)
+            ).all()
+            ids = [ligne[0] for ligne in lignes_lot]
+            if ids:
+                vue.retirer_reservations(s, ids)
+                apres_commit(s, cache_metier.invalider, "reservation", ids, tolerant=False)
+            annulees.extend(ids)
+            lignes.extend(tuple(ligne) for ligne in lignes_lot)
+        journaliser(s, "reservation", SUPPRESSION, annulees)
+        s.commit()
+    publierReservations(SUPPRESSION, lignes)
+    return annulees
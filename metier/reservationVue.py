@@ -0,0 +1,260 @@
+# ==============================================================
+# metier/reservationVue.py
+# Tenue à jour du modèle de lecture "reservation_vue"
+# (modele/reservation_vue.py) : une ligne dénormalisée par
+# réservation, lue sans jointure par la recherche.
+# Chaque fonction reçoit la session de l’écriture en cours : la vue
+# est modifiée dans la même transaction que les tables sources. Les
+# lignes d’une réservation sont recopiées par INSERT ... SELECT
+# (jointure sur la chambre, son type et l’usager), jamais depuis les
+# caches partagés entre requêtes, qui peuvent être en retard.
+#
+# Reconstruction complète (après un chargement hors API, par ex.) :
+#     python -m metier.reservationVue
+# ==============================================================
+
+from __future__ import annotations
+
+from collections import namedtuple
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from DTO.chambreDTO import ChambreDTO, TypeChambreDTO
+from DTO.projection import Projection, colonnes, construire
+from DTO.reservationDTO import ReservationDTO
+from DTO.usagerDTO import UsagerDTO
+from modele.chambre import Chambre
+from modele.reservation import Reservation
+from modele.reservation_vue import ReservationVue
+from modele.type_chambre import TypeChambre
+from modele.usager import Usager
+
+# Chambre vue par le ChambreDTO : le type est la ligne de la vue elle-même
+_ChambreVue = namedtuple(
+    "_ChambreVue", "id_chambre numero_chambre disponible_reservation autre_informations type_chambre"
+)
+
+# --------------------------------------------------------------
+# ---------- LECTURE ----------
+# --------------------------------------------------------------
+
+def dto_depuis_vue(v: ReservationVue) -> ReservationDTO:
+    """Construit le ReservationDTO d’une ligne de la vue (aucune requête)."""
+    chambre = ChambreDTO(
+        _ChambreVue(v.id_chambre, v.numero_chambre, v.disponible_reservation, v.autre_informations, v)
+    )
+    return ReservationDTO.from_entity(v, chambre=chambre, usager=UsagerDTO(v))
+
+
+# Champs du ReservationDTO -> colonnes de la vue (objets imbriqués : même ligne)
+CORRESPONDANCE_VUE = {
+    "idReservation": "id_reservation",
+    "dateDebut": "date_debut_reservation",
+    "dateFin": "date_fin_reservation",
+    "prixParJour": "prix_jour",
+    "infoReservation": "info_reservation",
+    "chambre": (None, {
+        "idChambre": "id_chambre",
+        "numero_chambre": "numero_chambre",
+        "disponible_reservation": "disponible_reservation",
+        "autre_informations": "autre_informations",
+        "type_chambre": (None, {
+            "nom_type": "nom_type",
+            "prix_plafond": "prix_plafond",
+            "prix_plancher": "prix_plancher",
+            "description_chambre": "description_chambre",
+        }),
+    }),
+    "usager": (None, {
+        "idUsager": "id_usager",
+        "prenom": "prenom",
+        "nom": "nom",
+        "adresse": "adresse",
+        "mobile": "mobile",
+        "type_usager": "type_usager",
+    }),
+}
+
+
+def colonnes_projetees(projection: Projection) -> List[str]:
+    """Colonnes de la vue nécessaires à la projection (les autres sont différées)."""
+    return colonnes(projection.arbre, CORRESPONDANCE_VUE)
+
+
+def dto_projete_depuis_vue(v: ReservationVue, projection: Projection) -> ReservationDTO:
+    """ReservationDTO partiel : seuls les champs de la projection sont lus."""
+    return construire(ReservationDTO, projection.arbre, v, CORRESPONDANCE_VUE)
+
+# --------------------------------------------------------------
+# ---------- COLONNES RECOPIÉES ----------
+# --------------------------------------------------------------
+
+def _colonnes_usager(u: UsagerDTO) -> Dict[str, Any]:
+    return {
+        "id_usager": u.idUsager,
+        "prenom": u.prenom,
+        "nom": u.nom,
+        "adresse": u.adresse,
+        "mobile": u.mobile,
+        "type_usager": u.type_usager,
+    }
+
+
+def _colonnes_type(tc: TypeChambreDTO) -> Dict[str, Any]:
+    return {
+        "nom_type": tc.nom_type,
+        "prix_plancher": tc.prix_plancher,
+        "prix_plafond": tc.prix_plafond,
+        "description_chambre": tc.description_chambre,
+    }
+
+
+def _colonnes_chambre(ch: ChambreDTO) -> Dict[str, Any]:
+    return {
+        "id_chambre": ch.idChambre,
+        "numero_chambre": ch.numero_chambre,
+        "disponible_reservation": ch.disponible_reservation,
+        "autre_informations": ch.autre_informations,
+        **_colonnes_type(ch.type_chambre),
+    }
+
+
+# Réservations recopiées par INSERT ... SELECT (liste IN bornée)
+TAILLE_LOT_VUE = 1000
+
+# --------------------------------------------------------------
+# ---------- ÉCRITURES (dans la transaction de l’appelant) ----------
+# --------------------------------------------------------------
+
+def inserer_reservation(s: Session, id_reservation) -> None:
+    inserer_reservations(s, [id_reservation])
+
+
+def inserer_reservations(s: Session, ids: Iterable) -> None:
+    """
+    Recopie des réservations déjà insérées (ou modifiées) : un INSERT ... SELECT
+    par lot, qui lit chambre, type et usager dans la transaction de l’écriture.
+    """
+    ids = list(ids)
+    for debut in range(0, len(ids), TAILLE_LOT_VUE):
+        source = select_source().where(Reservation.id_reservation.in_(ids[debut:debut + TAILLE_LOT_VUE]))
+        s.execute(insert(ReservationVue).from_select([c.name for c in source.selected_columns], source))
+
+
+def maj_reservation(s: Session, id_reservation) -> None:
+    # Chambre ou usager peut avoir changé : toute la ligne, en un UPDATE ... FROM
+    source = select_source().where(Reservation.id_reservation == id_reservation).subquery()
+    s.execute(
+        update(ReservationVue)
+        .where(ReservationVue.id_reservation == source.c.id_reservation)
+        .values({c.name: c for c in source.c if c.name != "id_reservation"})
+        .execution_options(synchronize_session=False)
+    )
+
+
+def retirer_reservations(s: Session, ids: Iterable) -> None:
+    s.execute(
+        delete(ReservationVue)
+        .where(ReservationVue.id_reservation.in_(list(ids)))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def maj_usager(s: Session, u: UsagerDTO) -> None:
+    s.execute(
+        update(ReservationVue)
+        .where(ReservationVue.id_usager == u.idUsager)
+        .values(**_colonnes_usager(u))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def maj_chambre(s: Session, ch: ChambreDTO) -> None:
+    s.execute(
+        update(ReservationVue)
+        .where(ReservationVue.id_chambre == ch.idChambre)
+        .values(**_colonnes_chambre(ch))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def maj_chambres(s: Session, ids: List, valeurs: Dict[str, Any], tc: Optional[TypeChambreDTO]) -> None:
+    # Modification en masse : mêmes changements pour un lot de chambres
+    colonnes = {k: v for k, v in valeurs.items() if k in ("disponible_reservation", "autre_informations")}
+    if tc is not None:
+        colonnes.update(_colonnes_type(tc))
+    s.execute(
+        update(ReservationVue)
+        .where(ReservationVue.id_chambre.in_(ids))
+        .values(**colonnes)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def maj_type(s: Session, id_type_chambre, tc: TypeChambreDTO) -> None:
+    # La vue ne garde pas l’id du type : on passe par les chambres de ce type
+    s.execute(
+        update(ReservationVue)
+        .where(
+            ReservationVue.id_chambre.in_(
+                select(Chambre.id_chambre).where(Chambre.fk_type_chambre == id_type_chambre)
+            )
+        )
+        .values(**_colonnes_type(tc))
+        .execution_options(synchronize_session=False)
+    )
+
+# --------------------------------------------------------------
+# ---------- RECONSTRUCTION ----------
+# Vide la vue puis la recalcule en un INSERT ... SELECT (jointure
+# des quatre tables), dans une seule transaction.
+# --------------------------------------------------------------
+
+def select_source():
+    """SELECT des colonnes de la vue à partir des tables sources (aussi utilisé par l’archivage)."""
+    return (
+        select(
+            Reservation.id_reservation,
+            Reservation.date_debut_reservation,
+            Reservation.date_fin_reservation,
+            Reservation.prix_jour,
+            Reservation.info_reservation,
+            Usager.id_usager,
+            Usager.prenom,
+            Usager.nom,
+            Usager.adresse,
+            Usager.mobile,
+            Usager.type_usager,
+            Chambre.id_chambre,
+            Chambre.numero_chambre,
+            Chambre.disponible_reservation,
+            Chambre.autre_informations,
+            TypeChambre.nom_type,
+            TypeChambre.prix_plancher,
+            TypeChambre.prix_plafond,
+            TypeChambre.description_chambre,
+        )
+        .join(Usager, Usager.id_usager == Reservation.fk_id_usager)
+        .join(Chambre, Chambre.id_chambre == Reservation.fk_id_chambre)
+        .join(TypeChambre, TypeChambre.id_type_chambre == Chambre.fk_type_chambre)
+    )
+
+
+def reconstruire(conn: Connection) -> int:
+    """Recalcule toute la vue. Retourne le nombre de réservations recopiées."""
+    source = select_source()
+    conn.execute(delete(ReservationVue))
+    conn.execute(
+        insert(ReservationVue).from_select([c.name for c in source.selected_columns], source)
+    )
+    return conn.execute(select(func.count()).select_from(ReservationVue)).scalar_one()
+
+
+if __name__ == "__main__":
+    from core.db import engine
+
+    with engine.begin() as conn:
+        print(f"Vue des réservations reconstruite : {reconstruire(conn)} lignes.")
@@ -8,59 +8,72 @@
 from __future__ import annotations
 
 from sqlalchemy.orm import Session
-from sqlalchemy import select
-from uuid import UUID
+from sqlalchemy import select, update, delete, exists
+from sqlalchemy.exc import IntegrityError
+from uuid import UUID, uuid4
 
+from core.cache import cache_metier
 from core.db import SessionLocal
+from core.upsert import inserer_ou_recuperer
 from modele.usager import Usager
+from modele.reservation import Reservation
 from DTO.usagerDTO import UsagerDTO, UsagerCreateDTO, UsagerUpdateDTO
+from metier import reservationVue as vue
+from metier.changementMetier import CREATION, MODIFICATION, SUPPRESSION, journaliser
+from metier.chargeurs import usager_par_id
+
+def mot_de_passe_colonne(mot_de_passe: str) -> str:
+    # Le mot de passe est tronqué/padé à 60 caractères pour respecter CHAR(60)
+    return (mot_de_passe[:60]).ljust(60)[:60]
 
 # --------------------------------------------------------------
 # ---------- CRÉATION ----------
 # Permet d’ajouter un nouvel usager dans la base.
-# Évite la création de doublons selon nom + prénom + mobile.
+# Évite la création de doublons selon nom + prénom + mobile :
+# la contrainte UNIQUE et un upsert natif (ON CONFLICT / MERGE)
+# le garantissent en une seule requête, même en concurrence.
 # --------------------------------------------------------------
 def creerUsager(data: UsagerCreateDTO) -> UsagerDTO:
     """
-    Crée un usager. Évite les doublons simples (nom, prénom, mobile).
+    Crée un usager. Évite les doublons simples (nom, prénom, mobile) :
+    si l’usager existe déjà, il est retourné tel quel.
     """
     with SessionLocal() as s:  # ouverture d’une session SQLAlchemy
-        existing = s.execute(
-            select(Usager).where(
-                (Usager.nom == data.nom)
-                & (Usager.prenom == data.prenom)
-                & (Usager.mobile == data.mobile)
-            )
-        ).scalar_one_or_none()
-
-        # Si un usager avec le même nom/prénom/mobile existe déjà, on le retourne
-        if existing:
-            return UsagerDTO(existing)
-
-        # Sinon on crée un nouvel usager à partir du DTO
-        u = Usager(
-            prenom=data.prenom,
-            nom=data.nom,
-            adresse=data.adresse,
-            mobile=data.mobile,
-            # Le mot de passe est tronqué/padé à 60 caractères pour respecter CHAR(60)
-            mot_de_passe=(data.mot_de_passe[:60]).ljust(60)[:60],
-            type_usager=data.type_usager,
+        # Id choisi ici : il dit si l’upsert a créé l’usager ou retourné l’existant
+        id_nouveau = uuid4()
+        u = inserer_ou_recuperer(
+            s,
+            Usager,
+            dict(
+                id_usager=id_nouveau,
+                prenom=data.prenom,
+                nom=data.nom,
+                adresse=data.adresse,
+                mobile=data.mobile,
+                mot_de_passe=mot_de_passe_colonne(data.mot_de_passe),
+                type_usager=data.type_usager,
+            ),
+            cles=("nom", "prenom", "mobile"),
         )
-        s.add(u)
+        dto = UsagerDTO(u)  # construit avant le commit (qui expire l’objet)
+        if dto.idUsager == id_nouveau:
+            journaliser(s, "usager", CREATION, [dto.idUsager])
         s.commit()
-        s.refresh(u)
-        return UsagerDTO(u)
+        cache_metier.invalider("usager", [dto.idUsager])
+        return dto
 
 # --------------------------------------------------------------
 # ---------- LECTURE ----------
 # Retourne un usager selon son identifiant unique (UUID)
 # --------------------------------------------------------------
 def getUsagerParId(id_usager: str | UUID) -> UsagerDTO | None:
-    with SessionLocal() as s:
-        u = s.get(Usager, str(id_usager))
-        # Si trouvé, on le retourne en DTO, sinon None
-        return UsagerDTO(u) if u else None
+    # Servi par le cache métier (LRU local puis cache partagé) si possible,
+    # sinon par le chargeur par lot (lectures simultanées regroupées)
+    try:
+        return usager_par_id(id_usager)
+    except ValueError:
+        # Identifiant mal formé : aucun usager ne peut correspondre
+        return None
 
 # --------------------------------------------------------------
 # ---------- MISE À JOUR ----------
@@ -74,43 +87,76 @@ def modifierUsager(id_usager: str, data: UsagerUpdateDTO) -> UsagerDTO:
     with SessionLocal() as s:
         s: Session
 
-        u = s.get(Usager, id_usager)
-        if not u:
-            raise ValueError("Usager introuvable.")
-
         # Mise à jour seulement des champs fournis dans le DTO
-        if data.prenom is not None:
-            u.prenom = data.prenom
-        if data.nom is not None:
-            u.nom = data.nom
-        if data.adresse is not None:
-            u.adresse = data.adresse
-        if data.mobile is not None:
-            u.mobile = data.mobile
-        if data.mot_de_passe is not None:
+        valeurs = data.model_dump(exclude_none=True)
+        if "mot_de_passe" in valeurs:
             # Même logique de longueur fixe pour CHAR(60)
-            u.mot_de_passe = (data.mot_de_passe[:60]).ljust(60)[:60]
-        if data.type_usager is not None:
-            u.type_usager = data.type_usager
+            valeurs["mot_de_passe"] = mot_de_passe_colonne(data.mot_de_passe)
 
+        if not valeurs:
+            u = s.get(Usager, id_usager)
+        else:
+            # Un seul UPDATE ... RETURNING au lieu de get + commit + refresh
+            try:
+                u = s.scalars(
+                    update(Usager)
+                    .where(Usager.id_usager == id_usager)
+                    .values(**valeurs)
+                    .returning(Usager)
+                ).one_or_none()
+            except IntegrityError:
+                # Contrainte UNIQUE (nom, prénom, mobile) violée
+                s.rollback()
+                raise ValueError("Un usager avec ce nom, prénom et mobile existe déjà.")
+        if not u:
+            raise ValueError("Usager introuvable.")
+
+        dto = UsagerDTO(u)
+        if valeurs.keys() - {"mot_de_passe"}:
+            # Copie de l’usager dans la vue des réservations (même transaction)
+            vue.maj_usager(s, dto)
+        if valeurs:
+            journaliser(s, "usager", MODIFICATION, [dto.idUsager])
         s.commit()
-        s.refresh(u)
-        return UsagerDTO(u)
+        cache_metier.invalider("usager", [dto.idUsager])
+        return dto
 
 # --------------------------------------------------------------
 # ---------- SUPPRESSION ----------
 # Supprime un usager de la base s’il existe.
 # Retourne True si supprimé, False si aucun trouvé.
+# Les réservations de l’usager ne sont pas chargées : un seul
+# DELETE ... WHERE id = :id AND NOT EXISTS (réservations).
 # --------------------------------------------------------------
 def supprimerUsager(id_usager: str) -> bool:
     """
     Supprime un usager. Retourne True si supprimé, False si non trouvé.
+    Lève ValueError si des réservations y sont encore rattachées.
     """
     with SessionLocal() as s:
         s: Session
-        u = s.get(Usager, id_usager)
-        if not u:
-            return False
-        s.delete(u)
-        s.commit()
-        return True
+        try:
+            res = s.execute(
+                delete(Usager)
+                .where(Usager.id_usager == id_usager)
+                .where(~exists().where(Reservation.fk_id_usager == Usager.id_usager))
+                .execution_options(synchronize_session=False)
+            )
+            if res.rowcount:
+                journaliser(s, "usager", SUPPRESSION, [id_usager])
+            s.commit()
+        except IntegrityError:
+            # Une réservation a été ajoutée entre-temps (concurrence)
+            s.rollback()
+            res = None
+
+        if res is not None and res.rowcount:
+            cache_metier.invalider("usager", [id_usager])
+            return True
+
+        # Aucune ligne supprimée : usager absent (404) ou avec réservations (400)
+        if s.scalar(select(exists().where(Usager.id_usager == id_usager))):
+            raise ValueError(
+                "Impossible de supprimer cet usager car des réservations y sont rattachées."
+            )
+        return False
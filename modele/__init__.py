@@ -0,0 +1,17 @@
+# ==============================================================
+# modele/__init__.py
+# Charge tous les modèles dès qu’un module de modele/ est importé :
+# les relations se désignent par leur nom ("Reservation", ...) et
+# la configuration des mappers (premier aliased(), select(), ...)
+# échoue si l’une des classes n’a pas encore été déclarée.
+# ==============================================================
+
+from .base import Base
+from .type_chambre import TypeChambre
+from .chambre import Chambre
+from .usager import Usager
+from .reservation import Reservation
+from .reservation_vue import ReservationVue
+from .reservation_archive import ReservationArchive
+from .changement import Changement
+from .importation import Importation
@@ -8,7 +8,7 @@
 from __future__ import annotations
 
 from typing import List, Optional, TYPE_CHECKING
-from sqlalchemy import ForeignKey, String, SmallInteger, Boolean
+from sqlalchemy import ForeignKey, String, SmallInteger, Boolean, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from uuid import UUID, uuid4
 from .base import Base
@@ -26,6 +26,13 @@ if TYPE_CHECKING:
 class Chambre(Base):
     __tablename__ = "chambre"
 
+    # Recherche des réservations par numéro de chambre, et des
+    # chambres disponibles d’un type (GET /chambres filtré)
+    __table_args__ = (
+        Index("ix_chambre_numero", "numero_chambre"),
+        Index("ix_chambre_type_disponible", "fk_type_chambre", "disponible_reservation"),
+    )
+
     # Identifiant unique (UUID) généré automatiquement
     id_chambre: Mapped[UUID] = mapped_column(default=uuid4, primary_key=True)
 
@@ -45,4 +52,8 @@ class Chambre(Base):
     type_chambre: Mapped["TypeChambre"] = relationship("TypeChambre", back_populates="chambres")
 
     # Relation inverse avec Reservation (une chambre peut avoir plusieurs réservations)
-    reservations: Mapped[List["Reservation"]] = relationship("Reservation", back_populates="chambre")
+    # passive_deletes="all" : on laisse la contrainte de la BD refuser la suppression
+    # au lieu de charger la collection pour mettre les clés étrangères à NULL
+    reservations: Mapped[List["Reservation"]] = relationship(
+        "Reservation", back_populates="chambre", passive_deletes="all"
+    )
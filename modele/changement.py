@@ -0,0 +1,57 @@
+# ==============================================================
+# modele/changement.py
+# Modèles SQLAlchemy du journal des changements (flux de deltas) :
+#   - "changement" : une ligne par écriture du métier (entité, id,
+#     opération, version de l’entité, instant). La séquence sert de
+#     curseur à GET /changements?depuis=... ;
+#   - "changement_purge" : séquences retirées par la rétention
+#     (un curseur plus ancien doit resynchroniser ses listes).
+# Le journal est écrit par metier/changementMetier.py, dans la même
+# transaction que l’écriture journalisée.
+# ==============================================================
+
+from __future__ import annotations
+
+from datetime import datetime
+from sqlalchemy import BigInteger, DateTime, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+from uuid import UUID
+from .base import Base
+
+# BIGINT IDENTITY sur SQL Server ; SQLite n’auto-incrémente que INTEGER
+_Sequence = BigInteger().with_variant(Integer, "sqlite")
+
+
+class Changement(Base):
+    __tablename__ = "changement"
+
+    __table_args__ = (
+        # Version suivante d’une entité, et compaction (dernière ligne par entité)
+        Index("ix_changement_entite_id", "entite", "id_entite", "sequence"),
+        # Rétention par ancienneté
+        Index("ix_changement_moment", "moment"),
+        # SQLite réutiliserait la plus grande séquence si sa ligne est purgée
+        {"sqlite_autoincrement": True},
+    )
+
+    # Curseur du flux : croissant, jamais réutilisé
+    sequence: Mapped[int] = mapped_column(_Sequence, primary_key=True, autoincrement=True)
+
+    # "usager", "type_chambre", "chambre" ou "reservation"
+    entite: Mapped[str] = mapped_column(String(30), nullable=False)
+    id_entite: Mapped[UUID] = mapped_column(nullable=False)
+
+    # "creation", "modification", "suppression" ou "archivage"
+    operation: Mapped[str] = mapped_column(String(20), nullable=False)
+
+    # Numéro de version de l’entité (1 à la première écriture journalisée)
+    version: Mapped[int] = mapped_column(Integer, nullable=False)
+    moment: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+
+class ChangementPurge(Base):
+    __tablename__ = "changement_purge"
+
+    # Plus grande séquence retirée par cette purge
+    sequence_max: Mapped[int] = mapped_column(_Sequence, primary_key=True, autoincrement=False)
+    purge_le: Mapped[datetime] = mapped_column(DateTime, nullable=False)
@@ -0,0 +1,44 @@
+# ==============================================================
+# modele/importation.py
+# Modèle SQLAlchemy de la table "importation" : point de reprise
+# des imports en masse (metier/importation.py). Chaque lot inséré
+# met à jour sa ligne dans la même transaction : après un échec, les
+# enregistrements déjà traités sont sautés à la reprise.
+# ==============================================================
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+from uuid import UUID
+from .base import Base
+
+
+class Importation(Base):
+    __tablename__ = "importation"
+
+    # Identifiant de l’import (choisi par le client ou la commande, pour reprendre)
+    id_import: Mapped[UUID] = mapped_column(primary_key=True)
+
+    # "usagers" ou "reservations" ; "csv" ou "ndjson"
+    entite: Mapped[str] = mapped_column(String(20), nullable=False)
+    format: Mapped[str] = mapped_column(String(10), nullable=False)
+
+    # "en_cours", "interrompu" ou "termine"
+    etat: Mapped[str] = mapped_column(String(20), nullable=False)
+
+    # Enregistrements lus et validés (point de reprise), puis leur sort
+    traites: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    inseres: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    existants: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rejetes: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    # Fichier des rejets (une ligne NDJSON par enregistrement refusé)
+    fichier_rejets: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
+
+    debut: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    # Dernier lot validé : un import "en_cours" sans nouvelle depuis
+    # longtemps a été abandonné (processus tué) et peut être repris
+    maj: Mapped[datetime] = mapped_column(DateTime, nullable=False)
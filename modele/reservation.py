@@ -9,7 +9,7 @@ from __future__ import annotations
 
 from typing import Optional, TYPE_CHECKING
 from datetime import datetime
-from sqlalchemy import ForeignKey, String, DateTime, Numeric
+from sqlalchemy import ForeignKey, String, DateTime, Numeric, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from uuid import UUID, uuid4
 from .base import Base
@@ -26,6 +26,15 @@ if TYPE_CHECKING:
 class Reservation(Base):
     __tablename__ = "reservation"
 
+    # Index composites de la recherche (metier/reservationMetier.py) :
+    # par chambre ou par usager puis par date, et par plage de dates
+    __table_args__ = (
+        Index("ix_reservation_chambre_debut", "fk_id_chambre", "date_debut_reservation"),
+        Index("ix_reservation_usager_debut", "fk_id_usager", "date_debut_reservation"),
+        Index("ix_reservation_debut_fin", "date_debut_reservation", "date_fin_reservation"),
+        Index("ix_reservation_fin", "date_fin_reservation"),
+    )
+
     # Identifiant unique de la réservation (UUID auto-généré)
     id_reservation: Mapped[UUID] = mapped_column(default=uuid4, primary_key=True)
 
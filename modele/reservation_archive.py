@@ -0,0 +1,21 @@
+# ==============================================================
+# modele/reservation_archive.py
+# Modèle SQLAlchemy de la table "reservation_archive" : les
+# réservations terminées depuis plus longtemps que l’horizon
+# d’archivage, retirées de la table reservation (et de la vue)
+# par metier/archivage.py.
+# Une ligne d’archive est une copie figée de la ligne de la vue au
+# moment de l’archivage : usager, chambre et type compris. Elle ne
+# dépend plus des tables sources (pas de clé étrangère) et n’est
+# plus modifiée par le métier.
+# ==============================================================
+
+from __future__ import annotations
+
+from .base import Base
+from .reservation_vue import ColonnesReservationVue, index_recherche
+
+
+class ReservationArchive(ColonnesReservationVue, Base):
+    __tablename__ = "reservation_archive"
+    __table_args__ = index_recherche(__tablename__)
@@ -0,0 +1,72 @@
+# ==============================================================
+# modele/reservation_vue.py
+# Modèle SQLAlchemy de la table "reservation_vue" : une ligne
+# par réservation, avec l’usager, la chambre et son type déjà
+# recopiés (modèle de lecture dénormalisé).
+# La recherche lit cette table sans aucune jointure.
+# Elle est tenue à jour dans la même transaction que les écritures
+# du métier (voir metier/reservationVue.py).
+# ==============================================================
+
+from __future__ import annotations
+
+from typing import Optional
+from datetime import datetime
+from sqlalchemy import String, CHAR, DateTime, Numeric, SmallInteger, Boolean, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from uuid import UUID
+from .base import Base
+
+# --------------------------------------------------------------
+# Les colonnes gardent les noms des tables sources : les DTO
+# (UsagerDTO, TypeChambreDTO, ...) lisent une ligne de la vue
+# comme ils lisent les objets du modèle.
+# Colonnes partagées avec l’archive (modele/reservation_archive.py) :
+# une recherche peut lire les deux tables avec un UNION ALL.
+# --------------------------------------------------------------
+def index_recherche(table: str) -> tuple:
+    # Mêmes index que la table reservation, plus les filtres
+    # qui demandaient une jointure (numéro de chambre, type, nom)
+    return (
+        Index(f"ix_{table}_chambre_debut", "id_chambre", "date_debut_reservation"),
+        Index(f"ix_{table}_usager_debut", "id_usager", "date_debut_reservation"),
+        Index(f"ix_{table}_debut_fin", "date_debut_reservation", "date_fin_reservation"),
+        Index(f"ix_{table}_fin", "date_fin_reservation"),
+        Index(f"ix_{table}_numero", "numero_chambre"),
+        Index(f"ix_{table}_type", "nom_type"),
+        Index(f"ix_{table}_nom_prenom", "nom", "prenom"),
+    )
+
+
+class ColonnesReservationVue:
+    # ---------- Réservation ----------
+    id_reservation: Mapped[UUID] = mapped_column(primary_key=True)
+    date_debut_reservation: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    date_fin_reservation: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    prix_jour: Mapped[float] = mapped_column(Numeric(10, 2), nullable=False)
+    info_reservation: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+
+    # ---------- Usager (sans le mot de passe) ----------
+    id_usager: Mapped[UUID] = mapped_column(nullable=False)
+    prenom: Mapped[str] = mapped_column(String(50), nullable=False)
+    nom: Mapped[str] = mapped_column(String(50), nullable=False)
+    adresse: Mapped[str] = mapped_column(String(100), nullable=False)
+    mobile: Mapped[str] = mapped_column(CHAR(15), nullable=False)
+    type_usager: Mapped[str] = mapped_column(String(50), nullable=False)
+
+    # ---------- Chambre ----------
+    id_chambre: Mapped[UUID] = mapped_column(nullable=False)
+    numero_chambre: Mapped[int] = mapped_column(SmallInteger, nullable=False)
+    disponible_reservation: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    autre_informations: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+
+    # ---------- Type de chambre ----------
+    nom_type: Mapped[str] = mapped_column(String(50), nullable=False)
+    prix_plancher: Mapped[float] = mapped_column(Numeric(10, 2), nullable=False)
+    prix_plafond: Mapped[Optional[float]] = mapped_column(Numeric(10, 2), nullable=True)
+    description_chambre: Mapped[Optional[str]] = mapped_column(String(200), nullable=True)
+
+
+class ReservationVue(ColonnesReservationVue, Base):
+    __tablename__ = "reservation_vue"
+    __table_args__ = index_recherche(__tablename__)
@@ -8,7 +8,7 @@
 from __future__ import annotations
 
 from typing import List, Optional, TYPE_CHECKING
-from sqlalchemy import String, Numeric
+from sqlalchemy import String, Numeric, UniqueConstraint, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from uuid import UUID, uuid4
 from .base import Base
@@ -24,6 +24,13 @@ if TYPE_CHECKING:
 class TypeChambre(Base):
     __tablename__ = "type_chambre"
 
+    # Le nom du type est une clé naturelle : sert aussi à l’upsert de creerTypeChambre
+    __table_args__ = (
+        UniqueConstraint("nom_type", name="uq_type_chambre_nom_type"),
+        # Recherche des chambres par fourchette de prix
+        Index("ix_type_chambre_prix", "prix_plancher", "prix_plafond"),
+    )
+
     # Identifiant unique du type de chambre (UUID auto-généré)
     id_type_chambre: Mapped[UUID] = mapped_column(default=uuid4, primary_key=True)
 
@@ -33,12 +40,16 @@ class TypeChambre(Base):
     # Prix plancher de base pour ce type de chambre
     prix_plancher: Mapped[float] = mapped_column(Numeric(10, 2), nullable=False)
 
-    # Prix plafond (optionnel, souvent utilisé pour indiquer une fourchette)
-    prix_plafond: Mapped[Optional[str]] = mapped_column(String(10), nullable=True)
+    # Prix plafond (optionnel, borne haute de la fourchette de prix du type).
+    # Numérique (et non plus du texte) pour filtrer par prix en SQL.
+    prix_plafond: Mapped[Optional[float]] = mapped_column(Numeric(10, 2), nullable=True)
 
     # Courte description du type (vue, taille, services inclus, etc.)
     description_chambre: Mapped[Optional[str]] = mapped_column(String(200), nullable=True)
 
     # Relation vers les chambres associées à ce type
     # Un type de chambre peut être lié à plusieurs chambres physiques
-    chambres: Mapped[List["Chambre"]] = relationship("Chambre", back_populates="type_chambre")
+    # (passive_deletes="all" : la contrainte de clé étrangère de la BD décide)
+    chambres: Mapped[List["Chambre"]] = relationship(
+        "Chambre", back_populates="type_chambre", passive_deletes="all"
+    )
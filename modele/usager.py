@@ -7,7 +7,7 @@
 from __future__ import annotations
 
 from typing import List, TYPE_CHECKING
-from sqlalchemy import String, CHAR
+from sqlalchemy import String, CHAR, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from uuid import UUID, uuid4
 from .base import Base
@@ -24,6 +24,11 @@ if TYPE_CHECKING:
 class Usager(Base):
     __tablename__ = "usager"
 
+    # (nom, prénom, mobile) identifie un usager : sert à l’upsert de creerUsager
+    __table_args__ = (
+        UniqueConstraint("nom", "prenom", "mobile", name="uq_usager_nom_prenom_mobile"),
+    )
+
     # Identifiant unique de l’usager (UUID auto-généré)
     id_usager: Mapped[UUID] = mapped_column(default=uuid4, primary_key=True)
 
@@ -47,4 +52,7 @@ class Usager(Base):
 
     # Relation avec la table des réservations
     # Un usager peut avoir plusieurs réservations associées
-    reservations: Mapped[List["Reservation"]] = relationship("Reservation", back_populates="usager")
+    # (passive_deletes="all" : la contrainte de clé étrangère de la BD décide)
+    reservations: Mapped[List["Reservation"]] = relationship(
+        "Reservation", back_populates="usager", passive_deletes="all"
+    )
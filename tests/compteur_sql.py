@@ -0,0 +1,27 @@
+# ==============================================================
+# tests/compteur_sql.py
+# Petit utilitaire de test : compte les requêtes SQL envoyées
+# à la BD pendant un bloc "with" (via les événements de l’engine).
+# ==============================================================
+
+from contextlib import contextmanager
+from typing import Iterator, List
+
+from sqlalchemy import event
+
+from core.db import engine
+
+
+@contextmanager
+def compter_requetes() -> Iterator[List[str]]:
+    """Retourne la liste (remplie au fil du bloc) des requêtes exécutées."""
+    requetes: List[str] = []
+
+    def _avant(conn, cursor, statement, parameters, context, executemany):
+        requetes.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _avant)
+    try:
+        yield requetes
+    finally:
+        event.remove(engine, "before_cursor_execute", _avant)
@@ -0,0 +1,161 @@
+# ==============================================================
+# tests/test_admission.py
+# Vérifie le contrôle d’admission : limite des requêtes en cours,
+# places réservées et priorité des écritures de réservation, refus
+# (file pleine, attente dépassée, BD saturée), 503 + Retry-After du
+# middleware et classement des routes de l’API.
+# ==============================================================
+
+import asyncio
+import unittest
+
+from fastapi.testclient import TestClient
+
+from core.admission import (
+    LECTURE,
+    MASSE,
+    RESERVATION,
+    Admission,
+    ControleAdmission,
+    MoyenneGlissante,
+    Refus,
+)
+from main import _classe_admission, app
+
+
+def _controle(limite=2, reserve=1, taille_file=10, attente=0.5, saturation=0.0):
+    mesure = MoyenneGlissante(poids=1.0, demi_vie=float("inf"))
+    mesure.ajouter(saturation)
+    return ControleAdmission(
+        limite=limite,
+        reserve=reserve,
+        taille_file=taille_file,
+        attentes={RESERVATION: attente, LECTURE: attente, MASSE: attente},
+        seuil_pool=0.05,
+        mesure_pool=mesure,
+    )
+
+
+class TestControleAdmission(unittest.IsolatedAsyncioTestCase):
+    async def test_places_reservees_aux_reservations(self):
+        controle = _controle(limite=2, reserve=1, attente=0.01)
+        await controle.entrer(LECTURE)
+        with self.assertRaises(Refus) as refus:
+            await controle.entrer(LECTURE)
+        self.assertEqual(refus.exception.motif, "attente_depassee")
+        self.assertGreaterEqual(refus.exception.retry_after, 1)
+        # La dernière place reste disponible pour une réservation
+        await controle.entrer(RESERVATION)
+        self.assertEqual(controle.en_cours, 2)
+
+    async def test_reservation_servie_avant_lecture(self):
+        controle = _controle(limite=1, reserve=0)
+        await controle.entrer(LECTURE)
+        ordre = []
+
+        async def attendre(classe):
+            await controle.entrer(classe)
+            ordre.append(classe)
+
+        lecture = asyncio.create_task(attendre(LECTURE))
+        await asyncio.sleep(0)
+        reservation = asyncio.create_task(attendre(RESERVATION))
+        await asyncio.sleep(0)
+        self.assertEqual(controle.profondeur_file, 2)
+
+        controle.sortir(LECTURE)
+        await reservation
+        self.assertEqual(ordre, [RESERVATION])
+        controle.sortir(RESERVATION)
+        await lecture
+        self.assertEqual(ordre, [RESERVATION, LECTURE])
+        self.assertEqual(controle.profondeur_file, 0)
+
+    async def test_file_pleine(self):
+        controle = _controle(limite=1, reserve=0, taille_file=1)
+        await controle.entrer(LECTURE)
+        en_attente = asyncio.create_task(controle.entrer(LECTURE))
+        await asyncio.sleep(0)
+        with self.assertRaises(Refus) as refus:
+            await controle.entrer(LECTURE)
+        self.assertEqual(refus.exception.motif, "file_pleine")
+        controle.sortir(LECTURE)
+        await en_attente
+        self.assertEqual(controle.statistiques()["refusees"][LECTURE], {"file_pleine": 1})
+
+    async def test_bd_saturee_refuse_les_lectures_sans_attendre(self):
+        controle = _controle(limite=1, reserve=0, saturation=0.2)
+        self.assertTrue(controle.bd_saturee())
+        await controle.entrer(RESERVATION)
+        with self.assertRaises(Refus) as refus:
+            await controle.entrer(LECTURE)
+        self.assertEqual(refus.exception.motif, "bd_saturee")
+        # Une réservation attend encore sa place
+        suivante = asyncio.create_task(controle.entrer(RESERVATION))
+        await asyncio.sleep(0)
+        controle.sortir(RESERVATION)
+        await suivante
+        self.assertEqual(controle.en_cours, 1)
+
+    async def test_client_parti_pendant_l_attente(self):
+        controle = _controle(limite=1, reserve=0, attente=5)
+        await controle.entrer(LECTURE)
+        abandon = asyncio.create_task(controle.entrer(LECTURE))
+        await asyncio.sleep(0)
+        abandon.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await abandon
+        self.assertEqual(controle.profondeur_file, 0)
+        controle.sortir(LECTURE)
+        self.assertEqual(controle.en_cours, 0)
+
+
+class TestMoyenneGlissante(unittest.TestCase):
+    def test_decroissance(self):
+        mesure = MoyenneGlissante(poids=1.0, demi_vie=0.01)
+        mesure.ajouter(1.0)
+        mesure._instant -= 0.1   # dix demi-vies plus tard
+        self.assertLess(mesure.valeur, 0.001)
+
+
+class TestMiddleware(unittest.TestCase):
+    def test_503_retry_after(self):
+        async def application(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"ok"})
+
+        controle = _controle(limite=1, reserve=0, attente=0)
+        client = TestClient(Admission(application, classer=lambda m, c: LECTURE, controle=controle))
+        self.assertEqual(client.get("/x").status_code, 200)
+
+        asyncio.run(controle.entrer(LECTURE))   # la seule place est prise
+        reponse = client.get("/x")
+        self.assertEqual(reponse.status_code, 503)
+        self.assertGreaterEqual(int(reponse.headers["retry-after"]), 1)
+        self.assertEqual(reponse.json()["motif"], "complet")
+        self.assertEqual(controle.statistiques()["admises"][LECTURE], 2)
+
+
+class TestRoutes(unittest.TestCase):
+    def test_classement(self):
+        self.assertEqual(_classe_admission("POST", "/reservations"), RESERVATION)
+        self.assertEqual(_classe_admission("DELETE", "/reservations/abc"), RESERVATION)
+        self.assertEqual(_classe_admission("POST", "/usagers"), RESERVATION)
+        self.assertEqual(_classe_admission("POST", "/rechercherReservation"), LECTURE)
+        self.assertEqual(_classe_admission("GET", "/chambres"), LECTURE)
+        self.assertEqual(_classe_admission("POST", "/import/usagers"), MASSE)
+        self.assertEqual(_classe_admission("POST", "/reservations/annulationMasse"), MASSE)
+        self.assertEqual(_classe_admission("PATCH", "/chambres"), MASSE)
+        for chemin in ("/health", "/admin/cache", "/flux/chambres", "/changements"):
+            self.assertIsNone(_classe_admission("GET", chemin), chemin)
+
+    def test_statistiques(self):
+        reponse = TestClient(app).get("/admin/admission")
+        self.assertEqual(reponse.status_code, 200)
+        stats = reponse.json()
+        for cle in ("limite", "en_cours", "file", "file_par_classe", "refusees", "attente_pool_ms"):
+            self.assertIn(cle, stats)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+# ==============================================================
+# tests/test_cache.py
+# Vérifie le cache métier à deux niveaux : LRU local, niveau
+# partagé (en JSON) et invalidation publiée à chaque écriture du métier.
+# Deux CacheMetier branchés sur le même backend simulent deux workers.
+# ==============================================================
+
+import json
+import pickle
+import time
+import unittest
+import uuid
+
+from core.cache import BackendMemoire, BackendRedis, CacheLocalLRU, CacheMetier, cache_metier
+from core.db import init_db
+from DTO.usagerDTO import UsagerCreateDTO, UsagerDTO, UsagerUpdateDTO
+from metier.usagerMetier import creerUsager, getUsagerParId, modifierUsager, supprimerUsager
+from tests.compteur_sql import compter_requetes
+
+
+class TestCacheLocalLRU(unittest.TestCase):
+    def test_eviction_du_moins_recent(self):
+        lru = CacheLocalLRU(taille_max=2)
+        lru.placer("a", 1)
+        lru.placer("b", 2)
+        lru.obtenir("a")  # "a" devient le plus récent
+        lru.placer("c", 3)
+        self.assertIsNone(lru.obtenir("b"))
+        self.assertEqual(lru.obtenir("a"), 1)
+        self.assertEqual(lru.obtenir("c"), 3)
+
+
+class TestCacheDeuxWorkers(unittest.TestCase):
+    def _verifier(self, backend_a, backend_b):
+        worker_a, worker_b = CacheMetier(backend_a), CacheMetier(backend_b)
+        chargements = []
+
+        def charger():
+            chargements.append(1)
+            return {"version": len(chargements)}
+
+        self.assertEqual(worker_a.obtenir("usager", "u1", charger, dict), {"version": 1})
+        # B trouve la valeur dans le niveau partagé, sans recharger
+        self.assertEqual(worker_b.obtenir("usager", "u1", charger, dict), {"version": 1})
+        self.assertEqual(len(chargements), 1)
+        self.assertEqual(worker_b.statistiques()["succes_partage"], 1)
+        worker_b.obtenir("usager", "u1", charger, dict)
+        self.assertEqual(worker_b.statistiques()["succes_local"], 1)
+
+        # Écriture dans A : B reçoit l’invalidation et relit la source
+        worker_a.invalider("usager", ["u1"])
+        delai = time.monotonic() + 2
+        while worker_b.statistiques()["invalidations_recues"] == 0 and time.monotonic() < delai:
+            time.sleep(0.01)
+        self.assertEqual(worker_b.obtenir("usager", "u1", charger, dict), {"version": 2})
+
+        stats = worker_b.statistiques()
+        self.assertEqual(stats["invalidations_recues"], 1)
+        self.assertGreaterEqual(stats["lag_invalidation_max_ms"], 0.0)
+        self.assertAlmostEqual(stats["taux_succes_total"], 2 / 3)
+
+    def test_invalidation_pendant_le_chargement(self):
+        backend = BackendMemoire()
+        worker = CacheMetier(backend)
+        versions = []
+
+        def charger_puis_ecriture_concurrente():
+            versions.append(len(versions) + 1)
+            if len(versions) == 1:
+                # Une écriture validée (et invalidée) pendant la lecture de la BD
+                worker.invalider("usager", ["u2"])
+            return {"version": versions[-1]}
+
+        # La valeur lue avant l’écriture est retournée, mais pas mise en cache
+        self.assertEqual(worker.obtenir("usager", "u2", charger_puis_ecriture_concurrente, dict), {"version": 1})
+        self.assertIsNone(backend.get(CacheMetier._cle("usager", "u2")))
+        self.assertEqual(worker.obtenir("usager", "u2", charger_puis_ecriture_concurrente, dict), {"version": 2})
+        self.assertEqual(worker.obtenir("usager", "u2", charger_puis_ecriture_concurrente, dict), {"version": 2})
+        self.assertEqual(worker._generations, {})
+
+    def test_backend_memoire(self):
+        backend = BackendMemoire()
+        self._verifier(backend, backend)
+
+    def test_niveau_partage_en_json(self):
+        backend = BackendMemoire()
+        worker_a, worker_b = CacheMetier(backend), CacheMetier(backend)
+        dto = UsagerDTO.model_validate({
+            "idUsager": uuid.uuid4(), "prenom": "Json", "nom": "Partage",
+            "adresse": "1 Rue Json", "mobile": "5550000000", "type_usager": "client",
+        })
+        worker_a.obtenir("usager", dto.idUsager, lambda: dto, UsagerDTO)
+        brut = backend.get(CacheMetier._cle("usager", dto.idUsager))
+        self.assertEqual(json.loads(brut)["nom"], "Partage")
+        self.assertEqual(worker_b.obtenir("usager", dto.idUsager, lambda: None, UsagerDTO), dto)
+
+        # Une valeur pickle n’est jamais désérialisée : elle est rechargée
+        backend.set(CacheMetier._cle("usager", "u3"), pickle.dumps({"version": 0}), 60)
+        self.assertEqual(worker_b.obtenir("usager", "u3", lambda: {"version": 1}, dict), {"version": 1})
+        self.assertEqual(json.loads(backend.get(CacheMetier._cle("usager", "u3"))), {"version": 1})
+
+    def test_backend_redis_fakeredis(self):
+        try:
+            import fakeredis
+        except ImportError:
+            self.skipTest("fakeredis non installé")
+        serveur = fakeredis.FakeServer()
+        a = BackendRedis(fakeredis.FakeRedis(server=serveur))
+        b = BackendRedis(fakeredis.FakeRedis(server=serveur))
+        try:
+            self._verifier(a, b)
+        finally:
+            a.fermer()
+            b.fermer()
+
+
+class TestCacheUsagerMetier(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        init_db()
+
+    def test_get_usager_en_cache_et_invalide_a_l_ecriture(self):
+        u = creerUsager(
+            UsagerCreateDTO(
+                prenom="Cache",
+                nom=f"Cache-{uuid.uuid4()}",
+                adresse="1 Rue Cache",
+                mobile=f"561{uuid.uuid4().hex[:6]}",
+                mot_de_passe="pwd",
+                type_usager="client",
+            )
+        )
+        getUsagerParId(u.idUsager)
+        with compter_requetes() as requetes:
+            self.assertEqual(getUsagerParId(str(u.idUsager)).nom, u.nom)
+        self.assertEqual(requetes, [])
+
+        modifierUsager(str(u.idUsager), UsagerUpdateDTO(prenom="Modifie"))
+        self.assertEqual(getUsagerParId(u.idUsager).prenom, "Modifie")
+
+        self.assertTrue(supprimerUsager(str(u.idUsager)))
+        self.assertIsNone(getUsagerParId(u.idUsager))
+        self.assertGreater(cache_metier.statistiques()["invalidations_publiees"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+# ==============================================================
+# tests/test_capture.py
+# Vérifie la capture de trafic : pseudonymisation des champs
+# personnels, ligne JSONL écrite par le middleware, et centiles
+# calculés par l’outil de comparaison des rejeux.
+# ==============================================================
+
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+from bench.rejeu import comparer, route
+from core.capture import CaptureTrafic, nettoyer
+
+
+class TestNettoyage(unittest.TestCase):
+    def test_champs_personnels_remplaces_de_facon_stable(self):
+        usager = {"prenom": "Alice", "nom": "Martin", "adresse": "1 rue Vue", "mobile": "0612345678", "mot_de_passe": "secret"}
+        a, b = nettoyer({"usager": usager}), nettoyer([usager])[0]
+
+        self.assertEqual(a["usager"], b)
+        for champ, valeur in usager.items():
+            self.assertNotEqual(b[champ], valeur)
+        self.assertEqual(b["mot_de_passe"], "********")
+        self.assertTrue(b["mobile"].isdigit())
+        self.assertEqual(len(b["mobile"]), len(usager["mobile"]))
+
+    def test_autres_champs_conserves(self):
+        corps = {"idUsager": "abc", "dateDebut": "2024-01-01", "prix_jour": 80.0}
+        self.assertEqual(nettoyer(corps), corps)
+
+
+async def _application(scope, receive, send):
+    await receive()
+    await send({"type": "http.response.start", "status": 201, "headers": []})
+    await send({"type": "http.response.body", "body": b'{"ok":true}'})
+
+
+class TestMiddleware(unittest.TestCase):
+    def test_ligne_capturee(self):
+        with tempfile.TemporaryDirectory() as dossier:
+            chemin = os.path.join(dossier, "trafic-{pid}.jsonl")
+            capture = CaptureTrafic(_application, taux=1.0, chemin=chemin)
+            corps = json.dumps({"nom": "Martin", "type_usager": "client"}).encode()
+            messages = iter([{"type": "http.request", "body": corps, "more_body": False}])
+
+            async def recevoir():
+                return next(messages)
+
+            async def envoyer(message):
+                pass
+
+            scope = {"type": "http", "method": "POST", "path": "/usagers", "query_string": b"x=1"}
+            asyncio.run(capture(scope, recevoir, envoyer))
+            capture.ecrivain.fermer()
+
+            with open(chemin.format(pid=os.getpid()), encoding="utf-8") as f:
+                lignes = [json.loads(l) for l in f]
+
+        self.assertEqual(len(lignes), 1)
+        ligne = lignes[0]
+        self.assertEqual((ligne["methode"], ligne["chemin"], ligne["requete"]), ("POST", "/usagers", "x=1"))
+        self.assertEqual((ligne["statut"], ligne["taille"]), (201, 11))
+        self.assertEqual(ligne["corps"]["type_usager"], "client")
+        self.assertNotEqual(ligne["corps"]["nom"], "Martin")
+        self.assertGreaterEqual(ligne["duree_ms"], 0)
+
+
+class TestComparaison(unittest.TestCase):
+    def test_route_normalisee(self):
+        self.assertEqual(
+            route("GET", "/usagers/0b8e2f1c-3a5d-4c8e-9f00-1234567890ab/reservations/12"),
+            "GET /usagers/{id}/reservations/{no}",
+        )
+
+    def test_centiles_par_route(self):
+        a = [{"route": "GET /chambres", "statut": 200, "duree_ms": float(i)} for i in range(1, 101)]
+        b = [{"route": "GET /chambres", "statut": 200, "duree_ms": float(2 * i)} for i in range(1, 101)]
+        b.append({"route": "GET /chambres", "statut": 0, "duree_ms": 9999.0})  # échec réseau ignoré
+
+        lignes = {l["route"]: l for l in comparer(a, b)}
+        ligne = lignes["GET /chambres"]
+        self.assertEqual((ligne["n_a"], ligne["n_b"]), (100, 100))
+        self.assertEqual((ligne["p50_a"], ligne["p90_a"], ligne["p99_a"]), (51.0, 90.0, 99.0))
+        self.assertAlmostEqual(ligne["p90_delta"], 100.0)
+        self.assertIn("(toutes)", lignes)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+# ==============================================================
+# tests/test_catalogue_chambre.py
+# Vérifie le catalogue des chambres en mémoire : les lectures
+# ne touchent pas la BD et les écritures de chambreMetier le
+# tiennent à jour (création, modification, suppression).
+# ==============================================================
+
+import unittest
+import uuid
+
+from sqlalchemy import select
+
+from core.db import init_db, SessionLocal
+from DTO.chambreDTO import (
+    TypeChambreCreateDTO,
+    TypeChambreUpdateDTO,
+    ChambreCreateDTO,
+    ChambreUpdateDTO,
+)
+from metier.catalogueChambre import catalogue_chambres
+from metier.chambreMetier import (
+    creerTypeChambre,
+    creerChambre,
+    getChambreParNumero,
+    listerChambres,
+    listerTypesChambre,
+    modifierChambre,
+    modifierTypeChambre,
+    supprimerChambre,
+    supprimerTypeChambre,
+)
+from modele.type_chambre import TypeChambre
+from tests.compteur_sql import compter_requetes
+
+
+class TestCatalogueChambre(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        init_db()
+
+    def setUp(self):
+        catalogue_chambres.charger()
+
+    def test_lectures_sans_requete(self):
+        with compter_requetes() as requetes:
+            listerChambres()
+            listerTypesChambre()
+            getChambreParNumero(-1)
+        self.assertEqual(requetes, [])
+
+    def test_ecritures_tiennent_le_catalogue_a_jour(self):
+        nom_type = f"cat-{uuid.uuid4().hex[:8]}"
+        creerTypeChambre(TypeChambreCreateDTO(nom_type=nom_type, prix_plancher=60.0))
+        self.assertIn(nom_type, [t.nom_type for t in listerTypesChambre()])
+
+        ch = creerChambre(
+            ChambreCreateDTO(numero_chambre=30001, disponible_reservation=True, nom_type=nom_type)
+        )
+        self.assertEqual(getChambreParNumero(30001).idChambre, ch.idChambre)
+
+        # Changement de numéro : l’ancien numéro ne répond plus
+        modifierChambre(str(ch.idChambre), ChambreUpdateDTO(numero_chambre=30002, disponible_reservation=False))
+        self.assertIsNone(getChambreParNumero(30001))
+        self.assertFalse(getChambreParNumero(30002).disponible_reservation)
+
+        # Modifier le type se voit sur toutes ses chambres
+        with SessionLocal() as s:
+            id_type = str(s.execute(
+                select(TypeChambre.id_type_chambre).where(TypeChambre.nom_type == nom_type)
+            ).scalar_one())
+        modifierTypeChambre(id_type, TypeChambreUpdateDTO(prix_plancher=65.0))
+        self.assertEqual(getChambreParNumero(30002).type_chambre.prix_plancher, 65.0)
+
+        # Le catalogue relu de la BD donne le même résultat
+        avant = [c.model_dump() for c in listerChambres()]
+        catalogue_chambres.invalider()
+        self.assertEqual([c.model_dump() for c in listerChambres()], avant)
+
+        self.assertTrue(supprimerChambre(str(ch.idChambre)))
+        self.assertIsNone(getChambreParNumero(30002))
+        self.assertTrue(supprimerTypeChambre(id_type))
+        self.assertNotIn(nom_type, [t.nom_type for t in listerTypesChambre()])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+# ==============================================================
+# tests/test_chambre_masse.py
+# Vérifie la modification en masse des chambres (PATCH /chambres) :
+# filtre, nombre retourné, catalogue et vue des réservations à jour.
+# ==============================================================
+
+import unittest
+import uuid
+from datetime import datetime, timedelta
+from unittest import mock
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from core.db import SessionLocal, init_db
+from DTO.chambreDTO import (
+    ChambreCreateDTO,
+    ChangementsChambresDTO,
+    FiltreChambresDTO,
+    TypeChambreCreateDTO,
+)
+from DTO.reservationDTO import CriteresRechercheDTO, ReservationDTO
+from DTO.usagerDTO import UsagerCreateDTO
+from main import app
+from metier import chambreMetier
+from metier.catalogueChambre import catalogue_chambres
+from metier.chambreMetier import (
+    creerChambre,
+    creerTypeChambre,
+    modifierChambresEnMasse,
+    supprimerChambre,
+    supprimerTypeChambre,
+)
+from metier.reservationMetier import creerReservation, rechercherReservation, supprimerReservation
+from metier.usagerMetier import creerUsager, supprimerUsager
+from modele.type_chambre import TypeChambre
+from tests.compteur_sql import compter_requetes
+
+NUMEROS = range(7301, 7311)
+
+
+class TestChambreMasse(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        init_db()
+        cls.types = [f"cm-{uuid.uuid4().hex[:8]}" for _ in range(2)]
+        for nom in cls.types:
+            creerTypeChambre(TypeChambreCreateDTO(nom_type=nom, prix_plancher=70.0, prix_plafond="90"))
+        cls.chambres = [
+            creerChambre(
+                ChambreCreateDTO(
+                    numero_chambre=n, disponible_reservation=True, autre_informations="cm", nom_type=cls.types[0]
+                )
+            )
+            for n in NUMEROS
+        ]
+        cls.usager = creerUsager(
+            UsagerCreateDTO(
+                prenom="Cm", nom=f"Cm-{uuid.uuid4()}", adresse="1 Rue Cm",
+                mobile="5557300000", mot_de_passe="pwd", type_usager="client",
+            )
+        )
+        debut = datetime(2033, 2, 1)
+        cls.reservation = creerReservation(
+            ReservationDTO(
+                dateDebut=debut, dateFin=debut + timedelta(days=1), prixParJour=80.0,
+                chambre=cls.chambres[0], usager=cls.usager,
+            )
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        supprimerReservation(str(cls.reservation.idReservation))
+        supprimerUsager(str(cls.usager.idUsager))
+        for ch in cls.chambres:
+            supprimerChambre(str(ch.idChambre))
+        with SessionLocal() as s:
+            ids = s.scalars(select(TypeChambre.id_type_chambre).where(TypeChambre.nom_type.in_(cls.types))).all()
+        for id_type in ids:
+            supprimerTypeChambre(str(id_type))
+
+    def test_plage_de_numeros(self):
+        catalogue_chambres.charger()
+        filtre = FiltreChambresDTO(numero_min=NUMEROS[0], numero_max=NUMEROS[4])
+        with compter_requetes() as requetes:
+            n = modifierChambresEnMasse(filtre, ChangementsChambresDTO(disponible_reservation=False))
+        self.assertEqual(n, 5)
+        # Lecture des ids + UPDATE ... RETURNING + UPDATE de la vue + journal (un executemany)
+        self.assertEqual(len(requetes), 4, requetes)
+        dispo = {catalogue_chambres.chambre_par_numero(no).disponible_reservation for no in NUMEROS[:5]}
+        self.assertEqual(dispo, {False})
+        self.assertTrue(catalogue_chambres.chambre_par_numero(NUMEROS[5]).disponible_reservation)
+        (r,) = rechercherReservation(CriteresRechercheDTO(idUsager=str(self.usager.idUsager)))
+        self.assertFalse(r.chambre.disponible_reservation)
+        modifierChambresEnMasse(filtre, ChangementsChambresDTO(disponible_reservation=True))
+
+    def test_changement_de_type_par_lots(self):
+        ids = [ch.idChambre for ch in self.chambres]
+        with mock.patch.object(chambreMetier, "TAILLE_LOT_MASSE", 3):
+            n = modifierChambresEnMasse(
+                FiltreChambresDTO(ids=ids, nom_type=self.types[0]),
+                ChangementsChambresDTO(nom_type=self.types[1], autre_informations="reno"),
+            )
+        self.assertEqual(n, len(ids))
+        ch = catalogue_chambres.chambre_par_numero(NUMEROS[-1])
+        self.assertEqual((ch.type_chambre.nom_type, ch.autre_informations), (self.types[1], "reno"))
+        (r,) = rechercherReservation(CriteresRechercheDTO(idUsager=str(self.usager.idUsager)))
+        self.assertEqual(r.chambre.type_chambre.nom_type, self.types[1])
+
+        # Le filtre sur l’ancien type ne correspond plus à rien
+        n = modifierChambresEnMasse(
+            FiltreChambresDTO(ids=ids, nom_type=self.types[0]), ChangementsChambresDTO(nom_type=self.types[0])
+        )
+        self.assertEqual(n, 0)
+        modifierChambresEnMasse(FiltreChambresDTO(ids=ids), ChangementsChambresDTO(nom_type=self.types[0]))
+
+    def test_validation(self):
+        with self.assertRaises(ValueError):
+            FiltreChambresDTO()
+        with self.assertRaises(ValueError):
+            ChangementsChambresDTO()
+        with self.assertRaises(ValueError):
+            modifierChambresEnMasse(
+                FiltreChambresDTO(numero_min=NUMEROS[0]), ChangementsChambresDTO(nom_type="type-absent")
+            )
+
+    def test_api_patch(self):
+        client = TestClient(app)
+        rep = client.patch(
+            "/chambres",
+            json={
+                "filtre": {"numero_min": NUMEROS[8], "numero_max": NUMEROS[9]},
+                "changements": {"autre_informations": "api"},
+            },
+        )
+        self.assertEqual(rep.status_code, 200, rep.text)
+        self.assertEqual(rep.json(), {"nombre": 2})
+        self.assertEqual(client.patch("/chambres", json={"filtre": {}, "changements": {}}).status_code, 422)
+
+
+if __name__ == "__main__":
+    unittest.main()
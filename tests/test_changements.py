@@ -0,0 +1,207 @@
+# ==============================================================
+# tests/test_changements.py
+# Vérifie le journal des changements : une ligne versionnée par
+# écriture du métier (rien après un rollback), lecture par curseur,
+# arrêt avant un trou récent, compaction, rétention (410, aussi
+# quand la purge tourne dans un autre processus) et réveil du
+# long-polling par un commit.
+# ==============================================================
+
+import asyncio
+import os
+import threading
+import time
+import unittest
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func, insert, select, update
+
+from core.db import SessionLocal, init_db
+from DTO.usagerDTO import UsagerCreateDTO, UsagerUpdateDTO
+from main import app
+from metier.changementMetier import (
+    CREATION, MODIFICATION, SUPPRESSION, CurseurExpire,
+    attendreChangements, compacterChangements, journaliser, lireChangements,
+)
+from metier.usagerMetier import creerUsager, modifierUsager, supprimerUsager
+from modele.changement import Changement, ChangementPurge
+
+# Lignes insérées à la main avec des instants très anciens : la
+# compaction et la rétention du test ne touchent pas aux autres lignes
+ANCIEN = datetime(1990, 3, 1)
+MAINTENANT = datetime(1995, 1, 1)
+
+
+def _curseur() -> int:
+    # Dernière séquence attribuée (la rétention a pu retirer la dernière ligne)
+    with SessionLocal() as s:
+        return max(
+            s.scalar(select(func.max(Changement.sequence))) or 0,
+            s.scalar(select(func.max(ChangementPurge.sequence_max))) or 0,
+        )
+
+
+def _dto_usager(nom: str) -> UsagerCreateDTO:
+    return UsagerCreateDTO(
+        prenom="Ch", nom=nom, adresse="1 Rue Ch",
+        mobile="5557700000", mot_de_passe="pwd", type_usager="client",
+    )
+
+
+class TestJournalChangements(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        init_db()
+
+    def _tout_lire(self, depuis: int) -> list:
+        changements = []
+        while True:
+            page = lireChangements(depuis, 2)
+            changements += page.changements
+            depuis = page.curseur
+            if not page.suite:
+                return changements
+
+    def test_versions_et_curseurs(self):
+        depuis = _curseur()
+        u = creerUsager(_dto_usager(f"Ch-{uuid.uuid4()}"))
+        modifierUsager(str(u.idUsager), UsagerUpdateDTO(adresse="2 Rue Ch"))
+        self.assertTrue(supprimerUsager(str(u.idUsager)))
+
+        miens = [c for c in self._tout_lire(depuis) if c.id == u.idUsager]
+        self.assertEqual([(c.entite, c.operation, c.version) for c in miens], [
+            ("usager", CREATION, 1), ("usager", MODIFICATION, 2), ("usager", SUPPRESSION, 3),
+        ])
+        self.assertEqual([c.curseur for c in miens], sorted(c.curseur for c in miens))
+
+        # Le dernier curseur ne renvoie plus rien
+        self.assertEqual(lireChangements(miens[-1].curseur).changements, [])
+
+    def test_upsert_existant_non_journalise(self):
+        nom = f"Ch-{uuid.uuid4()}"
+        u = creerUsager(_dto_usager(nom))
+        depuis = _curseur()
+        self.assertEqual(creerUsager(_dto_usager(nom)).idUsager, u.idUsager)
+        self.assertEqual(_curseur(), depuis)
+        supprimerUsager(str(u.idUsager))
+
+    def test_rien_apres_rollback(self):
+        depuis = _curseur()
+        with SessionLocal() as s:
+            journaliser(s, "usager", MODIFICATION, [uuid.uuid4()])
+            s.rollback()
+        self.assertEqual(lireChangements(depuis).changements, [])
+
+    def test_arret_avant_un_trou_recent(self):
+        depuis = _curseur()
+        id_entite = uuid.uuid4()
+        with SessionLocal() as s:
+            # Séquence depuis + 2 validée, depuis + 1 encore « en cours »
+            s.execute(insert(Changement).values(
+                sequence=depuis + 2, entite="usager", id_entite=id_entite,
+                operation=MODIFICATION, version=1, moment=datetime.now(),
+            ))
+            s.commit()
+        page = lireChangements(depuis)
+        self.assertEqual((page.changements, page.curseur), ([], depuis))
+
+        # Un trou ancien est définitif (rollback) : la ligne devient visible
+        with SessionLocal() as s:
+            s.execute(update(Changement).where(Changement.sequence == depuis + 2).values(moment=ANCIEN))
+            s.commit()
+        page = lireChangements(depuis)
+        self.assertEqual([c.id for c in page.changements], [id_entite])
+        self.assertEqual(page.curseur, depuis + 2)
+
+    def test_compaction_et_retention(self):
+        gardee, supprimee = uuid.uuid4(), uuid.uuid4()
+        with SessionLocal() as s:
+            for version, (id_entite, operation) in enumerate([
+                (gardee, CREATION), (gardee, MODIFICATION), (gardee, MODIFICATION),
+                (supprimee, CREATION), (supprimee, SUPPRESSION),
+            ], start=1):
+                s.execute(insert(Changement).values(
+                    entite="usager", id_entite=id_entite, operation=operation,
+                    version=version, moment=ANCIEN + timedelta(minutes=version),
+                ))
+            s.commit()
+        depuis = _curseur() - 5
+        self.assertEqual(lireChangements(depuis, 10).curseur, depuis + 5)
+
+        resultat = compacterChangements(maintenant=MAINTENANT)
+        self.assertEqual(resultat, {"compactees": 3, "retirees": 1})
+        with SessionLocal() as s:
+            restantes = s.execute(
+                select(Changement.id_entite, Changement.version)
+                .where(Changement.id_entite.in_([gardee, supprimee]))
+            ).all()
+        # Seule la dernière ligne de l’entité encore présente reste
+        self.assertEqual(restantes, [(gardee, 3)])
+
+        # Un curseur antérieur à la purge a manqué une suppression
+        with self.assertRaises(CurseurExpire):
+            lireChangements(depuis)
+        with TestClient(app) as client:
+            self.assertEqual(client.get("/changements", params={"depuis": depuis}).status_code, 410)
+            reponse = client.get("/changements", params={"depuis": _curseur()})
+            self.assertEqual(reponse.status_code, 200)
+            self.assertEqual(reponse.json()["changements"], [])
+
+    def test_retention_par_un_autre_processus(self):
+        supprimee = uuid.uuid4()
+        with SessionLocal() as s:
+            for version, operation in enumerate([CREATION, SUPPRESSION], start=1):
+                s.execute(insert(Changement).values(
+                    entite="usager", id_entite=supprimee, operation=operation,
+                    version=version, moment=ANCIEN + timedelta(minutes=version),
+                ))
+            s.commit()
+        depuis = _curseur() - 2
+        # Lecture déjà faite dans ce processus, avant la purge
+        self.assertEqual(lireChangements(depuis, 10).curseur, depuis + 2)
+
+        # Purge dans un autre processus, comme `python -m metier.changementMetier` (cron)
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                code = 0 if compacterChangements(maintenant=MAINTENANT)["retirees"] == 1 else 1
+            finally:
+                os._exit(code)
+        _, statut = os.waitpid(pid, 0)
+        self.assertEqual(os.waitstatus_to_exitcode(statut), 0)
+
+        with self.assertRaises(CurseurExpire):
+            lireChangements(depuis)
+
+    def test_long_polling_reveille_par_un_commit(self):
+        depuis = _curseur()
+        nom = f"Ch-{uuid.uuid4()}"
+        ecriture = threading.Timer(0.2, creerUsager, [_dto_usager(nom)])
+
+        async def attendre():
+            debut = time.monotonic()
+            ecriture.start()
+            page = await attendreChangements(depuis, 100, attente=5)
+            return page, time.monotonic() - debut
+
+        page, duree = asyncio.run(attendre())
+        ecriture.join()
+        self.assertEqual([c.operation for c in page.changements], [CREATION])
+        # Réveillé par le commit, avant le sondage suivant
+        self.assertLess(duree, 0.9)
+
+        supprimerUsager(str(page.changements[0].id))
+
+    def test_attente_sans_changement(self):
+        depuis = _curseur()
+        debut = time.monotonic()
+        page = asyncio.run(attendreChangements(depuis, 100, attente=0.3))
+        self.assertEqual((page.changements, page.curseur), ([], depuis))
+        self.assertGreaterEqual(time.monotonic() - debut, 0.3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+# ==============================================================
+# tests/test_chargeur_lot.py
+# Vérifie le chargement par lots : les lectures par id simultanées
+# partagent une requête "IN (...)", chaque appelant reçoit sa ligne ;
+# l’échéance dépassée du meneur ne touche pas les autres appelants.
+# ==============================================================
+
+import threading
+import time
+import unittest
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from core.db import init_db
+from core.echeance import DelaiDepasse, avec_echeance, verifier_echeance
+from core.lot import ChargeurParLot
+from DTO.usagerDTO import UsagerCreateDTO
+from metier.chargeurs import chargeur_usagers
+from metier.usagerMetier import creerUsager, supprimerUsager
+from tests.compteur_sql import compter_requetes
+
+NB_THREADS = 20
+
+
+def _en_parallele(fonction, valeurs):
+    depart = threading.Barrier(len(valeurs))
+
+    def appeler(v):
+        depart.wait()
+        try:
+            return fonction(v)
+        except ValueError as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=len(valeurs)) as pool:
+        return list(pool.map(appeler, valeurs))
+
+
+class TestChargeurParLot(unittest.TestCase):
+    def test_lectures_simultanees_regroupees(self):
+        lots = []
+
+        def charger(ids):
+            lots.append(list(ids))
+            return {i: i * 10 for i in ids if i % 2 == 0}
+
+        chargeur = ChargeurParLot(charger, fenetre=0.05)
+        resultats = _en_parallele(chargeur.charger, list(range(NB_THREADS)))
+        self.assertEqual(resultats, [i * 10 if i % 2 == 0 else None for i in range(NB_THREADS)])
+        self.assertLess(len(lots), NB_THREADS)
+        self.assertEqual(sorted(i for lot in lots for i in lot), list(range(NB_THREADS)))
+        stats = chargeur.statistiques()
+        self.assertEqual(stats["demandes"], NB_THREADS)
+        self.assertEqual(stats["lots"], len(lots))
+
+    def test_taille_max_coupe_les_lots(self):
+        lots = []
+        chargeur = ChargeurParLot(lambda ids: lots.append(ids) or {}, fenetre=0.5, taille_max=5)
+        _en_parallele(chargeur.charger, list(range(NB_THREADS)))
+        self.assertTrue(all(len(lot) <= 5 for lot in lots))
+        self.assertGreaterEqual(len(lots), NB_THREADS // 5)
+
+    def test_erreur_partagee_par_le_lot(self):
+        def charger(ids):
+            raise ValueError("BD indisponible")
+
+        chargeur = ChargeurParLot(charger, fenetre=0.05)
+        resultats = _en_parallele(chargeur.charger, list(range(NB_THREADS)))
+        self.assertTrue(all(isinstance(r, ValueError) for r in resultats))
+
+    def test_echeance_du_meneur_non_partagee(self):
+        lots, erreurs = [], []
+
+        def charger(ids):
+            lots.append(list(ids))
+            time.sleep(0.05)
+            verifier_echeance()
+            return {i: i * 10 for i in ids}
+
+        chargeur = ChargeurParLot(charger, fenetre=0.05)
+
+        def meneur():
+            with avec_echeance(0.02):
+                try:
+                    chargeur.charger(1)
+                except DelaiDepasse as e:
+                    erreurs.append(e)
+
+        fil = threading.Thread(target=meneur)
+        fil.start()
+        while chargeur._courant is None:
+            time.sleep(0.001)
+        # Rejoint le lot du meneur, puis un nouveau lot après son dépassement
+        self.assertEqual(chargeur.charger(2), 20)
+        fil.join()
+        self.assertEqual(len(erreurs), 1)
+        self.assertEqual(lots, [[1, 2], [2]])
+
+    def test_fenetre_nulle_sans_regroupement(self):
+        lots = []
+        chargeur = ChargeurParLot(lambda ids: lots.append(ids) or {}, fenetre=0)
+        _en_parallele(chargeur.charger, list(range(5)))
+        self.assertEqual(len(lots), 5)
+
+
+class TestChargeurUsagers(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        init_db()
+        cls.usagers = [
+            creerUsager(
+                UsagerCreateDTO(
+                    prenom="Lot",
+                    nom=f"Lot-{uuid.uuid4()}",
+                    adresse="1 Rue Lot",
+                    mobile=f"559{i:06d}",
+                    mot_de_passe="pwd",
+                    type_usager="client",
+                )
+            )
+            for i in range(8)
+        ]
+
+    @classmethod
+    def tearDownClass(cls):
+        for u in cls.usagers:
+            supprimerUsager(str(u.idUsager))
+
+    def test_une_requete_in_pour_le_lot(self):
+        ids = [str(u.idUsager) for u in self.usagers] + [str(uuid.uuid4())]
+        with compter_requetes() as requetes:
+            resultats = _en_parallele(chargeur_usagers.charger, ids)
+        self.assertEqual([r.idUsager for r in resultats[:-1]], [u.idUsager for u in self.usagers])
+        self.assertIsNone(resultats[-1])
+        # Fenêtre de 2 ms : quelques lots au pire, jamais une requête par id
+        self.assertLess(len(requetes), len(ids))
+        self.assertTrue(all(" IN " in r for r in requetes), requetes)
+
+    def test_id_mal_forme(self):
+        with self.assertRaises(ValueError):
+            chargeur_usagers.charger("pas-un-uuid")
+
+
+if __name__ == "__main__":
+    unittest.main()
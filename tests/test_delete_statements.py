@@ -0,0 +1,101 @@
+# ==============================================================
+# tests/test_delete_statements.py
+# Vérifie que les suppressions se font par un DELETE direct :
+# ni l’entité ni ses collections ne sont chargées, le nombre de
+# lignes touchées décide du 404 et un EXISTS donne l’erreur 400.
+# ==============================================================
+
+import unittest
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from core.db import init_db, SessionLocal
+from DTO.chambreDTO import TypeChambreCreateDTO, ChambreCreateDTO
+from DTO.reservationDTO import ReservationDTO
+from DTO.usagerDTO import UsagerCreateDTO
+from metier.chambreMetier import (
+    creerTypeChambre,
+    creerChambre,
+    supprimerChambre,
+    supprimerTypeChambre,
+)
+from metier.reservationMetier import creerReservation, supprimerReservation
+from metier.usagerMetier import creerUsager, supprimerUsager
+from modele.type_chambre import TypeChambre
+from tests.compteur_sql import compter_requetes
+
+
+class TestDeleteStatements(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        init_db()
+
+    def test_suppression_en_cascade_refusee_puis_ok(self):
+        nom_type = f"ds-{uuid.uuid4().hex[:8]}"
+        creerTypeChambre(
+            TypeChambreCreateDTO(nom_type=nom_type, prix_plancher=90.0, description_chambre="delete")
+        )
+        ch = creerChambre(
+            ChambreCreateDTO(numero_chambre=982, disponible_reservation=True, nom_type=nom_type)
+        )
+        u = creerUsager(
+            UsagerCreateDTO(
+                prenom="Ds",
+                nom=f"Ds-{uuid.uuid4()}",
+                adresse="1 Rue Ds",
+                mobile=f"559{uuid.uuid4().hex[:6]}",
+                mot_de_passe="pwd",
+                type_usager="client",
+            )
+        )
+        debut = datetime(2026, 4, 1, 15, 0, 0)
+        r = creerReservation(
+            ReservationDTO(
+                dateDebut=debut,
+                dateFin=debut + timedelta(days=1),
+                prixParJour=99.0,
+                chambre=ch,
+                usager=u,
+            )
+        )
+
+        # Chambre et usager encore référencés : 400 (ValueError), rien de chargé
+        with compter_requetes() as requetes:
+            with self.assertRaises(ValueError):
+                supprimerChambre(str(ch.idChambre))
+        # DELETE gardé par NOT EXISTS + EXISTS de diagnostic
+        self.assertEqual(len(requetes), 2)
+        with self.assertRaises(ValueError):
+            supprimerUsager(str(u.idUsager))
+
+        # Suppressions par id : une seule requête chacune, plus la ligne du
+        # journal des changements (et celle de la vue pour la réservation)
+        with compter_requetes() as requetes:
+            self.assertTrue(supprimerReservation(str(r.idReservation)))
+        self.assertEqual(len(requetes), 3)
+        with compter_requetes() as requetes:
+            self.assertTrue(supprimerUsager(str(u.idUsager)))
+        self.assertEqual(len(requetes), 2)
+        with compter_requetes() as requetes:
+            self.assertTrue(supprimerChambre(str(ch.idChambre)))
+        self.assertEqual(len(requetes), 2)
+
+        # TypeChambreDTO n’expose pas l’id : on le relit directement
+        with SessionLocal() as s:
+            id_type = str(s.execute(
+                select(TypeChambre.id_type_chambre).where(TypeChambre.nom_type == nom_type)
+            ).scalar_one())
+        self.assertTrue(supprimerTypeChambre(id_type))
+
+    def test_suppression_introuvable_retourne_false(self):
+        inconnu = str(uuid.uuid4())
+        self.assertFalse(supprimerReservation(inconnu))
+        self.assertFalse(supprimerUsager(inconnu))
+        self.assertFalse(supprimerChambre(inconnu))
+        self.assertFalse(supprimerTypeChambre(inconnu))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+# ==============================================================
+# tests/test_demarrage.py
+# Vérifie les migrations versionnées (schéma initial figé, base
+# neuve amenée jusqu’aux modèles, base v1 aux prix_plafond texte
+# migrée jusqu’à la dernière version) et le réchauffement au démarrage
+# (lifespan) : pool ouvert, OpenAPI précalculé.
+# ==============================================================
+
+import unittest
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+from fastapi.testclient import TestClient
+from sqlalchemy import MetaData, Numeric, String, Table, create_engine, inspect, select
+from sqlalchemy.pool import StaticPool
+
+from core.db import engine, init_db
+from core.migrations import MIGRATIONS, DERNIERE_VERSION, _v1_schema_initial, migrer, version_courante
+from main import app
+from modele import Base
+
+
+class TestMigrations(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        init_db()
+
+    def test_migrations_a_jour_et_rejouables(self):
+        with engine.connect() as conn:
+            self.assertEqual(version_courante(conn), DERNIERE_VERSION)
+        # Rejouer ne fait rien et ne lève pas d’erreur
+        self.assertEqual(migrer(engine), DERNIERE_VERSION)
+
+    def _base_neuve(self):
+        moteur = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+        self.addCleanup(moteur.dispose)
+        return moteur
+
+    def _base_v1_prix_texte(self):
+        # Base restée à la v1 : une réservation dont le type a un prix_plafond texte
+        moteur = self._base_neuve()
+        id_type, id_chambre, id_usager = (uuid.uuid4().hex for _ in range(3))
+        with moteur.begin() as conn:
+            _v1_schema_initial(conn)
+            for sql, valeurs in (
+                ("INSERT INTO type_chambre VALUES (?, 'v1', 100, '250 $', NULL)", (id_type,)),
+                ("INSERT INTO chambre VALUES (?, 101, 1, NULL, ?)", (id_chambre, id_type)),
+                ("INSERT INTO usager VALUES (?, 'P', 'N', 'A', '555', 'x', 'client')", (id_usager,)),
+                (
+                    "INSERT INTO reservation VALUES (?, ?, ?, 120, NULL, ?, ?)",
+                    (uuid.uuid4().hex, datetime(2024, 1, 1), datetime(2024, 1, 3), id_usager, id_chambre),
+                ),
+            ):
+                conn.exec_driver_sql(sql, valeurs)
+        return moteur
+
+    def test_doublons_avant_contraintes_uniques(self):
+        moteur = self._base_v1_prix_texte()
+        with moteur.begin() as conn:
+            for _ in range(2):
+                conn.exec_driver_sql(
+                    "INSERT INTO usager VALUES (?, 'P', 'N', 'A', '555', 'x', 'client')", (uuid.uuid4().hex,)
+                )
+        with self.assertRaises(RuntimeError) as erreur:
+            migrer(moteur)
+        self.assertIn("usager", str(erreur.exception))
+        self.assertRegex(str(erreur.exception), r"\('N', 'P', '555 *'\) × 3")
+        # Rien n’a été appliqué
+        with moteur.connect() as conn:
+            self.assertEqual(version_courante(conn), 0)
+
+    def test_vue_v4_figee(self):
+        # La v4 recopie prix_plafond tel qu’il est encore à ce stade : du texte
+        moteur = self._base_v1_prix_texte()
+        with moteur.begin() as conn:
+            for _, _, fonction in MIGRATIONS[1:4]:
+                fonction(conn)
+            colonnes = {c["name"]: c["type"] for c in inspect(conn).get_columns("reservation_vue")}
+            self.assertIsInstance(colonnes["prix_plafond"], String)
+            prix = conn.exec_driver_sql("SELECT prix_plafond FROM reservation_vue").scalar_one()
+        self.assertEqual(prix, "250 $")
+
+    def test_prix_texte_jusqu_a_la_derniere_version(self):
+        moteur = self._base_v1_prix_texte()
+        self.assertEqual(migrer(moteur), DERNIERE_VERSION)
+        with moteur.connect() as conn:
+            for table in ("type_chambre", "reservation_vue"):
+                colonnes = {c["name"]: c["type"] for c in inspect(conn).get_columns(table)}
+                self.assertIsInstance(colonnes["prix_plafond"], Numeric, table)
+                prix = conn.execute(select(Table(table, MetaData(), autoload_with=conn).c.prix_plafond))
+                self.assertEqual(prix.scalar_one(), Decimal("250.00"), table)
+
+    def test_schema_initial_fige(self):
+        # La v1 ne suit pas les modèles : prix_plafond encore en texte, sans contrainte UNIQUE
+        moteur = self._base_neuve()
+        with moteur.begin() as conn:
+            _v1_schema_initial(conn)
+            insp = inspect(conn)
+            self.assertEqual(set(insp.get_table_names()), {"type_chambre", "chambre", "usager", "reservation"})
+            colonnes = {c["name"]: c["type"] for c in insp.get_columns("type_chambre")}
+            self.assertIsInstance(colonnes["prix_plafond"], String)
+            self.assertEqual(insp.get_unique_constraints("type_chambre"), [])
+
+    def test_base_neuve_jusqu_aux_modeles(self):
+        moteur = self._base_neuve()
+        self.assertEqual(migrer(moteur), DERNIERE_VERSION)
+        insp = inspect(moteur)
+        for table in Base.metadata.sorted_tables:
+            colonnes = {c["name"]: c["type"] for c in insp.get_columns(table.name)}
+            self.assertEqual(set(colonnes), {c.name for c in table.columns}, table.name)
+            index = {i["name"] for i in insp.get_indexes(table.name)}
+            index |= {u["name"] for u in insp.get_unique_constraints(table.name)}
+            uniques = [c for c in table.constraints if c.name and c.name.startswith("uq_")]
+            for attendu in list(table.indexes) + uniques:
+                self.assertIn(attendu.name, index, table.name)
+        self.assertIsInstance(
+            {c["name"]: c["type"] for c in insp.get_columns("type_chambre")}["prix_plafond"], Numeric
+        )
+
+
+class TestDemarrage(unittest.TestCase):
+    def test_lifespan_rechauffe_le_worker(self):
+        app.openapi_schema = None
+        with TestClient(app) as client:
+            # Le schéma OpenAPI est déjà construit avant la première requête
+            self.assertIsNotNone(app.openapi_schema)
+            # Des connexions attendent dans le pool
+            if hasattr(engine.pool, "checkedin"):
+                self.assertGreaterEqual(engine.pool.checkedin(), 1)
+            self.assertEqual(client.get("/health").status_code, 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,163 @@
+# ==============================================================
+# tests/test_echeance.py
+# Vérifie l’échéance par requête : point de contrôle coopératif,
+# instruction SQL annulée avant envoi, délai d’instruction transmis
+# au pilote, 504 du middleware (l’échéance suit la requête jusque
+# dans le pool de threads) et classement des routes de l’API.
+# ==============================================================
+
+import sqlite3
+import time
+import unittest
+
+from fastapi.concurrency import run_in_threadpool
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from core import echeance
+from core.db import SessionLocal, init_db
+from core.echeance import (
+    AVANT_REQUETE,
+    ENTRE_ETAPES,
+    DelaiDepasse,
+    Echeances,
+    StatistiquesEcheances,
+    avec_echeance,
+    verifier_echeance,
+)
+from main import _genre_echeance, app
+
+
+class TestPointDeControle(unittest.TestCase):
+    def test_sans_echeance(self):
+        verifier_echeance()
+        self.assertIsNone(echeance.echeance_restante())
+
+    def test_echeance_depassee(self):
+        with avec_echeance(0) as e:
+            with self.assertRaises(DelaiDepasse) as erreur:
+                verifier_echeance()
+        self.assertEqual(erreur.exception.etape, ENTRE_ETAPES)
+        self.assertEqual(e.depassement, ENTRE_ETAPES)
+        self.assertIsNone(echeance.echeance_courante())
+
+
+class TestPropagationSQL(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        init_db()
+
+    def test_instruction_annulee_avant_envoi(self):
+        with SessionLocal() as s:
+            with avec_echeance(0) as e:
+                with self.assertRaises(DelaiDepasse):
+                    s.execute(text("SELECT 1"))
+            self.assertEqual(e.depassement, AVANT_REQUETE)
+        # Connexion rendue au pool toujours utilisable
+        with SessionLocal() as s:
+            self.assertEqual(s.execute(text("SELECT 1")).scalar(), 1)
+
+    def test_dans_les_temps(self):
+        with SessionLocal() as s, avec_echeance(5) as e:
+            self.assertEqual(s.execute(text("SELECT 1")).scalar(), 1)
+        self.assertIsNone(e.depassement)
+
+    def test_delai_du_pilote(self):
+        class Curseur:
+            timeout = 0
+
+        curseur = Curseur()
+        echeance._appliquer_delai(curseur, 2.3)
+        self.assertEqual(curseur.timeout, 3)
+        echeance._appliquer_delai(curseur, 0.01)
+        self.assertEqual(curseur.timeout, 1)
+        # Sans échéance : aucun délai
+        echeance._appliquer_delai(curseur, None)
+        self.assertEqual(curseur.timeout, 0)
+
+    def test_delai_sur_le_curseur_qui_execute(self):
+        # Comme pyodbc : le curseur copie Connection.timeout à sa création
+        # et garde le délai qu’il a au moment de l’exécution
+        delais = []
+
+        class Curseur(sqlite3.Cursor):
+            timeout = 0
+
+            def execute(self, sql, *args):
+                if sql == "SELECT 1":
+                    delais.append(self.timeout)
+                return super().execute(sql, *args)
+
+        class Connexion(sqlite3.Connection):
+            timeout = 0
+
+            def cursor(self, factory=Curseur):
+                curseur = super().cursor(factory)
+                curseur.timeout = self.timeout
+                return curseur
+
+        moteur = create_engine(
+            "sqlite://", creator=lambda: sqlite3.connect(":memory:", factory=Connexion), poolclass=StaticPool
+        )
+        echeance.installer(moteur)
+        try:
+            with moteur.connect() as c:
+                with avec_echeance(2.3):
+                    c.execute(text("SELECT 1"))
+                c.execute(text("SELECT 1"))
+        finally:
+            moteur.dispose()
+        self.assertEqual(delais, [3, 0])
+
+
+class TestMiddleware(unittest.TestCase):
+    def setUp(self):
+        self.stats = StatistiquesEcheances()
+        self._stats, echeance.statistiques_echeances = echeance.statistiques_echeances, self.stats
+
+        def etapes():
+            time.sleep(0.05)
+            verifier_echeance()
+
+        async def application(scope, receive, send):
+            await run_in_threadpool(etapes)
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"ok"})
+
+        self.client = TestClient(Echeances(application, genre=lambda m, c: echeance.LECTURE))
+
+    def tearDown(self):
+        echeance.statistiques_echeances = self._stats
+
+    def test_504_hors_delai(self):
+        reponse = self.client.get("/x", headers={"X-Timeout-Ms": "10"})
+        self.assertEqual(reponse.status_code, 504)
+        self.assertEqual(reponse.json()["etape"], ENTRE_ETAPES)
+        # Délai par défaut de la route : dans les temps
+        self.assertEqual(self.client.get("/x").status_code, 200)
+
+        stats = self.stats.statistiques()
+        self.assertEqual(stats["requetes"], {echeance.LECTURE: 2})
+        self.assertEqual(stats["delai_fixe_par_entete"], 1)
+        self.assertEqual(stats["depassements"], {echeance.LECTURE: {ENTRE_ETAPES: 1}})
+
+
+class TestRoutes(unittest.TestCase):
+    def test_genres(self):
+        self.assertEqual(_genre_echeance("POST", "/rechercherReservation"), echeance.RECHERCHE)
+        self.assertEqual(_genre_echeance("GET", "/chambres"), echeance.LECTURE)
+        self.assertEqual(_genre_echeance("POST", "/reservations"), echeance.ECRITURE)
+        self.assertEqual(_genre_echeance("PATCH", "/chambres"), echeance.MASSE)
+        self.assertEqual(_genre_echeance("POST", "/reservations/annulationMasse"), echeance.MASSE)
+        for methode, chemin in (("POST", "/import/usagers"), ("GET", "/flux/chambres"), ("GET", "/health")):
+            self.assertIsNone(_genre_echeance(methode, chemin), chemin)
+
+    def test_statistiques(self):
+        reponse = TestClient(app).get("/admin/echeances")
+        self.assertEqual(reponse.status_code, 200)
+        self.assertIn("depassements", reponse.json())
+
+
+if __name__ == "__main__":
+    unittest.main()
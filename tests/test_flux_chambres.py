@@ -0,0 +1,204 @@
+# ==============================================================
+# tests/test_flux_chambres.py
+# Vérifie le flux des chambres (SSE) : diffusion à plusieurs abonnés
+# depuis un autre fil, éviction d’un client lent, reprise avec
+# Last-Event-ID, relais entre workers par le pub/sub partagé, et
+# événements émis par les écritures de chambres et de réservations.
+# ==============================================================
+
+import asyncio
+import json
+import threading
+import unittest
+import uuid
+from datetime import datetime, timedelta
+
+from core.cache import BackendMemoire
+from core.diffusion import TRAME_RESYNCHRONISER, Diffuseur
+from core.taches import file_taches
+from core.db import init_db
+from DTO.chambreDTO import ChambreCreateDTO, ChambreUpdateDTO, TypeChambreCreateDTO
+from DTO.reservationDTO import ReservationDTO
+from DTO.usagerDTO import UsagerCreateDTO
+from main import api_flux_chambres
+from metier.chambreMetier import creerChambre, creerTypeChambre, modifierChambre, supprimerChambre
+from metier.fluxChambres import flux_chambres
+from metier.reservationMetier import creerReservation, supprimerReservation
+from metier.usagerMetier import creerUsager, supprimerUsager
+
+
+def _evenement(trame: bytes) -> dict:
+    lignes = dict(ligne.split(": ", 1) for ligne in trame.decode().strip().split("\n"))
+    return {"id": lignes.get("id"), "type": lignes["event"], "donnees": json.loads(lignes["data"])}
+
+
+async def _lire(abonnement, nombre: int, delai: float = 2.0) -> list:
+    return [await asyncio.wait_for(abonnement.file.get(), delai) for _ in range(nombre)]
+
+
+class TestDiffuseur(unittest.TestCase):
+    def test_diffusion_depuis_un_autre_fil(self):
+        d = Diffuseur("test:flux")
+
+        async def scenario():
+            abonnes = [d.abonner() for _ in range(50)]
+            fil = threading.Thread(target=lambda: [d.publier("test", {"n": n}) for n in range(3)])
+            fil.start()
+            fil.join()
+            recues = [await _lire(a, 3) for a in abonnes]
+            self.assertEqual(d.statistiques()["abonnes"], 50)
+            for a in abonnes:
+                d.desabonner(a)
+            return recues
+
+        recues = asyncio.run(scenario())
+        for trames in recues:
+            self.assertEqual([_evenement(t)["donnees"]["n"] for t in trames], [0, 1, 2])
+        s = d.statistiques()
+        self.assertEqual((s["abonnes"], s["publies"], s["trames_livrees"]), (0, 3, 150))
+
+    def test_client_lent_evince(self):
+        d = Diffuseur("test:flux", taille_tampon=3)
+
+        async def scenario():
+            lent, rapide = d.abonner(), d.abonner()
+            recues_rapide = []
+            for n in range(5):
+                d.publier("test", {"n": n})
+                await asyncio.sleep(0)
+                recues_rapide.append(await _lire(rapide, 1))
+            # Le client lent reçoit resynchroniser, puis son flux se termine
+            trames = [t async for t in lent.trames()]
+            return trames, recues_rapide, d.statistiques()
+
+        trames, recues_rapide, s = asyncio.run(scenario())
+        self.assertEqual(trames, [TRAME_RESYNCHRONISER])
+        self.assertEqual(len(recues_rapide), 5)
+        self.assertEqual((s["evinces"], s["abonnes"]), (1, 1))
+
+    def test_reprise_avec_last_event_id(self):
+        d = Diffuseur("test:flux")
+
+        async def scenario():
+            a = d.abonner()
+            d.publier("test", {"n": 0})
+            dernier = _evenement((await _lire(a, 1))[0])["id"]
+            d.desabonner(a)
+
+            # Manquées pendant la déconnexion, renvoyées à la reconnexion
+            d.publier("test", {"n": 1})
+            d.publier("test", {"n": 2})
+            reprise = d.abonner(dernier)
+            trames = await _lire(reprise, 2)
+            d.publier("test", {"n": 3})
+            trames += await _lire(reprise, 1)
+
+            # Identifiant inconnu (autre worker, redémarrage) : resynchroniser
+            inconnu = d.abonner("autre-worker.12")
+            return trames, await _lire(inconnu, 1)
+
+        trames, inconnu = asyncio.run(scenario())
+        self.assertEqual([_evenement(t)["donnees"]["n"] for t in trames], [1, 2, 3])
+        self.assertEqual(inconnu, [TRAME_RESYNCHRONISER])
+
+    def test_relais_entre_workers(self):
+        backend = BackendMemoire()
+        worker_a, worker_b = Diffuseur("test:flux", backend), Diffuseur("test:flux", backend)
+
+        async def scenario():
+            a, b = worker_a.abonner(), worker_b.abonner()
+            worker_a.publier("test", {"n": 1})
+            await asyncio.to_thread(file_taches.vider)
+            return await _lire(a, 1), await _lire(b, 1)
+
+        recue_a, recue_b = asyncio.run(scenario())
+        self.assertEqual(_evenement(recue_a[0])["donnees"], {"n": 1})
+        self.assertEqual(_evenement(recue_b[0])["donnees"], {"n": 1})
+        self.assertEqual(worker_a.statistiques()["recus_distants"], 0)
+        self.assertEqual(worker_b.statistiques()["recus_distants"], 1)
+
+
+class TestEvenementsDuMetier(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        init_db()
+        nom_type = f"fl-{uuid.uuid4().hex[:8]}"
+        creerTypeChambre(TypeChambreCreateDTO(nom_type=nom_type, prix_plancher=60.0))
+        cls.chambre = creerChambre(
+            ChambreCreateDTO(numero_chambre=7701, disponible_reservation=True, nom_type=nom_type)
+        )
+        cls.usager = creerUsager(
+            UsagerCreateDTO(
+                prenom="Fl", nom=f"Fl-{uuid.uuid4()}", adresse="1 Rue Fl",
+                mobile="5557700000", mot_de_passe="pwd", type_usager="client",
+            )
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        supprimerUsager(str(cls.usager.idUsager))
+        supprimerChambre(str(cls.chambre.idChambre))
+
+    def test_disponibilite_et_occupation(self):
+        id_chambre = str(self.chambre.idChambre)
+        debut = datetime(2034, 2, 1)
+
+        def ecrire():
+            modifierChambre(id_chambre, ChambreUpdateDTO(disponible_reservation=False))
+            modifierChambre(id_chambre, ChambreUpdateDTO(disponible_reservation=True))
+            r = creerReservation(
+                ReservationDTO(
+                    dateDebut=debut, dateFin=debut + timedelta(days=2), prixParJour=70.0,
+                    chambre=self.chambre, usager=self.usager,
+                )
+            )
+            supprimerReservation(str(r.idReservation))
+            return r.idReservation
+
+        async def scenario():
+            a = flux_chambres.abonner()
+            try:
+                id_reservation = await asyncio.to_thread(ecrire)
+                return id_reservation, [_evenement(t) for t in await _lire(a, 4)]
+            finally:
+                flux_chambres.desabonner(a)
+
+        id_reservation, evenements = asyncio.run(scenario())
+        self.assertEqual([(e["type"], e["donnees"]["operation"]) for e in evenements], [
+            ("chambres", "modification"), ("chambres", "modification"),
+            ("reservations", "creation"), ("reservations", "suppression"),
+        ])
+        self.assertEqual(
+            [e["donnees"]["chambres"][0]["disponible_reservation"] for e in evenements[:2]], [False, True]
+        )
+        # La suppression retourne la chambre et les dates (DELETE ... RETURNING)
+        annulee = evenements[3]["donnees"]["reservations"][0]
+        self.assertEqual(
+            (annulee["idReservation"], annulee["idChambre"], annulee["dateDebut"]),
+            (str(id_reservation), id_chambre, debut.isoformat()),
+        )
+
+    def test_route_sse(self):
+        async def scenario():
+            reponse = await api_flux_chambres(last_event_id=None)
+            corps = reponse.body_iterator
+            premiere = await corps.__anext__()
+            abonnes = flux_chambres.statistiques()["abonnes"]
+            await asyncio.to_thread(
+                modifierChambre, str(self.chambre.idChambre), ChambreUpdateDTO(autre_informations="vue mer")
+            )
+            evenement = _evenement(await asyncio.wait_for(corps.__anext__(), 2))
+            await corps.aclose()
+            return reponse, premiere, abonnes, evenement
+
+        reponse, premiere, abonnes, evenement = asyncio.run(scenario())
+        self.assertEqual(reponse.media_type, "text/event-stream")
+        self.assertEqual(premiere, b"retry: 3000\n\n")
+        self.assertGreaterEqual(abonnes, 1)
+        self.assertEqual(evenement["donnees"]["chambres"][0]["autre_informations"], "vue mer")
+        # Fermeture du flux : l’abonné est retiré
+        self.assertEqual(flux_chambres.statistiques()["abonnes"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
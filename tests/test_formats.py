@@ -0,0 +1,163 @@
+# ==============================================================
+# tests/test_formats.py
+# Vérifie la négociation du format des listes (en-tête Accept),
+# le JSON en colonnes (aller-retour, codage par dictionnaire) et
+# les routes GET /chambres et POST /rechercherReservation.
+# MessagePack et Arrow : seulement si leur paquet est installé.
+# ==============================================================
+
+import unittest
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from core import formats
+from core.db import init_db
+from core.formats import ARROW, COLONNES, JSON, MSGPACK, FormatNonDisponible, negocier
+from DTO.chambreDTO import ChambreCreateDTO, TypeChambreCreateDTO
+from DTO.reservationDTO import ReservationDTO
+from DTO.usagerDTO import UsagerCreateDTO
+from main import app
+from metier.chambreMetier import creerChambre, creerTypeChambre, supprimerChambre
+from metier.reservationMetier import creerReservation, supprimerReservation
+from metier.usagerMetier import creerUsager, supprimerUsager
+
+DEBUT = datetime(2036, 5, 1)
+
+
+class TestNegociation(unittest.TestCase):
+    def test_par_defaut_json(self):
+        for accept in (None, "", "*/*", "application/*", "application/json", "text/html, */*;q=0.1"):
+            self.assertEqual(negocier(accept), JSON, accept)
+
+    def test_qualite(self):
+        self.assertEqual(negocier(f"application/json;q=0.5, {COLONNES}"), COLONNES)
+        self.assertEqual(negocier(f"{COLONNES};q=0.2, application/json;q=0.9"), JSON)
+        # À qualité égale, l’ordre de l’en-tête
+        self.assertEqual(negocier(f"{COLONNES}, application/json"), COLONNES)
+        self.assertEqual(negocier(f"{COLONNES};q=0, application/json"), JSON)
+
+    def test_aucun_format_disponible(self):
+        with self.assertRaises(FormatNonDisponible):
+            negocier("text/csv")
+
+    @unittest.skipIf(formats._msgpack is not None, "msgpack installé")
+    def test_msgpack_absent(self):
+        with self.assertRaises(FormatNonDisponible):
+            negocier(MSGPACK)
+        self.assertEqual(negocier(f"{MSGPACK}, application/json;q=0.5"), JSON)
+
+
+class TestColonnes(unittest.TestCase):
+    lignes = [
+        {"id": 1, "type": {"nom": "Double", "prix": 100.0}, "info": None},
+        {"id": 2, "type": {"nom": "Suite", "prix": 250.0}, "info": "vue mer"},
+        {"id": 3, "type": {"nom": "Double", "prix": 100.0}, "info": None},
+        {"id": 4, "type": None, "info": None},
+    ]
+
+    def test_aller_retour(self):
+        document = formats.encoder_colonnes(self.lignes)
+        self.assertEqual(document["lignes"], 4)
+        self.assertEqual(set(document["colonnes"]), {"id", "type.nom", "type.prix", "info"})
+        self.assertEqual(document["colonnes"]["id"], [1, 2, 3, 4])
+        attendues = [dict(l, type=l["type"] or {"nom": None, "prix": None}) for l in self.lignes]
+        self.assertEqual(formats.lignes_depuis_colonnes(document), attendues)
+
+    def test_codage_par_dictionnaire(self):
+        colonnes = formats.encoder_colonnes(self.lignes)["colonnes"]
+        self.assertEqual(colonnes["type.nom"], {"dictionnaire": ["Double", "Suite"], "indices": [0, 1, 0, None]})
+        # Valeurs presque toutes distinctes : tableau simple
+        distinctes = formats.encoder_colonnes([{"nom": f"n{i}"} for i in range(4)])["colonnes"]
+        self.assertEqual(distinctes["nom"], ["n0", "n1", "n2", "n3"])
+
+    def test_liste_vide(self):
+        self.assertEqual(formats.encoder_colonnes([]), {"lignes": 0, "colonnes": {}})
+
+
+class TestRoutes(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        init_db()
+        cls.client = TestClient(app)
+        cls.nom_type = f"fm-{uuid.uuid4().hex[:8]}"
+        creerTypeChambre(TypeChambreCreateDTO(nom_type=cls.nom_type, prix_plancher=70.0))
+        cls.chambres = [
+            creerChambre(ChambreCreateDTO(numero_chambre=n, disponible_reservation=True, nom_type=cls.nom_type))
+            for n in (7901, 7902, 7903)
+        ]
+        cls.usager = creerUsager(
+            UsagerCreateDTO(
+                prenom="Fm", nom=f"Fm-{uuid.uuid4()}", adresse="1 Rue Fm",
+                mobile="5557900000", mot_de_passe="pwd", type_usager="client",
+            )
+        )
+        cls.reservations = [
+            creerReservation(
+                ReservationDTO(
+                    dateDebut=DEBUT, dateFin=DEBUT + timedelta(days=2), prixParJour=90.0,
+                    chambre=chambre, usager=cls.usager,
+                )
+            )
+            for chambre in cls.chambres
+        ]
+
+    @classmethod
+    def tearDownClass(cls):
+        for r in cls.reservations:
+            supprimerReservation(str(r.idReservation))
+        supprimerUsager(str(cls.usager.idUsager))
+        for chambre in cls.chambres:
+            supprimerChambre(str(chambre.idChambre))
+
+    def test_chambres_en_colonnes(self):
+        reponse = self.client.get("/chambres", params={"type": self.nom_type}, headers={"Accept": COLONNES})
+        self.assertEqual(reponse.status_code, 200)
+        self.assertEqual(reponse.headers["content-type"], COLONNES)
+        self.assertIn("Accept", reponse.headers["vary"])
+        document = reponse.json()
+        self.assertEqual(document["colonnes"]["type_chambre.nom_type"]["dictionnaire"], [self.nom_type])
+        # Mêmes lignes que la réponse JSON
+        lignes = self.client.get("/chambres", params={"type": self.nom_type}).json()
+        self.assertEqual(formats.lignes_depuis_colonnes(document), lignes)
+
+    def test_recherche_en_colonnes_avec_projection(self):
+        reponse = self.client.post(
+            "/rechercherReservation",
+            params={"fields": "dateDebut,chambre.numero_chambre"},
+            json={"idUsager": str(self.usager.idUsager), "total": True},
+            headers={"Accept": COLONNES},
+        )
+        self.assertEqual(reponse.status_code, 200)
+        self.assertEqual(reponse.headers["x-total-count"], "3")
+        colonnes = reponse.json()["colonnes"]
+        self.assertEqual(
+            set(colonnes), {"idReservation", "dateDebut", "chambre.idChambre", "chambre.numero_chambre"}
+        )
+        self.assertEqual(sorted(colonnes["chambre.numero_chambre"]), [7901, 7902, 7903])
+
+    def test_format_inconnu_406(self):
+        reponse = self.client.get("/chambres", headers={"Accept": "text/csv"})
+        self.assertEqual(reponse.status_code, 406)
+        self.assertIn(COLONNES, reponse.json()["detail"])
+
+    @unittest.skipIf(formats._msgpack is None, "msgpack non installé")
+    def test_msgpack(self):
+        reponse = self.client.get("/chambres", params={"type": self.nom_type}, headers={"Accept": MSGPACK})
+        self.assertEqual(reponse.headers["content-type"], MSGPACK)
+        lignes = formats._msgpack.unpackb(reponse.content)
+        self.assertEqual(sorted(l["numero_chambre"] for l in lignes), [7901, 7902, 7903])
+        self.assertEqual(lignes[0]["type_chambre"]["nom_type"], self.nom_type)
+
+    @unittest.skipIf(formats._pyarrow is None, "pyarrow non installé")
+    def test_arrow(self):
+        reponse = self.client.get("/chambres", params={"type": self.nom_type}, headers={"Accept": ARROW})
+        self.assertEqual(reponse.headers["content-type"], ARROW)
+        table = formats._pyarrow.ipc.open_stream(reponse.content).read_all()
+        self.assertEqual(sorted(table.column("numero_chambre").to_pylist()), [7901, 7902, 7903])
+        self.assertTrue(formats._pyarrow.types.is_dictionary(table.schema.field("type_chambre.nom_type").type))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,253 @@
+# ==============================================================
+# tests/test_importation.py
+# Vérifie l’import en masse : lecture d’un flux coupé n’importe où,
+# validation par lots (règles des DTO), doublons d’usagers, résolution
+# des références des réservations, fichier de rejets, reprise après
+# une interruption et routes POST /import/... (corps en flux).
+# ==============================================================
+
+import json
+import os
+import tempfile
+import unittest
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from core.db import SessionLocal, init_db
+from DTO.chambreDTO import ChambreCreateDTO, TypeChambreCreateDTO
+from DTO.reservationDTO import CriteresAnnulationDTO, CriteresRechercheDTO
+from DTO.usagerDTO import UsagerCreateDTO
+from main import app
+from metier.chambreMetier import creerChambre, creerTypeChambre, supprimerChambre
+from metier.importation import (
+    CSV,
+    INTERROMPU,
+    NDJSON,
+    ImportInterrompu,
+    ImportInvalide,
+    getImportation,
+    importerReservations,
+    importerUsagers,
+    lignes_texte,
+)
+from metier.reservationMetier import annulerReservationsEnMasse, rechercherReservation
+from metier.usagerMetier import creerUsager, supprimerUsager
+from modele.usager import Usager
+from tests.compteur_sql import compter_requetes
+
+
+def _morceaux(texte: str, taille: int = 7):
+    # Coupures arbitraires : au milieu des lignes et des caractères accentués
+    octets = texte.encode()
+    return [octets[i:i + taille] for i in range(0, len(octets), taille)]
+
+
+def _rejets(chemin: str) -> list:
+    with open(chemin, encoding="utf-8") as f:
+        return [json.loads(ligne) for ligne in f]
+
+
+class TestLecture(unittest.TestCase):
+    def test_lignes_coupees(self):
+        texte = "prénom,nom\r\nÉlodie,Côté\nZoé,\"Lé\nvesque\"\n"
+        self.assertEqual("".join(lignes_texte(_morceaux(texte, 3))), texte)
+        self.assertEqual(list(lignes_texte([b"a\nb"])), ["a\n", "b"])
+        # Marque d’ordre des octets (export Excel) retirée
+        self.assertEqual(list(lignes_texte(["﻿a\n".encode()])), ["a\n"])
+
+
+class _AvecDonnees(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        init_db()
+        cls.prefixe = f"Im-{uuid.uuid4().hex[:8]}"
+        cls.dossier = tempfile.TemporaryDirectory()
+
+    @classmethod
+    def tearDownClass(cls):
+        with SessionLocal() as s:
+            ids = s.scalars(select(Usager.id_usager).where(Usager.nom.like(f"{cls.prefixe}%"))).all()
+        for id_usager in ids:
+            try:
+                annulerReservationsEnMasse(CriteresAnnulationDTO(idUsager=id_usager))
+            except ValueError:
+                pass
+            supprimerUsager(str(id_usager))
+        cls.dossier.cleanup()
+
+    def _chemin(self, nom: str) -> str:
+        return os.path.join(self.dossier.name, nom)
+
+    def _nombre_usagers(self, motif: str) -> int:
+        with SessionLocal() as s:
+            return s.scalar(select(func.count()).where(Usager.nom.like(f"{self.prefixe}-{motif}")))
+
+    def _csv_usagers(self, nombre: int, depart: int = 0) -> str:
+        lignes = ["prenom,nom,adresse,mobile,mot_de_passe,type_usager"]
+        lignes += [
+            f"Prénom{i},{self.prefixe}-{i},\"{i} rue Principale, app. 2\",555{i:07d},pwd,client"
+            for i in range(depart, depart + nombre)
+        ]
+        return "\n".join(lignes) + "\n"
+
+
+class TestImportUsagers(_AvecDonnees):
+    def test_validation_doublons_et_rejets(self):
+        existant = creerUsager(UsagerCreateDTO(
+            prenom="Déjà", nom=f"{self.prefixe}-existant", adresse="1 rue", mobile="5551112222",
+            mot_de_passe="pwd", type_usager="client",
+        ))
+        texte = (
+            "prenom,nom,adresse,mobile,mot_de_passe,type_usager\n"
+            f"Ana,{self.prefixe}-a,1 rue A,5550000001,pwd,client\n"
+            f"Ana,{self.prefixe}-a,1 rue A,5550000001,pwd,client\n"          # doublon du fichier
+            f"Déjà,{self.prefixe}-existant,1 rue,5551112222,pwd,client\n"    # déjà en base
+            f"Bob,{self.prefixe}-b,1 rue B,,pwd,client\n"                     # mobile vide
+            f"Cy,{self.prefixe}-c,1 rue C,55500000000000000000,pwd,client\n"  # mobile trop long
+            f"Dan,{self.prefixe}-d,1 rue D,5550000004,pwd,client,en trop\n"
+            f"Éva,{self.prefixe}-e,\"1 rue E,\nbureau 3\",5550000005,pwd,client\n"
+        )
+        chemin = self._chemin("usagers.rejets.ndjson")
+        r = importerUsagers(_morceaux(texte), CSV, chemin_rejets=chemin, taille_lot=2)
+
+        self.assertEqual((r.etat, r.traites, r.inseres, r.existants, r.rejetes), ("termine", 7, 2, 2, 3))
+        # Noms d’une lettre : a (une seule fois) et e ; l’existant n’est pas recréé
+        self.assertEqual(self._nombre_usagers("_"), 2)
+        self.assertEqual(self._nombre_usagers("existant"), 1)
+        rejets = _rejets(chemin)
+        self.assertEqual([(x["enregistrement"], x["ligne"]) for x in rejets], [(4, 5), (5, 6), (6, 7)])
+        self.assertEqual(rejets[0]["erreurs"], ["mobile : Field required"])
+        self.assertIn("mobile", rejets[1]["erreurs"][0])
+        self.assertEqual(rejets[2]["erreurs"], ["Plus de valeurs que de colonnes."])
+        self.assertEqual(rejets[2]["donnees"]["(surplus)"], ["en trop"])
+        supprimerUsager(str(existant.idUsager))
+
+    def test_colonnes_manquantes(self):
+        with self.assertRaisesRegex(ImportInvalide, "mobile, mot_de_passe"):
+            importerUsagers([b"prenom,nom,adresse,type_usager\n"], CSV, chemin_rejets=self._chemin("x"))
+
+    def test_requetes_par_lot(self):
+        # Requêtes constantes par lot : une lecture des doublons, un executemany,
+        # le journal, le point de reprise (et la création / fin de l’import)
+        with compter_requetes() as petit:
+            importerUsagers(_morceaux(self._csv_usagers(5, 100)), CSV, chemin_rejets=self._chemin("p"), taille_lot=50)
+        with compter_requetes() as grand:
+            importerUsagers(_morceaux(self._csv_usagers(50, 200)), CSV, chemin_rejets=self._chemin("g"), taille_lot=50)
+        self.assertEqual(len(petit), len(grand))
+
+    def test_reprise_apres_interruption(self):
+        texte = self._csv_usagers(10, 300).replace(f"{self.prefixe}-304,", ",")  # un rejet dans le 3e lot
+        chemin = self._chemin("reprise.rejets.ndjson")
+        id_import = uuid.uuid4()
+
+        def coupe():
+            # Le flux s’interrompt au milieu du 4e lot (enregistrements 7 à 8)
+            lignes = texte.splitlines(keepends=True)
+            for ligne in lignes[:8]:
+                yield ligne.encode()
+            raise ConnectionError("connexion perdue")
+
+        with self.assertRaises(ImportInterrompu) as ctx:
+            importerUsagers(coupe(), CSV, id_import, chemin, taille_lot=2)
+        self.assertEqual(ctx.exception.traites, 6)
+        etat = getImportation(id_import)
+        self.assertEqual((etat.etat, etat.traites, etat.inseres, etat.rejetes), (INTERROMPU, 6, 5, 1))
+
+        # Rejet écrit pour un lot jamais validé (arrêt avant son commit) : retiré à la reprise
+        with open(chemin, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"enregistrement": 7, "ligne": 8, "erreurs": ["fantôme"], "donnees": {}}) + "\n")
+
+        # Reprise avec le fichier complet : les 6 premiers sont sautés
+        r = importerUsagers(_morceaux(texte), CSV, id_import, chemin, taille_lot=2)
+        self.assertEqual((r.etat, r.traites, r.inseres, r.existants, r.rejetes), ("termine", 10, 9, 0, 1))
+        self.assertEqual([x["enregistrement"] for x in _rejets(chemin)], [5])
+
+        # Import déjà terminé : rien n’est refait
+        with compter_requetes() as requetes:
+            deja = importerUsagers(_morceaux(texte), CSV, id_import, chemin)
+        self.assertEqual(deja, r)
+        self.assertFalse([q for q in requetes if q.lstrip().upper().startswith("INSERT")])
+
+
+class TestImportReservations(_AvecDonnees):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        nom_type = f"im-{uuid.uuid4().hex[:8]}"
+        creerTypeChambre(TypeChambreCreateDTO(nom_type=nom_type, prix_plancher=60.0))
+        cls.chambre = creerChambre(ChambreCreateDTO(numero_chambre=7501, disponible_reservation=True, nom_type=nom_type))
+        cls.usager = creerUsager(UsagerCreateDTO(
+            prenom="Rés", nom=f"{cls.prefixe}-r", adresse="1 rue R", mobile="5557500000",
+            mot_de_passe="pwd", type_usager="client",
+        ))
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        supprimerChambre(str(cls.chambre.idChambre))
+
+    def test_references_et_vue(self):
+        u, ch = self.usager, self.chambre
+        lignes = [
+            {"dateDebut": "2037-01-01T14:00", "dateFin": "2037-01-03T11:00", "prixParJour": 99.5,
+             "idUsager": str(u.idUsager), "numeroChambre": 7501},
+            {"dateDebut": "2037-02-01", "dateFin": "2037-02-04", "prixParJour": 80,
+             "nom": u.nom, "prenom": u.prenom, "mobile": u.mobile, "idChambre": str(ch.idChambre),
+             "infoReservation": "lit bébé"},
+            {"dateDebut": "2037-03-05", "dateFin": "2037-03-01", "prixParJour": 80,
+             "idUsager": str(u.idUsager), "numeroChambre": 7501},
+            {"dateDebut": "2037-04-01", "dateFin": "2037-04-02", "prixParJour": 80,
+             "nom": "Inconnu", "prenom": "X", "mobile": "000", "numeroChambre": 999999},
+        ]
+        texte = "\n".join(json.dumps(x) for x in lignes) + "\n\n{pas du json\n"
+        chemin = self._chemin("reservations.rejets.ndjson")
+        r = importerReservations(_morceaux(texte, 11), NDJSON, chemin_rejets=chemin)
+
+        self.assertEqual((r.traites, r.inseres, r.rejetes), (5, 2, 3))
+        rejets = _rejets(chemin)
+        self.assertEqual([x["ligne"] for x in rejets], [3, 4, 6])
+        self.assertEqual(rejets[0]["erreurs"], ["La date de fin doit être après la date de début."])
+        self.assertEqual(rejets[1]["erreurs"], ["Usager introuvable.", "Chambre introuvable."])
+        self.assertTrue(rejets[2]["erreurs"][0].startswith("JSON invalide"))
+
+        # Réservations lisibles par la recherche (vue dénormalisée tenue à jour)
+        trouvees = rechercherReservation(CriteresRechercheDTO(idUsager=str(u.idUsager)))
+        self.assertEqual([(t.prixParJour, t.chambre.numero_chambre) for t in trouvees], [(99.5, 7501), (80.0, 7501)])
+        self.assertEqual(trouvees[1].infoReservation, "lit bébé")
+
+
+class TestRoutesImport(_AvecDonnees):
+    def setUp(self):
+        self.client = TestClient(app)
+
+    def test_import_csv_en_flux(self):
+        texte = self._csv_usagers(3, 400) + f"Zed,{self.prefixe}-z,1 rue Z,,pwd,client\n"
+        reponse = self.client.post(
+            "/import/usagers",
+            params={"lot": 2},
+            content=iter(_morceaux(texte, 16)),
+            headers={"Content-Type": "text/csv; charset=utf-8"},
+        )
+        self.assertEqual(reponse.status_code, 200, reponse.text)
+        corps = reponse.json()
+        self.assertEqual((corps["inseres"], corps["rejetes"]), (3, 1))
+
+        etat = self.client.get(f"/import/{corps['idImport']}").json()
+        self.assertEqual(etat, corps)
+        rejets = self.client.get(f"/import/{corps['idImport']}/rejets")
+        self.assertEqual(rejets.headers["content-type"], "application/x-ndjson")
+        self.assertEqual(json.loads(rejets.text)["enregistrement"], 4)
+
+    def test_erreurs(self):
+        reponse = self.client.post("/import/usagers", content=b"{}", headers={"Content-Type": "application/xml"})
+        self.assertEqual(reponse.status_code, 415)
+        reponse = self.client.post("/import/usagers", content=b"nom\nx\n", headers={"Content-Type": "text/csv"})
+        self.assertEqual(reponse.status_code, 400)
+        self.assertIn("Colonnes manquantes", reponse.json()["detail"])
+        self.assertEqual(self.client.get(f"/import/{uuid.uuid4()}").status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+# ==============================================================
+# tests/test_memoire_partagee.py
+# Vérifie le mode multi-processus : segment de mémoire partagée,
+# catalogue des chambres partagé entre workers (invalidations d’un
+# voisin ou d’un autre serveur, segment trop petit) et pool SQL
+# neuf dans un processus forké.
+# ==============================================================
+
+import os
+import unittest
+import uuid
+from decimal import Decimal
+
+from sqlalchemy import select
+
+from core.cache import cache_metier
+from core.db import engine, init_db, SessionLocal
+from core.memoire_partagee import SegmentPartage
+from metier.catalogueChambre import CatalogueChambres, _LigneChambre, _LigneType
+from modele.chambre import Chambre
+from tests.compteur_sql import compter_requetes
+
+
+class TestSegmentPartage(unittest.TestCase):
+    def test_ecrire_puis_lire(self):
+        seg = SegmentPartage(taille=4096)
+        self.assertEqual(seg.version(), 0)
+        with seg.verrou:
+            v = seg.ecrire({"a": [1, 2, 3]})
+            self.assertEqual(seg.lire(), (v, {"a": [1, 2, 3]}))
+        self.assertEqual(seg.version(), 1)
+
+    def test_segment_trop_petit(self):
+        seg = SegmentPartage(taille=64)
+        with seg.verrou, self.assertRaises(ValueError):
+            seg.ecrire("x" * 1000)
+
+
+class TestCatalogueMultiProcessus(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        init_db()
+
+    def test_deux_workers_partagent_le_catalogue(self):
+        seg = SegmentPartage()
+        a, b = CatalogueChambres(), CatalogueChambres()
+        a.attacher_segment(seg)
+        b.attacher_segment(seg)
+
+        a.charger()  # lit la BD et publie
+        with compter_requetes() as requetes:
+            liste_b = b.lister_chambres()  # relu depuis le segment, sans SQL
+        self.assertEqual(requetes, [])
+        self.assertEqual(len(liste_b), len(a.lister_chambres()))
+        if not liste_b:
+            self.skipTest("Aucune chambre en base.")
+
+        # Une écriture dans A est vue par B à sa prochaine lecture
+        ch = liste_b[0]
+        maj = ch.model_copy(update={"autre_informations": f"partage-{uuid.uuid4().hex[:6]}"})
+        with SessionLocal() as s:
+            id_type = s.scalar(select(Chambre.fk_type_chambre).where(Chambre.id_chambre == ch.idChambre))
+        a.maj_chambre(maj, id_type)
+        self.assertEqual(
+            b.chambre_par_id(ch.idChambre).autre_informations, maj.autre_informations
+        )
+
+    def _deux_workers(self, taille=16 * 1024 * 1024):
+        seg = SegmentPartage(taille=taille)
+        a, b = CatalogueChambres(), CatalogueChambres()
+        a.attacher_segment(seg)
+        b.attacher_segment(seg)
+        return seg, a, b
+
+    def test_invalidation_d_un_voisin_relit_le_segment(self):
+        seg, a, b = self._deux_workers()
+        a.charger()
+        liste_b = b.lister_chambres()
+        if not liste_b:
+            self.skipTest("Aucune chambre en base.")
+        ch = liste_b[0]
+        maj = ch.model_copy(update={"autre_informations": f"voisin-{uuid.uuid4().hex[:6]}"})
+        with SessionLocal() as s:
+            id_type = s.scalar(select(Chambre.fk_type_chambre).where(Chambre.id_chambre == ch.idChambre))
+        a.maj_chambre(maj, id_type)
+
+        # Message du worker voisin (même origine que A ici) : déjà dans le segment
+        with compter_requetes() as requetes:
+            b.sur_invalidation(cache_metier.origine)
+            self.assertEqual(b.chambre_par_id(ch.idChambre).autre_informations, maj.autre_informations)
+        self.assertEqual(requetes, [])
+
+    def test_invalidation_distante_relue_une_seule_fois(self):
+        seg, a, b = self._deux_workers()
+        a.charger()
+        b.lister_chambres()
+        a.sur_invalidation("autre-serveur")
+        b.sur_invalidation("autre-serveur")
+
+        with compter_requetes() as requetes_a:
+            a.lister_chambres()
+        self.assertEqual(len(requetes_a), 2)   # types et chambres
+        # B reprend la lecture faite par A après la réception du message
+        with compter_requetes() as requetes_b:
+            b.lister_chambres()
+        self.assertEqual(requetes_b, [])
+
+    def test_segment_trop_petit_lectures_de_la_bd(self):
+        seg, a, b = self._deux_workers(taille=1024)
+        t = _LigneType(uuid.uuid4(), "Grand", Decimal("100.00"), Decimal("200.00"), "x" * 50)
+        chambres = [
+            _LigneChambre(uuid.uuid4(), 9000 + n, True, "y" * 20, t.id_type_chambre) for n in range(50)
+        ]
+        with self.assertLogs("metier.catalogueChambre", "WARNING"):
+            a.charger([t], chambres)   # ne lève pas ValueError
+        with seg.verrou:
+            _, donnees = seg.lire()
+        self.assertIsNone(donnees["types"])
+        # A garde son catalogue ; B lit la BD au lieu d’un segment incomplet
+        self.assertEqual(len(a), 50)
+        maj = a.chambre_par_numero(9000).model_copy(update={"autre_informations": "z"})
+        a.maj_chambre(maj, t.id_type_chambre)
+        self.assertEqual(a.chambre_par_numero(9000).autre_informations, "z")
+        with compter_requetes() as requetes:
+            b.lister_chambres()
+        self.assertEqual(len(requetes), 2)
+
+    @unittest.skipUnless(hasattr(os, "fork"), "fork() indisponible")
+    def test_fork_repart_d_un_pool_neuf_et_voit_le_segment(self):
+        seg = SegmentPartage(taille=4096)
+        pool_parent = engine.pool
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                if engine.pool is pool_parent:
+                    code = 1
+                with seg.verrou:
+                    seg.ecrire("depuis l’enfant")
+            except BaseException:
+                code = 2
+            os._exit(code)
+        _, statut = os.waitpid(pid, 0)
+        self.assertEqual(os.waitstatus_to_exitcode(statut), 0)
+        with seg.verrou:
+            self.assertEqual(seg.lire(), (1, "depuis l’enfant"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -35,7 +35,7 @@ class TestFullIntegration(unittest.TestCase):
             tc = TypeChambre(
                 nom_type="TestType",
                 prix_plancher=50.0,
-                prix_plafond="100.0",
+                prix_plafond=100.0,
                 description_chambre="Type test"
             )
             s.add(tc)
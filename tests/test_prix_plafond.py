@@ -0,0 +1,165 @@
+# ==============================================================
+# tests/test_prix_plafond.py
+# Vérifie le prix plafond numérique : conversion des anciens
+# textes (migration v5), recherche des chambres par prix, type et
+# disponibilité (GET /chambres?prixMin=&prixMax=...) et fourchette
+# plancher <= plafond à la création comme à la modification.
+# ==============================================================
+
+import unittest
+import uuid
+from decimal import Decimal
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+from sqlalchemy.pool import StaticPool
+
+from core.db import SessionLocal, init_db
+from core.migrations import DERNIERE_VERSION, migrer, prix_depuis_texte, schema_version
+from DTO.chambreDTO import ChambreCreateDTO, TypeChambreCreateDTO, TypeChambreUpdateDTO
+from main import app
+from metier.chambreMetier import (
+    creerChambre,
+    creerTypeChambre,
+    modifierTypeChambre,
+    rechercherChambres,
+    supprimerChambre,
+    supprimerTypeChambre,
+)
+from modele.type_chambre import TypeChambre
+from tests.compteur_sql import compter_requetes
+
+
+class TestPrixDepuisTexte(unittest.TestCase):
+    def test_formats_anciens(self):
+        for texte, attendu in (
+            ("250", "250.00"),
+            ("250,50 $", "250.50"),
+            ("$1,200", "1200.00"),
+            ("1 200.00", "1200.00"),
+            ("1.200,50", "1200.50"),
+            ("200 CAD", "200.00"),
+        ):
+            self.assertEqual(prix_depuis_texte(texte), Decimal(attendu), texte)
+
+    def test_illisibles(self):
+        for texte in (None, "", "  ", "abc", "1e3", "-5", "1.2.3", "999999999"):
+            self.assertIsNone(prix_depuis_texte(texte), texte)
+
+
+class TestMigrationPrixPlafond(unittest.TestCase):
+    def test_colonne_texte_convertie(self):
+        # BD SQLite temporaire, ramenée à l’état d’avant la v5 (colonne texte)
+        moteur = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+        migrer(moteur)
+        with moteur.begin() as conn:
+            conn.execute(schema_version.delete().where(schema_version.c.version >= 5))
+            conn.exec_driver_sql("DROP INDEX ix_type_chambre_prix")
+            conn.exec_driver_sql("ALTER TABLE type_chambre DROP COLUMN prix_plafond")
+            conn.exec_driver_sql("ALTER TABLE type_chambre ADD prix_plafond VARCHAR(10)")
+            for nom, texte in (("a", "250,50 $"), ("b", "n/d"), ("c", None)):
+                conn.exec_driver_sql(
+                    "INSERT INTO type_chambre (id_type_chambre, nom_type, prix_plancher, prix_plafond) "
+                    "VALUES (?, ?, 100, ?)",
+                    (uuid.uuid4().hex, nom, texte),
+                )
+
+        self.assertEqual(migrer(moteur), DERNIERE_VERSION)
+        with moteur.connect() as conn:
+            prix = dict(conn.execute(select(TypeChambre.nom_type, TypeChambre.prix_plafond)).all())
+        self.assertEqual(prix, {"a": Decimal("250.50"), "b": None, "c": None})
+        moteur.dispose()
+
+
+class TestRechercheChambresParPrix(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        init_db()
+        cls.types = {}
+        for suffixe, plancher, plafond in (("eco", 50.0, 80.0), ("std", 90.0, None), ("lux", 200.0, 400.0)):
+            nom = f"pp-{suffixe}-{uuid.uuid4().hex[:6]}"
+            creerTypeChambre(TypeChambreCreateDTO(nom_type=nom, prix_plancher=plancher, prix_plafond=plafond))
+            cls.types[suffixe] = nom
+        cls.chambres = [
+            creerChambre(
+                ChambreCreateDTO(numero_chambre=7500 + i, disponible_reservation=i % 2 == 0, nom_type=nom)
+            )
+            for i, nom in enumerate(list(cls.types.values()) * 2)
+        ]
+
+    @classmethod
+    def tearDownClass(cls):
+        for ch in cls.chambres:
+            supprimerChambre(str(ch.idChambre))
+        with SessionLocal() as s:
+            ids = s.scalars(
+                select(TypeChambre.id_type_chambre).where(TypeChambre.nom_type.in_(cls.types.values()))
+            ).all()
+        for id_type in ids:
+            supprimerTypeChambre(str(id_type))
+
+    def _numeros(self, **filtres):
+        return [ch.numero_chambre for ch in rechercherChambres(**filtres) if 7500 <= ch.numero_chambre < 7510]
+
+    def test_fourchette_de_prix(self):
+        # [85, 150] croise std (90, sans plafond) seulement
+        self.assertEqual(self._numeros(prix_min=85, prix_max=150), [7501, 7504])
+        # [70, 95] croise eco (50-80) et std (90)
+        self.assertEqual(self._numeros(prix_min=70, prix_max=95), [7500, 7501, 7503, 7504])
+        self.assertEqual(self._numeros(prix_min=300), [7502, 7505])
+
+    def test_type_et_disponibilite_en_une_requete(self):
+        with compter_requetes() as requetes:
+            chambres = rechercherChambres(nom_type=self.types["lux"], disponible=True)
+        self.assertEqual([ch.numero_chambre for ch in chambres], [7502])
+        self.assertEqual(chambres[0].type_chambre.prix_plafond, 400.0)
+        self.assertEqual(len(requetes), 1)
+
+    def test_api(self):
+        client = TestClient(app)
+        rep = client.get("/chambres", params={"prixMax": 85, "type": self.types["eco"], "disponible": "true"})
+        self.assertEqual(rep.status_code, 200, rep.text)
+        self.assertEqual([ch["numero_chambre"] for ch in rep.json()], [7500])
+        # Sans filtre : toutes les chambres (catalogue)
+        self.assertGreaterEqual(len(client.get("/chambres").json()), len(self.chambres))
+
+    def test_plafond_sous_le_plancher_refuse(self):
+        with self.assertRaises(ValueError):
+            TypeChambreCreateDTO(nom_type="x", prix_plancher=100.0, prix_plafond=50.0)
+        with self.assertRaises(ValueError):
+            TypeChambreUpdateDTO(prix_plancher=100.0, prix_plafond=50.0)
+
+
+class TestModificationFourchette(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        init_db()
+
+    def setUp(self):
+        nom = f"pp-maj-{uuid.uuid4().hex[:6]}"
+        creerTypeChambre(TypeChambreCreateDTO(nom_type=nom, prix_plancher=100.0, prix_plafond=200.0))
+        with SessionLocal() as s:
+            self.id_type = str(s.scalar(select(TypeChambre.id_type_chambre).where(TypeChambre.nom_type == nom)))
+
+    def tearDown(self):
+        supprimerTypeChambre(self.id_type)
+
+    def test_une_borne_verifiee_contre_la_bd(self):
+        for dto in (TypeChambreUpdateDTO(prix_plancher=250.0), TypeChambreUpdateDTO(prix_plafond=50.0)):
+            with self.assertRaisesRegex(ValueError, "plafond"):
+                modifierTypeChambre(self.id_type, dto)
+        with SessionLocal() as s:
+            tc = s.get(TypeChambre, uuid.UUID(self.id_type))
+            self.assertEqual((tc.prix_plancher, tc.prix_plafond), (Decimal("100.00"), Decimal("200.00")))
+
+        # Bornes égales : acceptées
+        tc = modifierTypeChambre(self.id_type, TypeChambreUpdateDTO(prix_plancher=200.0))
+        self.assertEqual((tc.prix_plancher, tc.prix_plafond), (200.0, 200.0))
+
+    def test_api_400(self):
+        rep = TestClient(app).put(f"/typeChambre/{self.id_type}", json={"prix_plafond": 10})
+        self.assertEqual(rep.status_code, 400, rep.text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,171 @@
+# ==============================================================
+# tests/test_projection.py
+# Vérifie les projections ?fields= / ?inclure= : analyse des
+# chemins, colonnes lues par la recherche de réservations et des
+# chambres (jointure évitée), forme des réponses et erreurs 400.
+# ==============================================================
+
+import unittest
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from core.db import init_db
+from DTO.chambreDTO import ChambreCreateDTO, ChambreDTO, TypeChambreCreateDTO
+from DTO.projection import Projection
+from DTO.reservationDTO import CriteresRechercheDTO, ReservationDTO
+from DTO.usagerDTO import UsagerCreateDTO, UsagerDTO
+from main import app
+from metier.chambreMetier import creerChambre, creerTypeChambre, rechercherChambres, supprimerChambre
+from metier.reservationMetier import creerReservation, rechercherReservationPage, supprimerReservation
+from metier.usagerMetier import creerUsager, supprimerUsager
+from tests.compteur_sql import compter_requetes
+
+DEBUT = datetime(2035, 4, 1)
+
+
+class TestAnalyse(unittest.TestCase):
+    def test_fields_et_inclure(self):
+        p = Projection.depuis_parametres(ReservationDTO, "dateDebut, chambre.numero_chambre", "usager")
+        self.assertEqual(p.arbre, {
+            "idReservation": True,
+            "dateDebut": True,
+            "chambre": {"numero_chambre": True, "idChambre": True},
+            "usager": True,
+        })
+        self.assertTrue(p.contient("usager.nom"))
+        self.assertTrue(p.contient("chambre.idChambre"))
+        self.assertFalse(p.contient("chambre.type_chambre"))
+        self.assertFalse(p.contient("dateFin"))
+
+    def test_inclure_seul_garde_les_champs_simples(self):
+        p = Projection.depuis_parametres(ReservationDTO, None, "chambre.type_chambre")
+        self.assertEqual(set(p.arbre), {
+            "idReservation", "dateDebut", "dateFin", "prixParJour", "infoReservation", "chambre",
+        })
+        self.assertEqual(p.arbre["chambre"], {"type_chambre": True, "idChambre": True})
+
+    def test_sans_parametre_forme_complete(self):
+        self.assertTrue(Projection.depuis_parametres(ReservationDTO, "", None).complete)
+
+    def test_erreurs(self):
+        with self.assertRaisesRegex(ValueError, "chambre.numero"):
+            Projection.depuis_parametres(ReservationDTO, "chambre.numero", None)
+        with self.assertRaisesRegex(ValueError, "objets imbriqués"):
+            Projection.depuis_parametres(ReservationDTO, None, "dateDebut")
+        with self.assertRaisesRegex(ValueError, "pas un objet imbriqué"):
+            Projection.depuis_parametres(ReservationDTO, "dateDebut.annee", None)
+
+
+class TestProjectionLectures(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        init_db()
+        cls.client = TestClient(app)
+        cls.nom_type = f"pj-{uuid.uuid4().hex[:8]}"
+        creerTypeChambre(TypeChambreCreateDTO(nom_type=cls.nom_type, prix_plancher=80.0))
+        cls.chambre = creerChambre(
+            ChambreCreateDTO(
+                numero_chambre=7801, disponible_reservation=True,
+                autre_informations="long texte " * 50, nom_type=cls.nom_type,
+            )
+        )
+        cls.usager = creerUsager(
+            UsagerCreateDTO(
+                prenom="Pj", nom=f"Pj-{uuid.uuid4()}", adresse="1 Rue Pj",
+                mobile="5557800000", mot_de_passe="pwd", type_usager="client",
+            )
+        )
+        cls.reservation = creerReservation(
+            ReservationDTO(
+                dateDebut=DEBUT, dateFin=DEBUT + timedelta(days=2), prixParJour=90.0,
+                chambre=cls.chambre, usager=cls.usager,
+            )
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        supprimerReservation(str(cls.reservation.idReservation))
+        supprimerUsager(str(cls.usager.idUsager))
+        supprimerChambre(str(cls.chambre.idChambre))
+
+    def _criteres(self) -> CriteresRechercheDTO:
+        return CriteresRechercheDTO(idUsager=str(self.usager.idUsager))
+
+    def test_recherche_reservations_colonnes_lues(self):
+        p = Projection.depuis_parametres(ReservationDTO, "dateDebut,dateFin,chambre.numero_chambre", None)
+        with compter_requetes() as requetes:
+            resultats, _ = rechercherReservationPage(self._criteres(), p)
+        # La borne de l’archive, puis la recherche
+        self.assertEqual(len(requetes), 2)
+        sql = requetes[1]
+        self.assertIn("numero_chambre", sql)
+        for colonne in ("prenom", "autre_informations", "nom_type", "info_reservation"):
+            self.assertNotIn(colonne, sql)
+        self.assertEqual(resultats[0].model_dump(include=p.inclusion), {
+            "idReservation": self.reservation.idReservation,
+            "dateDebut": DEBUT,
+            "dateFin": DEBUT + timedelta(days=2),
+            "chambre": {"idChambre": self.chambre.idChambre, "numero_chambre": 7801},
+        })
+
+    def test_route_recherche(self):
+        reponse = self.client.post(
+            "/rechercherReservation",
+            params={"fields": "dateDebut", "inclure": "usager"},
+            json={"idUsager": str(self.usager.idUsager)},
+        )
+        self.assertEqual(reponse.status_code, 200)
+        (r,) = reponse.json()
+        self.assertEqual(set(r), {"idReservation", "dateDebut", "usager"})
+        self.assertEqual(r["usager"]["nom"], self.usager.nom)
+
+        # Forme complète sans paramètre
+        complet = self.client.post("/rechercherReservation", json={"idUsager": str(self.usager.idUsager)})
+        self.assertEqual(complet.json()[0]["chambre"]["type_chambre"]["nom_type"], self.nom_type)
+
+    def test_chambres_sans_jointure(self):
+        p = Projection.depuis_parametres(ChambreDTO, "numero_chambre,disponible_reservation", None)
+        with compter_requetes() as requetes:
+            chambres = rechercherChambres(disponible=True, projection=p)
+        self.assertNotIn("type_chambre", requetes[0])
+        self.assertNotIn("autre_informations", requetes[0])
+        mienne = next(c for c in chambres if c.idChambre == self.chambre.idChambre)
+        self.assertEqual(
+            mienne.model_dump(include=p.inclusion),
+            {"idChambre": self.chambre.idChambre, "numero_chambre": 7801, "disponible_reservation": True},
+        )
+
+        # Type demandé : jointure, mais seulement ses colonnes utiles
+        p = Projection.depuis_parametres(ChambreDTO, "type_chambre.nom_type", None)
+        with compter_requetes() as requetes:
+            chambres = rechercherChambres(nom_type=self.nom_type, projection=p)
+        self.assertIn("JOIN", requetes[0])
+        self.assertNotIn("description_chambre", requetes[0])
+        self.assertEqual(chambres[0].model_dump(include=p.inclusion), {
+            "idChambre": self.chambre.idChambre, "type_chambre": {"nom_type": self.nom_type},
+        })
+
+    def test_route_chambres(self):
+        reponse = self.client.get("/chambres", params={"type": self.nom_type, "fields": "numero_chambre"})
+        self.assertEqual(reponse.json(), [{"idChambre": str(self.chambre.idChambre), "numero_chambre": 7801}])
+        # Catalogue en mémoire (sans filtre) : même forme
+        toutes = self.client.get("/chambres", params={"fields": "numero_chambre"}).json()
+        self.assertTrue(all(set(c) == {"idChambre", "numero_chambre"} for c in toutes))
+        reponse = self.client.get("/chambres/7801", params={"inclure": "type_chambre", "fields": "numero_chambre"})
+        self.assertEqual(set(reponse.json()), {"idChambre", "numero_chambre", "type_chambre"})
+
+    def test_route_usager(self):
+        reponse = self.client.get(f"/usagers/{self.usager.idUsager}", params={"fields": "nom"})
+        self.assertEqual(reponse.json(), {"idUsager": str(self.usager.idUsager), "nom": self.usager.nom})
+        self.assertEqual(set(self.client.get(f"/usagers/{self.usager.idUsager}").json()), set(UsagerDTO.model_fields))
+
+    def test_champ_inconnu_400(self):
+        reponse = self.client.get("/chambres", params={"fields": "prix"})
+        self.assertEqual(reponse.status_code, 400)
+        self.assertIn("numero_chambre", reponse.json()["detail"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+# ==============================================================
+# tests/test_requetes_lentes.py
+# Vérifie le journal des requêtes SQL lentes : normalisation et
+# empreinte, masquage des paramètres, tampon circulaire borné,
+# enregistrement depuis l’engine (durée, lignes, fonction métier
+# d’origine), capture du plan et route GET /admin/requetesLentes.
+# ==============================================================
+
+import unittest
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+from fastapi.testclient import TestClient
+
+from core.db import engine, init_db
+from core.requetes_lentes import JournalRequetesLentes, empreinte, masquer_parametres, normaliser
+from core.taches import file_taches
+from DTO.reservationDTO import CriteresRechercheDTO
+from main import app
+from metier.reservationMetier import rechercherReservationPage
+
+
+class TestNormalisation(unittest.TestCase):
+    def test_litteraux_et_listes_in(self):
+        a = normaliser("SELECT *\n  FROM t WHERE nom = 'Tremblay' AND n > 10 AND id IN (?, ?, ?)")
+        b = normaliser("SELECT * FROM t WHERE nom = N'O''Neil' AND n > 3 AND id IN (?,?)")
+        self.assertEqual(a, "SELECT * FROM t WHERE nom = ? AND n > ? AND id IN (?, ...)")
+        self.assertEqual(empreinte(a), empreinte(b))
+        # Les identifiants gardent leurs chiffres
+        self.assertEqual(normaliser("SELECT anon_1.x FROM t1 AS anon_1"), "SELECT anon_1.x FROM t1 AS anon_1")
+
+    def test_masquage(self):
+        id_ = uuid.uuid4()
+        self.assertEqual(
+            masquer_parametres(("Tremblay", 5, None, Decimal("9.50"), id_, b"xy")),
+            ["<texte:8>", 5, None, "9.50", str(id_), "<octets:2>"],
+        )
+        self.assertEqual(masquer_parametres({"mobile": "5551234"}), {"mobile": "<texte:7>"})
+        self.assertEqual(
+            masquer_parametres([("a", 1), ("bb", 2)], executemany=True),
+            {"lignes": 2, "premiere": ["<texte:1>", 1]},
+        )
+
+
+class TestJournal(unittest.TestCase):
+    def test_tampon_borne_et_agregats(self):
+        journal = JournalRequetesLentes(seuil=0, taille=2)
+        for n in (1, 2, 3):
+            journal.enregistrer(f"SELECT * FROM t WHERE id = {n}", (), n / 1000, fonction="metier.x.f")
+        stats = journal.statistiques()
+        self.assertEqual(stats["lentes"], 3)
+        self.assertEqual([e["duree_ms"] for e in stats["recentes"]], [3.0, 2.0])
+        (agregat,) = stats["par_empreinte"]
+        self.assertEqual((agregat["executions"], agregat["duree_max_ms"]), (3, 3.0))
+        self.assertEqual(agregat["origines"], ["metier.x.f"])
+
+
+class TestEngine(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        init_db()
+
+    def setUp(self):
+        self.journal = JournalRequetesLentes(seuil=0, taille=50)
+        self.journal.installer(engine)
+
+    def tearDown(self):
+        self.journal.desinstaller()
+
+    def test_origine_et_parametres_masques(self):
+        nom = f"Lent-{uuid.uuid4()}"
+        rechercherReservationPage(CriteresRechercheDTO(nom=nom, prenom="Lent", dateDebut=datetime(2030, 1, 1)))
+        entrees = [e for e in self.journal.recentes() if e["origine"]]
+        self.assertTrue(entrees)
+        entree = entrees[0]
+        self.assertEqual(entree["origine"], "metier.reservationMetier.rechercherReservationPage")
+        self.assertIn(f"<texte:{len(nom)}>", entree["parametres"])
+        self.assertNotIn(nom, str(entree))
+        self.assertGreaterEqual(entree["duree_ms"], 0)
+
+    def test_sous_le_seuil(self):
+        self.journal.seuil = 60.0
+        rechercherReservationPage(CriteresRechercheDTO(nom="Personne", prenom="Aucune"))
+        stats = self.journal.statistiques()
+        self.assertGreater(stats["instructions"], 0)
+        self.assertEqual(stats["lentes"], 0)
+
+    def test_capture_du_plan(self):
+        self.journal.plans = True
+        rechercherReservationPage(CriteresRechercheDTO(nom="Plan", prenom="Plan"))
+        file_taches.vider()
+        plans = [a["plan"] for a in self.journal.statistiques()["par_empreinte"] if a["sql"].startswith("SELECT")]
+        self.assertTrue(plans and all(plans))
+
+    def test_capture_du_plan_en_erreur(self):
+        # Une seule tentative : l’erreur devient le plan, la tâche ne la relance pas
+        self.journal.plans = True
+        tentatives = []
+        capturer = self.journal._capturer_plan
+        self.journal._capturer_plan = lambda *a: tentatives.append(1) or capturer(*a)
+        with self.assertLogs("core.requetes_lentes", "WARNING"):
+            self.journal.enregistrer("SELECT * FROM table_absente", (), 1.0)
+            file_taches.vider()
+        (agregat,) = self.journal.statistiques()["par_empreinte"]
+        self.assertTrue(agregat["plan"].startswith("erreur : "), agregat["plan"])
+        self.assertEqual(tentatives, [1])
+
+
+class TestRoute(unittest.TestCase):
+    def test_admin(self):
+        reponse = TestClient(app).get("/admin/requetesLentes", params={"limite": 5})
+        self.assertEqual(reponse.status_code, 200)
+        self.assertTrue({"seuil_ms", "par_empreinte", "recentes"} <= set(reponse.json()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+# ==============================================================
+# tests/test_reservation_annulation_masse.py
+# Vérifie l’annulation en masse des réservations par critères
+# (POST /reservations/annulationMasse) : ids retournés, lots,
+# vue des réservations à jour.
+# ==============================================================
+
+import unittest
+import uuid
+from datetime import datetime, timedelta
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+from core.db import init_db
+from DTO.chambreDTO import ChambreCreateDTO, TypeChambreCreateDTO
+from DTO.reservationDTO import CriteresAnnulationDTO, CriteresRechercheDTO, PlageDatesDTO, ReservationDTO
+from DTO.usagerDTO import UsagerCreateDTO
+from main import app
+from metier import reservationMetier
+from metier.chambreMetier import creerChambre, creerTypeChambre, supprimerChambre
+from metier.reservationMetier import annulerReservationsEnMasse, creerReservation, rechercherReservation
+from metier.usagerMetier import creerUsager, supprimerUsager
+from tests.compteur_sql import compter_requetes
+
+PASSE = datetime(2020, 5, 1)
+FUTUR = datetime.now().replace(microsecond=0) + timedelta(days=400)
+
+
+class TestAnnulationMasse(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        init_db()
+        nom_type = f"am-{uuid.uuid4().hex[:8]}"
+        creerTypeChambre(TypeChambreCreateDTO(nom_type=nom_type, prix_plancher=60.0))
+        cls.chambre = creerChambre(
+            ChambreCreateDTO(numero_chambre=7401, disponible_reservation=True, nom_type=nom_type)
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        supprimerChambre(str(cls.chambre.idChambre))
+
+    def setUp(self):
+        self.usager = creerUsager(
+            UsagerCreateDTO(
+                prenom="Am", nom=f"Am-{uuid.uuid4()}", adresse="1 Rue Am",
+                mobile="5557400000", mot_de_passe="pwd", type_usager="client",
+            )
+        )
+
+    def tearDown(self):
+        annulerReservationsEnMasse(CriteresAnnulationDTO(idUsager=self.usager.idUsager))
+        supprimerUsager(str(self.usager.idUsager))
+
+    def _reserver(self, debut: datetime) -> uuid.UUID:
+        return creerReservation(
+            ReservationDTO(
+                dateDebut=debut, dateFin=debut + timedelta(days=1), prixParJour=65.0,
+                chambre=self.chambre, usager=self.usager,
+            )
+        ).idReservation
+
+    def _restantes(self):
+        return {r.idReservation for r in rechercherReservation(CriteresRechercheDTO(idUsager=str(self.usager.idUsager)))}
+
+    def test_sejours_a_venir_d_un_usager(self):
+        passe = self._reserver(PASSE)
+        futures = {self._reserver(FUTUR + timedelta(days=3 * i)) for i in range(4)}
+        with compter_requetes() as requetes:
+            ids = annulerReservationsEnMasse(CriteresAnnulationDTO(idUsager=self.usager.idUsager, aVenir=True))
+        self.assertEqual(set(ids), futures)
+        # Lecture des ids + DELETE ... RETURNING + DELETE dans la vue + journal (un executemany)
+        self.assertEqual(len(requetes), 4, requetes)
+        self.assertEqual(self._restantes(), {passe})
+
+    def test_groupe_par_ids_en_lots(self):
+        groupe = [self._reserver(FUTUR + timedelta(days=3 * i)) for i in range(5)]
+        garde = self._reserver(FUTUR + timedelta(days=30))
+        with mock.patch.object(reservationMetier, "TAILLE_LOT_ANNULATION", 2):
+            ids = annulerReservationsEnMasse(CriteresAnnulationDTO(idReservations=groupe + [uuid.uuid4()]))
+        self.assertEqual(sorted(ids), sorted(groupe))
+        self.assertEqual(self._restantes(), {garde})
+
+    def test_plage_d_arrivee_et_chambre(self):
+        dedans = self._reserver(FUTUR)
+        self._reserver(FUTUR + timedelta(days=10))
+        ids = annulerReservationsEnMasse(
+            CriteresAnnulationDTO(
+                idChambre=self.chambre.idChambre,
+                idUsager=self.usager.idUsager,
+                arrivantEntre=PlageDatesDTO(debut=FUTUR, fin=FUTUR + timedelta(days=2)),
+            )
+        )
+        self.assertEqual(ids, [dedans])
+
+    def test_api(self):
+        r = self._reserver(FUTUR)
+        client = TestClient(app)
+        rep = client.post("/reservations/annulationMasse", json={"idUsager": str(self.usager.idUsager)})
+        self.assertEqual(rep.status_code, 200, rep.text)
+        self.assertEqual(rep.json(), {"nombre": 1, "idReservations": [str(r)]})
+        # Aucun critère : refusé
+        self.assertEqual(client.post("/reservations/annulationMasse", json={}).status_code, 422)
+        self.assertEqual(client.post("/reservations/annulationMasse", json={"aVenir": False}).status_code, 422)
+
+    def test_a_venir_seul_refuse(self):
+        r = self._reserver(FUTUR)
+        rep = TestClient(app).post("/reservations/annulationMasse", json={"aVenir": True})
+        self.assertEqual(rep.status_code, 400, rep.text)
+        self.assertIn("aVenir", rep.json()["detail"])
+        # Rien n’a été annulé
+        self.assertIn(r, self._restantes())
+
+
+if __name__ == "__main__":
+    unittest.main()
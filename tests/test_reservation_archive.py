@@ -0,0 +1,166 @@
+# ==============================================================
+# tests/test_reservation_archive.py
+# Vérifie l’archivage des réservations terminées : déplacement par
+# lots vers reservation_archive, recherche qui ne lit l’archive que
+# si les critères de dates le demandent, lecture par id archivé,
+# archivage lancé par un autre processus vu aussitôt par la recherche.
+# ==============================================================
+
+import os
+import unittest
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, select
+
+from core.db import SessionLocal, init_db
+from DTO.chambreDTO import ChambreCreateDTO, TypeChambreCreateDTO
+from DTO.reservationDTO import CriteresRechercheDTO, PlageDatesDTO, ReservationDTO
+from DTO.usagerDTO import UsagerCreateDTO
+from metier.archivage import archiverReservations, borne_archive
+from metier.chambreMetier import creerChambre, creerTypeChambre, supprimerChambre
+from metier.reservationMetier import creerReservation, rechercherReservation, rechercherReservationPage, supprimerReservation
+from metier.usagerMetier import creerUsager, supprimerUsager
+from modele.reservation import Reservation
+from modele.reservation_archive import ReservationArchive
+from modele.reservation_vue import ReservationVue
+from tests.compteur_sql import compter_requetes
+
+# Séjours très anciens : l’archivage du test ne touche pas aux autres données
+ANCIEN = datetime(1990, 3, 1)
+MAINTENANT = datetime(1995, 1, 1)
+FUTUR = datetime(2033, 7, 1)
+
+
+class TestArchivage(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        init_db()
+        nom_type = f"ar-{uuid.uuid4().hex[:8]}"
+        creerTypeChambre(TypeChambreCreateDTO(nom_type=nom_type, prix_plancher=60.0))
+        cls.chambre = creerChambre(
+            ChambreCreateDTO(numero_chambre=7601, disponible_reservation=True, nom_type=nom_type)
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        supprimerChambre(str(cls.chambre.idChambre))
+
+    def setUp(self):
+        self.usager = creerUsager(
+            UsagerCreateDTO(
+                prenom="Ar", nom=f"Ar-{uuid.uuid4()}", adresse="1 Rue Ar",
+                mobile="5557600000", mot_de_passe="pwd", type_usager="client",
+            )
+        )
+        self.anciennes = [self._reserver(ANCIEN + timedelta(days=10 * i)) for i in range(5)]
+        self.future = self._reserver(FUTUR)
+
+    def tearDown(self):
+        supprimerReservation(str(self.future))
+        with SessionLocal() as s:
+            s.execute(delete(Reservation).where(Reservation.fk_id_usager == self.usager.idUsager))
+            s.execute(delete(ReservationArchive).where(ReservationArchive.id_usager == self.usager.idUsager))
+            s.commit()
+        supprimerUsager(str(self.usager.idUsager))
+
+    def _reserver(self, debut: datetime) -> uuid.UUID:
+        return creerReservation(
+            ReservationDTO(
+                dateDebut=debut, dateFin=debut + timedelta(days=2), prixParJour=65.0,
+                chambre=self.chambre, usager=self.usager,
+            )
+        ).idReservation
+
+    def _compter(self, table, id_colonne) -> int:
+        with SessionLocal() as s:
+            return s.scalar(select(func.count()).select_from(table).where(id_colonne == self.usager.idUsager))
+
+    def test_archivage_par_lots(self):
+        self.assertEqual(archiverReservations(horizon_jours=365, taille_lot=2, maintenant=MAINTENANT), 5)
+
+        self.assertEqual(self._compter(Reservation, Reservation.fk_id_usager), 1)
+        self.assertEqual(self._compter(ReservationVue, ReservationVue.id_usager), 1)
+        self.assertEqual(self._compter(ReservationArchive, ReservationArchive.id_usager), 5)
+        self.assertEqual(borne_archive(), ANCIEN + timedelta(days=42))
+        # Relancer ne déplace plus rien
+        self.assertEqual(archiverReservations(horizon_jours=365, maintenant=MAINTENANT), 0)
+        # Plus de réservation rattachée que la future : les anciennes ne bloquent plus rien
+        self.assertEqual(self._compter(Reservation, Reservation.fk_id_usager), 1)
+
+    def test_recherche_transparente(self):
+        avant = rechercherReservation(CriteresRechercheDTO(idUsager=str(self.usager.idUsager)))
+        archiverReservations(horizon_jours=365, maintenant=MAINTENANT)
+
+        # Sans critère de date : vue et archive, mêmes résultats dans le même ordre.
+        # (borne de l’archive relue, puis une seule requête de recherche)
+        criteres = CriteresRechercheDTO(idUsager=str(self.usager.idUsager), total=True)
+        with compter_requetes() as requetes:
+            apres, total = rechercherReservationPage(criteres)
+        self.assertEqual(apres, avant)
+        self.assertEqual(total, 6)
+        self.assertEqual(len(requetes), 2, requetes)
+        self.assertIn("MAX(", requetes[0].upper())
+        self.assertIn("UNION ALL", requetes[1].upper())
+
+        # Pagination à travers les deux tables
+        page = rechercherReservation(
+            CriteresRechercheDTO(idUsager=str(self.usager.idUsager), limite=2, decalage=4)
+        )
+        self.assertEqual([r.idReservation for r in page], [self.anciennes[4], self.future])
+
+    def test_archive_ignoree_si_les_dates_l_excluent(self):
+        archiverReservations(horizon_jours=365, maintenant=MAINTENANT)
+        criteres = CriteresRechercheDTO(
+            idUsager=str(self.usager.idUsager),
+            arrivantEntre=PlageDatesDTO(debut=FUTUR - timedelta(days=1), fin=FUTUR + timedelta(days=1)),
+        )
+        with compter_requetes() as requetes:
+            (r,) = rechercherReservation(criteres)
+        self.assertEqual(r.idReservation, self.future)
+        # Seule la borne est lue dans l’archive
+        self.assertEqual(len(requetes), 2, requetes)
+        self.assertNotIn("RESERVATION_ARCHIVE", requetes[1].upper())
+
+        # Plage qui touche l’archive : elle est lue
+        criteres = CriteresRechercheDTO(
+            idUsager=str(self.usager.idUsager),
+            partantEntre=PlageDatesDTO(debut=ANCIEN, fin=ANCIEN + timedelta(days=15)),
+        )
+        trouvees = rechercherReservation(criteres)
+        self.assertEqual([t.idReservation for t in trouvees], self.anciennes[:2])
+
+    def test_lecture_par_id_archive(self):
+        archiverReservations(horizon_jours=365, maintenant=MAINTENANT)
+        (r,) = rechercherReservation(CriteresRechercheDTO(idReservation=str(self.anciennes[0])))
+        self.assertEqual(r.idReservation, self.anciennes[0])
+        self.assertEqual(r.usager.nom, self.usager.nom)
+        self.assertEqual(r.chambre.numero_chambre, 7601)
+
+    @unittest.skipUnless(hasattr(os, "fork"), "fork() indisponible")
+    def test_archivage_par_un_autre_processus(self):
+        # Recherches déjà faites dans ce processus (archive encore vide pour elles)
+        plage = PlageDatesDTO(debut=ANCIEN, fin=ANCIEN + timedelta(days=15))
+        criteres = CriteresRechercheDTO(idUsager=str(self.usager.idUsager), arrivantEntre=plage)
+        self.assertEqual(len(rechercherReservation(criteres)), 2)
+
+        # Archivage dans un autre processus, comme `python -m metier.archivage` (cron)
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                code = 0 if archiverReservations(horizon_jours=365, maintenant=MAINTENANT) == 5 else 1
+            finally:
+                os._exit(code)
+        _, statut = os.waitpid(pid, 0)
+        self.assertEqual(os.waitstatus_to_exitcode(statut), 0)
+
+        self.assertEqual(self._compter(Reservation, Reservation.fk_id_usager), 1)
+        trouvees = rechercherReservation(criteres)
+        self.assertEqual([t.idReservation for t in trouvees], self.anciennes[:2])
+        (r,) = rechercherReservation(CriteresRechercheDTO(idReservation=str(self.anciennes[0])))
+        self.assertEqual(r.idReservation, self.anciennes[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
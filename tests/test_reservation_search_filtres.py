@@ -0,0 +1,147 @@
+# ==============================================================
+# tests/test_reservation_search_filtres.py
+# Vérifie les filtres de la recherche de réservations (dates,
+# numéro et type de chambre, prix), la pagination et le total,
+# le tout en une seule requête SQL.
+# ==============================================================
+
+import unittest
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from core.db import SessionLocal, init_db
+from DTO.chambreDTO import ChambreCreateDTO, TypeChambreCreateDTO
+from DTO.reservationDTO import CriteresRechercheDTO, PlageDatesDTO, ReservationDTO
+from DTO.usagerDTO import UsagerCreateDTO
+from main import app
+from metier.chambreMetier import creerChambre, creerTypeChambre, supprimerChambre, supprimerTypeChambre
+from metier.reservationMetier import (
+    creerReservation,
+    rechercherReservation,
+    rechercherReservationPage,
+    supprimerReservation,
+)
+from metier.usagerMetier import creerUsager, supprimerUsager
+from modele.type_chambre import TypeChambre
+from tests.compteur_sql import compter_requetes
+
+DEBUT = datetime(2031, 6, 1, 15, 0, 0)
+
+
+class TestRechercheFiltres(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        init_db()
+        cls.nom_type = f"rf-{uuid.uuid4().hex[:8]}"
+        cls.type = creerTypeChambre(
+            TypeChambreCreateDTO(
+                nom_type=cls.nom_type, prix_plancher=90.0, prix_plafond="300", description_chambre="rf"
+            )
+        )
+        cls.chambres = [
+            creerChambre(
+                ChambreCreateDTO(
+                    numero_chambre=numero, disponible_reservation=True, autre_informations="rf", nom_type=cls.nom_type
+                )
+            )
+            for numero in (7101, 7102)
+        ]
+        cls.usager = creerUsager(
+            UsagerCreateDTO(
+                prenom="Rf", nom=f"Rf-{uuid.uuid4()}", adresse="1 Rue Rf",
+                mobile="5557000000", mot_de_passe="pwd", type_usager="client",
+            )
+        )
+        # 6 séjours de 2 jours, un tous les 3 jours, prix 100, 110, ..., 150,
+        # en alternance sur les deux chambres
+        cls.reservations = [
+            creerReservation(
+                ReservationDTO(
+                    dateDebut=DEBUT + timedelta(days=3 * i),
+                    dateFin=DEBUT + timedelta(days=3 * i + 2),
+                    prixParJour=100.0 + 10 * i,
+                    chambre=cls.chambres[i % 2],
+                    usager=cls.usager,
+                )
+            )
+            for i in range(6)
+        ]
+
+    @classmethod
+    def tearDownClass(cls):
+        for r in cls.reservations:
+            supprimerReservation(str(r.idReservation))
+        for ch in cls.chambres:
+            supprimerChambre(str(ch.idChambre))
+        supprimerUsager(str(cls.usager.idUsager))
+        with SessionLocal() as s:
+            id_type = s.scalar(select(TypeChambre.id_type_chambre).where(TypeChambre.nom_type == cls.nom_type))
+        supprimerTypeChambre(str(id_type))
+
+    def _prix(self, **criteres):
+        criteres.setdefault("idUsager", str(self.usager.idUsager))
+        return [r.prixParJour for r in rechercherReservation(CriteresRechercheDTO(**criteres))]
+
+    def test_arrivant_entre(self):
+        plage = PlageDatesDTO(debut=DEBUT + timedelta(days=3), fin=DEBUT + timedelta(days=9))
+        self.assertEqual(self._prix(arrivantEntre=plage), [110.0, 120.0, 130.0])
+
+    def test_partant_entre(self):
+        plage = PlageDatesDTO(debut=DEBUT, fin=DEBUT + timedelta(days=5))
+        self.assertEqual(self._prix(partantEntre=plage), [100.0, 110.0])
+
+    def test_present_le(self):
+        self.assertEqual(self._prix(presentLe=DEBUT + timedelta(days=7)), [120.0])
+        # Le jour du départ ne compte pas comme présent
+        self.assertEqual(self._prix(presentLe=DEBUT + timedelta(days=2)), [])
+
+    def test_chambre_type_et_prix(self):
+        self.assertEqual(self._prix(numeroChambre=7102), [110.0, 130.0, 150.0])
+        self.assertEqual(len(self._prix(nomType=self.nom_type)), 6)
+        self.assertEqual(self._prix(prixMin=115, prixMax=140), [120.0, 130.0, 140.0])
+        self.assertEqual(self._prix(nomType=f"{self.nom_type}-absent"), [])
+
+    def test_page_et_total_en_une_requete(self):
+        criteres = CriteresRechercheDTO(idUsager=str(self.usager.idUsager), limite=2, decalage=2, total=True)
+        with compter_requetes() as requetes:
+            resultats, total = rechercherReservationPage(criteres)
+        self.assertEqual([r.prixParJour for r in resultats], [120.0, 130.0])
+        self.assertEqual(total, 6)
+        # La borne de l’archive, puis la page et le total
+        self.assertEqual(len(requetes), 2, requetes)
+        self.assertIn("MAX(", requetes[0].upper())
+        # Les objets imbriqués viennent de la même requête
+        self.assertEqual(resultats[0].chambre.type_chambre.nom_type, self.nom_type)
+        self.assertEqual(resultats[0].usager.nom, self.usager.nom)
+
+    def test_total_page_au_dela_de_la_fin(self):
+        criteres = CriteresRechercheDTO(idUsager=str(self.usager.idUsager), limite=2, decalage=10, total=True)
+        self.assertEqual(rechercherReservationPage(criteres), ([], 6))
+
+    def test_criteres_invalides(self):
+        with self.assertRaises(ValueError):
+            CriteresRechercheDTO(prixMin=50, prixMax=10)
+        with self.assertRaises(ValueError):
+            PlageDatesDTO(debut=DEBUT, fin=DEBUT - timedelta(days=1))
+
+    def test_api_total_dans_entete(self):
+        client = TestClient(app)
+        rep = client.post(
+            "/rechercherReservation",
+            json={
+                "idUsager": str(self.usager.idUsager),
+                "arrivantEntre": {"debut": DEBUT.isoformat(), "fin": (DEBUT + timedelta(days=30)).isoformat()},
+                "limite": 4,
+                "total": True,
+            },
+        )
+        self.assertEqual(rep.status_code, 200)
+        self.assertEqual(len(rep.json()), 4)
+        self.assertEqual(rep.headers["X-Total-Count"], "6")
+
+
+if __name__ == "__main__":
+    unittest.main()
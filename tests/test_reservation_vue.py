@@ -0,0 +1,153 @@
+# ==============================================================
+# tests/test_reservation_vue.py
+# Vérifie que la vue dénormalisée des réservations suit les
+# écritures (réservation, usager, chambre, type), qu’elle est
+# recopiée des tables (pas des caches) et que la recherche la lit
+# sans jointure.
+# ==============================================================
+
+import unittest
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update
+
+from core.db import SessionLocal, engine, init_db
+from DTO.chambreDTO import ChambreCreateDTO, ChambreUpdateDTO, TypeChambreCreateDTO, TypeChambreUpdateDTO
+from DTO.reservationDTO import CriteresRechercheDTO, ReservationDTO, ReservationUpdateDTO
+from DTO.usagerDTO import UsagerCreateDTO, UsagerUpdateDTO
+from metier.chambreMetier import (
+    creerChambre,
+    creerTypeChambre,
+    modifierChambre,
+    modifierTypeChambre,
+    supprimerChambre,
+    supprimerTypeChambre,
+)
+from metier.reservationMetier import (
+    creerReservation,
+    modifierReservation,
+    rechercherReservation,
+    supprimerReservation,
+)
+from metier.reservationVue import reconstruire
+from metier.usagerMetier import creerUsager, modifierUsager, supprimerUsager
+from modele.chambre import Chambre
+from modele.reservation_vue import ReservationVue
+from modele.type_chambre import TypeChambre
+from tests.compteur_sql import compter_requetes
+
+
+class TestReservationVue(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        init_db()
+        cls.nom_type = f"rv-{uuid.uuid4().hex[:8]}"
+        creerTypeChambre(
+            TypeChambreCreateDTO(nom_type=cls.nom_type, prix_plancher=80.0, prix_plafond="150", description_chambre="rv")
+        )
+        with SessionLocal() as s:
+            cls.id_type = str(s.scalar(select(TypeChambre.id_type_chambre).where(TypeChambre.nom_type == cls.nom_type)))
+        cls.chambre = creerChambre(
+            ChambreCreateDTO(numero_chambre=7201, disponible_reservation=True, autre_informations="rv", nom_type=cls.nom_type)
+        )
+        cls.usager = creerUsager(
+            UsagerCreateDTO(
+                prenom="Rv", nom=f"Rv-{uuid.uuid4()}", adresse="1 Rue Rv",
+                mobile="5557200000", mot_de_passe="pwd", type_usager="client",
+            )
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        supprimerChambre(str(cls.chambre.idChambre))
+        supprimerUsager(str(cls.usager.idUsager))
+        supprimerTypeChambre(cls.id_type)
+
+    def _reserver(self, jours: int = 0) -> ReservationDTO:
+        debut = datetime(2032, 1, 10) + timedelta(days=jours)
+        return creerReservation(
+            ReservationDTO(
+                dateDebut=debut, dateFin=debut + timedelta(days=1), prixParJour=90.0,
+                chambre=self.chambre, usager=self.usager,
+            )
+        )
+
+    def _rechercher(self):
+        return rechercherReservation(CriteresRechercheDTO(idUsager=str(self.usager.idUsager)))
+
+    def test_recherche_sans_jointure(self):
+        r = self._reserver()
+        try:
+            with compter_requetes() as requetes:
+                trouvees = self._rechercher()
+            self.assertEqual([t.idReservation for t in trouvees], [r.idReservation])
+            self.assertEqual(trouvees[0], r)
+            # La borne de l’archive, puis la recherche
+            self.assertEqual(len(requetes), 2)
+            self.assertNotIn("JOIN", requetes[1].upper())
+        finally:
+            supprimerReservation(str(r.idReservation))
+        self.assertEqual(self._rechercher(), [])
+
+    def test_vue_suit_les_ecritures(self):
+        r = self._reserver(5)
+        try:
+            modifierReservation(str(r.idReservation), ReservationUpdateDTO(prixParJour=95.0, infoReservation="vue"))
+            modifierUsager(str(self.usager.idUsager), UsagerUpdateDTO(adresse="2 Rue Rv"))
+            modifierChambre(str(self.chambre.idChambre), ChambreUpdateDTO(autre_informations="rv-maj"))
+            modifierTypeChambre(self.id_type, TypeChambreUpdateDTO(description_chambre="rv-type-maj"))
+
+            (trouvee,) = self._rechercher()
+            self.assertEqual(trouvee.prixParJour, 95.0)
+            self.assertEqual(trouvee.infoReservation, "vue")
+            self.assertEqual(trouvee.usager.adresse, "2 Rue Rv")
+            self.assertEqual(trouvee.chambre.autre_informations, "rv-maj")
+            self.assertEqual(trouvee.chambre.type_chambre.description_chambre, "rv-type-maj")
+        finally:
+            supprimerReservation(str(r.idReservation))
+
+    def test_copie_lue_dans_la_transaction(self):
+        # Chambre modifiée hors de chambreMetier : le catalogue en mémoire est en retard
+        with SessionLocal() as s:
+            s.execute(
+                update(Chambre)
+                .where(Chambre.id_chambre == self.chambre.idChambre)
+                .values(autre_informations="rv-hors-api")
+            )
+            s.commit()
+        r = None
+        try:
+            r = self._reserver(12)
+            with SessionLocal() as s:
+                self.assertEqual(s.get(ReservationVue, r.idReservation).autre_informations, "rv-hors-api")
+            modifierReservation(str(r.idReservation), ReservationUpdateDTO(infoReservation="rv-maj"))
+            with SessionLocal() as s:
+                ligne = s.get(ReservationVue, r.idReservation)
+                self.assertEqual((ligne.info_reservation, ligne.autre_informations), ("rv-maj", "rv-hors-api"))
+        finally:
+            if r is not None:
+                supprimerReservation(str(r.idReservation))
+            with SessionLocal() as s:
+                s.execute(
+                    update(Chambre)
+                    .where(Chambre.id_chambre == self.chambre.idChambre)
+                    .values(autre_informations=self.chambre.autre_informations)
+                )
+                s.commit()
+
+    def test_reconstruction_identique(self):
+        r = self._reserver(9)
+        try:
+            avant = self._rechercher()
+            with engine.begin() as conn:
+                self.assertGreaterEqual(reconstruire(conn), 1)
+            self.assertEqual(self._rechercher(), avant)
+            with SessionLocal() as s:
+                self.assertIsNotNone(s.get(ReservationVue, r.idReservation))
+        finally:
+            supprimerReservation(str(r.idReservation))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+# ==============================================================
+# tests/test_singleflight.py
+# Vérifie le regroupement des lectures identiques simultanées :
+# une seule exécution, même résultat (ou même erreur) pour tous,
+# sauf l’échéance dépassée du meneur, qui ne touche pas les suiveurs.
+# ==============================================================
+
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi.testclient import TestClient
+
+from core.echeance import DelaiDepasse, avec_echeance, verifier_echeance
+from core.singleflight import SingleFlight
+from DTO.reservationDTO import CriteresRechercheDTO
+from main import app
+
+NB_THREADS = 20
+
+
+class TestSingleFlight(unittest.TestCase):
+    def _en_parallele(self, sf, parametres, fonction):
+        depart = threading.Barrier(NB_THREADS)
+
+        def appeler(i):
+            depart.wait()
+            try:
+                return sf.executer("route", parametres(i), fonction)
+            except ValueError as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=NB_THREADS) as pool:
+            return list(pool.map(appeler, range(NB_THREADS)))
+
+    def test_appels_identiques_regroupes(self):
+        sf = SingleFlight()
+        executions = []
+
+        def lente():
+            executions.append(1)
+            time.sleep(0.2)
+            return b"[]"
+
+        resultats = self._en_parallele(sf, lambda i: "memes-criteres", lente)
+        self.assertEqual(len(executions), 1)
+        self.assertTrue(all(r is resultats[0] for r in resultats))
+        stats = sf.statistiques()
+        self.assertEqual(stats["regroupees"], NB_THREADS - 1)
+        self.assertEqual(stats["routes"]["route"]["executions"], 1)
+        self.assertEqual(stats["en_cours"], 0)
+
+    def test_parametres_differents_non_regroupes(self):
+        sf = SingleFlight()
+        resultats = self._en_parallele(sf, lambda i: i, lambda: time.sleep(0.05) or 1)
+        self.assertEqual(resultats, [1] * NB_THREADS)
+        self.assertEqual(sf.statistiques()["executions"], NB_THREADS)
+
+    def test_erreur_partagee(self):
+        sf = SingleFlight()
+
+        def echoue():
+            time.sleep(0.2)
+            raise ValueError("critères invalides")
+
+        resultats = self._en_parallele(sf, lambda i: "x", echoue)
+        self.assertTrue(all(isinstance(r, ValueError) for r in resultats))
+
+    def test_echeance_du_meneur_non_partagee(self):
+        sf = SingleFlight()
+        executions, commencee = [], threading.Event()
+        erreurs = []
+
+        def lente():
+            executions.append(1)
+            commencee.set()
+            time.sleep(0.1)
+            verifier_echeance()
+            return "ok"
+
+        def meneur():
+            with avec_echeance(0.05):
+                try:
+                    sf.executer("route", "x", lente)
+                except DelaiDepasse as e:
+                    erreurs.append(e)
+
+        fil = threading.Thread(target=meneur)
+        fil.start()
+        commencee.wait()
+        # Suiveur sans échéance : relance la lecture au lieu de recevoir le 504 du meneur
+        self.assertEqual(sf.executer("route", "x", lente), "ok")
+        fil.join()
+        self.assertEqual(len(erreurs), 1)
+        self.assertEqual(len(executions), 2)
+
+    def test_cle_canonique_des_criteres(self):
+        a = CriteresRechercheDTO(idUsager="A" * 8 + "-0000-0000-0000-" + "0" * 12, nom="Roy", prenom="Léa")
+        b = CriteresRechercheDTO(prenom="Léa", nom="Roy", idUsager=a.idUsager.lower())
+        self.assertEqual(a.cle_canonique(), b.cle_canonique())
+        self.assertNotEqual(a.cle_canonique(), CriteresRechercheDTO(nom="Roy", prenom="Lea").cle_canonique())
+
+
+class TestRoutesRegroupees(unittest.TestCase):
+    def test_routes_retournent_du_json(self):
+        with TestClient(app) as client:
+            r = client.get("/chambres")
+            self.assertEqual(r.status_code, 200)
+            self.assertIsInstance(r.json(), list)
+            r = client.post("/rechercherReservation", json={})
+            self.assertEqual(r.status_code, 200)
+            self.assertIsInstance(r.json(), list)
+            self.assertEqual(client.get("/chambres/-1").status_code, 404)
+            stats = client.get("/admin/regroupement").json()
+            self.assertIn("GET /chambres", stats["routes"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+# ==============================================================
+# tests/test_taches.py
+# Vérifie la file des tâches d’arrière-plan : exécution hors de
+# l’appelant, nouveaux essais, file bornée, vidage à l’arrêt et
+# hooks après commit de la session (rien après un rollback).
+# ==============================================================
+
+import threading
+import unittest
+
+from sqlalchemy import text
+
+from core.db import SessionLocal, init_db
+from core.taches import FileTaches, apres_commit, file_taches
+
+
+class TestFileTaches(unittest.TestCase):
+    def setUp(self):
+        self.file = FileTaches(nb_travailleurs=2, taille_max=100, delai_base=0.01, delai_max=0.05)
+
+    def tearDown(self):
+        self.file.vider()
+
+    def test_execution_en_arriere_plan(self):
+        fils = []
+        fait = threading.Event()
+
+        def tache(valeur):
+            fils.append((valeur, threading.current_thread().name))
+            fait.set()
+
+        self.assertTrue(self.file.soumettre(tache, 42))
+        self.assertTrue(fait.wait(2))
+        self.assertEqual(fils[0][0], 42)
+        self.assertTrue(fils[0][1].startswith("taches-"))
+
+    def test_nouveaux_essais_puis_succes(self):
+        essais = []
+
+        def instable():
+            essais.append(1)
+            if len(essais) < 3:
+                raise ConnectionError("panne passagère")
+
+        self.file.soumettre(instable)
+        self.assertTrue(self.file.vider(5))
+        s = self.file.statistiques()
+        self.assertEqual(len(essais), 3)
+        self.assertEqual((s["terminees"], s["reessais"], s["echouees"]), (1, 2, 0))
+
+    def test_abandon_apres_essais_max(self):
+        def toujours_en_panne():
+            raise ConnectionError("panne")
+
+        self.file.essais_max = 3
+        self.file.soumettre(toujours_en_panne)
+        self.assertTrue(self.file.vider(5))
+        s = self.file.statistiques()
+        self.assertEqual((s["echouees"], s["reessais"]), (1, 2))
+
+    def test_file_pleine_execution_dans_l_appelant(self):
+        file = FileTaches(nb_travailleurs=1, taille_max=1)
+        debloquer, commence = threading.Event(), threading.Event()
+
+        def bloquante():
+            commence.set()
+            debloquer.wait(5)
+
+        appelant = []
+        try:
+            self.assertTrue(file.soumettre(bloquante))
+            commence.wait(2)
+            self.assertTrue(file.soumettre(lambda: None))  # occupe la seule place
+            self.assertEqual(file.statistiques()["profondeur"], 1)
+            self.assertFalse(file.soumettre(lambda: appelant.append(threading.current_thread())))
+            self.assertEqual(appelant, [threading.current_thread()])
+        finally:
+            debloquer.set()
+            file.vider()
+        self.assertEqual(file.statistiques()["executees_en_ligne"], 1)
+
+    def test_vidage_attend_les_taches_puis_redemarre(self):
+        faites = []
+        for i in range(20):
+            self.file.soumettre(faites.append, i)
+        self.assertTrue(self.file.vider(5))
+        self.assertEqual(sorted(faites), list(range(20)))
+        s = self.file.statistiques()
+        self.assertEqual((s["profondeur"], s["en_cours"], s["terminees"]), (0, 0, 20))
+        self.assertGreater(s["latence_max_ms"], 0)
+
+        # Une soumission après le vidage relance le pool
+        fait = threading.Event()
+        self.assertTrue(self.file.soumettre(fait.set))
+        self.assertTrue(fait.wait(2))
+
+
+class TestHooksApresCommit(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        init_db()
+
+    def test_taches_soumises_au_commit(self):
+        faites = []
+        with SessionLocal() as s:
+            s.execute(text("SELECT 1"))
+            apres_commit(s, faites.append, "ecriture")
+            self.assertEqual(faites, [])  # rien avant le commit
+            s.commit()
+        file_taches.vider()
+        self.assertEqual(faites, ["ecriture"])
+
+    def test_taches_oubliees_au_rollback(self):
+        faites = []
+        with SessionLocal() as s:
+            s.execute(text("SELECT 1"))
+            apres_commit(s, faites.append, "annulee")
+            s.rollback()
+            s.execute(text("SELECT 1"))
+            s.commit()
+        file_taches.vider()
+        self.assertEqual(faites, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -59,9 +59,8 @@ class TestTypeChambreUpdate(unittest.TestCase):
         # Étape 4 : vérifie que tous les champs ont bien été mis à jour
         self.assertEqual(updated.nom_type, f"{base}-n")
         self.assertEqual(float(updated.prix_plancher), 99.5)
-        # Le champ prix_plafond peut être rempli d’espaces à cause du type CHAR/NCHAR,
-        # donc on enlève les espaces avant la comparaison
-        self.assertEqual(updated.prix_plafond.strip(), "300")
+        # prix_plafond est numérique depuis la migration v5 (plus de texte à nettoyer)
+        self.assertEqual(updated.prix_plafond, 300.0)
         self.assertEqual(updated.description_chambre, "desc new")
 
 # Point d’entrée du test unitaire
@@ -0,0 +1,86 @@
+# ==============================================================
+# tests/test_upsert_concurrent.py
+# Vérifie que creerUsager et creerTypeChambre ne créent jamais
+# de doublon, même appelés en même temps depuis plusieurs threads
+# (contrainte UNIQUE + upsert natif en une seule requête).
+# ==============================================================
+
+import unittest
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import select, func
+
+from core.db import init_db, SessionLocal
+from DTO.chambreDTO import TypeChambreCreateDTO
+from DTO.usagerDTO import UsagerCreateDTO
+from metier.chambreMetier import creerTypeChambre, supprimerTypeChambre
+from metier.usagerMetier import creerUsager, supprimerUsager
+from modele.type_chambre import TypeChambre
+from modele.usager import Usager
+from tests.compteur_sql import compter_requetes
+
+NB_THREADS = 16
+NB_APPELS = 64
+
+
+class TestUpsertConcurrent(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        init_db()
+
+    def test_creer_usager_concurrent_sans_doublon(self):
+        dto = UsagerCreateDTO(
+            prenom="Conc",
+            nom=f"Conc-{uuid.uuid4()}",
+            adresse="1 Rue Conc",
+            mobile=f"560{uuid.uuid4().hex[:6]}",
+            mot_de_passe="pwd",
+            type_usager="client",
+        )
+        with ThreadPoolExecutor(max_workers=NB_THREADS) as pool:
+            resultats = list(pool.map(lambda _: creerUsager(dto), range(NB_APPELS)))
+
+        # Tous les appels retournent le même usager...
+        ids = {r.idUsager for r in resultats}
+        self.assertEqual(len(ids), 1)
+
+        # ... et une seule ligne existe en base
+        with SessionLocal() as s:
+            nb = s.scalar(select(func.count()).select_from(Usager).where(Usager.nom == dto.nom))
+        self.assertEqual(nb, 1)
+
+        # L’upsert tient en une seule requête
+        with compter_requetes() as requetes:
+            again = creerUsager(dto)
+        self.assertEqual(again.idUsager, ids.pop())
+        self.assertEqual(len(requetes), 1)
+
+        self.assertTrue(supprimerUsager(str(again.idUsager)))
+
+    def test_creer_type_chambre_concurrent_sans_doublon(self):
+        dto = TypeChambreCreateDTO(
+            nom_type=f"conc-{uuid.uuid4().hex[:8]}",
+            prix_plancher=75.0,
+            description_chambre="concurrence",
+        )
+        with ThreadPoolExecutor(max_workers=NB_THREADS) as pool:
+            list(pool.map(lambda _: creerTypeChambre(dto), range(NB_APPELS)))
+
+        with SessionLocal() as s:
+            ids = s.execute(
+                select(TypeChambre.id_type_chambre).where(TypeChambre.nom_type == dto.nom_type)
+            ).scalars().all()
+        self.assertEqual(len(ids), 1)
+
+        # Le type existant est retourné tel quel (valeurs d’origine conservées)
+        existant = creerTypeChambre(
+            TypeChambreCreateDTO(nom_type=dto.nom_type, prix_plancher=999.0)
+        )
+        self.assertEqual(existant.prix_plancher, 75.0)
+
+        self.assertTrue(supprimerTypeChambre(str(ids[0])))
+
+
+if __name__ == "__main__":
+    unittest.main()
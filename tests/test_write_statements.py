@@ -0,0 +1,162 @@
+# ==============================================================
+# tests/test_write_statements.py
+# Vérifie le nombre de requêtes SQL des écritures du métier.
+# Les modifications passent par un seul UPDATE ... RETURNING
+# (OUTPUT sur MSSQL) au lieu de get + commit + refresh.
+# ==============================================================
+
+import unittest
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from core.db import init_db, SessionLocal
+from DTO.chambreDTO import (
+    TypeChambreCreateDTO,
+    TypeChambreUpdateDTO,
+    ChambreCreateDTO,
+    ChambreUpdateDTO,
+)
+from DTO.reservationDTO import ReservationDTO, ReservationUpdateDTO
+from DTO.usagerDTO import UsagerCreateDTO, UsagerUpdateDTO
+from metier.chambreMetier import (
+    creerTypeChambre,
+    creerChambre,
+    modifierTypeChambre,
+    modifierChambre,
+    supprimerChambre,
+    supprimerTypeChambre,
+)
+from metier.reservationMetier import (
+    creerReservation,
+    modifierReservation,
+    supprimerReservation,
+)
+from metier.usagerMetier import creerUsager, modifierUsager, supprimerUsager
+from metier.catalogueChambre import catalogue_chambres
+from modele.type_chambre import TypeChambre
+from tests.compteur_sql import compter_requetes
+
+
+class TestWriteStatements(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        init_db()
+        cls.type = creerTypeChambre(
+            TypeChambreCreateDTO(
+                nom_type=f"ws-{uuid.uuid4().hex[:8]}",
+                prix_plancher=100.0,
+                prix_plafond="200",
+                description_chambre="write statements",
+            )
+        )
+        cls.chambre = creerChambre(
+            ChambreCreateDTO(
+                numero_chambre=981,
+                disponible_reservation=True,
+                autre_informations="ws",
+                nom_type=cls.type.nom_type,
+            )
+        )
+        cls.usager = creerUsager(
+            UsagerCreateDTO(
+                prenom="Ws",
+                nom=f"Ws-{uuid.uuid4()}",
+                adresse="1 Rue Ws",
+                mobile=f"558{uuid.uuid4().hex[:6]}",
+                mot_de_passe="pwd",
+                type_usager="client",
+            )
+        )
+
+        with SessionLocal() as s:
+            cls.id_type = str(s.execute(
+                select(TypeChambre.id_type_chambre)
+                .where(TypeChambre.nom_type == cls.type.nom_type)
+            ).scalar_one())
+
+    @classmethod
+    def tearDownClass(cls):
+        supprimerChambre(str(cls.chambre.idChambre))
+        supprimerUsager(str(cls.usager.idUsager))
+        supprimerTypeChambre(cls.id_type)
+
+    def test_modifier_usager_une_requete(self):
+        with compter_requetes() as requetes:
+            u = modifierUsager(str(self.usager.idUsager), UsagerUpdateDTO(adresse="2 Rue Ws"))
+        self.assertEqual(u.adresse, "2 Rue Ws")
+        # UPDATE ... RETURNING + UPDATE de la vue des réservations + journal des changements
+        self.assertEqual(len(requetes), 3)
+        # Le mot de passe n’est pas copié dans la vue
+        with compter_requetes() as requetes:
+            modifierUsager(str(self.usager.idUsager), UsagerUpdateDTO(mot_de_passe="autre"))
+        self.assertEqual(len(requetes), 2)
+
+    def test_modifier_type_chambre_une_requete(self):
+        with compter_requetes() as requetes:
+            tc = modifierTypeChambre(self.id_type, TypeChambreUpdateDTO(description_chambre="maj"))
+        self.assertEqual(tc.description_chambre, "maj")
+        # UPDATE ... RETURNING + UPDATE de la vue des réservations + journal
+        self.assertEqual(len(requetes), 3)
+
+    def test_modifier_chambre_une_requete(self):
+        catalogue_chambres.charger()
+        with compter_requetes() as requetes:
+            ch = modifierChambre(str(self.chambre.idChambre), ChambreUpdateDTO(disponible_reservation=False))
+        self.assertFalse(ch.disponible_reservation)
+        self.assertEqual(ch.type_chambre.nom_type, self.type.nom_type)
+        # UPDATE ... RETURNING + UPDATE de la vue + journal ; le type vient du catalogue en mémoire
+        self.assertEqual(len(requetes), 3)
+
+    def test_modifier_chambre_catalogue_vide(self):
+        catalogue_chambres.invalider()
+        with compter_requetes() as requetes:
+            ch = modifierChambre(str(self.chambre.idChambre), ChambreUpdateDTO(autre_informations="ws2"))
+        self.assertEqual(ch.type_chambre.nom_type, self.type.nom_type)
+        # UPDATE ... RETURNING + chargement du type par clé primaire + UPDATE de la vue + journal
+        self.assertEqual(len(requetes), 4)
+
+    def test_creer_et_modifier_reservation(self):
+        catalogue_chambres.charger()
+        debut = datetime(2026, 3, 1, 15, 0, 0)
+        dto = ReservationDTO(
+            dateDebut=debut,
+            dateFin=debut + timedelta(days=2),
+            prixParJour=120.0,
+            infoReservation="ws",
+            chambre=self.chambre,
+            usager=self.usager,
+        )
+        with compter_requetes() as requetes:
+            created = creerReservation(dto)
+        # Lecture par lot de l’usager (chambre servie par le catalogue)
+        # + INSERT ... RETURNING + INSERT dans la vue des réservations + journal
+        self.assertEqual(len(requetes), 4, requetes)
+
+        with compter_requetes() as requetes:
+            updated = modifierReservation(
+                str(created.idReservation),
+                ReservationUpdateDTO(dateFin=debut + timedelta(days=3), prixParJour=130.0),
+            )
+        self.assertEqual(updated.prixParJour, 130.0)
+        self.assertEqual(updated.chambre.idChambre, self.chambre.idChambre)
+        self.assertEqual(updated.usager.idUsager, self.usager.idUsager)
+        # UPDATE ... RETURNING + UPDATE de la vue + journal : usager en cache, chambre dans le catalogue
+        self.assertEqual(len(requetes), 3, requetes)
+
+        # La validation des dates se fait toujours contre la valeur en base
+        with self.assertRaises(ValueError):
+            modifierReservation(str(created.idReservation), ReservationUpdateDTO(dateFin=debut))
+
+        self.assertTrue(supprimerReservation(str(created.idReservation)))
+
+    def test_modifier_introuvable(self):
+        with self.assertRaises(ValueError):
+            modifierUsager(str(uuid.uuid4()), UsagerUpdateDTO(prenom="X"))
+        with self.assertRaises(ValueError):
+            modifierReservation(str(uuid.uuid4()), ReservationUpdateDTO(prixParJour=1.0))
+
+
+if __name__ == "__main__":
+    unittest.main()